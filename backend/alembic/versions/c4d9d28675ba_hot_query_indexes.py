@@ -0,0 +1,56 @@
+"""Indexes for hot audit, permission grant, notification and client assignment queries
+
+Revision ID: c4d9d28675ba
+Revises: 9d1265301279
+Create Date: 2026-10-16 10:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d9d28675ba'
+down_revision = '9d1265301279'
+branch_labels = None
+depends_on = None
+
+
+# (name, table, columns, partial index predicate); mirrors the Index() declarations in db_models
+INDEXES = [
+    ('idx_audit_logs_created_at', 'audit_logs', ['created_at'], None),
+    ('idx_audit_logs_actor_created', 'audit_logs', ['actor_id', 'created_at'], 'actor_id IS NOT NULL'),
+    ('idx_audit_logs_resource_type_created', 'audit_logs', ['resource_type', 'created_at'], None),
+    ('idx_notification_logs_recipient_template_created', 'notification_logs', ['recipient', 'template_type', 'created_at'], None),
+    ('idx_notification_logs_status_created', 'notification_logs', ['status', 'created_at'], None),
+    ('idx_client_assignments_user_status', 'client_assignments', ['user_id', 'status'], None),
+    ('idx_client_assignments_client_status', 'client_assignments', ['client_id', 'status'], None),
+]
+
+# Created by migrations/003 on databases set up from the SQL scripts; kept on downgrade
+EXISTING_INDEXES = [
+    ('idx_permission_grants_status_expires', 'permission_grants', ['status', 'expires_at'], None),
+    ('idx_sa_properties_ga_property', 'service_account_properties', ['ga_property_id'], None),
+    ('idx_pab_ga_property', 'property_access_bindings', ['ga_property_id'], None),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, and does not block writes to audit_logs
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in EXISTING_INDEXES + INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                sqlite_where=sa.text(where) if where else None
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
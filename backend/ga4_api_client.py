@@ -12,6 +12,8 @@ from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+from src.services.ga4_api_executor import ga4_api_executor
+
 logger = logging.getLogger(__name__)
 
 class GA4ApiClient:
@@ -59,7 +61,7 @@ class GA4ApiClient:
         """
         try:
             request = self.service.accounts().list()
-            response = request.execute()
+            response = await ga4_api_executor.execute(request, "accounts.list", project=self.credentials.project_id)
             
             accounts = []
             if 'accounts' in response:
@@ -93,7 +95,7 @@ class GA4ApiClient:
         try:
             filter_param = f"parent:accounts/{account_id}" if account_id else ""
             request = self.service.properties().list(filter=filter_param)
-            response = request.execute()
+            response = await ga4_api_executor.execute(request, "properties.list", project=self.credentials.project_id)
             
             properties = []
             if 'properties' in response:
@@ -132,7 +134,9 @@ class GA4ApiClient:
         try:
             parent = f"accounts/{account_id}"
             request = self.service.accounts().accessBindings().list(parent=parent)
-            response = request.execute()
+            response = await ga4_api_executor.execute(
+                request, "accounts.accessBindings.list", project=self.credentials.project_id
+            )
             
             bindings = []
             if 'accessBindings' in response:
@@ -167,7 +171,9 @@ class GA4ApiClient:
         try:
             parent = f"properties/{property_id}"
             request = self.service.properties().accessBindings().list(parent=parent)
-            response = request.execute()
+            response = await ga4_api_executor.execute(
+                request, "accessBindings.list", project=self.credentials.project_id, property_id=property_id
+            )
             
             bindings = []
             if 'accessBindings' in response:
@@ -217,7 +223,9 @@ class GA4ApiClient:
                 parent=parent,
                 body=access_binding
             )
-            response = request.execute()
+            response = await ga4_api_executor.execute(
+                request, "accessBindings.create", project=self.credentials.project_id, property_id=property_id
+            )
             
             logger.info(f"GA4 Property {property_id}에 사용자 {user_email} 권한 부여 완료")
             return {
@@ -247,7 +255,9 @@ class GA4ApiClient:
         """
         try:
             request = self.service.properties().accessBindings().delete(name=binding_name)
-            request.execute()
+            await ga4_api_executor.execute(
+                request, "accessBindings.delete", project=self.credentials.project_id, property_id=property_id
+            )
             
             logger.info(f"GA4 Property {property_id}의 접근 권한 {binding_name} 철회 완료")
             return True
@@ -284,7 +294,10 @@ class GA4ApiClient:
                 updateMask='roles',
                 body=access_binding
             )
-            response = request.execute()
+            response = await ga4_api_executor.execute(
+                request, "accessBindings.patch",
+                project=self.credentials.project_id, property_id=binding_name.split('/')[1]
+            )
             
             logger.info(f"GA4 Property 접근 권한 {binding_name} 수정 완료")
             return {
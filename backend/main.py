@@ -13,13 +13,14 @@ import logging
 from contextlib import asynccontextmanager
 import os
 
-from src.api.routers import auth, users, permissions, clients, ga4, health, service_accounts, rbac, permission_requests, permission_lifecycle
+from src.api.routers import auth, users, permissions, clients, ga4, health, service_accounts, rbac, permission_requests, permission_lifecycle, reports, metrics
 # Temporarily exclude problematic routers: notifications, audit, dashboard, ui_components, role_management, enhanced_users
 # from src.api.routers import enhanced_auth, enhanced_users  # Temporarily disabled due to syntax errors
 from src.core.config import settings
 from src.core.database import init_db
 from src.core.exceptions import AppException
-from src.core.rbac import RBACMiddleware
+from src.middleware.security import SecurityMiddleware
+from src.core.lifecycle import start_background_services, stop_background_services
 
 # Configure logging
 logging.basicConfig(
@@ -36,11 +37,13 @@ async def lifespan(app: FastAPI):
     logger.info("Starting GA4 Admin Automation System...")
     await init_db()
     logger.info("Database initialized successfully")
+    await start_background_services()
     
     yield
     
     # Shutdown
     logger.info("Shutting down GA4 Admin Automation System...")
+    await stop_background_services()
 
 
 # Create FastAPI application
@@ -75,8 +78,8 @@ app.add_middleware(
     allowed_hosts=settings.ALLOWED_HOSTS
 )
 
-# Add RBAC middleware
-app.add_middleware(RBACMiddleware)
+# Add security middleware (rate limiting, attack patterns, security headers, RBAC context)
+app.add_middleware(SecurityMiddleware)
 
 
 # Exception handlers
@@ -130,6 +133,8 @@ app.include_router(service_accounts.router, prefix="/api/service-accounts", tags
 app.include_router(rbac.router, tags=["RBAC - Role & Permission Management"])
 app.include_router(permission_requests.router, prefix="/api", tags=["Permission Requests"])
 app.include_router(permission_lifecycle.router, prefix="/api", tags=["Permission Lifecycle"])
+app.include_router(reports.router, prefix="/api")
+app.include_router(metrics.router, prefix="/api/admin/metrics", tags=["Metrics"])
 # app.include_router(enhanced_users.router, tags=["Enhanced User Management"])
 
 
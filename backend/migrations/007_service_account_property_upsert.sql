@@ -0,0 +1,13 @@
+-- Migration 007: Unique key for ServiceAccountProperty upserts
+-- Property discovery upserts on (service_account_id, ga_property_id) with INSERT ... ON CONFLICT
+
+-- Keep the newest row of any duplicates created before the key existed
+DELETE FROM service_account_properties older
+USING service_account_properties newer
+WHERE older.service_account_id = newer.service_account_id
+  AND older.ga_property_id = newer.ga_property_id
+  AND older.id < newer.id;
+
+-- Databases created from migration 003 already have an equivalent UNIQUE constraint
+CREATE UNIQUE INDEX IF NOT EXISTS uq_sa_properties_account_property
+    ON service_account_properties(service_account_id, ga_property_id);
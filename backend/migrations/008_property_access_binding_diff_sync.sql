@@ -0,0 +1,36 @@
+-- Migration 008: Diff-based PropertyAccessBinding synchronization
+-- Roles become a JSONB array and each property remembers the hash of its last synchronized bindings
+
+-- Hash of the binding set written by the last synchronization; unchanged properties are skipped
+ALTER TABLE service_account_properties
+ADD COLUMN IF NOT EXISTS bindings_hash VARCHAR(64);
+
+-- Roles were TEXT[] (migration 003) or a Python list literal in TEXT; store them as a JSONB array.
+-- Existing order is kept: the next synchronization rewrites rows whose roles are not sorted.
+DO $$
+DECLARE
+    roles_type TEXT;
+BEGIN
+    SELECT data_type INTO roles_type
+    FROM information_schema.columns
+    WHERE table_name = 'property_access_bindings' AND column_name = 'roles';
+
+    IF roles_type = 'ARRAY' THEN
+        ALTER TABLE property_access_bindings
+        ALTER COLUMN roles TYPE JSONB USING to_jsonb(roles);
+    ELSIF roles_type = 'text' THEN
+        ALTER TABLE property_access_bindings
+        ALTER COLUMN roles TYPE JSONB USING to_jsonb(string_to_array(translate(roles, '[]'' ', ''), ','));
+    END IF;
+END $$;
+
+-- Keep the newest row of any duplicates, then enforce one binding per user and property
+DELETE FROM property_access_bindings older
+USING property_access_bindings newer
+WHERE older.service_account_id = newer.service_account_id
+  AND older.ga_property_id = newer.ga_property_id
+  AND older.user_email = newer.user_email
+  AND older.id < newer.id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_pab_account_property_email
+    ON property_access_bindings(service_account_id, ga_property_id, user_email);
@@ -0,0 +1,6 @@
+-- Migration 009: Incremental access binding synchronization
+-- Service accounts remember how far GA4 change history has been read and when every property was last re-listed
+
+ALTER TABLE service_accounts
+ADD COLUMN IF NOT EXISTS binding_sync_watermark TIMESTAMP WITH TIME ZONE,
+ADD COLUMN IF NOT EXISTS binding_full_sync_at TIMESTAMP WITH TIME ZONE;
@@ -12,8 +12,8 @@ from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...core.database import get_db
-from ...core.auth_dependencies import get_current_user, require_roles
-from ...models.db_models import User, UserRole
+from ...core.auth_dependencies import CurrentUser, get_current_user, require_roles
+from ...models.db_models import UserRole
 from ...services.ai_insights_service import AIInsightsService, InsightType, Priority
 from ...services.ml_model_service import MLModelService, ModelType, PredictionResult
 
@@ -95,7 +95,7 @@ class PredictionResponse(BaseModel):
 @router.post("/generate", response_model=List[InsightResponse])
 async def generate_insights(
     request: InsightRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -147,7 +147,7 @@ async def generate_insights(
 @router.post("/query", response_model=Dict[str, Any])
 async def natural_language_query(
     request: NaturalLanguageQuery,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -183,7 +183,7 @@ async def natural_language_query(
 @router.post("/anomaly-detection", response_model=PredictionResponse)
 async def detect_anomalies(
     request: AnomalyDetectionRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -218,7 +218,7 @@ async def detect_anomalies(
 @router.post("/trend-prediction", response_model=PredictionResponse)
 async def predict_trends(
     request: TrendPredictionRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -252,7 +252,7 @@ async def predict_trends(
 @router.post("/conversion-prediction", response_model=PredictionResponse)
 async def predict_conversion(
     request: ConversionPredictionRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -288,7 +288,7 @@ async def predict_conversion(
 @router.get("/models", response_model=List[Dict[str, Any]])
 async def list_models(
     model_type: Optional[ModelType] = Query(None, description="Filter by model type"),
-    current_user: User = Depends(require_roles([UserRole.ADMIN, UserRole.ANALYST])),
+    current_user: CurrentUser = Depends(require_roles([UserRole.ADMIN, UserRole.ANALYST])),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -324,7 +324,7 @@ async def list_models(
 @router.post("/models/train", response_model=Dict[str, str])
 async def train_model(
     request: ModelTrainingRequest,
-    current_user: User = Depends(require_roles([UserRole.ADMIN])),
+    current_user: CurrentUser = Depends(require_roles([UserRole.ADMIN])),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -355,7 +355,7 @@ async def train_model(
 @router.get("/models/{model_id}", response_model=Dict[str, Any])
 async def get_model_info(
     model_id: str,
-    current_user: User = Depends(require_roles([UserRole.ADMIN, UserRole.ANALYST])),
+    current_user: CurrentUser = Depends(require_roles([UserRole.ADMIN, UserRole.ANALYST])),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -399,7 +399,7 @@ async def get_insights_history(
     days: int = Query(7, ge=1, le=90, description="Number of days to look back"),
     insight_type: Optional[InsightType] = Query(None, description="Filter by insight type"),
     priority: Optional[Priority] = Query(None, description="Filter by priority"),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -423,7 +423,7 @@ async def get_insights_history(
 @router.get("/dashboard-summary", response_model=Dict[str, Any])
 async def get_dashboard_summary(
     client_id: str = Query(..., description="Client ID"),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
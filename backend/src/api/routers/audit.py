@@ -7,8 +7,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated, List, Optional, Dict, Any
 from datetime import datetime
 
-from ...core.database import get_db
-from ...models.schemas import AuditLogResponse
+from ...core.database import get_read_db
+from ...models.schemas import AuditLogResponse, CursorPage
 from ...services.auth_service import AuthService
 from ...services.audit_service import AuditService
 
@@ -25,7 +25,7 @@ async def list_audit_logs(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     current_user: Annotated[dict, Depends(AuthService.get_current_user)] = None,
-    db: Annotated[AsyncSession, Depends(get_db)] = None
+    db: Annotated[AsyncSession, Depends(get_read_db)] = None
 ):
     """List audit logs"""
     # Only admins can view audit logs
@@ -48,12 +48,44 @@ async def list_audit_logs(
     return logs
 
 
+@router.get("/cursor", response_model=CursorPage[AuditLogResponse])
+async def list_audit_logs_by_cursor(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+    actor_id: Optional[int] = None,
+    resource_type: Optional[str] = None,
+    action: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    current_user: Annotated[dict, Depends(AuthService.get_current_user)] = None,
+    db: Annotated[AsyncSession, Depends(get_read_db)] = None
+):
+    """List audit logs newest first with keyset pagination; page depth does not affect latency"""
+    # Only admins can view audit logs
+    if current_user.get("role") not in ["admin", "super_admin"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Insufficient permissions"
+        )
+    
+    audit_service = AuditService(db)
+    return await audit_service.get_audit_logs_page(
+        limit=limit,
+        cursor=cursor,
+        actor_id=actor_id,
+        resource_type=resource_type,
+        action=action,
+        start_date=start_date,
+        end_date=end_date
+    )
+
+
 @router.get("/recent", response_model=List[AuditLogResponse])
 async def get_recent_activity(
     limit: int = Query(10, ge=1, le=50),
     resource_types: Optional[List[str]] = Query(None),
     current_user: Annotated[dict, Depends(AuthService.get_current_user)] = None,
-    db: Annotated[AsyncSession, Depends(get_db)] = None
+    db: Annotated[AsyncSession, Depends(get_read_db)] = None
 ):
     """Get recent activity logs"""
     audit_service = AuditService(db)
@@ -69,7 +101,7 @@ async def get_activity_summary(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     current_user: Annotated[dict, Depends(AuthService.get_current_user)] = None,
-    db: Annotated[AsyncSession, Depends(get_db)] = None
+    db: Annotated[AsyncSession, Depends(get_read_db)] = None
 ):
     """Get activity summary statistics"""
     # Only admins can view audit summaries
@@ -95,7 +127,7 @@ async def count_audit_logs(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     current_user: Annotated[dict, Depends(AuthService.get_current_user)] = None,
-    db: Annotated[AsyncSession, Depends(get_db)] = None
+    db: Annotated[AsyncSession, Depends(get_read_db)] = None
 ):
     """Count audit logs with filters"""
     # Only admins can count audit logs
@@ -8,7 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated
 
 from ...core.database import get_db
-from ...core.exceptions import AuthenticationError, ValidationError
+from ...core.exceptions import AuthenticationError, ServiceUnavailableError, ValidationError
 from ...models.schemas import UserLogin, UserCreate, Token, UserResponse
 from ...services.auth_service import AuthService
 from ...services.user_service import UserService
@@ -68,6 +68,12 @@ async def login(
             detail=e.message,
             headers={"WWW-Authenticate": "Bearer"},
         )
+    except ServiceUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=e.message,
+            headers={"Retry-After": str(e.retry_after)},
+        )
 
 
 @router.post("/refresh", response_model=Token)
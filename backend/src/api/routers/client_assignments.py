@@ -9,7 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...core.database import get_db
 from ...core.auth_dependencies import (
-    get_current_user, require_permissions, require_roles, 
+    CurrentUser, get_current_user, require_permissions, require_roles, 
     get_user_accessible_clients
 )
 from ...core.exceptions import AppException, create_http_exception
@@ -35,7 +35,7 @@ router = APIRouter(prefix="/client-assignments", tags=["Client Assignments"])
 @require_permissions(["manage_client_assignments"])
 async def create_client_assignment(
     assignment_data: ClientAssignmentCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new client assignment"""
@@ -56,7 +56,7 @@ async def create_client_assignment(
 @require_permissions(["manage_client_assignments"])
 async def bulk_create_client_assignments(
     bulk_data: ClientAssignmentBulkCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Create multiple client assignments"""
@@ -78,7 +78,7 @@ async def list_client_assignments(
     client_id: Optional[int] = Query(None, description="Filter by client ID"),
     status: Optional[str] = Query(None, description="Filter by assignment status"),
     include_inactive: bool = Query(False, description="Include inactive assignments"),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     accessible_clients: List[int] = Depends(get_user_accessible_clients),
     db: AsyncSession = Depends(get_db)
 ):
@@ -123,7 +123,7 @@ async def list_client_assignments(
 )
 async def get_client_assignment(
     assignment_id: int = Path(..., description="Assignment ID"),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific client assignment"""
@@ -157,7 +157,7 @@ async def get_client_assignment(
 async def update_client_assignment(
     assignment_id: int = Path(..., description="Assignment ID"),
     update_data: ClientAssignmentUpdate = ...,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Update a client assignment"""
@@ -177,7 +177,7 @@ async def update_client_assignment(
 @require_permissions(["manage_client_assignments"])
 async def delete_client_assignment(
     assignment_id: int = Path(..., description="Assignment ID"),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Delete a client assignment"""
@@ -198,7 +198,7 @@ async def delete_client_assignment(
 async def get_user_client_assignments(
     user_id: int = Path(..., description="User ID"),
     include_inactive: bool = Query(False, description="Include inactive assignments"),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get all client assignments for a user"""
@@ -226,7 +226,7 @@ async def get_user_client_assignments(
 async def get_client_user_assignments(
     client_id: int = Path(..., description="Client ID"),
     include_inactive: bool = Query(False, description="Include inactive assignments"),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     accessible_clients: List[int] = Depends(get_user_accessible_clients),
     db: AsyncSession = Depends(get_db)
 ):
@@ -255,7 +255,7 @@ async def get_client_user_assignments(
 @require_roles([UserRole.SUPER_ADMIN, UserRole.ADMIN])
 async def get_user_access_control_summary(
     user_id: int = Path(..., description="User ID"),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get access control summary for a user"""
@@ -287,7 +287,7 @@ async def get_user_access_control_summary(
 )
 async def validate_client_access(
     client_id: int = Path(..., description="Client ID"),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Validate if user has access to a client"""
@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated, List, Optional
 
-from ...core.database import get_db
+from ...core.database import get_db, get_read_db
 from ...core.rbac import Permission, require_permission, get_current_user_with_permissions
 from ...models.schemas import ClientResponse, MessageResponse, ClientCreate, ClientUpdate
 from ...services.client_service import ClientService
@@ -20,7 +20,7 @@ async def list_clients(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     current_user: dict = Depends(get_current_user_with_permissions),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """List clients with RBAC protection"""
     try:
@@ -39,7 +39,7 @@ async def list_clients(
 async def get_client(
     client_id: int,
     current_user: dict = Depends(get_current_user_with_permissions),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get client by ID with RBAC protection"""
     try:
@@ -10,14 +10,15 @@ from sqlalchemy.orm import selectinload
 
 from ...core.database import get_db
 from ...core.auth_dependencies import (
-    get_current_user, require_permissions, require_roles,
+    CurrentUser, get_current_user, require_permissions, require_roles,
     get_user_accessible_clients, require_client_access
 )
 from ...core.exceptions import AppException, create_http_exception
+from ...core.pagination import keyset_page
 from ...models.db_models import User, Client, ClientAssignment, UserRole, ClientAssignmentStatus
 from ...models.schemas import (
     ClientCreate, ClientUpdate, ClientResponse, ClientWithUsersResponse,
-    UserResponse, MessageResponse
+    UserResponse, MessageResponse, CursorPage
 )
 from ...services.client_assignment_service import ClientAssignmentService
 
@@ -25,6 +26,43 @@ from ...services.client_assignment_service import ClientAssignmentService
 router = APIRouter(prefix="/clients", tags=["Clients (Enhanced)"])
 
 
+def _client_with_users(client: Client) -> ClientWithUsersResponse:
+    """Client response listing its active assignments"""
+    active_assignments = [
+        a for a in client.client_assignments
+        if a.status == ClientAssignmentStatus.ACTIVE
+    ]
+
+    return ClientWithUsersResponse(
+        id=client.id,
+        name=client.name,
+        description=client.description,
+        contact_email=client.contact_email,
+        is_active=client.is_active,
+        created_at=client.created_at,
+        updated_at=client.updated_at,
+        assigned_users=active_assignments,
+        total_assigned_users=len(active_assignments)
+    )
+
+
+def _accessible_clients_query(current_user: CurrentUser, accessible_clients: List[int], include_inactive: bool):
+    """Clients the current user may list, with their assignments loaded"""
+    query = select(Client).options(
+        selectinload(Client.client_assignments).selectinload(ClientAssignment.user)
+    )
+
+    # Apply access control filtering
+    if current_user.role != UserRole.SUPER_ADMIN:
+        query = query.where(Client.id.in_(accessible_clients))
+
+    # Filter by active status
+    if not include_inactive:
+        query = query.where(Client.is_active == True)
+
+    return query
+
+
 @router.get(
     "/",
     response_model=List[ClientWithUsersResponse],
@@ -35,24 +73,13 @@ async def list_clients_with_access_control(
     page: int = Query(1, gt=0, description="Page number"),
     per_page: int = Query(10, gt=0, le=100, description="Items per page"),
     include_inactive: bool = Query(False, description="Include inactive clients"),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     accessible_clients: List[int] = Depends(get_user_accessible_clients),
     db: AsyncSession = Depends(get_db)
 ):
     """List clients with access control filtering"""
     try:
-        # Build base query
-        query = select(Client).options(
-            selectinload(Client.client_assignments).selectinload(ClientAssignment.user)
-        )
-        
-        # Apply access control filtering
-        if current_user.role != UserRole.SUPER_ADMIN:
-            query = query.where(Client.id.in_(accessible_clients))
-        
-        # Filter by active status
-        if not include_inactive:
-            query = query.where(Client.is_active == True)
+        query = _accessible_clients_query(current_user, accessible_clients, include_inactive)
         
         # Apply pagination
         offset = (page - 1) * per_page
@@ -63,28 +90,38 @@ async def list_clients_with_access_control(
         clients = result.scalars().all()
         
         # Convert to response format
-        response_clients = []
-        for client in clients:
-            # Count active assignments
-            active_assignments = [
-                a for a in client.client_assignments 
-                if a.status == ClientAssignmentStatus.ACTIVE
-            ]
-            
-            response_client = ClientWithUsersResponse(
-                id=client.id,
-                name=client.name,
-                description=client.description,
-                contact_email=client.contact_email,
-                is_active=client.is_active,
-                created_at=client.created_at,
-                updated_at=client.updated_at,
-                assigned_users=active_assignments,
-                total_assigned_users=len(active_assignments)
-            )
-            response_clients.append(response_client)
+        return [_client_with_users(client) for client in clients]
+        
+    except AppException as e:
+        raise create_http_exception(e)
+
+
+@router.get(
+    "/cursor",
+    response_model=CursorPage[ClientWithUsersResponse],
+    summary="List Clients with Access Control by Cursor",
+    description="Get accessible clients ordered by name with keyset pagination"
+)
+async def list_clients_with_access_control_by_cursor(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    per_page: int = Query(10, gt=0, le=100, description="Items per page"),
+    include_inactive: bool = Query(False, description="Include inactive clients"),
+    current_user: CurrentUser = Depends(get_current_user),
+    accessible_clients: List[int] = Depends(get_user_accessible_clients),
+    db: AsyncSession = Depends(get_db)
+):
+    """List clients with access control filtering, continuing after ``cursor``"""
+    try:
+        query = _accessible_clients_query(current_user, accessible_clients, include_inactive)
+        clients, next_cursor = await keyset_page(
+            db, query, Client.name, Client.id, per_page, cursor, descending=False
+        )
         
-        return response_clients
+        return CursorPage[ClientWithUsersResponse](
+            items=[_client_with_users(client) for client in clients],
+            next_cursor=next_cursor,
+            size=per_page
+        )
         
     except AppException as e:
         raise create_http_exception(e)
@@ -99,7 +136,7 @@ async def list_clients_with_access_control(
 async def get_client_with_access_control(
     client_id: int = Path(..., description="Client ID"),
     include_inactive_assignments: bool = Query(False, description="Include inactive assignments"),
-    current_user: User = Depends(require_client_access),
+    current_user: CurrentUser = Depends(require_client_access),
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific client with access control"""
@@ -153,7 +190,7 @@ async def get_client_with_access_control(
 @require_permissions(["create_client"])
 async def create_client(
     client_data: ClientCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new client"""
@@ -196,7 +233,7 @@ async def create_client(
 async def update_client(
     client_id: int = Path(..., description="Client ID"),
     client_data: ClientUpdate = ...,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     accessible_clients: List[int] = Depends(get_user_accessible_clients),
     db: AsyncSession = Depends(get_db)
 ):
@@ -261,7 +298,7 @@ async def update_client(
 @require_roles([UserRole.SUPER_ADMIN])
 async def delete_client(
     client_id: int = Path(..., description="Client ID"),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Delete a client (Super Admin only)"""
@@ -312,7 +349,7 @@ async def delete_client(
 async def get_client_users(
     client_id: int = Path(..., description="Client ID"),
     include_inactive: bool = Query(False, description="Include inactive assignments"),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     accessible_clients: List[int] = Depends(get_user_accessible_clients),
     db: AsyncSession = Depends(get_db)
 ):
@@ -354,7 +391,7 @@ async def assign_user_to_client(
     client_id: int = Path(..., description="Client ID"),
     user_id: int = Path(..., description="User ID"),
     notes: Optional[str] = Query(None, description="Assignment notes"),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Quick assign a user to a client"""
@@ -385,7 +422,7 @@ async def assign_user_to_client(
 async def unassign_user_from_client(
     client_id: int = Path(..., description="Client ID"),
     user_id: int = Path(..., description="User ID"),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Remove user assignment from client"""
@@ -9,7 +9,7 @@ from typing import Annotated, Dict, Any
 from datetime import datetime
 
 from ...core.database import get_db
-from ...core.exceptions import AuthenticationError, ValidationError, SecurityError
+from ...core.exceptions import AuthenticationError, ValidationError, SecurityError, ServiceUnavailableError
 from ...models.schemas import (
     UserLogin, Token, UserResponse, UserRegistrationRequest,
     EmailVerificationRequest
@@ -133,6 +133,12 @@ async def login(
             detail=e.message,
             headers={"Retry-After": "900"}  # 15 minutes
         )
+    except ServiceUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=e.message,
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -12,10 +12,23 @@ from ...core.exceptions import GoogleAPIError
 from ...models.schemas import MessageResponse
 from ...core.rbac import Permission, require_permission, get_current_user_with_permissions
 from ...services.google_api_service import GoogleAnalyticsService
+from ...services.ga4_client_registry import ga4_client_registry
+from ...services.ga4_metadata_cache import cache_key, ga4_metadata_cache, get_ga4_metadata_cache_stats
 
 router = APIRouter()
 
 
+def get_ga_service() -> GoogleAnalyticsService:
+    """Dependency to get the long-lived GA4 Admin client"""
+    try:
+        return ga4_client_registry.get()
+    except GoogleAPIError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Google API error: {e.message}"
+        )
+
+
 @router.get("/")
 @require_permission(Permission.GA4_PROPERTY_READ)
 async def list_ga4_properties(
@@ -23,7 +36,8 @@ async def list_ga4_properties(
     limit: int = Query(100, ge=1, le=1000),
     account_id: str = Query(None, description="Filter by GA4 account ID"),
     current_user: dict = Depends(get_current_user_with_permissions),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    ga_service: GoogleAnalyticsService = Depends(get_ga_service)
 ) -> List[Dict[str, Any]]:
     """
     List Google Analytics 4 properties with permission-based filtering.
@@ -31,8 +45,6 @@ async def list_ga4_properties(
     Required permissions: GA4_PROPERTY_READ (ADMIN+ or assigned users)
     """
     try:
-        ga_service = GoogleAnalyticsService()
-        
         # Get user's accessible properties based on role and assignments
         user_role = current_user.get("role", "viewer")
         user_id = current_user.get("user_id")
@@ -77,7 +89,8 @@ async def list_ga4_properties(
 async def get_ga4_property(
     property_id: str,
     current_user: dict = Depends(get_current_user_with_permissions),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    ga_service: GoogleAnalyticsService = Depends(get_ga_service)
 ) -> Dict[str, Any]:
     """
     Get specific GA4 property details.
@@ -85,8 +98,6 @@ async def get_ga4_property(
     Required permissions: GA4_PROPERTY_READ (ADMIN+ or assigned users)
     """
     try:
-        ga_service = GoogleAnalyticsService()
-        
         # Check if user has access to this property
         user_role = current_user.get("role", "viewer")
         user_id = current_user.get("user_id")
@@ -125,7 +136,8 @@ async def get_ga4_property(
 async def get_property_permissions(
     property_id: str,
     current_user: dict = Depends(get_current_user_with_permissions),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    ga_service: GoogleAnalyticsService = Depends(get_ga_service)
 ) -> Dict[str, Any]:
     """
     Get current permissions for a GA4 property.
@@ -133,8 +145,6 @@ async def get_property_permissions(
     Required permissions: GA4_PROPERTY_READ (ADMIN+ or assigned users)
     """
     try:
-        ga_service = GoogleAnalyticsService()
-        
         # Verify property access
         user_role = current_user.get("role", "viewer")
         user_id = current_user.get("user_id")
@@ -181,7 +191,8 @@ async def grant_property_permission(
     property_id: str,
     permission_data: dict,
     current_user: dict = Depends(get_current_user_with_permissions),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    ga_service: GoogleAnalyticsService = Depends(get_ga_service)
 ) -> Dict[str, Any]:
     """
     Grant permission to a GA4 property (usually triggered by approval workflow).
@@ -189,8 +200,6 @@ async def grant_property_permission(
     Required permissions: GA4_PROPERTY_UPDATE (ADMIN+ only)
     """
     try:
-        ga_service = GoogleAnalyticsService()
-        
         # Extract permission details
         target_email = permission_data.get("target_email")
         role = permission_data.get("role", "VIEWER")  # GA4 roles: VIEWER, ANALYST, EDITOR, ADMIN
@@ -237,7 +246,8 @@ async def revoke_property_permission(
     property_id: str,
     target_email: str = Query(..., description="Email of user to revoke permission from"),
     current_user: dict = Depends(get_current_user_with_permissions),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    ga_service: GoogleAnalyticsService = Depends(get_ga_service)
 ) -> Dict[str, Any]:
     """
     Revoke permission from a GA4 property.
@@ -245,8 +255,6 @@ async def revoke_property_permission(
     Required permissions: GA4_PROPERTY_UPDATE (ADMIN+ only)
     """
     try:
-        ga_service = GoogleAnalyticsService()
-        
         # Revoke permission via Google API
         result = await ga_service.revoke_property_permission(
             property_id=property_id,
@@ -279,14 +287,14 @@ async def revoke_property_permission(
 @require_permission(Permission.GA4_PROPERTY_READ)
 async def list_ga4_accounts(
     current_user: dict = Depends(get_current_user_with_permissions),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    ga_service: GoogleAnalyticsService = Depends(get_ga_service)
 ) -> List[Dict[str, Any]]:
     """List all Google Analytics accounts"""
     # RBAC decorator handles access control
     
     try:
-        ga_service = GoogleAnalyticsService()
-        accounts = await ga_service.list_accounts()
+        accounts = await ga4_metadata_cache.get(cache_key(ga_service, "accounts"), ga_service.list_accounts)
         return accounts
     except GoogleAPIError as e:
         raise HTTPException(
@@ -300,14 +308,17 @@ async def list_ga4_accounts(
 async def list_ga4_properties(
     account_name: str,
     current_user: dict = Depends(get_current_user_with_permissions),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    ga_service: GoogleAnalyticsService = Depends(get_ga_service)
 ) -> List[Dict[str, Any]]:
     """List properties for a specific account"""
     # RBAC decorator handles access control
     
     try:
-        ga_service = GoogleAnalyticsService()
-        properties = await ga_service.list_properties(account_name)
+        properties = await ga4_metadata_cache.get(
+            cache_key(ga_service, "properties", account_name),
+            lambda: ga_service.list_properties(account_name)
+        )
         return properties
     except GoogleAPIError as e:
         raise HTTPException(
@@ -321,14 +332,17 @@ async def list_ga4_properties(
 async def get_property_users(
     property_name: str,
     current_user: dict = Depends(get_current_user_with_permissions),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    ga_service: GoogleAnalyticsService = Depends(get_ga_service)
 ) -> List[Dict[str, Any]]:
     """Get users for a specific property"""
     # RBAC decorator handles access control
     
     try:
-        ga_service = GoogleAnalyticsService()
-        users = await ga_service.get_property_users(property_name)
+        users = await ga4_metadata_cache.get(
+            cache_key(ga_service, "users", property_name),
+            lambda: ga_service.get_property_users(property_name)
+        )
         return users
     except GoogleAPIError as e:
         raise HTTPException(
@@ -342,13 +356,13 @@ async def get_property_users(
 async def validate_property_access(
     property_name: str,
     current_user: dict = Depends(get_current_user_with_permissions),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    ga_service: GoogleAnalyticsService = Depends(get_ga_service)
 ):
     """Validate if service account has access to manage the property"""
     # RBAC decorator handles access control
     
     try:
-        ga_service = GoogleAnalyticsService()
         has_access = await ga_service.validate_property_access(property_name)
         
         if has_access:
@@ -362,4 +376,13 @@ async def validate_property_access(
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=f"Google API error: {e.message}"
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/cache-stats")
+@require_permission(Permission.SYSTEM_HEALTH)
+async def get_ga4_cache_stats(
+    current_user: dict = Depends(get_current_user_with_permissions)
+) -> Dict[str, Any]:
+    """GA4 metadata cache hit ratio and upstream call counts"""
+    return get_ga4_metadata_cache_stats()
@@ -0,0 +1,31 @@
+"""
+Admin metrics endpoints
+"""
+
+from fastapi import APIRouter, Depends, Query
+from typing import Any, Dict
+
+from ...core.database import replica_router
+from ...core.db_metrics import db_metrics
+from ...core.rbac import Permission, require_permission, get_current_user_with_permissions
+
+router = APIRouter()
+
+
+@router.get("/database")
+@require_permission(Permission.SYSTEM_HEALTH)
+async def get_database_metrics(
+    top: int = Query(20, ge=1, le=500, description="Statements to list, by total time"),
+    current_user: dict = Depends(get_current_user_with_permissions)
+) -> Dict[str, Any]:
+    """Connection pool gauges, statement timing histograms, statements per request and recent slow queries"""
+    return db_metrics.get_stats(top=top)
+
+
+@router.get("/replicas")
+@require_permission(Permission.SYSTEM_HEALTH)
+async def get_replica_metrics(
+    current_user: dict = Depends(get_current_user_with_permissions)
+) -> Dict[str, Any]:
+    """Replica lag and health, and how reads were routed"""
+    return replica_router.get_stats()
@@ -9,7 +9,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, or_
 
-from ...core.database import get_db
+from ...core.database import get_db, get_read_db
 from ...core.rbac import Permission, require_permission, get_current_user_with_permissions
 from ...models.db_models import (
     User, UserRole, PermissionRequest, PermissionGrant,
@@ -27,10 +27,10 @@ async def get_permission_request_service(
 ) -> PermissionRequestService:
     """Dependency to get PermissionRequestService"""
     from ...services.client_assignment_service import ClientAssignmentService
-    from ...services.google_api_service import GoogleAnalyticsService
+    from ...services.ga4_client_registry import ga4_client_registry
     
     client_assignment_service = ClientAssignmentService(db)
-    google_api_service = GoogleAnalyticsService()
+    google_api_service = ga4_client_registry.get()
     audit_service = AuditService(db)
     
     return PermissionRequestService(
@@ -45,7 +45,7 @@ async def get_permission_request_service(
 @require_permission(Permission.PERMISSION_READ)
 async def get_lifecycle_dashboard(
     current_user: dict = Depends(get_current_user_with_permissions),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ) -> Dict[str, Any]:
     """
     Get permission lifecycle dashboard overview
@@ -157,7 +157,7 @@ async def get_permission_timeline(
     user_id: Optional[int] = Query(None, description="Filter by user (admin only)"),
     days: int = Query(30, ge=1, le=365, description="Timeline range in days"),
     current_user: dict = Depends(get_current_user_with_permissions),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ) -> Dict[str, Any]:
     """
     Get permission lifecycle timeline
@@ -348,7 +348,7 @@ async def get_expiring_permissions(
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
     current_user: dict = Depends(get_current_user_with_permissions),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ) -> Dict[str, Any]:
     """
     Get permissions expiring within specified days
@@ -522,7 +522,7 @@ async def bulk_extend_permissions(
 async def get_lifecycle_statistics(
     period: str = Query("month", regex="^(week|month|quarter|year)$"),
     current_user: dict = Depends(get_current_user_with_permissions),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ) -> Dict[str, Any]:
     """
     Get comprehensive lifecycle statistics
@@ -13,11 +13,11 @@ from ...models.db_models import User, UserRole, PermissionRequestStatus
 from ...models.schemas import (
     PermissionRequestCreate, PermissionRequestResponse, PermissionRequestUpdate,
     ClientPropertiesResponse, AutoApprovalRuleResponse, MessageResponse,
-    PaginatedResponse
+    PaginatedResponse, CursorPage
 )
 from ...services.permission_request_service import PermissionRequestService
 from ...services.client_assignment_service import ClientAssignmentService
-from ...services.google_api_service import GoogleAnalyticsService
+from ...services.ga4_client_registry import ga4_client_registry
 from ...services.audit_service import AuditService
 from ...core.exceptions import (
     ValidationError, BusinessRuleViolationError, DuplicateResourceError,
@@ -33,7 +33,7 @@ async def get_permission_request_service(
 ) -> PermissionRequestService:
     """Dependency to get PermissionRequestService"""
     client_assignment_service = ClientAssignmentService(db)
-    google_api_service = GoogleAnalyticsService()
+    google_api_service = ga4_client_registry.get()
     audit_service = AuditService(db)
     
     return PermissionRequestService(
@@ -157,6 +157,26 @@ async def get_my_permission_requests(
     )
 
 
+@router.get("/my-requests/cursor", response_model=CursorPage[PermissionRequestResponse])
+@require_permission(Permission.PERMISSION_READ, resource_ownership=True, allow_self_access=True)
+async def get_my_permission_requests_by_cursor(
+    status_filter: Optional[PermissionRequestStatus] = Query(None, alias="status"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=100),
+    current_user: dict = Depends(get_current_user_with_permissions),
+    service: PermissionRequestService = Depends(get_permission_request_service)
+):
+    """
+    Get current user's permission requests with keyset pagination
+    
+    Same filters as /my-requests, newest first; pass next_cursor back as
+    ``cursor`` to read the following page.
+    """
+    return await service.get_user_permission_requests_page(
+        current_user["user_id"], status_filter, limit, cursor
+    )
+
+
 @router.get("/pending-approvals", response_model=List[PermissionRequestResponse])
 @require_permission(Permission.PERMISSION_READ)
 async def get_pending_approval_requests(
@@ -179,6 +199,25 @@ async def get_pending_approval_requests(
     )
 
 
+@router.get("/pending-approvals/cursor", response_model=CursorPage[PermissionRequestResponse])
+@require_permission(Permission.PERMISSION_READ)
+async def get_pending_approval_requests_by_cursor(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=100),
+    current_user: dict = Depends(get_current_user_with_permissions),
+    service: PermissionRequestService = Depends(get_permission_request_service)
+):
+    """
+    Get permission requests pending approval with keyset pagination
+    
+    Same requests as /pending-approvals, newest first; pass next_cursor back
+    as ``cursor`` to read the following page.
+    """
+    return await service.get_pending_requests_for_approval_page(
+        current_user["user_id"], limit, cursor
+    )
+
+
 @router.put("/{request_id}/approve", response_model=PermissionRequestResponse)
 @require_permission(Permission.PERMISSION_APPROVE)
 async def approve_permission_request(
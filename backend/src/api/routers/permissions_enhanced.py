@@ -10,7 +10,7 @@ from sqlalchemy.orm import selectinload
 
 from ...core.database import get_db
 from ...core.auth_dependencies import (
-    get_current_user, require_permissions, require_roles,
+    CurrentUser, get_current_user, require_permissions, require_roles,
     get_user_accessible_clients
 )
 from ...core.exceptions import AppException, create_http_exception
@@ -40,7 +40,7 @@ async def list_permission_grants_with_access_control(
     user_id: Optional[int] = Query(None, description="Filter by user ID"),
     status: Optional[PermissionStatus] = Query(None, description="Filter by status"),
     permission_level: Optional[PermissionLevel] = Query(None, description="Filter by permission level"),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     accessible_clients: List[int] = Depends(get_user_accessible_clients),
     db: AsyncSession = Depends(get_db)
 ):
@@ -115,7 +115,7 @@ async def list_permission_grants_with_access_control(
 )
 async def get_permission_grant(
     permission_id: int = Path(..., description="Permission Grant ID"),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     accessible_clients: List[int] = Depends(get_user_accessible_clients),
     db: AsyncSession = Depends(get_db)
 ):
@@ -172,7 +172,7 @@ async def get_permission_grant(
 @require_permissions(["create_permission"])
 async def create_permission_grant(
     permission_data: PermissionGrantCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     accessible_clients: List[int] = Depends(get_user_accessible_clients),
     db: AsyncSession = Depends(get_db)
 ):
@@ -255,7 +255,7 @@ async def create_permission_grant(
 async def update_permission_grant(
     permission_id: int = Path(..., description="Permission Grant ID"),
     update_data: PermissionGrantUpdate = ...,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     accessible_clients: List[int] = Depends(get_user_accessible_clients),
     db: AsyncSession = Depends(get_db)
 ):
@@ -350,7 +350,7 @@ async def update_permission_grant(
 @require_permissions(["delete_permission"])
 async def delete_permission_grant(
     permission_id: int = Path(..., description="Permission Grant ID"),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     accessible_clients: List[int] = Depends(get_user_accessible_clients),
     db: AsyncSession = Depends(get_db)
 ):
@@ -403,7 +403,7 @@ async def delete_permission_grant(
 )
 async def get_my_permission_requests(
     status: Optional[PermissionStatus] = Query(None, description="Filter by status"),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get current user's permission requests"""
@@ -437,7 +437,7 @@ async def get_my_permission_requests(
 )
 @require_roles([UserRole.SUPER_ADMIN, UserRole.ADMIN])
 async def get_pending_permissions_for_review(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     accessible_clients: List[int] = Depends(get_user_accessible_clients),
     db: AsyncSession = Depends(get_db)
 ):
@@ -475,7 +475,7 @@ async def get_pending_permissions_for_review(
 async def approve_permission_grant(
     permission_id: int = Path(..., description="Permission Grant ID"),
     notes: Optional[str] = Query(None, description="Approval notes"),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Approve a permission grant"""
@@ -507,7 +507,7 @@ async def approve_permission_grant(
 async def reject_permission_grant(
     permission_id: int = Path(..., description="Permission Grant ID"),
     reason: str = Query(..., description="Rejection reason"),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Reject a permission grant"""
@@ -0,0 +1,71 @@
+"""
+Report export API endpoints
+"""
+
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Path, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core.database import get_db, replica_router, request_user_key
+from ...core.auth_dependencies import CurrentUser, get_current_user, require_roles
+from ...core.exceptions import AppException, create_http_exception
+from ...models.db_models import UserRole, ReportType
+from ...services.report_service import ReportService
+
+
+router = APIRouter(prefix="/reports", tags=["Reports"])
+
+
+async def get_report_service(request: Request, db: AsyncSession = Depends(get_db)) -> ReportService:
+    """Dependency to get ReportService, exporting from a read replica when one is usable"""
+    return ReportService(db, read_session_factory=replica_router.sessions_for(request_user_key(request)))
+
+
+@router.get(
+    "/{report_type}/export",
+    summary="Export Report",
+    description="Stream a report as CSV or JSON Lines, optionally gzipped"
+)
+@require_roles([UserRole.SUPER_ADMIN, UserRole.ADMIN])
+async def export_report(
+    request: Request,
+    report_type: ReportType = Path(..., description="Report type"),
+    file_format: str = Query("csv", alias="format", pattern="^(csv|jsonl)$"),
+    compress: bool = Query(False, alias="gzip", description="Gzip the export"),
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    user_id: Optional[int] = None,
+    client_id: Optional[int] = None,
+    include_expired: bool = False,
+    action: Optional[str] = None,
+    actor_id: Optional[int] = None,
+    current_user: CurrentUser = Depends(get_current_user),
+    service: ReportService = Depends(get_report_service)
+):
+    """Stream a report export without building it in memory"""
+    try:
+        export = await service.stream_report(
+            admin_id=current_user.id,
+            report_type=report_type,
+            file_format=file_format,
+            compress=compress,
+            start_date=start_date,
+            end_date=end_date,
+            user_id=user_id,
+            client_id=client_id,
+            include_expired=include_expired,
+            action_filter=action,
+            user_id_filter=actor_id,
+            ip_address=request.client.host if request.client else None,
+            user_agent=request.headers.get("user-agent")
+        )
+    except AppException as e:
+        raise create_http_exception(e)
+
+    return StreamingResponse(
+        export.body,
+        media_type=export.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{export.filename}"'}
+    )
@@ -8,13 +8,13 @@ from typing import Dict, List
 
 from ...core.database import get_db
 from ...core.auth_dependencies import (
-    get_current_user, 
+    CurrentUser, get_current_user, 
     require_permissions,
     can_manage_user_role,
     validate_user_operation_access
 )
 from ...core.exceptions import PermissionDeniedError, NotFoundError
-from ...models.db_models import User, UserRole
+from ...models.db_models import UserRole
 from ...models.schemas import UserResponse
 from ...services.user_service import UserService
 
@@ -26,7 +26,7 @@ router = APIRouter()
 async def assign_user_role(
     user_id: int,
     role_data: Dict[str, str],
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -87,7 +87,7 @@ async def assign_user_role(
 @require_permissions(["read_user"])
 async def get_user_permissions(
     user_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -168,7 +168,7 @@ async def get_user_permissions(
 @router.get("/roles/hierarchy")
 @require_permissions(["read_user"])
 async def get_role_hierarchy(
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Get role hierarchy and permissions matrix.
@@ -225,7 +225,7 @@ async def get_role_hierarchy(
 @router.get("/manageable-roles")
 @require_permissions(["change_user_role"])
 async def get_manageable_roles(
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Get roles that current user can assign to others.
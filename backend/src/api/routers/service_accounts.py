@@ -11,7 +11,7 @@ from ...core.database import get_db
 from ...core.exceptions import NotFoundError, ValidationError, AuthorizationError, GoogleAPIError
 from ...models.schemas import (
     ServiceAccountResponse, ServiceAccountCreate, ServiceAccountUpdate, 
-    MessageResponse, PaginatedResponse, GA4PropertyResponse
+    MessageResponse, PaginatedResponse, CursorPage, GA4PropertyResponse
 )
 from ...core.rbac import Permission, require_permission, get_current_user_with_permissions
 from ...services.service_account_service import ServiceAccountService
@@ -79,6 +79,37 @@ async def list_service_accounts(
     return result
 
 
+@router.get("/cursor", response_model=CursorPage[ServiceAccountResponse])
+@require_permission(Permission.SERVICE_ACCOUNT_READ)
+async def list_service_accounts_by_cursor(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+    client_id: Optional[int] = None,
+    is_active: Optional[bool] = None,
+    current_user: dict = Depends(get_current_user_with_permissions),
+    db: AsyncSession = Depends(get_db)
+):
+    """List service accounts newest first with keyset pagination"""
+    sa_service = ServiceAccountService(db)
+    
+    # Apply client access control for non-admin users
+    accessible_client_ids = None
+    if current_user.get("role") not in ["super_admin", "admin"]:
+        from ...services.client_assignment_service import ClientAssignmentService
+        ca_service = ClientAssignmentService(db)
+        accessible_client_ids = await ca_service.get_user_accessible_client_ids(
+            current_user["user_id"]
+        )
+    
+    return await sa_service.list_service_accounts_page(
+        limit=limit,
+        cursor=cursor,
+        client_id=client_id,
+        is_active=is_active,
+        accessible_client_ids=accessible_client_ids
+    )
+
+
 @router.get("/{sa_id}", response_model=ServiceAccountResponse)
 @require_permission(Permission.SERVICE_ACCOUNT_READ)
 async def get_service_account(
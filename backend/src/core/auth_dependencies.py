@@ -4,7 +4,7 @@ Authentication and authorization dependencies with client access control
 
 from typing import List, Optional, Callable
 from functools import wraps
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -16,24 +16,47 @@ from .config import settings
 from .exceptions import AuthenticationError, PermissionDeniedError
 from ..models.db_models import User, UserRole
 from ..services.client_assignment_service import ClientAssignmentService
+from ..services.principal_cache import AuthenticatedPrincipal, principal_cache
+from ..services.activity_tracker import activity_tracker
+
+# Type injected as ``current_user`` by get_current_user: the cached principal, not the ORM row
+CurrentUser = AuthenticatedPrincipal
 
 
 security = HTTPBearer()
 
 
+def _shared_token_payload(request: Optional[Request], token: str) -> Optional[dict]:
+    """Claims SecurityMiddleware already decoded from this request's bearer token"""
+    if request is None:
+        return None
+    state = request.scope.get("state") or {}
+    if state.get("token") != token:
+        return None
+    return state.get("token_payload")
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
-) -> User:
-    """Get current authenticated user"""
+    db: AsyncSession = Depends(get_db),
+    request: Request = None
+) -> AuthenticatedPrincipal:
+    """
+    Get current authenticated user
+    
+    Returns a cached principal (id, email, role, status, client ids) rather than
+    the ORM row, so most requests neither read nor write the users table.
+    """
     
     try:
-        # Decode JWT token
-        payload = jwt.decode(
-            credentials.credentials,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM]
-        )
+        # Decode JWT token, unless the security middleware already did
+        payload = _shared_token_payload(request, credentials.credentials)
+        if payload is None:
+            payload = jwt.decode(
+                credentials.credentials,
+                settings.SECRET_KEY,
+                algorithms=[settings.ALGORITHM]
+            )
         email: str = payload.get("sub")
         if email is None:
             raise AuthenticationError("Invalid token")
@@ -46,27 +69,24 @@ async def get_current_user(
     except jwt.InvalidTokenError:
         raise AuthenticationError("Invalid token")
     
-    # Get user from database
-    query = select(User).where(User.email == email)
-    result = await db.execute(query)
-    user = result.scalar_one_or_none()
+    # Resolve from the principal cache, token claims or a single database read
+    principal = await principal_cache.resolve(db, payload)
     
-    if user is None:
+    if principal is None:
         raise AuthenticationError("User not found")
     
-    if user.status.value != "active":
+    if not principal.is_active:
         raise AuthenticationError("User account is not active")
     
-    # Update last login
-    user.last_login_at = datetime.utcnow()
-    await db.commit()
+    # Last activity is written in periodic batches
+    activity_tracker.record(principal.id)
     
-    return user
+    return principal
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: AuthenticatedPrincipal = Depends(get_current_user)
+) -> AuthenticatedPrincipal:
     """Get current active user (alias for backward compatibility)"""
     return current_user
 
@@ -79,7 +99,7 @@ def require_roles(allowed_roles: List[UserRole]):
             # Extract user from kwargs (should be injected by FastAPI)
             current_user = None
             for key, value in kwargs.items():
-                if isinstance(value, User):
+                if isinstance(value, (User, AuthenticatedPrincipal)):
                     current_user = value
                     break
             
@@ -139,7 +159,7 @@ def require_permissions(permissions: List[str]):
             # Extract user from kwargs
             current_user = None
             for key, value in kwargs.items():
-                if isinstance(value, User):
+                if isinstance(value, (User, AuthenticatedPrincipal)):
                     current_user = value
                     break
             
@@ -162,9 +182,9 @@ def require_permissions(permissions: List[str]):
 
 async def require_client_access(
     client_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
-) -> User:
+) -> CurrentUser:
     """Dependency to ensure user has access to specific client"""
     
     client_service = ClientAssignmentService(db)
@@ -184,10 +204,10 @@ def require_client_access_param(client_id_param: str = "client_id"):
     """Dependency factory to require client access from path/query parameter"""
     
     async def dependency(
-        current_user: User = Depends(get_current_user),
+        current_user: CurrentUser = Depends(get_current_user),
         db: AsyncSession = Depends(get_db),
         **kwargs
-    ) -> User:
+    ) -> CurrentUser:
         # Extract client_id from path parameters
         client_id = kwargs.get(client_id_param)
         if client_id is None:
@@ -209,11 +229,15 @@ def require_client_access_param(client_id_param: str = "client_id"):
 
 
 async def get_user_accessible_clients(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ) -> List[int]:
     """Get list of client IDs accessible to current user"""
     
+    # Requesters and viewers only see assigned clients, already on the principal
+    if isinstance(current_user, AuthenticatedPrincipal) and current_user.role not in (UserRole.SUPER_ADMIN, UserRole.ADMIN):
+        return list(current_user.client_ids)
+    
     client_service = ClientAssignmentService(db)
     return await client_service.get_user_accessible_clients(
         user_id=current_user.id,
@@ -231,7 +255,7 @@ def client_access_filter():
             accessible_clients = None
             
             for key, value in kwargs.items():
-                if isinstance(value, User):
+                if isinstance(value, (User, AuthenticatedPrincipal)):
                     current_user = value
                 elif isinstance(value, list) and key == "accessible_clients":
                     accessible_clients = value
@@ -288,7 +312,7 @@ def get_role_hierarchy_access(user_role: UserRole) -> List[UserRole]:
 async def validate_client_operation_access(
     operation: str,
     client_id: Optional[int],
-    current_user: User,
+    current_user: CurrentUser,
     db: AsyncSession
 ) -> bool:
     """Validate access for client-related operations"""
@@ -317,7 +341,7 @@ async def validate_client_operation_access(
 async def validate_user_operation_access(
     operation: str,
     target_user_id: Optional[int],
-    current_user: User,
+    current_user: CurrentUser,
     db: AsyncSession
 ) -> bool:
     """Validate access for user-related operations"""
@@ -34,6 +34,20 @@ class Settings(BaseSettings):
         description="Database connection URL"
     )
     DATABASE_ECHO: bool = False
+    # Connection pool (ignored for SQLite, which keeps SQLAlchemy's default pool)
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 20
+    DATABASE_POOL_TIMEOUT: float = 30.0  # seconds to wait for a connection before failing
+    DATABASE_POOL_RECYCLE: int = 3600
+    # Engine instrumentation, served at /api/admin/metrics/database
+    DATABASE_METRICS_ENABLED: bool = True
+    DATABASE_METRICS_MAX_STATEMENTS: int = 500  # distinct normalized statements tracked; the rest share one entry
+    DATABASE_SLOW_QUERY_SECONDS: float = 0.5  # statements at least this slow are logged, parameters redacted
+    # Read replicas for read-only endpoints (see core/db_replicas.py); none means everything uses DATABASE_URL
+    DATABASE_REPLICA_URLS: List[str] = []
+    DATABASE_REPLICA_MAX_LAG_SECONDS: float = 5.0  # replicas further behind are skipped
+    DATABASE_REPLICA_CHECK_SECONDS: float = 2.0
+    DATABASE_READ_YOUR_WRITES_SECONDS: float = 10.0  # a user's reads stay on the primary this long after their writes
     
     # Authentication settings
     SECRET_KEY: str = Field(
@@ -47,11 +61,82 @@ class Settings(BaseSettings):
     # Password settings
     PASSWORD_MIN_LENGTH: int = 8
     PASSWORD_RESET_TOKEN_EXPIRE_MINUTES: int = 30
+    PASSWORD_HASH_ROUNDS: int = 12  # bcrypt cost; stored hashes of another cost are rehashed at login
+    PASSWORD_HASH_WORKERS: int = 0  # hashing processes; 0 = one per available core
+    PASSWORD_HASH_MAX_PENDING: int = 0  # hashes queued or running before logins get 503; 0 = 4 per worker
     
     # Google API settings
     GOOGLE_CLIENT_ID: Optional[str] = None
     GOOGLE_CLIENT_SECRET: Optional[str] = None
     GOOGLE_SERVICE_ACCOUNT_FILE: Optional[str] = None
+    GOOGLE_SERVICE_ACCOUNT_KEYS_DIR: Optional[str] = None  # <secret_name>.json keys of managed service accounts
+    
+    # GA4 Admin API execution
+    GA4_API_MAX_WORKERS: int = 16
+    GA4_API_MAX_CONCURRENCY: int = 16
+    GA4_API_TIMEOUT_SECONDS: float = 30.0
+    GA4_ADMIN_API_ENDPOINT: Optional[str] = None  # Override the Admin API root URL
+    GA4_API_MAX_RETRIES: int = 4  # Retries after 429 / 5xx responses
+    GA4_API_RETRY_BASE_SECONDS: float = 0.5  # Backoff doubles per retry, with jitter
+    GA4_API_RETRY_MAX_SECONDS: float = 30.0
+    
+    # GA4 Admin API quotas
+    GA4_QUOTA_ENABLED: bool = True
+    GA4_QUOTA_PROJECT_REQUESTS_PER_SECOND: float = 10.0  # Per Google Cloud project
+    GA4_QUOTA_PROJECT_BURST: int = 20
+    GA4_QUOTA_PROPERTY_REQUESTS_PER_SECOND: float = 2.0  # Per GA4 property
+    GA4_QUOTA_PROPERTY_BURST: int = 5
+    GA4_QUOTA_MAX_BUCKETS: int = 10000  # Idle buckets are dropped beyond this
+    
+    # GA4 Admin client registry
+    GA4_CLIENT_MAX_CLIENTS: int = 100
+    GA4_CLIENT_IDLE_TIMEOUT_SECONDS: float = 1800.0  # Evict clients unused for 30 minutes
+    GA4_CLIENT_TOKEN_REFRESH_MARGIN_SECONDS: float = 300.0  # Refresh access tokens 5 minutes before expiry
+    
+    # GA4 fleet property discovery
+    GA4_DISCOVERY_MAX_CONCURRENCY: int = 16  # Service accounts discovered at once
+    GA4_DISCOVERY_PER_PROJECT_CONCURRENCY: int = 4  # Admin API quotas are per Google Cloud project
+    GA4_DISCOVERY_PAGE_SIZE: int = 200  # accountSummaries.list maximum
+    GA4_DISCOVERY_UPSERT_CHUNK_SIZE: int = 1000  # Rows per INSERT ... ON CONFLICT statement
+    
+    # GA4 access binding synchronization
+    GA4_BINDING_FULL_SYNC_INTERVAL_HOURS: float = 24.0  # Re-list every property at least this often
+    GA4_CHANGE_HISTORY_OVERLAP_SECONDS: float = 300.0  # Re-read history this far before the watermark
+    GA4_CHANGE_HISTORY_PAGE_SIZE: int = 200  # searchChangeHistoryEvents maximum
+    
+    # GA4 bulk user-link writes
+    GA4_USER_LINK_BATCH_SIZE: int = 1000  # accessBindings batchCreate / batchUpdate / batchDelete maximum
+    GA4_USER_LINK_MAX_CONCURRENCY: int = 8  # Properties written at once
+    
+    # GA4 metadata read cache
+    GA4_CACHE_ENABLED: bool = True
+    GA4_CACHE_FRESH_SECONDS: float = 60.0  # Served without calling Google
+    GA4_CACHE_STALE_SECONDS: float = 600.0  # Then served while a background refresh runs
+    GA4_CACHE_NEGATIVE_SECONDS: float = 10.0  # Google errors are remembered this long
+    GA4_CACHE_MAX_ENTRIES: int = 5000
+    
+    # RBAC permission decision cache
+    RBAC_CACHE_MAX_ENTRIES: int = 50000
+    RBAC_CACHE_TTL_SECONDS: float = 300.0  # 5 minutes
+    RBAC_CACHE_REDIS_ENABLED: bool = False  # Share invalidations across workers via REDIS_URL
+    RBAC_MATRIX_MAX_AGE_SECONDS: float = 60.0  # Reload the role permission matrix at least this often
+    
+    # Request authentication
+    AUTH_STATELESS_TOKENS: bool = False  # Trust role/status/client claims in access tokens; needs RBAC_CACHE_REDIS_ENABLED
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+    AUTH_PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_ACTIVITY_FLUSH_INTERVAL_SECONDS: float = 30.0
+    
+    # Audit log writer
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_MAX_PENDING: int = 50000
+    
+    # Report export
+    REPORT_EXPORT_PAGE_SIZE: int = 5000  # Rows read per keyset page when streaming reports
+    
+    # Scheduler
+    SCHEDULER_EXPIRY_CHUNK_SIZE: int = 5000  # Grants expired per UPDATE ... RETURNING statement
     
     # Email settings
     SMTP_HOST: str = "localhost"
@@ -60,15 +145,39 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: Optional[str] = None
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
+    SMTP_POOL_SIZE: int = 5  # Open connections, and so messages in flight
+    SMTP_POOL_MAX_MESSAGES_PER_CONNECTION: int = 100
+    SMTP_POOL_IDLE_TIMEOUT_SECONDS: float = 60.0
+    SMTP_MAX_RETRIES: int = 3
+    SMTP_RETRY_BACKOFF_SECONDS: float = 0.5  # Doubled on every retry
+    SMTP_TIMEOUT_SECONDS: float = 30.0
     
     # Email configuration
     EMAIL_FROM: str = "noreply@ga4admin.com"
     EMAIL_FROM_NAME: str = "GA4 Admin System"
+    NOTIFICATION_SEND_CONCURRENCY: int = 10  # Emails in flight at once for batched notifications
     
     # Rate limiting
-    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_ENABLED: bool = False  # Per-IP limits and blocks in SecurityMiddleware
     RATE_LIMIT_REQUESTS: int = 100
     RATE_LIMIT_WINDOW: int = 3600  # 1 hour
+    RATE_LIMIT_REDIS_MAX_CONNECTIONS: int = 50
+    RATE_LIMIT_REDIS_TIMEOUT_SECONDS: float = 0.25
+    RATE_LIMIT_REDIS_RETRY_SECONDS: float = 5.0  # Use in-process limits this long after a Redis error
+    RATE_LIMIT_FALLBACK_MAX_KEYS: int = 100000
+    
+    # Request security
+    SECURITY_PATTERN_BLOCKING_ENABLED: bool = False  # Reject and block clients sending the patterns below
+    TRUSTED_PROXIES: List[str] = []  # Proxy addresses / networks whose X-Forwarded-For and X-Real-IP are believed
+    SECURITY_BODY_SCAN_MAX_BYTES: int = 65536  # Leading bytes of POST bodies scanned for attack patterns
+    SECURITY_SUSPICIOUS_PATTERNS: List[str] = [
+        "sqlmap", "nikto", "nmap", "dirb", "burp", "havij",
+        "union select", "or 1=1", "and 1=1", "../", "..\\",
+        "<script", "javascript:", "onload=", "onerror=",
+        "eval(", "document.cookie", "alert("
+    ]
+    SECURITY_PATTERNS_FILE: Optional[str] = None  # One pattern per line; replaces the list above, reloaded on change
+    SECURITY_PATTERNS_RELOAD_SECONDS: float = 5.0  # How often SECURITY_PATTERNS_FILE is checked for changes
     
     # Logging
     LOG_LEVEL: str = "INFO"
@@ -2,46 +2,103 @@
 Database configuration and session management
 """
 
-from typing import AsyncGenerator
+from contextlib import asynccontextmanager, nullcontext
+from functools import partial
+from typing import Any, AsyncGenerator, AsyncIterator, Callable, Dict, Optional
+from fastapi import Request
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 import logging
 
 from .config import settings
+from .db_metrics import InstrumentedAsyncQueuePool, db_metrics
+from .db_replicas import ReplicaRouter, WriteTrackingSession
 
 logger = logging.getLogger(__name__)
 
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """create_async_engine arguments for a database URL"""
+    options: Dict[str, Any] = {
+        "echo": settings.DATABASE_ECHO,
+        "pool_pre_ping": True,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+    }
+    # SQLite keeps its own pool (StaticPool in memory, NullPool for files)
+    if make_url(url).get_backend_name() != "sqlite":
+        options.update(
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        )
+    return options
+
+
 # Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DATABASE_ECHO,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-)
+engine = create_async_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+
+# Read replicas, used by get_read_db
+replica_engines = [create_async_engine(url, **engine_options(url)) for url in settings.DATABASE_REPLICA_URLS]
+
+if settings.DATABASE_METRICS_ENABLED:
+    for instrumented in [engine, *replica_engines]:
+        db_metrics.instrument(instrumented)
 
 # Create session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=WriteTrackingSession,
     expire_on_commit=False,
 )
 
+replica_router = ReplicaRouter(AsyncSessionLocal, replica_engines)
+
 
 class Base(DeclarativeBase):
     """Base model class"""
     pass
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    """Get database session"""
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        except Exception:
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
+def request_user_key(request: Optional[Request]) -> Optional[str]:
+    """The authenticated user behind a request (token subject decoded by SecurityMiddleware), if any"""
+    if request is None:
+        return None
+    state = request.scope.get("state") or {}
+    return (state.get("token_payload") or {}).get("sub")
+
+
+@asynccontextmanager
+async def _request_session(sessions: Callable[[], AsyncSession]) -> AsyncIterator[AsyncSession]:
+    """A session whose statements are counted as one request"""
+    tracking = db_metrics.track_request() if settings.DATABASE_METRICS_ENABLED else nullcontext()
+    with tracking:
+        async with sessions() as session:
+            try:
+                yield session
+            except Exception:
+                await session.rollback()
+                raise
+            finally:
+                await session.close()
+
+
+async def get_db(request: Request = None) -> AsyncGenerator[AsyncSession, None]:
+    """Get database session on the primary"""
+    async with _request_session(AsyncSessionLocal) as session:
+        user_key = request_user_key(request)
+        if user_key is not None:
+            # The user's next reads come from the primary once this session commits a change
+            session.info["write_observer"] = partial(replica_router.record_write, user_key)
+        yield session
+
+
+async def get_read_db(request: Request = None) -> AsyncGenerator[AsyncSession, None]:
+    """Get database session for read-only work: a replica unless the user wrote recently or replicas lag"""
+    async with _request_session(replica_router.sessions_for(request_user_key(request))) as session:
+        yield session
 
 
 async def init_db() -> None:
@@ -70,5 +127,6 @@ def get_async_session() -> AsyncSession:
 
 async def close_db() -> None:
     """Close database connections"""
+    await replica_router.dispose()
     await engine.dispose()
     logger.info("Database connections closed")
\ No newline at end of file
@@ -0,0 +1,280 @@
+"""
+Database engine instrumentation
+
+Records what the engine does so latency incidents can be traced to the
+database: per-statement timing histograms keyed by normalized SQL, connection
+pool wait times, exhaustion and occupancy, statements per request (counted
+between entering and leaving get_db) and a log of slow statements with their
+bound parameters redacted. Statistics are served by the admin metrics endpoint.
+"""
+
+import bisect
+import logging
+import re
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+OTHER_STATEMENTS = "<other>"
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+|:\w+|\?")
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_WHITESPACE = re.compile(r"\s+")
+
+# Statements of the request being served, if any
+_request_statements: ContextVar[Optional[List[int]]] = ContextVar("request_statements", default=None)
+
+
+def normalize_sql(statement: str) -> str:
+    """Statement text with literals and placeholders replaced by ?, so repeated queries share one key"""
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _PLACEHOLDER.sub("?", statement)
+    # IN lists expand to one placeholder per value
+    statement = _PLACEHOLDER_LIST.sub("?, ...", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """Bound parameters with their values replaced by type names"""
+    if isinstance(parameters, dict):
+        return {key: f"<{type(value).__name__}>" for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            # executemany: describe the first row
+            return [redact_parameters(parameters[0]), f"... {len(parameters)} rows"]
+        return [f"<{type(value).__name__}>" for value in parameters]
+    return None if parameters is None else f"<{type(parameters).__name__}>"
+
+
+class Histogram:
+    """Counts observations into fixed buckets, with sum and maximum"""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (the maximum for the last bucket)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else self.max
+        return self.max
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg": self.total / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+            "buckets": {
+                **{f"le_{bound:g}": count for bound, count in zip(self.buckets, self.counts)},
+                "le_inf": self.counts[-1]
+            }
+        }
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that reports how long each checkout waited and whether it timed out"""
+
+    wait_observer = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            if self.wait_observer is not None:
+                self.wait_observer(time.perf_counter() - started, timed_out=True)
+            raise
+        if self.wait_observer is not None:
+            self.wait_observer(time.perf_counter() - started, timed_out=False)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() replaces the pool; keep reporting from the new one
+        pool = super().recreate()
+        pool.wait_observer = self.wait_observer
+        return pool
+
+
+class DatabaseMetrics:
+    """Statement, pool and per-request statistics of an instrumented engine"""
+
+    def __init__(
+        self,
+        slow_query_seconds: float = settings.DATABASE_SLOW_QUERY_SECONDS,
+        max_statements: int = settings.DATABASE_METRICS_MAX_STATEMENTS,
+        slow_query_log_size: int = 100
+    ):
+        self.slow_query_seconds = slow_query_seconds
+        self.max_statements = max_statements
+        self.statements: Dict[str, Histogram] = {}
+        self.statement_errors: Dict[str, int] = {}
+        self.slow_queries: Deque[Dict[str, Any]] = deque(maxlen=slow_query_log_size)
+        self.pool_wait = Histogram()
+        self.pool_timeouts = 0
+        self.request_statements = Histogram(QUERY_COUNT_BUCKETS)
+        self.requests = 0
+        self._engines: List[Any] = []
+
+    def instrument(self, engine) -> None:
+        """Attach to an Engine or AsyncEngine"""
+        sync_engine = getattr(engine, "sync_engine", engine)
+        event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(sync_engine, "handle_error", self._handle_error)
+        if isinstance(sync_engine.pool, InstrumentedAsyncQueuePool):
+            sync_engine.pool.wait_observer = self.record_pool_wait
+        self._engines.append(sync_engine)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        key = self._statement_key(statement)
+        self.statements[key].observe(elapsed)
+
+        counter = _request_statements.get()
+        if counter is not None:
+            counter[0] += 1
+
+        if elapsed >= self.slow_query_seconds:
+            entry = {
+                "statement": key,
+                "parameters": redact_parameters(parameters),
+                "duration": elapsed,
+                "at": time.time()
+            }
+            self.slow_queries.append(entry)
+            logger.warning(f"Slow query ({elapsed * 1000:.0f} ms): {key} parameters={entry['parameters']}")
+
+    def _handle_error(self, exception_context) -> None:
+        conn = exception_context.connection
+        started = conn.info.get("query_started") if conn is not None else None
+        if started:
+            started.pop()
+        if exception_context.statement is not None:
+            key = self._statement_key(exception_context.statement)
+            self.statement_errors[key] = self.statement_errors.get(key, 0) + 1
+
+    def _statement_key(self, statement: str) -> str:
+        """Normalized statement, or OTHER_STATEMENTS once max_statements distinct keys are tracked"""
+        key = normalize_sql(statement)
+        if key not in self.statements:
+            if len(self.statements) >= self.max_statements:
+                key = OTHER_STATEMENTS
+            self.statements.setdefault(key, Histogram())
+        return key
+
+    def record_pool_wait(self, elapsed: float, timed_out: bool = False) -> None:
+        """Record a connection checkout"""
+        self.pool_wait.observe(elapsed)
+        if timed_out:
+            self.pool_timeouts += 1
+            logger.warning(f"Connection pool exhausted: checkout timed out after {elapsed:.2f}s")
+
+    @contextmanager
+    def track_request(self) -> Iterator[List[int]]:
+        """Count the statements executed until the block exits as one request"""
+        counter = [0]
+        token = _request_statements.set(counter)
+        try:
+            yield counter
+        finally:
+            _request_statements.reset(token)
+            self.requests += 1
+            self.request_statements.observe(counter[0])
+
+    def _pool_stats(self) -> List[Dict[str, Any]]:
+        pools = []
+        for sync_engine in self._engines:
+            pool = sync_engine.pool
+            stats: Dict[str, Any] = {"engine": repr(sync_engine.url), "class": type(pool).__name__}
+            if hasattr(pool, "checkedout"):
+                stats.update({
+                    "size": pool.size(),
+                    "checked_out": pool.checkedout(),
+                    "checked_in": pool.checkedin(),
+                    "overflow": pool.overflow(),
+                    "max_overflow": getattr(pool, "_max_overflow", None),
+                    "timeout": pool.timeout()
+                })
+            pools.append(stats)
+        return pools
+
+    def get_stats(self, top: int = 20) -> Dict[str, Any]:
+        """Get database statistics for monitoring; statements are ordered by total time"""
+        slowest = sorted(self.statements.items(), key=lambda item: item[1].total, reverse=True)[:top]
+        return {
+            "pools": self._pool_stats(),
+            "pool_wait": self.pool_wait.get_stats(),
+            "pool_timeouts": self.pool_timeouts,
+            "requests": self.requests,
+            "statements_per_request": self.request_statements.get_stats(),
+            "statements": [
+                {
+                    "statement": key,
+                    "total_time": histogram.total,
+                    "errors": self.statement_errors.get(key, 0),
+                    **histogram.get_stats()
+                }
+                for key, histogram in slowest
+            ],
+            "distinct_statements": len(self.statements),
+            "slow_query_seconds": self.slow_query_seconds,
+            "slow_queries": list(self.slow_queries)
+        }
+
+    def reset(self) -> None:
+        """Drop collected statistics (pools stay instrumented)"""
+        self.statements.clear()
+        self.statement_errors.clear()
+        self.slow_queries.clear()
+        self.pool_wait = Histogram()
+        self.pool_timeouts = 0
+        self.request_statements = Histogram(QUERY_COUNT_BUCKETS)
+        self.requests = 0
+
+
+# Metrics of the application engine (core.database)
+db_metrics = DatabaseMetrics()
+
+
+def get_db_metrics_stats() -> Dict[str, Any]:
+    """Get database engine statistics"""
+    return db_metrics.get_stats()
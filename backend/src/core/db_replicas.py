@@ -0,0 +1,248 @@
+"""
+Read-replica routing
+
+Read-only endpoints and services take their sessions from ReplicaRouter
+rather than AsyncSessionLocal, which moves heavy reads (audit listings,
+reports, dashboards) off the primary. A replica is used when:
+
+- the user did not write recently: a user whose own write was committed
+  within DATABASE_READ_YOUR_WRITES_SECONDS reads from the primary, so they
+  never see data older than what they just saved;
+- it keeps up: a background task measures each replica's replication lag
+  every DATABASE_REPLICA_CHECK_SECONDS, and replicas further behind than
+  DATABASE_REPLICA_MAX_LAG_SECONDS, or that cannot be reached, are skipped.
+
+Otherwise the read goes to the primary. Healthy replicas take turns.
+
+Write stickiness is kept per process. WriteTrackingSession (the primary's
+session class) notes whether a session changed data, and reports committed
+writes through the callback stored in session.info["write_observer"].
+"""
+
+import asyncio
+import logging
+import time
+from itertools import count
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+LagProbe = Callable[[AsyncConnection], Awaitable[Optional[float]]]
+
+# Bound on remembered writers; expired entries are pruned beyond it
+MAX_STICKY_USERS = 10000
+
+
+class WriteTrackingSession(Session):
+    """Session that records in info["wrote"] whether it changed data since the last commit"""
+
+
+@event.listens_for(WriteTrackingSession, "after_flush")
+def _flushed(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(WriteTrackingSession, "do_orm_execute")
+def _executed(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(WriteTrackingSession, "after_commit")
+def _committed(session):
+    if session.info.pop("wrote", False):
+        observer = session.info.get("write_observer")
+        if observer is not None:
+            observer()
+
+
+@event.listens_for(WriteTrackingSession, "after_rollback")
+def _rolled_back(session):
+    session.info.pop("wrote", None)
+
+
+async def replication_lag(conn: AsyncConnection) -> Optional[float]:
+    """Seconds a replica is behind its primary (0.0 for backends that cannot tell)"""
+    if conn.dialect.name == "postgresql":
+        # A standby that replayed everything it received is current, however old its last transaction
+        result = await conn.execute(text(
+            "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+            "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+        ))
+        lag = result.scalar()
+        return float(lag) if lag is not None else 0.0
+    return 0.0
+
+
+class Replica:
+    """A replica engine with its sessions and last measured lag"""
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        self.lag: Optional[float] = None  # Unknown until first checked
+        self.healthy = False
+        self.checked_at = 0.0
+        self.reads = 0
+        self.check_failures = 0
+
+    @property
+    def name(self) -> str:
+        return self.engine.url.render_as_string(hide_password=True)
+
+
+class ReplicaRouter:
+    """Chooses the primary or a replica for read-only sessions"""
+
+    def __init__(
+        self,
+        primary_sessions: Callable[[], AsyncSession],
+        replica_engines: Sequence[AsyncEngine] = (),
+        max_lag_seconds: float = settings.DATABASE_REPLICA_MAX_LAG_SECONDS,
+        sticky_seconds: float = settings.DATABASE_READ_YOUR_WRITES_SECONDS,
+        check_interval: float = settings.DATABASE_REPLICA_CHECK_SECONDS,
+        lag_probe: LagProbe = replication_lag
+    ):
+        self.primary_sessions = primary_sessions
+        self.replicas = [Replica(engine) for engine in replica_engines]
+        self.max_lag_seconds = max_lag_seconds
+        self.sticky_seconds = sticky_seconds
+        self.check_interval = check_interval
+        self.lag_probe = lag_probe
+
+        self._sticky: Dict[Hashable, float] = {}
+        self._turn = count()
+        self._task: Optional[asyncio.Task] = None
+
+        self.primary_reads = 0
+        self.sticky_reads = 0
+        self.fallback_reads = 0
+        self.writes_recorded = 0
+
+    def record_write(self, user_key: Optional[Hashable]) -> None:
+        """Send the user's reads to the primary for the next sticky_seconds"""
+        if user_key is None:
+            return
+        now = time.monotonic()
+        self._sticky[user_key] = now + self.sticky_seconds
+        self.writes_recorded += 1
+        if len(self._sticky) > MAX_STICKY_USERS:
+            self._sticky = {key: until for key, until in self._sticky.items() if until > now}
+
+    def is_sticky(self, user_key: Optional[Hashable]) -> bool:
+        """Whether the user committed a write within sticky_seconds"""
+        return user_key is not None and self._sticky.get(user_key, 0.0) > time.monotonic()
+
+    def sessions_for(self, user_key: Optional[Hashable] = None) -> Callable[[], AsyncSession]:
+        """
+        Session factory for read-only work on behalf of a user
+
+        The choice is made once, so every session the factory opens (e.g. one
+        a streamed response reads through later) uses the same database.
+        """
+        if not self.replicas:
+            self.primary_reads += 1
+            return self.primary_sessions
+        if self.is_sticky(user_key):
+            self.sticky_reads += 1
+            return self.primary_sessions
+
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            self.fallback_reads += 1
+            return self.primary_sessions
+        replica = healthy[next(self._turn) % len(healthy)]
+        replica.reads += 1
+        return replica.sessions
+
+    def read_session(self, user_key: Optional[Hashable] = None) -> AsyncSession:
+        """A session for read-only work"""
+        return self.sessions_for(user_key)()
+
+    async def check_replicas(self) -> None:
+        """Measure every replica's lag and mark it usable or not"""
+        await asyncio.gather(*(self._check(replica) for replica in self.replicas))
+
+    async def _check(self, replica: Replica) -> None:
+        try:
+            async with replica.engine.connect() as conn:
+                lag = await self.lag_probe(conn)
+        except Exception as e:
+            replica.check_failures += 1
+            if replica.healthy or replica.lag is None:
+                logger.warning(f"Replica {replica.name} unavailable, reading from the primary: {e}")
+            replica.lag = None
+            replica.healthy = False
+        else:
+            healthy = lag is not None and lag <= self.max_lag_seconds
+            if replica.healthy and not healthy:
+                logger.warning(f"Replica {replica.name} is {lag}s behind, reading from the primary")
+            elif healthy and not replica.healthy:
+                logger.info(f"Replica {replica.name} in use, {lag:.2f}s behind")
+            replica.lag = lag
+            replica.healthy = healthy
+        replica.checked_at = time.time()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self.check_replicas()
+
+    @property
+    def running(self) -> bool:
+        """Whether the background lag checks are active"""
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Check the replicas, then keep checking them in the background"""
+        if self.replicas and not self.running:
+            await self.check_replicas()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background lag checks"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def dispose(self) -> None:
+        """Stop checking and close the replica connections"""
+        await self.stop()
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get routing statistics for monitoring"""
+        replicas: List[Dict[str, Any]] = [
+            {
+                "replica": replica.name,
+                "healthy": replica.healthy,
+                "lag_seconds": replica.lag,
+                "checked_at": replica.checked_at,
+                "reads": replica.reads,
+                "check_failures": replica.check_failures
+            }
+            for replica in self.replicas
+        ]
+        return {
+            "running": self.running,
+            "replicas": replicas,
+            "max_lag_seconds": self.max_lag_seconds,
+            "sticky_seconds": self.sticky_seconds,
+            "replica_reads": sum(replica.reads for replica in self.replicas),
+            "primary_reads": self.primary_reads,
+            "sticky_reads": self.sticky_reads,
+            "fallback_reads": self.fallback_reads,
+            "writes_recorded": self.writes_recorded,
+            "sticky_users": sum(1 for until in self._sticky.values() if until > time.monotonic())
+        }
@@ -89,6 +89,19 @@ class RateLimitError(AppException):
         )
 
 
+class ServiceUnavailableError(AppException):
+    """Service temporarily overloaded exception"""
+    
+    def __init__(self, message: str = "Service temporarily unavailable", retry_after: int = 1):
+        super().__init__(
+            message=message,
+            status_code=503,
+            error_code="SERVICE_UNAVAILABLE",
+            details={"retry_after": retry_after}
+        )
+        self.retry_after = retry_after
+
+
 class GoogleAPIError(AppException):
     """Google API error exception"""
     
@@ -215,6 +228,7 @@ BusinessRuleViolationError = ValidationError
 DuplicateResourceError = ConflictError
 UnauthorizedError = AuthenticationError
 ResourceNotFoundError = NotFoundError
+ExternalApiError = GoogleAPIError
 
 
 def create_http_exception(exception: AppException):
@@ -0,0 +1,37 @@
+"""
+Background components shared by the application entry points
+
+main.py and src/main_enhanced.py start and stop the same workers through
+these helpers, so neither app runs without one of them.
+"""
+
+import logging
+
+from .database import close_db, replica_router
+from ..services.activity_tracker import activity_tracker
+from ..services.audit_writer import audit_writer
+from ..services.ga4_api_executor import ga4_api_executor
+from ..services.password_hasher import password_hasher
+from ..services.smtp_pool import smtp_pool
+
+logger = logging.getLogger(__name__)
+
+
+async def start_background_services() -> None:
+    """Start replica lag checks, activity and audit writers and the password hasher"""
+    await replica_router.start()
+    activity_tracker.start()
+    audit_writer.start()
+    await password_hasher.start()
+
+
+async def stop_background_services() -> None:
+    """Stop the background workers, flushing buffered writes, then close database connections"""
+    ga4_api_executor.shutdown(wait=False)
+    # Writes the last_login_at updates and audit entries still buffered
+    await activity_tracker.stop()
+    await audit_writer.stop()
+    password_hasher.shutdown()
+    await smtp_pool.close()
+    # Also stops the replica lag checks and disposes the replica engines
+    await close_db()
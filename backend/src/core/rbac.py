@@ -12,6 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from ..models.db_models import User, UserRole, UserStatus, RegistrationStatus
 from ..core.database import get_db
 from ..services.auth_service import AuthService
+from ..middleware.security import is_public_path
 
 
 class Permission(str, Enum):
@@ -397,7 +398,11 @@ async def get_current_user_with_permissions(
 
 
 class RBACMiddleware:
-    """RBAC Middleware for request-level authorization"""
+    """
+    RBAC Middleware for request-level authorization
+    
+    SecurityMiddleware sets the same RBAC context; use this one only in apps without it.
+    """
     
     def __init__(self, app):
         self.app = app
@@ -407,20 +412,13 @@ class RBACMiddleware:
             await self.app(scope, receive, send)
             return
         
-        request = Request(scope, receive)
-        
         # Skip RBAC for public endpoints
-        public_paths = [
-            "/health", "/api/docs", "/api/redoc", "/api/openapi.json",
-            "/api/auth/login", "/api/auth/register", "/static"
-        ]
-        
-        if any(request.url.path.startswith(path) for path in public_paths):
+        if is_public_path(scope["path"]):
             await self.app(scope, receive, send)
             return
         
         # Add RBAC context to request state
-        request.state.rbac_enabled = True
+        scope.setdefault("state", {})["rbac_enabled"] = True
         
         await self.app(scope, receive, send)
 
@@ -10,8 +10,11 @@ from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .core.config import settings
-from .core.database import init_db, close_db, get_db
+from .core.database import init_db, get_db, AsyncSessionLocal
 from .core.exceptions import AppException
+from .core.lifecycle import start_background_services, stop_background_services
+from .services.permission_cache import permission_decision_cache
+from .services.role_permission_matrix import role_permission_matrix
 from .models.db_models import ClientAssignmentStatus
 from .api.routers import (
     client_assignments,
@@ -19,7 +22,8 @@ from .api.routers import (
     permissions_enhanced,
     permission_requests,
     service_accounts,
-    ai_insights
+    ai_insights,
+    reports
 )
 
 # Import existing routers (assuming they exist)
@@ -52,12 +56,26 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to initialize database: {e}")
         raise
     
+    try:
+        async with AsyncSessionLocal() as session:
+            await role_permission_matrix.load(session)
+    except Exception as e:
+        # Loaded lazily on the first permission check instead
+        logger.error(f"Failed to compile role permission matrix: {e}")
+    
+    if settings.RBAC_CACHE_REDIS_ENABLED:
+        await permission_decision_cache.connect_redis(settings.REDIS_URL)
+    elif settings.AUTH_STATELESS_TOKENS:
+        logger.warning("AUTH_STATELESS_TOKENS needs RBAC_CACHE_REDIS_ENABLED to share revocations; tokens are checked against the database")
+    
+    await start_background_services()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down GA4 Admin Automation System...")
-    await close_db()
-    logger.info("Database connections closed")
+    await permission_decision_cache.disconnect_redis()
+    await stop_background_services()
 
 
 # Create FastAPI application
@@ -142,6 +160,7 @@ app.include_router(permissions_enhanced.router, prefix="/api")
 app.include_router(permission_requests.router, prefix="/api")
 app.include_router(service_accounts.router, prefix="/api")
 app.include_router(ai_insights.router, prefix="/api")
+app.include_router(reports.router, prefix="/api")
 app.include_router(audit_logs, prefix="/api")
 
 
@@ -0,0 +1,171 @@
+"""
+Multi-pattern request scanner for SecurityMiddleware
+
+Checking every attack pattern with its own substring search costs one pass
+over the request data per pattern. The pattern set is compiled once instead:
+into an Aho-Corasick automaton when pyahocorasick is installed, otherwise into
+one regex whose alternatives are factored into a trie, so each position is
+only tried against patterns sharing its prefix. Either way a scan is one pass
+whose cost barely grows with the number of patterns.
+
+Scanners work on raw bytes, match ASCII case-insensitively and can follow a
+body across chunks. ReloadingPatternScanner recompiles the set when
+SECURITY_PATTERNS_FILE changes, without a restart.
+"""
+
+import logging
+import os
+import re
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - pyahocorasick is optional
+    ahocorasick = None
+
+logger = logging.getLogger(__name__)
+
+AHO_CORASICK = "aho-corasick"
+REGEX = "regex"
+
+SCANNER_USER_AGENTS = ('sqlmap', 'nikto', 'nmap', 'burp')
+
+
+def _trie_regex(patterns: Iterable[bytes]) -> "re.Pattern[bytes]":
+    """One regex matching any of the patterns, with shared prefixes factored out"""
+    trie: Dict = {}
+    for pattern in patterns:
+        node = trie
+        for byte in pattern:
+            node = node.setdefault(byte, {})
+        node[None] = {}
+
+    def build(node: Dict) -> bytes:
+        # A pattern ends here: whatever follows is irrelevant, the shorter match suffices
+        if None in node:
+            return b""
+        branches = [re.escape(bytes([byte])) + build(child) for byte, child in sorted(node.items())]
+        return branches[0] if len(branches) == 1 else b"(?:" + b"|".join(branches) + b")"
+
+    return re.compile(build(trie))
+
+
+class ScanStream:
+    """Scans a body chunk by chunk, up to a size cap"""
+
+    def __init__(self, scanner: "PatternScanner", max_bytes: int):
+        self.scanner = scanner
+        self.overlap = scanner.max_length - 1  # Carried over so patterns split across chunks are found
+        self.max_bytes = max_bytes
+        self.scanned = 0
+        self.tail = b""
+        self.matched = False
+
+    def feed(self, chunk: bytes) -> bool:
+        """Scan the next chunk; True once a pattern was seen"""
+        if self.matched or self.scanned >= self.max_bytes or not chunk:
+            return self.matched
+        chunk = chunk[:self.max_bytes - self.scanned]
+        self.scanned += len(chunk)
+        window = self.tail + chunk
+        self.matched = self.scanner.search(window) is not None
+        self.tail = window[len(window) - self.overlap:] if self.overlap else b""
+        return self.matched
+
+
+class PatternScanner:
+    """A compiled, immutable pattern set"""
+
+    def __init__(self, patterns: Iterable[str], engine: Optional[str] = None):
+        encoded = {pattern.encode("utf-8").lower() for pattern in patterns if pattern}
+        if not encoded:
+            raise ValueError("At least one pattern is required")
+        self.patterns: Tuple[bytes, ...] = tuple(sorted(encoded))
+        self.max_length = max(len(pattern) for pattern in self.patterns)
+        self.engine = engine or (AHO_CORASICK if ahocorasick is not None else REGEX)
+
+        if self.engine == AHO_CORASICK:
+            if ahocorasick is None:
+                raise ValueError("pyahocorasick is not installed")
+            # pyahocorasick matches str; latin-1 maps each byte to one character and back
+            self._automaton = ahocorasick.Automaton()
+            for pattern in self.patterns:
+                self._automaton.add_word(pattern.decode("latin-1"), pattern)
+            self._automaton.make_automaton()
+        elif self.engine == REGEX:
+            self._regex = _trie_regex(self.patterns)
+        else:
+            raise ValueError(f"Unknown scanner engine: {self.engine}")
+
+    def search(self, data: bytes) -> Optional[bytes]:
+        """The first pattern found in data (ASCII case-insensitive), or None"""
+        data = data.lower()
+        if self.engine == AHO_CORASICK:
+            for _, pattern in self._automaton.iter(data.decode("latin-1")):
+                return pattern
+            return None
+        match = self._regex.search(data)
+        return match.group() if match else None
+
+    def stream(self, max_bytes: int) -> ScanStream:
+        """Incremental scan of a body arriving in chunks"""
+        return ScanStream(self, max_bytes)
+
+
+class ReloadingPatternScanner:
+    """
+    The scanner for a patterns file, recompiled when the file changes
+
+    The file holds one pattern per line; blank lines and lines starting with
+    '#' are ignored. Its modification time is checked at most every
+    check_interval seconds. Without a file, or while it cannot be read, the
+    last compiled set (initially the defaults) stays in use.
+    """
+
+    def __init__(
+        self,
+        defaults: Iterable[str],
+        path: Optional[str] = None,
+        check_interval: float = 5.0,
+        engine: Optional[str] = None
+    ):
+        self.path = path
+        self.check_interval = check_interval
+        self.engine = engine
+        self._scanner = PatternScanner(defaults, engine)
+        self._mtime: Optional[float] = None
+        self._next_check = 0.0
+
+        self.reloads = 0
+        self.reload_errors = 0
+
+    @property
+    def current(self) -> PatternScanner:
+        """The compiled pattern set, reloaded first if the file changed"""
+        if self.path and time.monotonic() >= self._next_check:
+            self._next_check = time.monotonic() + self.check_interval
+            self._reload_if_changed()
+        return self._scanner
+
+    def replace(self, patterns: Iterable[str]) -> None:
+        """Compile and swap in a new pattern set"""
+        self._scanner = PatternScanner(patterns, self.engine)
+        self.reloads += 1
+
+    def _reload_if_changed(self) -> None:
+        try:
+            mtime = os.stat(self.path).st_mtime
+            if mtime == self._mtime:
+                return
+            with open(self.path, encoding="utf-8") as patterns_file:
+                patterns = [
+                    line.strip() for line in patterns_file
+                    if line.strip() and not line.lstrip().startswith("#")
+                ]
+            self.replace(patterns)
+            self._mtime = mtime
+            logger.info(f"Loaded {len(self._scanner.patterns)} suspicious request patterns from {self.path}")
+        except (OSError, ValueError) as e:
+            self.reload_errors += 1
+            logger.error(f"Keeping current request patterns, cannot load {self.path}: {e}")
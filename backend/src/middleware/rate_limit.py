@@ -0,0 +1,244 @@
+"""
+Rate limiting backends for SecurityMiddleware
+
+Each request costs one round-trip: a Lua script checks the client's IP block,
+applies a GCRA (generic cell rate algorithm) limit and records violations
+atomically in Redis. GCRA keeps a single "theoretical arrival time" per key
+instead of a counter per window, so bursts across window boundaries are not
+let through twice.
+
+When Redis is unreachable the limiter falls back to the same algorithm in
+process memory (limits then apply per worker) rather than letting every request
+through, and retries Redis after RATE_LIMIT_REDIS_RETRY_SECONDS.
+"""
+
+import logging
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from ..core.config import settings
+
+try:
+    import redis.asyncio as aioredis
+    from redis.exceptions import RedisError
+except ImportError:  # pragma: no cover - redis is optional
+    aioredis = None
+    RedisError = OSError
+
+logger = logging.getLogger(__name__)
+
+# Decision states
+ALLOWED = "allowed"
+LIMITED = "limited"
+BLOCKED = "blocked"        # The IP was already blocked
+NEWLY_BLOCKED = "newly_blocked"  # This request's violation triggered the block
+
+# KEYS: rate key, block key, violations key
+# ARGV: emission interval (ms), limit, max violations, block duration (ms), violation ttl (s)
+# Returns {allowed, retry after (ms), 0 limited / 1 blocked / 2 newly blocked}
+GCRA_SCRIPT = """
+local block_ttl = redis.call('PTTL', KEYS[2])
+if block_ttl > 0 then
+    return {0, block_ttl, 1}
+end
+
+local interval = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - interval * limit
+
+if now < allow_at then
+    local violations = redis.call('INCR', KEYS[3])
+    redis.call('EXPIRE', KEYS[3], tonumber(ARGV[5]))
+    if violations >= tonumber(ARGV[3]) then
+        redis.call('SET', KEYS[2], '1', 'PX', tonumber(ARGV[4]))
+        redis.call('DEL', KEYS[3])
+        return {0, tonumber(ARGV[4]), 2}
+    end
+    return {0, allow_at - now, 0}
+end
+
+redis.call('SET', KEYS[1], new_tat, 'PX', new_tat - now)
+return {1, 0, 0}
+"""
+
+
+class RateLimitDecision(NamedTuple):
+    """Outcome of a rate limit check"""
+    state: str
+    retry_after: float = 0.0  # Seconds
+
+    @property
+    def allowed(self) -> bool:
+        return self.state == ALLOWED
+
+    @property
+    def blocked(self) -> bool:
+        return self.state in (BLOCKED, NEWLY_BLOCKED)
+
+
+class InMemoryRateLimiter:
+    """GCRA limiter and IP blocklist in process memory"""
+
+    def __init__(
+        self,
+        max_violations: int = 5,
+        block_seconds: float = 3600,
+        violation_ttl: float = 3600,
+        max_keys: int = settings.RATE_LIMIT_FALLBACK_MAX_KEYS
+    ):
+        self.max_violations = max_violations
+        self.block_seconds = block_seconds
+        self.violation_ttl = violation_ttl
+        self.max_keys = max_keys
+
+        self._tat: Dict[str, float] = {}
+        self._blocked_until: Dict[str, float] = {}
+        # ip -> (violations, expiry)
+        self._violations: Dict[str, Tuple[int, float]] = {}
+
+    async def hit(self, ip: str, path: str, limit: int, window: float) -> RateLimitDecision:
+        """Count a request and decide whether it may proceed"""
+        now = time.monotonic()
+
+        blocked_until = self._blocked_until.get(ip)
+        if blocked_until is not None:
+            if blocked_until > now:
+                return RateLimitDecision(BLOCKED, blocked_until - now)
+            del self._blocked_until[ip]
+
+        key = f"{ip}:{path}"
+        interval = window / limit
+        new_tat = max(self._tat.get(key, now), now) + interval
+        allow_at = new_tat - interval * limit
+
+        if now < allow_at:
+            violations, expires = self._violations.get(ip, (0, 0.0))
+            violations = (violations if expires > now else 0) + 1
+            if violations >= self.max_violations:
+                self._violations.pop(ip, None)
+                self._blocked_until[ip] = now + self.block_seconds
+                return RateLimitDecision(NEWLY_BLOCKED, self.block_seconds)
+            self._violations[ip] = (violations, now + self.violation_ttl)
+            return RateLimitDecision(LIMITED, allow_at - now)
+
+        self._tat[key] = new_tat
+        if len(self._tat) > self.max_keys:
+            self._prune(now)
+        return RateLimitDecision(ALLOWED)
+
+    async def block(self, ip: str, duration: float) -> None:
+        """Block an IP for duration seconds"""
+        self._blocked_until[ip] = time.monotonic() + duration
+
+    def _prune(self, now: float) -> None:
+        """Forget keys whose limit has fully recovered, then the oldest if still too many"""
+        self._tat = {key: tat for key, tat in self._tat.items() if tat > now}
+        self._blocked_until = {ip: until for ip, until in self._blocked_until.items() if until > now}
+        self._violations = {ip: entry for ip, entry in self._violations.items() if entry[1] > now}
+
+        overflow = len(self._tat) - self.max_keys
+        if overflow > 0:
+            for key in sorted(self._tat, key=self._tat.get)[:overflow]:
+                del self._tat[key]
+
+
+class RedisRateLimiter:
+    """GCRA limiter shared across workers through Redis, with an in-process fallback"""
+
+    def __init__(
+        self,
+        redis_client=None,
+        fallback: Optional[InMemoryRateLimiter] = None,
+        max_violations: int = 5,
+        block_seconds: float = 3600,
+        violation_ttl: float = 3600,
+        retry_seconds: float = settings.RATE_LIMIT_REDIS_RETRY_SECONDS
+    ):
+        if redis_client is None and aioredis is not None:
+            redis_client = aioredis.Redis(
+                connection_pool=aioredis.ConnectionPool.from_url(
+                    settings.REDIS_URL,
+                    max_connections=settings.RATE_LIMIT_REDIS_MAX_CONNECTIONS,
+                    socket_timeout=settings.RATE_LIMIT_REDIS_TIMEOUT_SECONDS,
+                    socket_connect_timeout=settings.RATE_LIMIT_REDIS_TIMEOUT_SECONDS
+                )
+            )
+        self.redis = redis_client
+        self.fallback = fallback or InMemoryRateLimiter(max_violations, block_seconds, violation_ttl)
+        self.max_violations = max_violations
+        self.block_seconds = block_seconds
+        self.violation_ttl = violation_ttl
+        self.retry_seconds = retry_seconds
+
+        self._script = redis_client.register_script(GCRA_SCRIPT) if redis_client is not None else None
+        self._retry_at = 0.0
+
+        self.redis_checks = 0
+        self.fallback_checks = 0
+        self.redis_errors = 0
+
+    @property
+    def redis_available(self) -> bool:
+        """Whether Redis is used for the next check"""
+        return self._script is not None and time.monotonic() >= self._retry_at
+
+    async def hit(self, ip: str, path: str, limit: int, window: float) -> RateLimitDecision:
+        """Count a request and decide whether it may proceed"""
+        if self.redis_available:
+            try:
+                allowed, retry_after_ms, state = await self._script(
+                    keys=[f"rate_limit:{ip}:{path}", f"blocked_ip:{ip}", f"violations:{ip}"],
+                    args=[
+                        max(int(window * 1000 / limit), 1), limit, self.max_violations,
+                        int(self.block_seconds * 1000), int(self.violation_ttl)
+                    ]
+                )
+            except (RedisError, OSError) as e:
+                self._redis_failed(e)
+            else:
+                self.redis_checks += 1
+                if allowed:
+                    return RateLimitDecision(ALLOWED)
+                return RateLimitDecision(
+                    (LIMITED, BLOCKED, NEWLY_BLOCKED)[state], retry_after_ms / 1000
+                )
+
+        self.fallback_checks += 1
+        return await self.fallback.hit(ip, path, limit, window)
+
+    async def block(self, ip: str, duration: float) -> None:
+        """Block an IP for duration seconds"""
+        await self.fallback.block(ip, duration)
+        if self.redis_available:
+            try:
+                await self.redis.set(f"blocked_ip:{ip}", "1", px=int(duration * 1000))
+            except (RedisError, OSError) as e:
+                self._redis_failed(e)
+
+    def _redis_failed(self, error: Exception) -> None:
+        if time.monotonic() >= self._retry_at:
+            logger.warning(f"Rate limiter falling back to in-process limits: {error}")
+        self.redis_errors += 1
+        self._retry_at = time.monotonic() + self.retry_seconds
+
+    async def close(self) -> None:
+        """Release the Redis connection pool"""
+        if self.redis is not None:
+            await self.redis.aclose()
+
+    def get_stats(self) -> Dict[str, object]:
+        """Get limiter statistics for monitoring"""
+        return {
+            "redis_available": self.redis_available,
+            "redis_checks": self.redis_checks,
+            "fallback_checks": self.fallback_checks,
+            "redis_errors": self.redis_errors
+        }
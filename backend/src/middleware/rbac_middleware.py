@@ -18,6 +18,7 @@ from ..core.exceptions import AuthorizationError
 from ..models.db_models import UserRole, Permission
 from ..services.auth_service import AuthService
 from ..services.rbac_service import RBACService
+from .security import is_public_path
 
 logger = logging.getLogger(__name__)
 security = HTTPBearer()
@@ -75,26 +76,16 @@ class RBACMiddleware:
     
     def _is_public_endpoint(self, path: str) -> bool:
         """Check if endpoint is public (no auth required)"""
-        public_paths = [
-            "/api/auth/login",
-            "/api/auth/register",
-            "/api/auth/refresh",
-            "/docs",
-            "/openapi.json",
-            "/health",
-            "/api/health"
-        ]
-        
-        # Check exact matches and prefix matches
-        for public_path in public_paths:
-            if path == public_path or path.startswith(public_path + "/"):
-                return True
-        
-        return False
+        return is_public_path(path)
     
     async def _extract_user_from_request(self, request: Request) -> Optional[Dict[str, Any]]:
         """Extract user information from JWT token in request"""
         
+        # Claims already decoded by SecurityMiddleware
+        shared = getattr(request.state, "current_user", None)
+        if shared is not None:
+            return shared
+        
         try:
             # Get authorization header
             auth_header = request.headers.get("authorization")
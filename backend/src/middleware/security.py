@@ -2,254 +2,376 @@
 Security middleware for GA4 Admin Automation System
 """
 
+import asyncio
+import ipaddress
+import re
 import time
 import json
-from typing import Dict, List, Optional
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Sequence
 from datetime import datetime, timedelta
-from fastapi import Request, HTTPException, status
+from fastapi import status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+import jwt
 import redis
 import hashlib
 import logging
 
+from ..core.config import settings
+from .pattern_scanner import SCANNER_USER_AGENTS, PatternScanner, ReloadingPatternScanner, ScanStream
+from .rate_limit import BLOCKED, NEWLY_BLOCKED, RateLimitDecision, RedisRateLimiter
+
 logger = logging.getLogger(__name__)
 
-class SecurityMiddleware(BaseHTTPMiddleware):
+# Endpoints that need no authentication; a path is public if it is one of these or lies below one
+PUBLIC_PATHS = (
+    "/health", "/api/health", "/docs", "/openapi.json", "/api/docs", "/api/redoc", "/api/openapi.json",
+    "/api/auth/login", "/api/auth/register", "/api/auth/refresh", "/static"
+)
+_PUBLIC_PATH = re.compile("(?:%s)(?:/|$)" % "|".join(re.escape(path) for path in PUBLIC_PATHS))
+
+# The only request headers the pipeline reads
+_HEADERS = frozenset({b"x-forwarded-for", b"x-real-ip", b"user-agent", b"authorization"})
+
+SECURITY_HEADERS = [
+    (name.lower().encode("latin-1"), value.encode("latin-1"))
+    for name, value in (
+        ('X-Content-Type-Options', 'nosniff'),
+        ('X-Frame-Options', 'DENY'),
+        ('X-XSS-Protection', '1; mode=block'),
+        ('Strict-Transport-Security', 'max-age=31536000; includeSubDomains'),
+        ('Content-Security-Policy', "default-src 'self'; script-src 'self' 'unsafe-inline'; style-src 'self' 'unsafe-inline'"),
+        ('Referrer-Policy', 'strict-origin-when-cross-origin'),
+        ('Permissions-Policy', 'geolocation=(), microphone=(), camera=()')
+    )
+]
+_SECURITY_HEADER_NAMES = frozenset(name for name, _ in SECURITY_HEADERS)
+
+
+def is_public_path(path: str) -> bool:
+    """Whether a request path is served without authentication"""
+    return _PUBLIC_PATH.match(path) is not None
+
+
+def _read_headers(scope) -> Dict[bytes, bytes]:
+    """The headers the pipeline needs, in one pass over the raw ASGI headers"""
+    found = {}
+    for name, value in scope["headers"]:
+        if name not in _HEADERS:
+            continue
+        if name not in found:
+            found[name] = value
+        elif name == b"x-forwarded-for":
+            # Repeated headers form one hop list, nearest proxy last
+            found[name] += b", " + value
+    return found
+
+
+class _ScannedBody:
+    """
+    Request body channel scanned for attack patterns as it is received
+    
+    finish() reads the rest of the scanned prefix ahead of the application and
+    keeps it for the application's own reads, so the verdict is known before a
+    response starts. The read-ahead is bounded by the scan cap.
     """
-    Comprehensive security middleware providing:
-    - Rate limiting
+    
+    def __init__(self, stream: ScanStream, receive):
+        self.stream = stream
+        self._receive = receive
+        self._read_ahead: Deque[Dict[str, Any]] = deque()
+        # Starlette reads concurrently (streaming responses listen for disconnects)
+        self._lock = asyncio.Lock()
+        self.complete = False
+    
+    @property
+    def matched(self) -> bool:
+        return self.stream.matched
+    
+    @property
+    def scanned(self) -> bool:
+        """Whether every byte up to the scan cap has been seen"""
+        return self.complete or self.stream.matched or self.stream.scanned >= self.stream.max_bytes
+    
+    async def _next(self) -> Dict[str, Any]:
+        message = await self._receive()
+        if message["type"] == "http.request":
+            self.stream.feed(message.get("body", b""))
+            self.complete = not message.get("more_body", False)
+        else:
+            self.complete = True
+        return message
+    
+    async def receive(self) -> Dict[str, Any]:
+        async with self._lock:
+            message = self._read_ahead.popleft() if self._read_ahead else await self._next()
+        if self.stream.matched:
+            # The application sees a disconnected client and stops processing the body
+            return {"type": "http.disconnect"}
+        return message
+    
+    async def finish(self) -> None:
+        """Receive and scan the body up to the scan cap"""
+        while not self.scanned:
+            async with self._lock:
+                if not self.scanned:
+                    self._read_ahead.append(await self._next())
+
+
+class SecurityMiddleware:
+    """
+    Pure ASGI security pipeline providing:
+    - Rate limiting (RATE_LIMIT_ENABLED)
     - IP blocking
-    - Request fingerprinting
+    - Attack pattern blocking (SECURITY_PATTERN_BLOCKING_ENABLED)
     - Brute force protection
+    - Security response headers
+    - Shared token claims for authentication dependencies
+    
+    The enforcing stages are off unless enabled in settings. Client addresses
+    come from X-Forwarded-For / X-Real-IP only when the connecting peer is one
+    of TRUSTED_PROXIES, so clients cannot choose the address they are limited
+    or blocked under.
+    
+    Request headers are read once per request, public routes are recognised by
+    one precompiled pattern and POST bodies are scanned incrementally while the
+    application reads them, so nothing is buffered here. Bearer tokens of
+    protected routes are decoded once and left in ``request.state`` for
+    get_current_user and the RBAC decorators.
     """
     
-    def __init__(self, app, redis_client=None):
-        super().__init__(app)
-        self.redis_client = redis_client or redis.Redis(host='localhost', port=6379, db=1)
+    def __init__(self, app, redis_client=None, rate_limiter: Optional[RedisRateLimiter] = None,
+                 body_scan_max_bytes: int = settings.SECURITY_BODY_SCAN_MAX_BYTES,
+                 rate_limit_enabled: Optional[bool] = None,
+                 pattern_blocking_enabled: Optional[bool] = None,
+                 trusted_proxies: Optional[Sequence[str]] = None):
+        self.app = app
+        # redis_client must be a redis.asyncio client; by default a pooled one for REDIS_URL
+        self.rate_limiter = rate_limiter or RedisRateLimiter(redis_client)
+        self.redis_client = self.rate_limiter.redis
+        self.rate_limit_enabled = settings.RATE_LIMIT_ENABLED if rate_limit_enabled is None else rate_limit_enabled
+        self.pattern_blocking_enabled = (
+            settings.SECURITY_PATTERN_BLOCKING_ENABLED if pattern_blocking_enabled is None else pattern_blocking_enabled
+        )
+        self.trusted_proxies = [
+            ipaddress.ip_network(proxy, strict=False)
+            for proxy in (settings.TRUSTED_PROXIES if trusted_proxies is None else trusted_proxies)
+        ]
+        self.body_scan_max_bytes = body_scan_max_bytes
         self.rate_limits = {
             '/api/auth/login': {'requests': 5, 'window': 300},  # 5 attempts per 5 minutes
             '/api/auth/register': {'requests': 3, 'window': 3600},  # 3 registrations per hour
             '/api/auth/refresh': {'requests': 10, 'window': 3600},  # 10 refreshes per hour
-            'default': {'requests': 100, 'window': 3600}  # 100 requests per hour
+            'default': {'requests': settings.RATE_LIMIT_REQUESTS, 'window': settings.RATE_LIMIT_WINDOW}
         }
         
         # IP blocklist patterns (implement persistent storage in production)
         self.blocked_ips = set()
-        self.suspicious_patterns = [
-            'sqlmap', 'nikto', 'nmap', 'dirb', 'burp', 'havij',
-            'union select', 'or 1=1', 'and 1=1', '../', '..\\',
-            '<script', 'javascript:', 'onload=', 'onerror=',
-            'eval(', 'document.cookie', 'alert('
-        ]
+        # Attack patterns compiled into one scanner; SECURITY_PATTERNS_FILE replaces them at runtime
+        self.pattern_scanner = ReloadingPatternScanner(
+            settings.SECURITY_SUSPICIOUS_PATTERNS,
+            settings.SECURITY_PATTERNS_FILE,
+            settings.SECURITY_PATTERNS_RELOAD_SECONDS
+        )
+        self.user_agent_scanner = PatternScanner(SCANNER_USER_AGENTS)
     
-    async def dispatch(self, request: Request, call_next):
-        # Get client IP
-        client_ip = self._get_client_ip(request)
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Check if IP is blocked
-        if await self._is_ip_blocked(client_ip):
-            return JSONResponse(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                content={"error": "IP_BLOCKED", "message": "IP address temporarily blocked"}
-            )
+        path = scope["path"]
+        headers = _read_headers(scope)
+        client_ip = self._get_client_ip(scope, headers)
         
-        # Rate limiting
-        if not await self._check_rate_limit(client_ip, request.url.path):
-            await self._handle_rate_limit_exceeded(client_ip, request.url.path)
-            return JSONResponse(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                content={"error": "RATE_LIMIT_EXCEEDED", "message": "Too many requests"}
-            )
+        # IP block check and rate limiting in one round-trip
+        if self.rate_limit_enabled:
+            decision = await self._check_rate_limit(client_ip, path)
+            if decision.state == BLOCKED:
+                await JSONResponse(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    content={"error": "IP_BLOCKED", "message": "IP address temporarily blocked"}
+                )(scope, receive, send)
+                return
+            
+            if not decision.allowed:
+                if decision.state == NEWLY_BLOCKED:
+                    await self._log_ip_blocked(client_ip, self.rate_limiter.block_seconds, "repeated_rate_limit_violations")
+                await JSONResponse(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    content={"error": "RATE_LIMIT_EXCEEDED", "message": "Too many requests"},
+                    headers={"Retry-After": str(max(int(decision.retry_after + 0.999), 1))}
+                )(scope, receive, send)
+                return
         
-        # Malicious pattern detection
-        if await self._detect_malicious_patterns(request):
-            await self._block_ip_temporarily(client_ip, reason="malicious_pattern")
-            logger.warning(f"Malicious pattern detected from IP {client_ip}: {request.url}")
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content={"error": "INVALID_REQUEST", "message": "Request blocked"}
-            )
+        # Malicious pattern detection in the URL and user agent
+        if self.pattern_blocking_enabled and self._detect_malicious_patterns(
+            path, scope["query_string"], headers.get(b"user-agent", b"")
+        ):
+            await self._reject_malicious(scope, receive, send, client_ip)
+            return
+        
+        # RBAC context and decoded token claims for downstream dependencies
+        if not is_public_path(path):
+            state = scope.setdefault("state", {})
+            state["rbac_enabled"] = True
+            self._share_token_claims(state, headers.get(b"authorization"))
         
-        # Add security headers
-        response = await call_next(request)
-        self._add_security_headers(response)
+        if scope["method"] != "POST" or not self.pattern_blocking_enabled:
+            await self.app(scope, receive, self._with_security_headers(send))
+            return
+        
+        # Request bodies are scanned as the application reads them. The response
+        # starts only once the scan is done, so a match still gets a whole 400.
+        body = _ScannedBody(self.pattern_scanner.current.stream(self.body_scan_max_bytes), receive)
+        secured_send = self._with_security_headers(send)
+        
+        async def guarded_send(message):
+            await body.finish()
+            if body.matched:
+                return  # The application's answer to a blocked request is replaced below
+            await secured_send(message)
+        
+        try:
+            await self.app(scope, body.receive, guarded_send)
+        except Exception:
+            if not body.matched:
+                raise
         
-        return response
+        if body.matched:
+            await self._block_ip_temporarily(client_ip, reason="malicious_pattern")
+            logger.warning(f"Malicious pattern detected from IP {client_ip} in body of {path}")
+            await self._invalid_request_response()(scope, receive, send)
     
-    def _get_client_ip(self, request: Request) -> str:
-        """Extract client IP considering proxies"""
-        forwarded = request.headers.get('X-Forwarded-For')
+    def _get_client_ip(self, scope, headers: Dict[bytes, bytes]) -> str:
+        """Extract client IP, following forwarding headers only through trusted proxies"""
+        client = scope.get("client")
+        peer = client[0] if client else '127.0.0.1'
+        if not self._is_trusted_proxy(peer):
+            return peer
+        
+        forwarded = headers.get(b'x-forwarded-for')
         if forwarded:
-            return forwarded.split(',')[0].strip()
+            # Walk back from the nearest hop; the first address not of a trusted proxy is the client
+            hops = [hop.strip() for hop in forwarded.decode('latin-1').split(',') if hop.strip()]
+            for hop in reversed(hops):
+                if not self._is_trusted_proxy(hop):
+                    return hop
+            return hops[0] if hops else peer
         
-        real_ip = request.headers.get('X-Real-IP')
+        real_ip = headers.get(b'x-real-ip')
         if real_ip:
-            return real_ip
+            return real_ip.decode('latin-1').strip()
         
-        return request.client.host if request.client else '127.0.0.1'
+        return peer
     
-    async def _check_rate_limit(self, ip: str, path: str) -> bool:
-        """Check if request is within rate limits"""
+    def _is_trusted_proxy(self, address: str) -> bool:
+        """Whether an address belongs to one of the trusted proxies"""
+        if not self.trusted_proxies:
+            return False
         try:
-            # Get rate limit config for this path
-            limit_config = self.rate_limits.get(path, self.rate_limits['default'])
-            
-            # Create Redis key
-            window_start = int(time.time()) // limit_config['window'] * limit_config['window']
-            key = f"rate_limit:{ip}:{path}:{window_start}"
-            
-            # Get current count
-            current_count = await self._redis_get_int(key)
-            
-            if current_count >= limit_config['requests']:
-                return False
-            
-            # Increment counter
-            await self._redis_incr(key, limit_config['window'])
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error checking rate limit: {e}")
-            return True  # Allow request on Redis failure
-    
-    async def _handle_rate_limit_exceeded(self, ip: str, path: str):
-        """Handle rate limit exceeded"""
-        # Track repeated violations
-        violation_key = f"violations:{ip}"
-        violations = await self._redis_get_int(violation_key)
-        violations += 1
-        await self._redis_set(violation_key, violations, 3600)  # Track for 1 hour
-        
-        # Block IP after multiple violations
-        if violations >= 5:
-            await self._block_ip_temporarily(ip, reason="repeated_rate_limit_violations")
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in self.trusted_proxies)
+    
+    async def _check_rate_limit(self, ip: str, path: str) -> RateLimitDecision:
+        """Check the IP block and count the request against its rate limit"""
+        limit_config = self.rate_limits.get(path, self.rate_limits['default'])
+        return await self.rate_limiter.hit(ip, path, limit_config['requests'], limit_config['window'])
     
-    async def _is_ip_blocked(self, ip: str) -> bool:
-        """Check if IP is currently blocked"""
+    def _share_token_claims(self, state: Dict[str, Any], authorization: Optional[bytes]):
+        """Decode a bearer token once and keep its claims in request state"""
+        if not authorization:
+            return
+        scheme, _, token = authorization.decode("latin-1").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return
         try:
-            blocked_until = await self._redis_get(f"blocked_ip:{ip}")
-            if blocked_until:
-                if float(blocked_until) > time.time():
-                    return True
-                else:
-                    # Remove expired block
-                    await self._redis_delete(f"blocked_ip:{ip}")
-            return False
-        except Exception as e:
-            logger.error(f"Error checking IP block status: {e}")
-            return False
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except jwt.InvalidTokenError:
+            return  # get_current_user reports the invalid token
+        
+        state["token"] = token
+        state["token_payload"] = payload
+        state["current_user"] = {
+            "user_id": payload.get("user_id"),
+            "email": payload.get("sub"),
+            "role": payload.get("role"),
+            "token_payload": payload
+        }
+    
+    async def _reject_malicious(self, scope, receive, send, client_ip: str):
+        """Block the client and answer 400"""
+        await self._block_ip_temporarily(client_ip, reason="malicious_pattern")
+        logger.warning(f"Malicious pattern detected from IP {client_ip}: {scope['path']}")
+        await self._invalid_request_response()(scope, receive, send)
+    
+    @staticmethod
+    def _invalid_request_response() -> JSONResponse:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"error": "INVALID_REQUEST", "message": "Request blocked"}
+        )
+    
+    @staticmethod
+    def _with_security_headers(send) -> Callable[[Dict[str, Any]], Awaitable[None]]:
+        """Wrap send so the response carries the security headers"""
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = [
+                    header for header in message.get("headers", []) if header[0].lower() not in _SECURITY_HEADER_NAMES
+                ]
+                message = {**message, "headers": headers + SECURITY_HEADERS}
+            await send(message)
+        return send_with_headers
     
     async def _block_ip_temporarily(self, ip: str, duration: int = 3600, reason: str = "security_violation"):
         """Block IP temporarily"""
         try:
-            block_until = time.time() + duration
-            await self._redis_set(f"blocked_ip:{ip}", str(block_until), duration)
-            
-            logger.warning(f"IP {ip} blocked for {duration} seconds. Reason: {reason}")
-            
-            # Log security event
-            security_event = {
-                "timestamp": datetime.utcnow().isoformat(),
-                "event_type": "ip_blocked",
-                "ip_address": ip,
-                "reason": reason,
-                "duration": duration
-            }
-            await self._log_security_event(security_event)
-            
+            await self.rate_limiter.block(ip, duration)
+            await self._log_ip_blocked(ip, duration, reason)
         except Exception as e:
             logger.error(f"Error blocking IP: {e}")
     
-    async def _detect_malicious_patterns(self, request: Request) -> bool:
-        """Detect malicious patterns in request"""
+    async def _log_ip_blocked(self, ip: str, duration: float, reason: str):
+        """Log and record an IP block"""
+        logger.warning(f"IP {ip} blocked for {duration} seconds. Reason: {reason}")
+        
+        # Log security event
+        security_event = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "event_type": "ip_blocked",
+            "ip_address": ip,
+            "reason": reason,
+            "duration": duration
+        }
+        await self._log_security_event(security_event)
+    
+    def _detect_malicious_patterns(self, path: str, query: bytes, user_agent: bytes) -> bool:
+        """Detect malicious patterns in the request URL and user agent"""
         try:
-            # Check URL path
-            path = str(request.url.path).lower()
-            query = str(request.url.query).lower()
-            
-            # Check for suspicious patterns
-            for pattern in self.suspicious_patterns:
-                if pattern in path or pattern in query:
-                    return True
+            # Check URL path and query string
+            url = path.encode('utf-8', errors='ignore') + b"?" + query
+            if self.pattern_scanner.current.search(url) is not None:
+                return True
             
             # Check headers for suspicious content
-            user_agent = request.headers.get('User-Agent', '').lower()
-            for pattern in ['sqlmap', 'nikto', 'nmap', 'burp']:
-                if pattern in user_agent:
-                    return True
-            
-            # Check request body for POST requests
-            if request.method == "POST":
-                try:
-                    body = await request.body()
-                    if body:
-                        body_str = body.decode('utf-8', errors='ignore').lower()
-                        for pattern in self.suspicious_patterns:
-                            if pattern in body_str:
-                                return True
-                except Exception:
-                    pass  # Skip body check if there's an error
-            
-            return False
+            return self.user_agent_scanner.search(user_agent) is not None
             
         except Exception as e:
             logger.error(f"Error detecting malicious patterns: {e}")
             return False
     
-    def _add_security_headers(self, response):
-        """Add security headers to response"""
-        response.headers.update({
-            'X-Content-Type-Options': 'nosniff',
-            'X-Frame-Options': 'DENY',
-            'X-XSS-Protection': '1; mode=block',
-            'Strict-Transport-Security': 'max-age=31536000; includeSubDomains',
-            'Content-Security-Policy': "default-src 'self'; script-src 'self' 'unsafe-inline'; style-src 'self' 'unsafe-inline'",
-            'Referrer-Policy': 'strict-origin-when-cross-origin',
-            'Permissions-Policy': 'geolocation=(), microphone=(), camera=()'
-        })
-    
-    async def _redis_get(self, key: str) -> Optional[str]:
-        """Get value from Redis"""
-        try:
-            value = self.redis_client.get(key)
-            return value.decode('utf-8') if value else None
-        except Exception as e:
-            logger.error(f"Redis GET error: {e}")
-            return None
-    
-    async def _redis_get_int(self, key: str) -> int:
-        """Get integer value from Redis"""
-        try:
-            value = await self._redis_get(key)
-            return int(value) if value else 0
-        except Exception:
-            return 0
-    
     async def _redis_set(self, key: str, value: str, ttl: int):
-        """Set value in Redis with TTL"""
+        """Set value in Redis with TTL, unless the limiter has fallen back to memory"""
+        if not self.rate_limiter.redis_available:
+            return
         try:
-            self.redis_client.setex(key, ttl, value)
+            await self.redis_client.setex(key, ttl, value)
         except Exception as e:
             logger.error(f"Redis SET error: {e}")
     
-    async def _redis_incr(self, key: str, ttl: int):
-        """Increment Redis key and set TTL"""
-        try:
-            pipeline = self.redis_client.pipeline()
-            pipeline.incr(key)
-            pipeline.expire(key, ttl)
-            pipeline.execute()
-        except Exception as e:
-            logger.error(f"Redis INCR error: {e}")
-    
-    async def _redis_delete(self, key: str):
-        """Delete key from Redis"""
-        try:
-            self.redis_client.delete(key)
-        except Exception as e:
-            logger.error(f"Redis DELETE error: {e}")
-    
     async def _log_security_event(self, event: Dict):
         """Log security event for monitoring"""
         try:
@@ -4,7 +4,7 @@ Database models for GA4 Admin Automation System
 
 from datetime import datetime, timedelta
 from typing import Optional
-from sqlalchemy import Boolean, DateTime, Integer, String, Text, ForeignKey, Enum, JSON
+from sqlalchemy import Boolean, DateTime, Integer, String, Text, ForeignKey, Enum, JSON, UniqueConstraint, Index, text
 from sqlalchemy.dialects.postgresql import INET, JSONB
 from sqlalchemy import JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -413,6 +413,10 @@ class ServiceAccount(Base):
     last_used_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     key_version: Mapped[Optional[int]] = mapped_column(Integer, default=1)
     
+    # Access binding synchronization
+    binding_sync_watermark: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))  # Change history read up to here
+    binding_full_sync_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))  # Last re-list of every property
+    
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
@@ -542,6 +546,11 @@ class PermissionGrant(Base):
             self.extension_count < 3 and  # Max 3 extensions
             self.expires_at is not None
         )
+    
+    # Expiry sweeps and expiry notices filter approved grants by expiry date
+    __table_args__ = (
+        Index('idx_permission_grants_status_expires', 'status', 'expires_at'),
+    )
 
 
 class PasswordResetToken(Base):
@@ -632,10 +641,10 @@ class ClientAssignment(Base):
         self.deactivation_reason = None
         return True
     
-    # Add unique constraint to prevent duplicate assignments
+    # A user's clients (request authentication) and a client's users, usually active only
     __table_args__ = (
-        # Index for efficient lookups
-        # Note: SQLAlchemy will handle index creation
+        Index('idx_client_assignments_user_status', 'user_id', 'status'),
+        Index('idx_client_assignments_client_status', 'client_id', 'status'),
     )
 
 
@@ -666,6 +675,17 @@ class AuditLog(Base):
     actor: Mapped[Optional["User"]] = relationship("User", back_populates="audit_logs")
     permission_grant: Mapped[Optional["PermissionGrant"]] = relationship("PermissionGrant", back_populates="audit_logs")
     client_assignment: Mapped[Optional["ClientAssignment"]] = relationship("ClientAssignment")
+    
+    # Audit views are newest first, by date range, actor or resource type; system actions have no actor
+    __table_args__ = (
+        Index('idx_audit_logs_created_at', 'created_at'),
+        Index(
+            'idx_audit_logs_actor_created', 'actor_id', 'created_at',
+            postgresql_where=text('actor_id IS NOT NULL'),
+            sqlite_where=text('actor_id IS NOT NULL')
+        ),
+        Index('idx_audit_logs_resource_type_created', 'resource_type', 'created_at'),
+    )
 
 
 class ServiceAccountProperty(Base):
@@ -683,6 +703,7 @@ class ServiceAccountProperty(Base):
     discovered_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     last_validated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     validation_status: Mapped[str] = mapped_column(String(20), default='unknown')  # 'valid', 'invalid', 'unknown'
+    bindings_hash: Mapped[Optional[str]] = mapped_column(String(64))  # SHA-256 of the last synchronized access bindings
     
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -690,9 +711,10 @@ class ServiceAccountProperty(Base):
     # Relationships
     service_account: Mapped["ServiceAccount"] = relationship("ServiceAccount", back_populates="service_account_properties")
     
-    # Unique constraint
+    # Unique constraint; discovery upserts on it
     __table_args__ = (
-        # SQLAlchemy will handle unique constraint creation
+        UniqueConstraint('service_account_id', 'ga_property_id', name='uq_sa_properties_account_property'),
+        Index('idx_sa_properties_ga_property', 'ga_property_id'),
     )
 
 
@@ -705,7 +727,7 @@ class PropertyAccessBinding(Base):
     
     ga_property_id: Mapped[str] = mapped_column(String(50), nullable=False)
     user_email: Mapped[str] = mapped_column(String(255), nullable=False)
-    roles: Mapped[Optional[str]] = mapped_column(Text)  # JSON array of GA4 roles
+    roles: Mapped[Optional[list]] = mapped_column(JSON().with_variant(JSONB, 'postgresql'))  # Sorted GA4 role names
     binding_name: Mapped[Optional[str]] = mapped_column(String(500))  # Google's binding resource name
     
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
@@ -717,9 +739,10 @@ class PropertyAccessBinding(Base):
     # Relationships
     service_account: Mapped["ServiceAccount"] = relationship("ServiceAccount", back_populates="property_access_bindings")
     
-    # Unique constraint
+    # Unique constraint; one cached binding per user and property
     __table_args__ = (
-        # SQLAlchemy will handle unique constraint creation
+        UniqueConstraint('service_account_id', 'ga_property_id', 'user_email', name='uq_pab_account_property_email'),
+        Index('idx_pab_ga_property', 'ga_property_id'),
     )
 
 
@@ -941,6 +964,12 @@ class NotificationLog(Base):
     
     # Relationships
     audit_log: Mapped[Optional["AuditLog"]] = relationship("AuditLog")
+    
+    # Recent-notice lookups per recipient, and the retry queue and retention cleanup by status
+    __table_args__ = (
+        Index('idx_notification_logs_recipient_template_created', 'recipient', 'template_type', 'created_at'),
+        Index('idx_notification_logs_status_created', 'status', 'created_at'),
+    )
 
 
 class ReportDownloadLog(Base):
@@ -1187,4 +1216,110 @@ class UserSession(Base):
         self.is_active = False
         self.logged_out_at = datetime.utcnow()
         self.logout_reason = reason
-        return True
\ No newline at end of file
+        return True
+
+class RolePermission(Base):
+    """Role to permission mapping for the RBAC system"""
+    __tablename__ = "role_permissions"
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    role: Mapped[UserRole] = mapped_column(Enum(UserRole), nullable=False)
+    permission: Mapped[Permission] = mapped_column(Enum(Permission), nullable=False)
+    scope: Mapped[PermissionScope] = mapped_column(Enum(PermissionScope), default=PermissionScope.SYSTEM)
+    context: Mapped[PermissionContext] = mapped_column(Enum(PermissionContext), default=PermissionContext.ALL)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class UserRoleAssignment(Base):
+    """Additional role assignments beyond a user's primary role"""
+    __tablename__ = "user_role_assignments"
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
+    role: Mapped[UserRole] = mapped_column(Enum(UserRole), nullable=False)
+    client_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("clients.id"))  # NULL for system-wide roles
+    scope: Mapped[PermissionScope] = mapped_column(Enum(PermissionScope), default=PermissionScope.SYSTEM)
+    
+    # Lifecycle management
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    assigned_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    assigned_by_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
+    expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    
+    # Revocation tracking
+    revoked_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    revoked_by_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("users.id"))
+    revocation_reason: Mapped[Optional[str]] = mapped_column(Text)
+    
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Relationships
+    user: Mapped["User"] = relationship("User", back_populates="role_assignments", foreign_keys=[user_id])
+    client: Mapped[Optional["Client"]] = relationship("Client")
+    assigned_by: Mapped["User"] = relationship("User", foreign_keys=[assigned_by_id])
+    revoked_by: Mapped[Optional["User"]] = relationship("User", foreign_keys=[revoked_by_id])
+    
+    @property
+    def is_valid(self) -> bool:
+        """Check if the assignment is currently in effect"""
+        return (
+            self.is_active and
+            self.revoked_at is None and
+            (self.expires_at is None or self.expires_at.replace(tzinfo=None) > datetime.utcnow())
+        )
+    
+    def revoke_assignment(self, revoker_id: int, reason: str) -> bool:
+        """Revoke the role assignment"""
+        if not self.is_active:
+            return False
+        
+        self.is_active = False
+        self.revoked_at = datetime.utcnow()
+        self.revoked_by_id = revoker_id
+        self.revocation_reason = reason
+        return True
+
+
+class UserPermissionOverride(Base):
+    """Individual permission grants or denials that override role permissions"""
+    __tablename__ = "user_permission_overrides"
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
+    permission: Mapped[Permission] = mapped_column(Enum(Permission), nullable=False)
+    
+    # Override type
+    is_granted: Mapped[bool] = mapped_column(Boolean, nullable=False)  # True = grant, False = deny
+    scope: Mapped[PermissionScope] = mapped_column(Enum(PermissionScope), default=PermissionScope.SYSTEM)
+    context: Mapped[PermissionContext] = mapped_column(Enum(PermissionContext), default=PermissionContext.ALL)
+    
+    # Context-specific overrides
+    client_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("clients.id"))
+    resource_id: Mapped[Optional[str]] = mapped_column(String(100))
+    
+    # Lifecycle management
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    granted_by_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
+    granted_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    reason: Mapped[Optional[str]] = mapped_column(Text)
+    
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Relationships
+    user: Mapped["User"] = relationship("User", back_populates="permission_overrides", foreign_keys=[user_id])
+    client: Mapped[Optional["Client"]] = relationship("Client")
+    granted_by: Mapped["User"] = relationship("User", foreign_keys=[granted_by_id])
+    
+    @property
+    def is_valid(self) -> bool:
+        """Check if the override is currently in effect"""
+        return (
+            self.is_active and
+            (self.expires_at is None or self.expires_at.replace(tzinfo=None) > datetime.utcnow())
+        )
@@ -440,6 +440,17 @@ class PaginatedResponse(BaseModel, Generic[T]):
         return self.page > 1
 
 
+class CursorPage(BaseModel, Generic[T]):
+    """Keyset-paginated response schema; pass next_cursor back as ``cursor`` for the following page"""
+    items: List[T]
+    next_cursor: Optional[str] = None
+    size: int
+    
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+
 # GA4 Property schemas
 class GA4PropertyResponse(BaseSchema):
     """GA4 Property response schema"""
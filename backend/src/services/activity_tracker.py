@@ -0,0 +1,123 @@
+"""
+Coalesced user activity tracking
+
+Authenticated requests used to commit ``users.last_login_at`` one row at a time.
+Activity is now recorded in memory and flushed periodically as one batched
+UPDATE, so read endpoints no longer open write transactions.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..models.db_models import User
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityTracker:
+    """Buffers per-user last activity timestamps and writes them in batches"""
+
+    def __init__(
+        self,
+        flush_interval: float = settings.AUTH_ACTIVITY_FLUSH_INTERVAL_SECONDS,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal
+    ):
+        self.flush_interval = flush_interval
+        self.session_factory = session_factory
+        self._pending: Dict[int, datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        self.recorded = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.last_flush_time = 0.0
+
+    def record(self, user_id: int, at: Optional[datetime] = None) -> None:
+        """Record activity for a user; only the latest timestamp is kept"""
+        at = at or datetime.utcnow()
+        previous = self._pending.get(user_id)
+        if previous is None or at > previous:
+            self._pending[user_id] = at
+        self.recorded += 1
+
+    @property
+    def pending(self) -> int:
+        """Number of users with unflushed activity"""
+        return len(self._pending)
+
+    async def flush(self) -> int:
+        """Write all pending activity in a single transaction"""
+        if not self._pending:
+            return 0
+
+        batch, self._pending = self._pending, {}
+        started_at = time.perf_counter()
+
+        try:
+            async with self.session_factory() as session:
+                # Core executemany: users deleted since their last request simply match no row
+                users = User.__table__
+                await session.execute(
+                    update(users)
+                    .where(users.c.id == bindparam("user_id"))
+                    .values(last_login_at=bindparam("at")),
+                    [{"user_id": user_id, "at": at} for user_id, at in batch.items()]
+                )
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Failed to flush activity for {len(batch)} users: {e}")
+            # Keep the newest timestamps for the next attempt
+            for user_id, at in batch.items():
+                if user_id not in self._pending or at > self._pending[user_id]:
+                    self._pending[user_id] = at
+            return 0
+
+        self.flushes += 1
+        self.rows_written += len(batch)
+        self.last_flush_time = time.perf_counter() - started_at
+        return len(batch)
+
+    async def _run(self) -> None:
+        """Flush periodically until cancelled"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        """Start the periodic flush task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the periodic flush task and write what is left"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get tracker statistics for monitoring"""
+        return {
+            "flush_interval": self.flush_interval,
+            "pending": self.pending,
+            "recorded": self.recorded,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "last_flush_time": self.last_flush_time
+        }
+
+
+# Global activity tracker instance
+activity_tracker = ActivityTracker()
@@ -8,15 +8,18 @@ from typing import List, Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 
+from ..core.pagination import keyset_page
 from ..models.db_models import AuditLog
-from ..models.schemas import AuditLogResponse
+from ..models.schemas import AuditLogResponse, CursorPage
+from .audit_writer import AuditWriter, audit_writer
 
 
 class AuditService:
     """Audit logging service"""
     
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, writer: Optional[AuditWriter] = None):
         self.db = db
+        self.writer = writer or audit_writer
     
     async def log_action(
         self,
@@ -27,21 +30,35 @@ class AuditService:
         resource_id: Optional[str] = None,
         details: Optional[str] = None,
         ip_address: Optional[str] = None,
-        user_agent: Optional[str] = None
-    ) -> AuditLog:
-        """Log an action to the audit trail"""
+        user_agent: Optional[str] = None,
+        durable: bool = False
+    ) -> Optional[AuditLog]:
+        """
+        Log an action to the audit trail
         
-        audit_log = AuditLog(
-            actor_id=actor_id,
-            permission_grant_id=permission_grant_id,
-            action=action,
-            resource_type=resource_type,
-            resource_id=resource_id,
-            details=details,
-            ip_address=ip_address,
-            user_agent=user_agent
-        )
+        Entries are queued on the audit writer and inserted in batches while it
+        runs; None is returned since the row does not exist yet. Pass
+        ``durable=True`` for actions that must be committed before returning;
+        the entry is then written through this service's session and returned.
+        """
+        
+        entry = {
+            "actor_id": actor_id,
+            "permission_grant_id": permission_grant_id,
+            "action": action,
+            "resource_type": resource_type,
+            "resource_id": resource_id,
+            "details": details if details is None or isinstance(details, str) else json.dumps(details),
+            "ip_address": ip_address,
+            "user_agent": user_agent
+        }
         
+        if not durable and self.writer.running:
+            entry["created_at"] = datetime.utcnow()
+            await self.writer.submit(entry)
+            return None
+        
+        audit_log = AuditLog(**entry)
         self.db.add(audit_log)
         await self.db.commit()
         await self.db.refresh(audit_log)
@@ -55,8 +72,9 @@ class AuditService:
         actor_id: Optional[int] = None,
         details: Optional[Dict[str, Any]] = None,
         ip_address: Optional[str] = None,
-        user_agent: Optional[str] = None
-    ) -> AuditLog:
+        user_agent: Optional[str] = None,
+        durable: bool = False
+    ) -> Optional[AuditLog]:
         """Log a permission-related action"""
         
         details_json = json.dumps(details) if details else None
@@ -69,7 +87,8 @@ class AuditService:
             resource_id=str(permission_grant_id),
             details=details_json,
             ip_address=ip_address,
-            user_agent=user_agent
+            user_agent=user_agent,
+            durable=durable
         )
     
     async def log_user_action(
@@ -79,8 +98,9 @@ class AuditService:
         actor_id: Optional[int] = None,
         details: Optional[Dict[str, Any]] = None,
         ip_address: Optional[str] = None,
-        user_agent: Optional[str] = None
-    ) -> AuditLog:
+        user_agent: Optional[str] = None,
+        durable: bool = False
+    ) -> Optional[AuditLog]:
         """Log a user-related action"""
         
         details_json = json.dumps(details) if details else None
@@ -92,7 +112,8 @@ class AuditService:
             resource_id=str(user_id),
             details=details_json,
             ip_address=ip_address,
-            user_agent=user_agent
+            user_agent=user_agent,
+            durable=durable
         )
     
     async def log_authentication_action(
@@ -101,8 +122,9 @@ class AuditService:
         user_id: Optional[int] = None,
         details: Optional[Dict[str, Any]] = None,
         ip_address: Optional[str] = None,
-        user_agent: Optional[str] = None
-    ) -> AuditLog:
+        user_agent: Optional[str] = None,
+        durable: bool = False
+    ) -> Optional[AuditLog]:
         """Log an authentication-related action"""
         
         details_json = json.dumps(details) if details else None
@@ -114,7 +136,8 @@ class AuditService:
             resource_id=str(user_id) if user_id else None,
             details=details_json,
             ip_address=ip_address,
-            user_agent=user_agent
+            user_agent=user_agent,
+            durable=durable
         )
     
     async def get_audit_logs(
@@ -129,19 +152,9 @@ class AuditService:
     ) -> List[AuditLogResponse]:
         """Get audit logs with optional filters"""
         
-        query = select(AuditLog)
-        
-        if actor_id:
-            query = query.where(AuditLog.actor_id == actor_id)
-        if resource_type:
-            query = query.where(AuditLog.resource_type == resource_type)
-        if action:
-            query = query.where(AuditLog.action == action)
-        if start_date:
-            query = query.where(AuditLog.created_at >= start_date)
-        if end_date:
-            query = query.where(AuditLog.created_at <= end_date)
-        
+        query = self._filter_audit_logs(
+            select(AuditLog), actor_id, resource_type, action, start_date, end_date
+        )
         query = query.offset(skip).limit(limit).order_by(AuditLog.created_at.desc())
         
         result = await self.db.execute(query)
@@ -149,6 +162,31 @@ class AuditService:
         
         return [AuditLogResponse.model_validate(log) for log in logs]
     
+    async def get_audit_logs_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        actor_id: Optional[int] = None,
+        resource_type: Optional[str] = None,
+        action: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> CursorPage[AuditLogResponse]:
+        """Get a page of audit logs, newest first, continuing after ``cursor``"""
+        
+        query = self._filter_audit_logs(
+            select(AuditLog), actor_id, resource_type, action, start_date, end_date
+        )
+        logs, next_cursor = await keyset_page(
+            self.db, query, AuditLog.created_at, AuditLog.id, limit, cursor
+        )
+        
+        return CursorPage[AuditLogResponse](
+            items=[AuditLogResponse.model_validate(log) for log in logs],
+            next_cursor=next_cursor,
+            size=limit
+        )
+    
     async def get_recent_activity(
         self,
         limit: int = 10,
@@ -178,8 +216,23 @@ class AuditService:
     ) -> int:
         """Count audit logs with optional filters"""
         
-        query = select(func.count(AuditLog.id))
+        query = self._filter_audit_logs(
+            select(func.count(AuditLog.id)), actor_id, resource_type, action, start_date, end_date
+        )
         
+        result = await self.db.execute(query)
+        return result.scalar()
+    
+    @staticmethod
+    def _filter_audit_logs(
+        query,
+        actor_id: Optional[int],
+        resource_type: Optional[str],
+        action: Optional[str],
+        start_date: Optional[datetime],
+        end_date: Optional[datetime]
+    ):
+        """Apply the audit log list filters to a query"""
         if actor_id:
             query = query.where(AuditLog.actor_id == actor_id)
         if resource_type:
@@ -190,9 +243,7 @@ class AuditService:
             query = query.where(AuditLog.created_at >= start_date)
         if end_date:
             query = query.where(AuditLog.created_at <= end_date)
-        
-        result = await self.db.execute(query)
-        return result.scalar()
+        return query
     
     async def get_activity_summary(
         self,
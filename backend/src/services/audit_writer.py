@@ -0,0 +1,188 @@
+"""
+Buffered audit log writer
+
+Audit entries are queued in memory and written with one multi-row INSERT when
+the buffer reaches AUDIT_BATCH_SIZE or every AUDIT_FLUSH_INTERVAL_SECONDS,
+instead of one commit per entry. The buffer is flushed on shutdown; entries
+that must be persisted before a request returns bypass it (see AuditService).
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..models.db_models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+
+class AuditWriter:
+    """In-process audit queue flushed in batches by a background task"""
+
+    def __init__(
+        self,
+        batch_size: int = settings.AUDIT_BATCH_SIZE,
+        flush_interval: float = settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+        max_pending: int = settings.AUDIT_MAX_PENDING,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.session_factory = session_factory
+
+        self._pending: List[Dict[str, Any]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._stopping = False
+
+        self.submitted = 0
+        self.written = 0
+        self.batches = 0
+        self.failures = 0
+        self.dropped = 0
+        self.quarantined = 0
+        self.last_flush_time = 0.0
+
+    @property
+    def running(self) -> bool:
+        """Whether the background flush task is active"""
+        return self._task is not None and not self._task.done()
+
+    @property
+    def pending(self) -> int:
+        """Number of entries waiting to be written"""
+        return len(self._pending)
+
+    async def submit(self, entry: Dict[str, Any]) -> None:
+        """Queue an audit entry (column values of AuditLog)"""
+        self._pending.append(entry)
+        self.submitted += 1
+
+        if len(self._pending) >= self.max_pending:
+            # Writers outpace the database; apply backpressure to the caller
+            await self.flush()
+        elif len(self._pending) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """Write all pending entries in batches of batch_size"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+
+        written_before = self.written
+        async with self._flush_lock:
+            while self._pending:
+                batch = self._pending[:self.batch_size]
+                del self._pending[:self.batch_size]
+                retry = await self._write_batch(batch)
+                if retry:
+                    # The database is unavailable; keep the entries in order for the next flush
+                    self._pending[:0] = retry
+                    break
+
+            overflow = len(self._pending) - self.max_pending
+            if overflow > 0:
+                del self._pending[:overflow]
+                self.dropped += overflow
+                logger.error(f"Audit queue full; dropped {overflow} oldest entries")
+        return self.written - written_before
+
+    async def _write_batch(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Write a batch, falling back to one row at a time if it fails
+
+        Rows that still fail while others succeed are bad data (e.g. a foreign
+        key violation) and are quarantined so they cannot block the queue. If
+        every row fails the database is assumed down and the batch is returned
+        for a later retry.
+        """
+        if await self._write(batch):
+            return []
+        if len(batch) == 1:
+            return batch
+
+        failed = [entry for entry in batch if not await self._write([entry])]
+        if len(failed) == len(batch):
+            return batch
+
+        for entry in failed:
+            self.quarantined += 1
+            logger.error(f"Quarantined audit entry that could not be written: {entry!r}")
+        return []
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> bool:
+        """Insert a batch of entries in one transaction"""
+        started_at = time.perf_counter()
+        try:
+            async with self.session_factory() as session:
+                await session.execute(insert(AuditLog), batch)
+                await session.commit()
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Failed to write {len(batch)} audit entries: {e}")
+            return False
+
+        self.batches += 1
+        self.written += len(batch)
+        self.last_flush_time = time.perf_counter() - started_at
+        return True
+
+    async def _run(self) -> None:
+        """Flush on the size threshold or the flush interval, whichever comes first"""
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        """Start the background flush task"""
+        if not self.running:
+            self._stopping = False
+            self._wakeup = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task and write everything still queued"""
+        if self._task is not None:
+            # Let an in-flight flush finish rather than cancelling it mid-commit
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+            self._wakeup = None
+
+        await self.flush()
+        if self._pending:
+            logger.error(f"{len(self._pending)} audit entries could not be written on shutdown")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get writer statistics for monitoring"""
+        return {
+            "running": self.running,
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval,
+            "pending": self.pending,
+            "submitted": self.submitted,
+            "written": self.written,
+            "batches": self.batches,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "quarantined": self.quarantined,
+            "last_flush_time": self.last_flush_time
+        }
+
+
+# Global audit writer instance
+audit_writer = AuditWriter()
@@ -2,10 +2,10 @@
 Authentication service
 """
 
+import time
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, Tuple
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -16,9 +16,11 @@ from ..core.database import get_db
 from ..core.exceptions import AuthenticationError
 from ..models.db_models import User, UserStatus
 from ..models.schemas import UserLogin, Token
+from .password_hasher import crypt_context, password_hasher
+from .principal_cache import CLAIM_STATUS, CLAIM_CLIENT_IDS, load_client_ids
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing; blocking, the request path uses password_hasher instead
+pwd_context = crypt_context(settings.PASSWORD_HASH_ROUNDS)
 
 # Token security
 security = HTTPBearer()
@@ -88,6 +90,17 @@ class AuthService:
             logger.error(f"Database error querying for {email}: {e}")
             return None
     
+    async def _access_token_data(self, user: User) -> Dict[str, Any]:
+        """Claims for an access token, including those used for stateless authentication"""
+        return {
+            "sub": user.email,
+            "user_id": user.id,
+            "role": user.role.value,
+            CLAIM_STATUS: user.status.value,
+            CLAIM_CLIENT_IDS: list(await load_client_ids(self.db, user.id)),
+            "iat": int(time.time())
+        }
+    
     async def authenticate_user(self, login_data: UserLogin) -> Tuple[Token, User]:
         """Authenticate user and return tokens with user info"""
         import logging
@@ -102,7 +115,7 @@ class AuthService:
         
         logger.info(f"User found: {user.email}, status: {user.status}, role: {user.role}")
         
-        password_valid = self.verify_password(login_data.password, user.password_hash)
+        password_valid, new_hash = await password_hasher.verify_and_update(login_data.password, user.password_hash)
         logger.info(f"Password verification result: {password_valid}")
         
         if not password_valid:
@@ -114,12 +127,16 @@ class AuthService:
             logger.error(f"User status check failed: {user.status} != {UserStatus.ACTIVE}")
             raise AuthenticationError("Account is not active")
         
+        # Upgrade hashes made with old parameters now that the plain password is known
+        if new_hash:
+            user.password_hash = new_hash
+        
         # Update last login
         user.last_login_at = datetime.utcnow()
         await self.db.commit()
         
         # Create tokens
-        token_data = {"sub": user.email, "user_id": user.id, "role": user.role.value}
+        token_data = await self._access_token_data(user)
         access_token = self.create_access_token(token_data)
         refresh_token = self.create_refresh_token({"sub": user.email, "user_id": user.id})
         
@@ -152,7 +169,7 @@ class AuthService:
             raise AuthenticationError("Account is not active")
         
         # Create new tokens
-        token_data = {"sub": user.email, "user_id": user.id, "role": user.role.value}
+        token_data = await self._access_token_data(user)
         access_token = self.create_access_token(token_data)
         new_refresh_token = self.create_refresh_token({"sub": user.email, "user_id": user.id})
         
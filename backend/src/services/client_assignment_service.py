@@ -18,6 +18,7 @@ from ..models.schemas import (
     ClientAssignmentResponse, AccessControlSummary
 )
 from ..core.exceptions import PermissionDeniedError, NotFoundError, ValidationError
+from .principal_cache import principal_cache
 
 
 class ClientAssignmentService:
@@ -59,6 +60,7 @@ class ClientAssignmentService:
         self.db.add(assignment)
         await self.db.commit()
         await self.db.refresh(assignment)
+        await principal_cache.revoke(user.id, user.email)
         
         # Load relationships
         await self._load_assignment_relationships(assignment)
@@ -118,6 +120,8 @@ class ClientAssignmentService:
         if assignments:
             self.db.add_all(assignments)
             await self.db.commit()
+            for user in users:
+                await principal_cache.revoke(user.id, user.email)
             
             # Load relationships and convert to response objects
             for assignment in assignments:
@@ -165,6 +169,7 @@ class ClientAssignmentService:
             assignment.updated_at = datetime.utcnow()
             await self.db.commit()
             await self.db.refresh(assignment)
+            await principal_cache.revoke(assignment.user_id)
             
             # Load relationships
             await self._load_assignment_relationships(assignment)
@@ -192,12 +197,14 @@ class ClientAssignmentService:
         
         # Load relationships for audit log
         await self._load_assignment_relationships(assignment)
+        user_id = assignment.user_id
         user_email = assignment.user.email
         client_name = assignment.client.name
         
         # Delete assignment
         await self.db.delete(assignment)
         await self.db.commit()
+        await principal_cache.revoke(user_id, user_email)
         
         # Create audit log
         await self._create_audit_log(
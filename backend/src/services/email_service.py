@@ -8,13 +8,12 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-import smtplib
-import aiosmtplib
 from jinja2 import Environment, DictLoader
 
 from ..core.config import settings
 from ..core.exceptions import EmailError
 from ..models.db_models import User, PermissionGrant, PermissionLevel, PermissionStatus
+from .smtp_pool import smtp_pool
 
 logger = logging.getLogger(__name__)
 
@@ -188,12 +187,6 @@ class EmailService:
     
     def __init__(self):
         self.template_env = Environment(loader=DictLoader(EMAIL_TEMPLATES))
-        self.smtp_host = settings.SMTP_HOST
-        self.smtp_port = settings.SMTP_PORT
-        self.smtp_user = settings.SMTP_USER
-        self.smtp_password = settings.SMTP_PASSWORD
-        self.smtp_tls = settings.SMTP_TLS
-        self.smtp_ssl = settings.SMTP_SSL
         self.from_email = settings.EMAIL_FROM
         self.from_name = settings.EMAIL_FROM_NAME
     
@@ -204,7 +197,7 @@ class EmailService:
         html_content: str,
         text_content: Optional[str] = None
     ) -> bool:
-        """Send email using aiosmtplib"""
+        """Send email through the shared SMTP pool"""
         try:
             # Create message
             message = MIMEMultipart("alternative")
@@ -223,15 +216,7 @@ class EmailService:
             
             # Send email
             if settings.ENABLE_EMAIL_NOTIFICATIONS:
-                await aiosmtplib.send(
-                    message,
-                    hostname=self.smtp_host,
-                    port=self.smtp_port,
-                    username=self.smtp_user,
-                    password=self.smtp_password,
-                    use_tls=self.smtp_tls,
-                    start_tls=True if self.smtp_tls else False
-                )
+                await smtp_pool.send(message)
                 logger.info(f"Email sent successfully to {to_email}")
             else:
                 logger.info(f"Email notifications disabled. Would send to {to_email}: {subject}")
@@ -5,7 +5,6 @@ Enhanced Authentication Service with Session Management and Security Features
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, Tuple
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -18,21 +17,18 @@ import re
 
 from ..core.config import settings
 from ..core.database import get_db
-from ..core.exceptions import AuthenticationError, ValidationError, SecurityError
+from ..core.exceptions import AuthenticationError, ValidationError, SecurityError, ServiceUnavailableError
 from ..models.db_models import (
     User, UserRole, UserStatus, RegistrationStatus, UserSession, 
     UserActivityLog, ActivityType
 )
 from ..models.schemas import UserLogin, Token, UserResponse
+from .password_hasher import crypt_context, password_hasher
 
 logger = logging.getLogger(__name__)
 
-# Enhanced password hashing with higher rounds
-pwd_context = CryptContext(
-    schemes=["bcrypt"], 
-    deprecated="auto",
-    bcrypt__rounds=12  # Higher security rounds
-)
+# Password hashing (PASSWORD_HASH_ROUNDS); blocking, the request path uses password_hasher instead
+pwd_context = crypt_context(settings.PASSWORD_HASH_ROUNDS)
 
 # Token security
 security = HTTPBearer()
@@ -242,7 +238,8 @@ class EnhancedAuthService:
                 raise AuthenticationError("Invalid email or password")
             
             # Verify password
-            if not self.verify_password(login_data.password, user.password_hash):
+            password_valid, new_hash = await password_hasher.verify_and_update(login_data.password, user.password_hash)
+            if not password_valid:
                 await self._log_failed_login(user.id, login_data.email, "invalid_password", ip_address, user_agent)
                 raise AuthenticationError("Invalid email or password")
             
@@ -280,6 +277,10 @@ class EnhancedAuthService:
                 device_fingerprint=device_fingerprint
             )
             
+            # Upgrade hashes made with old parameters now that the plain password is known
+            if new_hash:
+                user.password_hash = new_hash
+            
             # Update last login
             user.last_login_at = datetime.utcnow()
             
@@ -620,7 +621,7 @@ class EnhancedAuthService:
                 raise AuthenticationError("User not found")
             
             # Verify current password
-            if not self.verify_password(current_password, user.password_hash):
+            if not await password_hasher.verify(current_password, user.password_hash):
                 raise AuthenticationError("Current password is incorrect")
             
             # Validate new password
@@ -629,11 +630,11 @@ class EnhancedAuthService:
                 raise ValidationError(f"Password validation failed: {'; '.join(errors)}")
             
             # Check if new password is different from current
-            if self.verify_password(new_password, user.password_hash):
+            if await password_hasher.verify(new_password, user.password_hash):
                 raise ValidationError("New password must be different from current password")
             
             # Update password
-            user.password_hash = self.hash_password(new_password)
+            user.password_hash = await password_hasher.hash(new_password)
             user.updated_at = datetime.utcnow()
             
             # Terminate all existing sessions except current one
@@ -651,7 +652,7 @@ class EnhancedAuthService:
             await self.db.commit()
             return True
             
-        except (AuthenticationError, ValidationError):
+        except (AuthenticationError, ValidationError, ServiceUnavailableError):
             raise
         except Exception as e:
             logger.error(f"Password change error: {e}")
@@ -0,0 +1,299 @@
+"""
+Execution layer for Google Analytics Admin API calls
+
+The googleapiclient library is synchronous: ``request.execute()`` blocks for the
+full HTTP round-trip to Google. Every GA4 Admin call is routed through this
+executor so the blocking work runs on a bounded thread pool instead of the
+event loop, with a per-call timeout, a concurrency limit and basic metrics.
+Calls are admitted by the quota scheduler first and retried with jittered
+backoff when Google answers 429 or 5xx.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional
+
+from googleapiclient.errors import HttpError
+
+from ..core.config import settings
+from ..core.exceptions import GoogleAPIError
+from .ga4_quota_scheduler import GA4Priority, GA4QuotaScheduler, ga4_quota_scheduler
+
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+logger = logging.getLogger(__name__)
+
+
+class GA4ApiExecutor:
+    """Bounded thread pool executor for blocking GA4 Admin API requests"""
+
+    def __init__(
+        self,
+        max_workers: int = settings.GA4_API_MAX_WORKERS,
+        max_concurrency: int = settings.GA4_API_MAX_CONCURRENCY,
+        default_timeout: float = settings.GA4_API_TIMEOUT_SECONDS,
+        quota_scheduler: GA4QuotaScheduler = ga4_quota_scheduler,
+        max_retries: int = settings.GA4_API_MAX_RETRIES,
+        retry_base: float = settings.GA4_API_RETRY_BASE_SECONDS,
+        retry_max: float = settings.GA4_API_RETRY_MAX_SECONDS
+    ):
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency
+        self.default_timeout = default_timeout
+        self.quota_scheduler = quota_scheduler
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.peak_in_flight = 0
+        self.operation_metrics: Dict[str, Dict[str, Any]] = {}
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        """Create the worker pool on first use"""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="ga4-api"
+            )
+        return self._pool
+
+    def _get_semaphore(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        """Get the admission semaphore bound to the running event loop"""
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def execute(
+        self,
+        request: Any,
+        operation: str,
+        timeout: Optional[float] = None,
+        project: Optional[str] = None,
+        property_id: Optional[str] = None,
+        priority: Optional[GA4Priority] = None
+    ) -> Dict[str, Any]:
+        """
+        Execute a googleapiclient request off the event loop
+
+        Args:
+            request: googleapiclient ``HttpRequest`` (anything with ``execute()``)
+            operation: Operation name used for metrics, e.g. ``userLinks.list``
+            timeout: Per-call timeout in seconds (defaults to the executor timeout)
+            project: Google Cloud project whose quota the call is charged to
+            property_id: GA4 property the call targets, if any
+            priority: Admission priority (defaults to the context's, see ``ga4_priority``)
+
+        Raises:
+            GoogleAPIError: If the call does not complete within the timeout.
+            HttpError: Propagated unchanged from the underlying request once
+                retries are exhausted or for non-retryable statuses.
+        """
+        return await self.run(
+            request.execute, operation,
+            timeout=timeout, project=project, property_id=property_id, priority=priority
+        )
+
+    async def run(
+        self,
+        func: Callable[..., Any],
+        operation: str,
+        *args: Any,
+        timeout: Optional[float] = None,
+        project: Optional[str] = None,
+        property_id: Optional[str] = None,
+        priority: Optional[GA4Priority] = None,
+        throttle: bool = True
+    ) -> Any:
+        """
+        Run an arbitrary blocking callable through the executor
+
+        ``throttle=False`` skips quota admission and retries, for calls that are
+        not charged to the Admin API quota such as OAuth token refreshes.
+        """
+        attempt = 0
+        while True:
+            if throttle:
+                await self.quota_scheduler.acquire(project, property_id, priority)
+            try:
+                return await self._run_once(func, operation, args, timeout)
+            except HttpError as e:
+                status = int(getattr(e.resp, "status", 0) or 0)
+                if not throttle or status not in RETRYABLE_STATUSES or attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay(attempt, e)
+                if status == 429:
+                    self.quota_scheduler.pause(project, property_id, delay)
+                self._record_retry(operation)
+                logger.warning(
+                    f"GA4 API call {operation} got HTTP {status}, retry {attempt + 1}/{self.max_retries} in {delay:.2f}s"
+                )
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    def _retry_delay(self, attempt: int, error: HttpError) -> float:
+        """Retry-After when Google sends one, otherwise exponential backoff with jitter"""
+        retry_after = error.resp.get("retry-after") if hasattr(error.resp, "get") else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.retry_max)
+            except ValueError:
+                pass
+        backoff = min(self.retry_max, self.retry_base * 2 ** attempt)
+        return backoff / 2 + random.uniform(0, backoff / 2)
+
+    async def _run_once(
+        self,
+        func: Callable[..., Any],
+        operation: str,
+        args: tuple,
+        timeout: Optional[float]
+    ) -> Any:
+        """Run one attempt of a call on the worker pool"""
+        call_timeout = timeout if timeout is not None else self.default_timeout
+        loop = asyncio.get_running_loop()
+        semaphore = self._get_semaphore(loop)
+
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        started_at = time.perf_counter()
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        outcome = "success"
+
+        try:
+            thread_future = self._get_pool().submit(func, *args)
+        except BaseException:
+            self._release(semaphore)
+            raise
+
+        # A timed-out call keeps running on its worker thread, so the permit is
+        # returned only once the thread is done, not when the caller gives up.
+        thread_future.add_done_callback(
+            lambda _: self._release_threadsafe(loop, semaphore)
+        )
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(thread_future), timeout=call_timeout)
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            logger.error(f"GA4 API call {operation} timed out after {call_timeout}s")
+            raise GoogleAPIError(
+                f"GA4 API call {operation} timed out after {call_timeout}s",
+                details={"operation": operation, "timeout": call_timeout}
+            )
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            self._record_metric(
+                operation,
+                outcome,
+                queue_time=started_at - queued_at,
+                run_time=time.perf_counter() - started_at
+            )
+
+    def _release(self, semaphore: asyncio.Semaphore):
+        """Return a permit taken in run()"""
+        self.in_flight -= 1
+        semaphore.release()
+
+    def _release_threadsafe(self, loop: asyncio.AbstractEventLoop, semaphore: asyncio.Semaphore):
+        """Return a permit from the worker thread that finished the call"""
+        try:
+            loop.call_soon_threadsafe(self._release, semaphore)
+        except RuntimeError:
+            # The loop is already closed; nobody is left waiting on the permit
+            pass
+
+    def _operation(self, operation: str) -> Dict[str, Any]:
+        return self.operation_metrics.setdefault(operation, {
+            "calls": 0,
+            "errors": 0,
+            "timeouts": 0,
+            "retries": 0,
+            "latencies": deque(maxlen=100),  # Last 100 measurements
+            "max_queue_time": 0.0
+        })
+
+    def _record_retry(self, operation: str):
+        """Count a retried attempt of an operation"""
+        self._operation(operation)["retries"] += 1
+
+    def _record_metric(self, operation: str, outcome: str, queue_time: float, run_time: float):
+        """Record call outcome and latency for an operation"""
+
+        metrics = self._operation(operation)
+
+        metrics["calls"] += 1
+        if outcome == "error":
+            metrics["errors"] += 1
+        elif outcome == "timeout":
+            metrics["timeouts"] += 1
+        metrics["max_queue_time"] = max(metrics["max_queue_time"], queue_time)
+
+        latencies: Deque[float] = metrics["latencies"]
+        latencies.append(run_time)
+
+        if run_time > 5.0:
+            logger.warning(f"Slow GA4 API call {operation}: {run_time:.3f}s")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get executor statistics for monitoring"""
+
+        operations = {}
+        for operation, metrics in self.operation_metrics.items():
+            latencies = sorted(metrics["latencies"])
+            operations[operation] = {
+                "calls": metrics["calls"],
+                "errors": metrics["errors"],
+                "timeouts": metrics["timeouts"],
+                "retries": metrics["retries"],
+                "max_queue_time": metrics["max_queue_time"],
+                "avg_time": sum(latencies) / len(latencies) if latencies else 0.0,
+                "p99_time": latencies[int(len(latencies) * 0.99)] if latencies else 0.0,
+                "max_time": latencies[-1] if latencies else 0.0
+            }
+
+        return {
+            "max_workers": self.max_workers,
+            "max_concurrency": self.max_concurrency,
+            "default_timeout": self.default_timeout,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "peak_in_flight": self.peak_in_flight,
+            "max_retries": self.max_retries,
+            "quota": self.quota_scheduler.get_stats(),
+            "operations": operations
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Shut down the worker pool"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+        self._semaphore = None
+        self._semaphore_loop = None
+
+
+# Global executor instance
+ga4_api_executor = GA4ApiExecutor()
+
+
+def get_ga4_executor_stats() -> Dict[str, Any]:
+    """Get GA4 API executor statistics"""
+    return ga4_api_executor.get_stats()
@@ -0,0 +1,184 @@
+"""
+Registry of long-lived GA4 Admin API clients
+
+Building a ``GoogleAnalyticsService`` loads credentials and builds the Admin API
+resource from its discovery document, and a fresh client has no access token,
+so its first call also fetches one from Google. Routers and services used to pay
+for all of that on every request. The registry keeps one client per service
+account key, refreshes access tokens on the GA4 executor before they expire so
+requests never wait on the token endpoint, and drops clients that go unused.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from google.auth.transport.requests import Request
+
+from ..core.config import settings
+from ..core.exceptions import GoogleAPIError
+from ..models.db_models import ServiceAccount
+from .ga4_api_executor import ga4_api_executor
+from .google_api_service import GoogleAnalyticsService
+
+logger = logging.getLogger(__name__)
+
+# Key of the client for settings.GOOGLE_SERVICE_ACCOUNT_FILE
+DEFAULT_CLIENT = "default"
+
+
+def load_service_account_key(secret_name: str) -> Dict[str, Any]:
+    """Read a managed service account key from GOOGLE_SERVICE_ACCOUNT_KEYS_DIR"""
+    if not settings.GOOGLE_SERVICE_ACCOUNT_KEYS_DIR:
+        raise GoogleAPIError(f"No key store configured for service account secret {secret_name}")
+
+    path = os.path.join(settings.GOOGLE_SERVICE_ACCOUNT_KEYS_DIR, f"{os.path.basename(secret_name)}.json")
+    try:
+        with open(path) as key_file:
+            return json.load(key_file)
+    except (OSError, ValueError) as e:
+        raise GoogleAPIError(f"Failed to load service account secret {secret_name}: {e}")
+
+
+@dataclass
+class _RegistryEntry:
+    service: GoogleAnalyticsService
+    last_used: float
+    refresh_task: Optional[asyncio.Task] = None
+
+
+class GA4ClientRegistry:
+    """Long-lived GA4 Admin clients keyed by service account"""
+
+    def __init__(
+        self,
+        max_clients: int = settings.GA4_CLIENT_MAX_CLIENTS,
+        idle_timeout: float = settings.GA4_CLIENT_IDLE_TIMEOUT_SECONDS,
+        refresh_margin: float = settings.GA4_CLIENT_TOKEN_REFRESH_MARGIN_SECONDS,
+        key_loader: Callable[[str], Dict[str, Any]] = load_service_account_key
+    ):
+        self.max_clients = max_clients
+        self.idle_timeout = idle_timeout
+        self.refresh_margin = refresh_margin
+        self.key_loader = key_loader
+        self._entries: "OrderedDict[str, _RegistryEntry]" = OrderedDict()
+
+        self.hits = 0
+        self.builds = 0
+        self.evictions = 0
+        self.token_refreshes = 0
+        self.token_refresh_errors = 0
+
+    def get(self, service_account: Optional[ServiceAccount] = None) -> GoogleAnalyticsService:
+        """
+        Get the client for a service account, or for GOOGLE_SERVICE_ACCOUNT_FILE
+
+        Raises:
+            GoogleAPIError: If the service account's key cannot be loaded.
+        """
+        if service_account is None:
+            return self._get(DEFAULT_CLIENT, GoogleAnalyticsService)
+
+        # A rotated key gets a new client; the old one is evicted once idle
+        key = f"{service_account.secret_name}:v{service_account.key_version or 1}"
+        return self._get(
+            key,
+            lambda: GoogleAnalyticsService.from_service_account_info(self.key_loader(service_account.secret_name))
+        )
+
+    def _get(self, key: str, factory: Callable[[], GoogleAnalyticsService]) -> GoogleAnalyticsService:
+        now = time.monotonic()
+        self._evict_idle(now)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        else:
+            service = factory()
+            if service.credentials is None:
+                # Nothing configured: hand out the uninitialized client without keeping it
+                return service
+            self.builds += 1
+            entry = _RegistryEntry(service, now)
+            self._entries[key] = entry
+            while len(self._entries) > self.max_clients:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        entry.last_used = now
+        self._refresh_ahead(key, entry)
+        return entry.service
+
+    def _evict_idle(self, now: float) -> None:
+        # Entries are in least recently used order
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if now - entry.last_used < self.idle_timeout:
+                break
+            del self._entries[key]
+            self.evictions += 1
+
+    def _refresh_ahead(self, key: str, entry: _RegistryEntry) -> None:
+        """Start a background token refresh if the access token is about to expire"""
+        credentials = entry.service.credentials
+        if entry.refresh_task is not None and not entry.refresh_task.done():
+            return
+        # The first token is fetched by the transport on the first call, off the loop
+        if not credentials.token or credentials.expiry is None:
+            return
+        if (credentials.expiry - datetime.utcnow()).total_seconds() > self.refresh_margin:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop to refresh on; the transport refreshes on its next call
+            return
+        entry.refresh_task = loop.create_task(self._refresh_token(key, credentials))
+
+    async def _refresh_token(self, key: str, credentials) -> None:
+        try:
+            await ga4_api_executor.run(credentials.refresh, "oauth.refresh", Request(), throttle=False)
+            self.token_refreshes += 1
+        except Exception as e:
+            # The transport retries the refresh itself if the token really expires
+            self.token_refresh_errors += 1
+            logger.warning(f"Failed to refresh GA4 access token for {key}: {e}")
+
+    def evict(self, service_account: Optional[ServiceAccount] = None) -> None:
+        """Drop the client of a service account, e.g. after its key was revoked"""
+        if service_account is None:
+            prefix = DEFAULT_CLIENT
+        else:
+            prefix = f"{service_account.secret_name}:v"
+        for key in [key for key in self._entries if key == prefix or key.startswith(prefix)]:
+            del self._entries[key]
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all clients"""
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get registry statistics for monitoring"""
+        return {
+            "clients": len(self._entries),
+            "max_clients": self.max_clients,
+            "hits": self.hits,
+            "builds": self.builds,
+            "evictions": self.evictions,
+            "token_refreshes": self.token_refreshes,
+            "token_refresh_errors": self.token_refresh_errors
+        }
+
+
+# Global registry instance
+ga4_client_registry = GA4ClientRegistry()
+
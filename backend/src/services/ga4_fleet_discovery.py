@@ -0,0 +1,198 @@
+"""
+Fleet-wide GA4 property discovery
+
+Discovers the properties of every active service account concurrently. Each
+service account costs one paginated ``accountSummaries.list`` walk instead of
+``accounts.list`` followed by ``properties.list`` per account. Admin API calls
+are bounded globally and per Google Cloud project (quotas are per project), and
+a single writer persists each account's properties as soon as they arrive, so
+database work overlaps with the API calls still in flight.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..models.db_models import ServiceAccount
+from .audit_service import AuditService
+from .ga4_client_registry import ga4_client_registry
+from .ga4_property_discovery_service import GA4PropertyDiscoveryService
+from .ga4_quota_scheduler import GA4Priority, ga4_priority
+from .google_api_service import GoogleAnalyticsService
+
+logger = logging.getLogger(__name__)
+
+# (service account, discovered properties, error)
+_DiscoveryResult = Tuple[ServiceAccount, Optional[List[Dict[str, Any]]], Optional[Exception]]
+
+
+def project_key(service_account: ServiceAccount) -> str:
+    """Google Cloud project a service account's API quota is charged to"""
+    if service_account.project_id:
+        return service_account.project_id
+    # <name>@<project>.iam.gserviceaccount.com
+    return service_account.email.split("@")[-1].split(".")[0]
+
+
+class GA4FleetDiscovery:
+    """Discovers GA4 properties for all active service accounts with bounded fan-out"""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+        client_factory: Callable[[ServiceAccount], GoogleAnalyticsService] = ga4_client_registry.get,
+        max_concurrency: int = settings.GA4_DISCOVERY_MAX_CONCURRENCY,
+        per_project_concurrency: int = settings.GA4_DISCOVERY_PER_PROJECT_CONCURRENCY,
+        page_size: int = settings.GA4_DISCOVERY_PAGE_SIZE
+    ):
+        self.session_factory = session_factory
+        self.client_factory = client_factory
+        self.max_concurrency = max_concurrency
+        self.per_project_concurrency = per_project_concurrency
+        self.page_size = page_size
+
+    async def run(self) -> Dict[str, Any]:
+        """Discover and store the properties of every active service account"""
+        started = time.perf_counter()
+
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(ServiceAccount).where(ServiceAccount.is_active == True).order_by(ServiceAccount.id)
+            )
+            service_accounts = result.scalars().all()
+
+        report = {
+            "service_accounts": len(service_accounts),
+            "succeeded": 0,
+            "failed": 0,
+            "properties": 0,
+            "errors": [],
+            "discovered_at": datetime.utcnow().isoformat()
+        }
+
+        results: "asyncio.Queue[Optional[_DiscoveryResult]]" = asyncio.Queue()
+        writer = asyncio.create_task(self._write_results(results, report))
+
+        global_limit = asyncio.Semaphore(self.max_concurrency)
+        project_limits: Dict[str, asyncio.Semaphore] = {}
+        try:
+            # Bulk discovery yields Admin API quota to interactive grants
+            with ga4_priority(GA4Priority.SYNC):
+                await asyncio.gather(*(
+                    self._discover(service_account, global_limit, project_limits, results)
+                    for service_account in service_accounts
+                ))
+        finally:
+            await results.put(None)
+            await writer
+
+        report["elapsed_seconds"] = time.perf_counter() - started
+        logger.info(
+            f"Discovered {report['properties']} GA4 properties for {report['succeeded']}/"
+            f"{report['service_accounts']} service accounts in {report['elapsed_seconds']:.1f}s"
+        )
+        return report
+
+    async def _discover(
+        self,
+        service_account: ServiceAccount,
+        global_limit: asyncio.Semaphore,
+        project_limits: Dict[str, asyncio.Semaphore],
+        results: "asyncio.Queue[Optional[_DiscoveryResult]]"
+    ) -> None:
+        """List one service account's properties and hand them to the writer"""
+        project_limit = project_limits.setdefault(
+            project_key(service_account), asyncio.Semaphore(self.per_project_concurrency)
+        )
+        # Take the project slot first so a saturated project does not hold global slots
+        async with project_limit, global_limit:
+            try:
+                ga_service = self.client_factory(service_account)
+                properties = await ga_service.list_account_summaries(page_size=self.page_size)
+            except Exception as e:
+                logger.warning(f"GA4 property discovery failed for {service_account.email}: {e}")
+                await results.put((service_account, None, e))
+                return
+
+        await results.put((service_account, properties, None))
+
+    async def _write_results(
+        self,
+        results: "asyncio.Queue[Optional[_DiscoveryResult]]",
+        report: Dict[str, Any]
+    ) -> None:
+        """Persist discovery results as they arrive, one transaction per drained batch"""
+        async with self.session_factory() as db:
+            discovery_service = GA4PropertyDiscoveryService(db, None, AuditService(db))
+            finished = False
+
+            while not finished:
+                batch = [await results.get()]
+                while not results.empty():
+                    batch.append(results.get_nowait())
+
+                for item in batch:
+                    if item is None:
+                        finished = True
+                        continue
+                    await self._write_result(db, discovery_service, item, report)
+
+                await db.commit()
+
+            await AuditService(db).log_action(
+                action="discover_ga4_properties_fleet",
+                resource_type="service_account",
+                details=(
+                    f"Discovered {report['properties']} properties for {report['succeeded']} of "
+                    f"{report['service_accounts']} service accounts ({report['failed']} failed)"
+                )
+            )
+
+    async def _write_result(
+        self,
+        db: AsyncSession,
+        discovery_service: GA4PropertyDiscoveryService,
+        item: _DiscoveryResult,
+        report: Dict[str, Any]
+    ) -> None:
+        service_account, properties, error = item
+        now = datetime.utcnow()
+
+        if error is None:
+            try:
+                async with db.begin_nested():
+                    await discovery_service._update_service_account_properties(service_account.id, properties)
+            except Exception as e:
+                error = e
+            else:
+                report["succeeded"] += 1
+                report["properties"] += len(properties)
+
+        if error is not None:
+            report["failed"] += 1
+            report["errors"].append({
+                "service_account_id": service_account.id,
+                "email": service_account.email,
+                "error": str(error)
+            })
+
+        await db.execute(
+            update(ServiceAccount)
+            .where(ServiceAccount.id == service_account.id)
+            .values(
+                health_status='healthy' if error is None else 'unhealthy',
+                health_checked_at=now,
+                **({"last_used_at": now} if error is None else {})
+            )
+        )
+
+
+# Global fleet discovery instance
+ga4_fleet_discovery = GA4FleetDiscovery()
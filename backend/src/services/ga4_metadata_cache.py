@@ -0,0 +1,222 @@
+"""
+Read-through cache for GA4 Admin API metadata
+
+The GA4 read endpoints used to call Google on every hit, so a dozen admins
+opening the same property page made a dozen identical upstream calls. Entries
+are fresh for GA4_CACHE_FRESH_SECONDS and are then served stale for up to
+GA4_CACHE_STALE_SECONDS while a single background load refreshes them.
+Concurrent misses for the same key share one upstream call, Google errors are
+cached briefly so a failing property is not hammered, and our own grant and
+revoke writes invalidate the property they touched.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from ..core.config import settings
+from ..core.exceptions import GoogleAPIError
+
+logger = logging.getLogger(__name__)
+
+# (service account email, kind of read, resource id)
+CacheKey = Tuple[Optional[str], str, Optional[str]]
+
+
+def resource_id(name: Optional[str]) -> Optional[str]:
+    """'properties/123' and '123' address the same entries"""
+    return name.split('/')[-1] if name else None
+
+
+def cache_key(ga_service, kind: str, resource: Optional[str] = None) -> CacheKey:
+    """Key of a read made through a client; clients of different service accounts see different data"""
+    return (getattr(ga_service.credentials, 'service_account_email', None), kind, resource_id(resource))
+
+
+@dataclass
+class _Entry:
+    value: Any
+    error: Optional[GoogleAPIError]
+    fetched_at: float
+
+
+class GA4MetadataCache:
+    """Bounded LRU of GA4 reads with single-flight loads and stale-while-revalidate"""
+
+    def __init__(
+        self,
+        fresh_seconds: float = settings.GA4_CACHE_FRESH_SECONDS,
+        stale_seconds: float = settings.GA4_CACHE_STALE_SECONDS,
+        negative_seconds: float = settings.GA4_CACHE_NEGATIVE_SECONDS,
+        max_entries: int = settings.GA4_CACHE_MAX_ENTRIES,
+        enabled: bool = settings.GA4_CACHE_ENABLED
+    ):
+        self.fresh_seconds = fresh_seconds
+        self.stale_seconds = stale_seconds
+        self.negative_seconds = negative_seconds
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self._loads: Dict[CacheKey, asyncio.Task] = {}
+        self._generations: Dict[Optional[str], int] = {}
+        self._clear_generation = 0
+
+        self.requests = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.upstream_calls = 0
+        self.upstream_errors = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    async def get(self, key: CacheKey, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Get a cached read, loading it with ``loader`` when missing or expired
+
+        Raises:
+            GoogleAPIError: The load failed, now or within GA4_CACHE_NEGATIVE_SECONDS
+        """
+        if not self.enabled:
+            self.upstream_calls += 1
+            return await loader()
+
+        self.requests += 1
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.fetched_at
+            if entry.error is not None:
+                if age < self.negative_seconds:
+                    self.negative_hits += 1
+                    raise entry.error.with_traceback(None)
+            elif age < self.fresh_seconds:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry.value
+            elif age < self.fresh_seconds + self.stale_seconds:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                if key not in self._loads:
+                    self.refreshes += 1
+                    self._start_load(key, loader)
+                return entry.value
+
+        load = self._loads.get(key)
+        if load is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            load = self._start_load(key, loader)
+        # A cancelled request must not cancel the load other requests are waiting on
+        return await asyncio.shield(load)
+
+    def _start_load(self, key: CacheKey, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        load = asyncio.get_running_loop().create_task(self._load(key, loader))
+        self._loads[key] = load
+        load.add_done_callback(lambda task: self._load_done(key, task))
+        return load
+
+    def _load_done(self, key: CacheKey, task: asyncio.Task) -> None:
+        if self._loads.get(key) is task:
+            del self._loads[key]
+        if not task.cancelled():
+            # Background refreshes have no waiter to retrieve their error
+            task.exception()
+
+    async def _load(self, key: CacheKey, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Call Google once and store the result unless the resource was invalidated meanwhile"""
+        generation = self._generation(key)
+        self.upstream_calls += 1
+        try:
+            value = await loader()
+        except GoogleAPIError as e:
+            self.upstream_errors += 1
+            logger.debug(f"GA4 metadata load failed for {key}: {e.message}")
+            if self._generation(key) == generation and not self._servable(self._entries.get(key)):
+                # Keep serving stale data through an outage; otherwise remember the failure briefly
+                self._store(key, _Entry(None, e, time.monotonic()))
+            raise
+
+        if self._generation(key) == generation:
+            self._store(key, _Entry(value, None, time.monotonic()))
+        return value
+
+    def _generation(self, key: CacheKey) -> Tuple[int, int]:
+        return self._clear_generation, self._generations.get(key[2], 0)
+
+    def _servable(self, entry: Optional[_Entry]) -> bool:
+        """Whether an entry still holds data that may be served stale"""
+        return (
+            entry is not None
+            and entry.error is None
+            and time.monotonic() - entry.fetched_at < self.fresh_seconds + self.stale_seconds
+        )
+
+    def _store(self, key: CacheKey, entry: _Entry) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    # ==================== INVALIDATION ====================
+
+    def invalidate(self, resource: str) -> None:
+        """Drop every cached read of a resource (e.g. 'properties/123') after we changed it"""
+        resource = resource_id(resource)
+        self._generations[resource] = self._generations.get(resource, 0) + 1
+        # Requests from now on must not join a load that started before the write
+        for key in [key for key in self._loads if key[2] == resource]:
+            del self._loads[key]
+        for key in [key for key in self._entries if key[2] == resource]:
+            del self._entries[key]
+        self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop all cached reads"""
+        self._clear_generation += 1
+        self._generations.clear()
+        self._loads.clear()
+        self._entries.clear()
+        self.invalidations += 1
+
+    # ==================== MONITORING ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics for monitoring"""
+        served = self.hits + self.stale_hits + self.negative_hits
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "requests": self.requests,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": served / self.requests if self.requests else 0.0,
+            "refreshes": self.refreshes,
+            "loads_in_flight": len(self._loads),
+            "upstream_calls": self.upstream_calls,
+            "upstream_errors": self.upstream_errors,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions
+        }
+
+
+# Global cache instance shared by the GA4 routers
+ga4_metadata_cache = GA4MetadataCache()
+
+
+def get_ga4_metadata_cache_stats() -> Dict[str, Any]:
+    """Get GA4 metadata cache statistics"""
+    return ga4_metadata_cache.get_stats()
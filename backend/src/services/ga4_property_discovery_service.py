@@ -2,10 +2,13 @@
 GA4 Property Discovery Service - discovers and synchronizes GA4 properties for service accounts
 """
 
+import hashlib
+import json
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func, desc, update, delete
+from sqlalchemy import select, and_, or_, func, desc, update, delete, insert
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import selectinload
 
 from ..models.db_models import (
@@ -16,14 +19,125 @@ from ..models.schemas import (
     ServiceAccountPropertyResponse, PropertyAccessBindingResponse,
     ValidationResultResponse
 )
+from ..core.config import settings
 from ..core.exceptions import (
     ValidationError, BusinessRuleViolationError, ExternalApiError,
     ResourceNotFoundError
 )
 from .google_api_service import GoogleAnalyticsService
+from .ga4_client_registry import ga4_client_registry
 from .audit_service import AuditService
 
 
+async def upsert_service_account_properties(
+    db: AsyncSession,
+    service_account_id: int,
+    discovered_properties: List[Dict[str, Any]],
+    chunk_size: int = settings.GA4_DISCOVERY_UPSERT_CHUNK_SIZE
+) -> int:
+    """
+    Upsert a service account's discovered properties and deactivate the ones not discovered
+    
+    Rows are written with INSERT ... ON CONFLICT (service_account_id, ga_property_id)
+    DO UPDATE in chunks instead of a SELECT per property. Nothing is committed, so
+    the upsert and the deactivation land in the caller's transaction.
+    
+    Returns:
+        Number of discovered properties written
+    """
+    now = datetime.utcnow()
+    
+    # One row per property: ON CONFLICT cannot update the same row twice in a statement
+    rows = {}
+    for prop_data in discovered_properties:
+        property_id = prop_data.get('property_id')
+        if property_id:
+            rows[property_id] = {
+                "service_account_id": service_account_id,
+                "ga_property_id": property_id,
+                "property_name": prop_data.get('display_name'),
+                "property_account_id": prop_data.get('account_id'),
+                "is_active": True,
+                "discovered_at": now,
+                "last_validated_at": now,
+                "validation_status": 'valid',
+                "updated_at": now
+            }
+    
+    if not rows:
+        return 0
+    
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == 'postgresql' else sqlite.insert
+    table = ServiceAccountProperty.__table__
+    values = list(rows.values())
+    for start in range(0, len(values), chunk_size):
+        statement = dialect_insert(table).values(values[start:start + chunk_size])
+        excluded = statement.excluded
+        await db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[table.c.service_account_id, table.c.ga_property_id],
+                set_={
+                    # Keep the stored name / account when discovery did not report one
+                    "property_name": func.coalesce(excluded.property_name, table.c.property_name),
+                    "property_account_id": func.coalesce(excluded.property_account_id, table.c.property_account_id),
+                    "is_active": excluded.is_active,
+                    "discovered_at": excluded.discovered_at,
+                    "last_validated_at": excluded.last_validated_at,
+                    "validation_status": excluded.validation_status,
+                    "updated_at": excluded.updated_at
+                }
+            )
+        )
+    
+    # Every discovered row now has discovered_at == now; older active rows were not discovered
+    await db.execute(
+        update(ServiceAccountProperty)
+        .where(
+            and_(
+                ServiceAccountProperty.service_account_id == service_account_id,
+                ServiceAccountProperty.is_active == True,
+                or_(ServiceAccountProperty.discovered_at.is_(None), ServiceAccountProperty.discovered_at < now)
+            )
+        )
+        .values(
+            is_active=False,
+            validation_status='invalid',
+            last_validated_at=now,
+            updated_at=now
+        )
+        .execution_options(synchronize_session=False)
+    )
+    
+    return len(rows)
+
+
+def _normalize_access_bindings(bindings: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """GA4 bindings keyed by user email with sorted roles; bindings without an email or roles are dropped"""
+    normalized: Dict[str, Dict[str, Any]] = {}
+    for binding in bindings:
+        user_email = binding.get('user_email')
+        roles = binding.get('roles') or []
+        if not user_email or not roles:
+            continue
+        entry = normalized.setdefault(user_email, {"roles": set(), "binding_name": None})
+        entry["roles"].update(roles)
+        entry["binding_name"] = binding.get('binding_name') or entry["binding_name"]
+    
+    return {
+        user_email: {"roles": sorted(entry["roles"]), "binding_name": entry["binding_name"]}
+        for user_email, entry in normalized.items()
+    }
+
+
+def _access_bindings_hash(normalized_bindings: Dict[str, Dict[str, Any]]) -> str:
+    """Stable SHA-256 of a normalized binding set, independent of the order GA4 returned it in"""
+    canonical = sorted(
+        [user_email, binding["roles"], binding["binding_name"]]
+        for user_email, binding in normalized_bindings.items()
+    )
+    return hashlib.sha256(json.dumps(canonical, separators=(',', ':')).encode()).hexdigest()
+
+
 class GA4PropertyDiscoveryService:
     """Service for discovering and managing GA4 properties through service accounts"""
     
@@ -88,22 +202,16 @@ class GA4PropertyDiscoveryService:
                 return await self._get_service_account_properties(service_account_id)
         
         try:
-            # Discover properties through Google API
-            discovery_result = await self.google_api_service.discover_ga4_properties(
-                service_account
-            )
+            # Discover properties through Google API: one paginated accountSummaries walk
+            ga_service = ga4_client_registry.get(service_account)
+            discovered_properties = await ga_service.list_account_summaries()
             
             # Update service account health status
-            service_account.health_status = 'healthy' if discovery_result.get('success') else 'unhealthy'
+            service_account.health_status = 'healthy'
             service_account.health_checked_at = datetime.utcnow()
             service_account.last_used_at = datetime.utcnow()
             
-            if not discovery_result.get('success'):
-                await self.db.commit()
-                raise ExternalApiError(f"Failed to discover properties: {discovery_result.get('error')}")
-            
             # Process discovered properties
-            discovered_properties = discovery_result.get('properties', [])
             await self._update_service_account_properties(service_account_id, discovered_properties)
             
             await self.db.commit()
@@ -140,71 +248,7 @@ class GA4PropertyDiscoveryService:
         discovered_properties: List[Dict[str, Any]]
     ) -> None:
         """Update the database with discovered properties"""
-        
-        discovered_property_ids = set()
-        
-        for prop_data in discovered_properties:
-            property_id = prop_data.get('property_id')
-            if not property_id:
-                continue
-                
-            discovered_property_ids.add(property_id)
-            
-            # Check if property already exists
-            existing_query = (
-                select(ServiceAccountProperty)
-                .where(
-                    and_(
-                        ServiceAccountProperty.service_account_id == service_account_id,
-                        ServiceAccountProperty.ga_property_id == property_id
-                    )
-                )
-            )
-            result = await self.db.execute(existing_query)
-            existing_property = result.scalar_one_or_none()
-            
-            if existing_property:
-                # Update existing property
-                existing_property.property_name = prop_data.get('display_name', existing_property.property_name)
-                existing_property.property_account_id = prop_data.get('account_id', existing_property.property_account_id)
-                existing_property.is_active = True
-                existing_property.discovered_at = datetime.utcnow()
-                existing_property.validation_status = 'valid'
-                existing_property.last_validated_at = datetime.utcnow()
-                existing_property.updated_at = datetime.utcnow()
-            else:
-                # Create new property
-                new_property = ServiceAccountProperty(
-                    service_account_id=service_account_id,
-                    ga_property_id=property_id,
-                    property_name=prop_data.get('display_name'),
-                    property_account_id=prop_data.get('account_id'),
-                    is_active=True,
-                    discovered_at=datetime.utcnow(),
-                    last_validated_at=datetime.utcnow(),
-                    validation_status='valid'
-                )
-                self.db.add(new_property)
-        
-        # Mark properties not found in discovery as inactive
-        if discovered_property_ids:
-            inactive_update = (
-                update(ServiceAccountProperty)
-                .where(
-                    and_(
-                        ServiceAccountProperty.service_account_id == service_account_id,
-                        ServiceAccountProperty.ga_property_id.notin_(discovered_property_ids),
-                        ServiceAccountProperty.is_active == True
-                    )
-                )
-                .values(
-                    is_active=False,
-                    validation_status='invalid',
-                    last_validated_at=datetime.utcnow(),
-                    updated_at=datetime.utcnow()
-                )
-            )
-            await self.db.execute(inactive_update)
+        await upsert_service_account_properties(self.db, service_account_id, discovered_properties)
     
     async def _get_service_account_properties(
         self, 
@@ -285,27 +329,11 @@ class GA4PropertyDiscoveryService:
             "properties": [],
             "total_properties": len(properties),
             "total_bindings_synced": 0,
+            "properties_unchanged": 0,
             "errors": []
         }
         
-        for prop in properties:
-            try:
-                property_sync = await self._sync_single_property_permissions(
-                    service_account, prop
-                )
-                sync_report["properties"].append(property_sync)
-                sync_report["total_bindings_synced"] += property_sync.get("bindings_count", 0)
-                
-            except Exception as e:
-                error_msg = f"Failed to sync property {prop.ga_property_id}: {str(e)}"
-                sync_report["errors"].append(error_msg)
-                sync_report["properties"].append({
-                    "property_id": prop.ga_property_id,
-                    "property_name": prop.property_name,
-                    "status": "error",
-                    "error": error_msg,
-                    "bindings_count": 0
-                })
+        await self._sync_properties(service_account, properties, sync_report)
         
         await self.db.commit()
         
@@ -325,6 +353,167 @@ class GA4PropertyDiscoveryService:
         
         return sync_report
     
+    async def synchronize_property_permissions_incremental(
+        self,
+        service_account_id: int
+    ) -> Dict[str, Any]:
+        """
+        Synchronize permissions only for properties GA4 change history reports as changed
+        
+        Each GA4 account's change history is searched from the service account's
+        watermark (less GA4_CHANGE_HISTORY_OVERLAP_SECONDS), and only the properties
+        it mentions are re-listed; an account-level change re-lists the whole account.
+        Change history does not record every access change, so a full
+        synchronization runs instead when there is no watermark yet or the last one
+        is older than GA4_BINDING_FULL_SYNC_INTERVAL_HOURS. The watermark only moves
+        when every search and property synchronization succeeded.
+        """
+        
+        service_account = await self.db.get(ServiceAccount, service_account_id)
+        if not service_account:
+            raise ResourceNotFoundError(f"Service account {service_account_id} not found")
+        
+        started_at = datetime.utcnow()
+        watermark = service_account.binding_sync_watermark
+        full_sync_at = service_account.binding_full_sync_at
+        full_sync_due = (
+            watermark is None
+            or full_sync_at is None
+            or full_sync_at.replace(tzinfo=None) <= started_at - timedelta(hours=settings.GA4_BINDING_FULL_SYNC_INTERVAL_HOURS)
+        )
+        
+        if full_sync_due:
+            sync_report = await self.synchronize_property_permissions(service_account_id)
+            sync_report["mode"] = "full"
+            if not sync_report["errors"]:
+                await self._advance_binding_watermark(service_account_id, started_at, full_sync=True)
+            return sync_report
+        
+        result = await self.db.execute(
+            select(ServiceAccountProperty)
+            .where(
+                and_(
+                    ServiceAccountProperty.service_account_id == service_account_id,
+                    ServiceAccountProperty.is_active == True
+                )
+            )
+        )
+        properties_by_account: Dict[Optional[str], Dict[str, ServiceAccountProperty]] = {}
+        for prop in result.scalars().all():
+            properties_by_account.setdefault(prop.property_account_id, {})[prop.ga_property_id] = prop
+        
+        changes_since = watermark.replace(tzinfo=None) - timedelta(seconds=settings.GA4_CHANGE_HISTORY_OVERLAP_SECONDS)
+        sync_report = {
+            "service_account_id": service_account_id,
+            "service_account_email": service_account.email,
+            "synchronized_at": started_at.isoformat(),
+            "mode": "incremental",
+            "changes_since": changes_since.isoformat(),
+            "change_events": 0,
+            "properties": [],
+            "total_properties": sum(len(properties) for properties in properties_by_account.values()),
+            "properties_resynced": 0,
+            "total_bindings_synced": 0,
+            "properties_unchanged": 0,
+            "errors": []
+        }
+        
+        changed_properties: Dict[str, ServiceAccountProperty] = {}
+        for account_id, account_properties in properties_by_account.items():
+            if not account_id:
+                # No account to search; re-list until discovery fills it in
+                changed_properties.update(account_properties)
+                continue
+            
+            try:
+                events = await self.google_api_service.search_change_history_events(
+                    f"accounts/{account_id}",
+                    changes_since,
+                    page_size=settings.GA4_CHANGE_HISTORY_PAGE_SIZE
+                )
+            except Exception as e:
+                sync_report["errors"].append(f"Failed to search change history of account {account_id}: {str(e)}")
+                continue
+            
+            sync_report["change_events"] += len(events)
+            for event in events:
+                for change in event.get('changes', []):
+                    resource = (change.get('resource') or '').split('/')
+                    if resource[0] == 'accounts':
+                        changed_properties.update(account_properties)
+                    elif resource[0] == 'properties' and len(resource) > 1 and resource[1] in account_properties:
+                        changed_properties[resource[1]] = account_properties[resource[1]]
+        
+        sync_report["properties_resynced"] = len(changed_properties)
+        await self._sync_properties(service_account, changed_properties.values(), sync_report)
+        await self.db.commit()
+        
+        if not sync_report["errors"]:
+            await self._advance_binding_watermark(service_account_id, started_at)
+        
+        await self.audit_service.log_action(
+            action="synchronize_property_permissions_incremental",
+            resource_type="service_account",
+            resource_id=str(service_account_id),
+            details=(
+                f"Re-listed {sync_report['properties_resynced']} of {sync_report['total_properties']} properties "
+                f"for {sync_report['change_events']} change history events ({len(sync_report['errors'])} errors)"
+            )
+        )
+        
+        return sync_report
+    
+    async def _advance_binding_watermark(
+        self,
+        service_account_id: int,
+        synchronized_at: datetime,
+        full_sync: bool = False
+    ) -> None:
+        """Record that change history up to synchronized_at has been applied"""
+        values = {"binding_sync_watermark": synchronized_at}
+        if full_sync:
+            values["binding_full_sync_at"] = synchronized_at
+        
+        await self.db.execute(
+            update(ServiceAccount)
+            .where(ServiceAccount.id == service_account_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+    
+    async def _sync_properties(
+        self,
+        service_account: ServiceAccount,
+        properties,
+        sync_report: Dict[str, Any]
+    ) -> None:
+        """Synchronize each property's permissions into sync_report"""
+        for prop in properties:
+            try:
+                property_sync = await self._sync_single_property_permissions(
+                    service_account, prop
+                )
+                sync_report["properties"].append(property_sync)
+                sync_report["total_bindings_synced"] += property_sync.get("bindings_count", 0)
+                if property_sync.get("bindings_changes", {}).get("skipped"):
+                    sync_report["properties_unchanged"] += 1
+                if property_sync.get("status") == "error":
+                    sync_report["errors"].append(
+                        f"Failed to sync property {prop.ga_property_id}: {property_sync.get('error')}"
+                    )
+                
+            except Exception as e:
+                error_msg = f"Failed to sync property {prop.ga_property_id}: {str(e)}"
+                sync_report["errors"].append(error_msg)
+                sync_report["properties"].append({
+                    "property_id": prop.ga_property_id,
+                    "property_name": prop.property_name,
+                    "status": "error",
+                    "error": error_msg,
+                    "bindings_count": 0
+                })
+    
     async def _sync_single_property_permissions(
         self, 
         service_account: ServiceAccount,
@@ -355,8 +544,8 @@ class GA4PropertyDiscoveryService:
             property_sync["bindings_count"] = len(bindings)
             
             # Update PropertyAccessBinding cache
-            await self._update_property_access_bindings(
-                service_account.id, property_obj.ga_property_id, bindings
+            property_sync["bindings_changes"] = await self._update_property_access_bindings(
+                property_obj, bindings
             )
             
             # Get internal permission grants for comparison
@@ -387,38 +576,82 @@ class GA4PropertyDiscoveryService:
     
     async def _update_property_access_bindings(
         self, 
-        service_account_id: int,
-        property_id: str,
+        property_obj: ServiceAccountProperty,
         bindings: List[Dict[str, Any]]
-    ) -> None:
-        """Update the PropertyAccessBinding cache with current GA4 bindings"""
+    ) -> Dict[str, Any]:
+        """
+        Bring the PropertyAccessBinding cache of a property in line with its GA4 bindings
         
-        # Clear existing bindings for this property
-        delete_query = delete(PropertyAccessBinding).where(
-            and_(
-                PropertyAccessBinding.service_account_id == service_account_id,
-                PropertyAccessBinding.ga_property_id == property_id
+        A property whose binding set hashes the same as at its last synchronization
+        is skipped without touching the table. Otherwise only the rows that differ
+        are inserted, updated or deleted.
+        
+        Returns:
+            Whether the property was skipped and the inserted / updated / deleted counts
+        """
+        current_bindings = _normalize_access_bindings(bindings)
+        bindings_hash = _access_bindings_hash(current_bindings)
+        changes = {"skipped": False, "inserted": 0, "updated": 0, "deleted": 0}
+        
+        if property_obj.bindings_hash == bindings_hash:
+            changes["skipped"] = True
+            return changes
+        
+        result = await self.db.execute(
+            select(PropertyAccessBinding).where(
+                and_(
+                    PropertyAccessBinding.service_account_id == property_obj.service_account_id,
+                    PropertyAccessBinding.ga_property_id == property_obj.ga_property_id
+                )
             )
         )
-        await self.db.execute(delete_query)
+        stored_bindings = {binding.user_email: binding for binding in result.scalars().all()}
+        now = datetime.utcnow()
         
-        # Add current bindings
-        for binding in bindings:
-            user_email = binding.get('user_email', '')
-            roles = binding.get('roles', [])
-            binding_name = binding.get('binding_name', '')
-            
-            if user_email and roles:
-                access_binding = PropertyAccessBinding(
-                    service_account_id=service_account_id,
-                    ga_property_id=property_id,
-                    user_email=user_email,
-                    roles=str(roles),  # Store as JSON string
-                    binding_name=binding_name,
-                    is_active=True,
-                    synchronized_at=datetime.utcnow()
-                )
-                self.db.add(access_binding)
+        # Remove bindings no longer present in GA4
+        removed_ids = [
+            binding.id for user_email, binding in stored_bindings.items()
+            if user_email not in current_bindings
+        ]
+        if removed_ids:
+            await self.db.execute(
+                delete(PropertyAccessBinding)
+                .where(PropertyAccessBinding.id.in_(removed_ids))
+                .execution_options(synchronize_session=False)
+            )
+            changes["deleted"] = len(removed_ids)
+        
+        # Update changed bindings in place and insert new ones in one statement
+        new_bindings = []
+        for user_email, binding in current_bindings.items():
+            stored = stored_bindings.get(user_email)
+            if stored is None:
+                new_bindings.append({
+                    "service_account_id": property_obj.service_account_id,
+                    "ga_property_id": property_obj.ga_property_id,
+                    "user_email": user_email,
+                    "roles": binding["roles"],
+                    "binding_name": binding["binding_name"],
+                    "is_active": True,
+                    "synchronized_at": now
+                })
+            elif (
+                stored.roles != binding["roles"]
+                or stored.binding_name != binding["binding_name"]
+                or not stored.is_active
+            ):
+                stored.roles = binding["roles"]
+                stored.binding_name = binding["binding_name"]
+                stored.is_active = True
+                stored.synchronized_at = now
+                changes["updated"] += 1
+        
+        if new_bindings:
+            await self.db.execute(insert(PropertyAccessBinding), new_bindings)
+            changes["inserted"] = len(new_bindings)
+        
+        property_obj.bindings_hash = bindings_hash
+        return changes
     
     async def _identify_permission_discrepancies(
         self, 
@@ -0,0 +1,281 @@
+"""
+Quota-aware admission for outbound GA4 Admin API calls
+
+Google enforces Admin API quotas per Google Cloud project and per property, and
+bursts beyond them come back as 429s. Before a call is sent it takes a token
+from its project's bucket and, when it targets a property, from that
+property's bucket. Waiters are admitted in priority order, so an interactive
+grant queued behind a scheduled sync goes first.
+"""
+
+import asyncio
+import bisect
+import contextlib
+import contextvars
+import itertools
+import logging
+import time
+from enum import IntEnum
+from typing import Any, Dict, Iterator, List, Optional
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class GA4Priority(IntEnum):
+    """Admission priority of a GA4 call; lower values are admitted first"""
+    INTERACTIVE = 0
+    SYNC = 1
+
+
+_current_priority: contextvars.ContextVar[GA4Priority] = contextvars.ContextVar(
+    "ga4_call_priority", default=GA4Priority.INTERACTIVE
+)
+
+
+@contextlib.contextmanager
+def ga4_priority(priority: GA4Priority) -> Iterator[None]:
+    """Run the GA4 calls made in this block, and in tasks it starts, at the given priority"""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_ga4_priority() -> GA4Priority:
+    """Priority of GA4 calls made from the current context"""
+    return _current_priority.get()
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``rate`` tokens per second up to ``capacity``"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self) -> bool:
+        """Whether a token can be taken now"""
+        self._refill()
+        return self.tokens >= 1
+
+    def take(self):
+        """Take a token; call only after available()"""
+        self.tokens -= 1
+
+    def wait_time(self) -> float:
+        """Seconds until a token is available"""
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def is_idle(self) -> bool:
+        """Whether the bucket is full, so dropping it loses nothing"""
+        self._refill()
+        return self.tokens >= self.capacity
+
+    def pause(self, seconds: float):
+        """Withhold tokens for ``seconds``, e.g. after Google answered 429"""
+        self._refill()
+        self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "property_id", "future", "enqueued_at")
+
+    def __init__(self, priority: GA4Priority, seq: int, property_id: Optional[str], future: asyncio.Future):
+        self.priority = priority
+        self.seq = seq
+        self.property_id = property_id
+        self.future = future
+        self.enqueued_at = time.perf_counter()
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class GA4QuotaScheduler:
+    """Token buckets per Google Cloud project and per property with priority admission"""
+
+    def __init__(
+        self,
+        project_rate: float = settings.GA4_QUOTA_PROJECT_REQUESTS_PER_SECOND,
+        project_burst: int = settings.GA4_QUOTA_PROJECT_BURST,
+        property_rate: float = settings.GA4_QUOTA_PROPERTY_REQUESTS_PER_SECOND,
+        property_burst: int = settings.GA4_QUOTA_PROPERTY_BURST,
+        max_buckets: int = settings.GA4_QUOTA_MAX_BUCKETS,
+        enabled: bool = settings.GA4_QUOTA_ENABLED
+    ):
+        self.project_rate = project_rate
+        self.project_burst = project_burst
+        self.property_rate = property_rate
+        self.property_burst = property_burst
+        self.max_buckets = max_buckets
+        self.enabled = enabled
+
+        self._project_buckets: Dict[str, TokenBucket] = {}
+        self._property_buckets: Dict[str, TokenBucket] = {}
+        self._waiters: Dict[str, List[_Waiter]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._seq = itertools.count()
+
+        self.peak_queue_depth = 0
+        self.throttled = 0
+        self.admission_metrics: Dict[GA4Priority, Dict[str, float]] = {
+            priority: {"admitted": 0, "total_wait": 0.0, "max_wait": 0.0} for priority in GA4Priority
+        }
+
+    async def acquire(
+        self,
+        project: Optional[str] = None,
+        property_id: Optional[str] = None,
+        priority: Optional[GA4Priority] = None
+    ) -> float:
+        """
+        Wait until the project (and property) quota admits one call
+
+        Returns:
+            Seconds spent waiting
+        """
+        if not self.enabled:
+            return 0.0
+
+        priority = current_ga4_priority() if priority is None else priority
+        project = project or "default"
+        waiter = _Waiter(priority, next(self._seq), property_id, asyncio.get_running_loop().create_future())
+        bisect.insort(self._waiters.setdefault(project, []), waiter)
+        self.peak_queue_depth = max(self.peak_queue_depth, self.queue_depth())
+        self._dispatch(project)
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            waiters = self._waiters.get(project, [])
+            if waiter in waiters:
+                waiters.remove(waiter)
+            raise
+
+        waited = time.perf_counter() - waiter.enqueued_at
+        metrics = self.admission_metrics[priority]
+        metrics["admitted"] += 1
+        metrics["total_wait"] += waited
+        metrics["max_wait"] = max(metrics["max_wait"], waited)
+        return waited
+
+    def pause(self, project: Optional[str], property_id: Optional[str], seconds: float):
+        """Stop admitting calls for a project and property that Google throttled"""
+        if not self.enabled:
+            return
+        self.throttled += 1
+        self._project_bucket(project or "default").pause(seconds)
+        if property_id:
+            self._property_bucket(property_id).pause(seconds)
+
+    def queue_depth(self, priority: Optional[GA4Priority] = None) -> int:
+        """Calls waiting for quota, optionally only those of one priority"""
+        return sum(
+            1
+            for waiters in self._waiters.values()
+            for waiter in waiters
+            if priority is None or waiter.priority == priority
+        )
+
+    def _dispatch(self, project: str):
+        """Admit waiting calls of a project in priority order while quota allows"""
+        timer = self._timers.pop(project, None)
+        if timer is not None:
+            timer.cancel()
+
+        waiters = self._waiters.get(project)
+        if not waiters:
+            self._waiters.pop(project, None)
+            return
+
+        project_bucket = self._project_bucket(project)
+        next_wake: Optional[float] = None
+        index = 0
+        while index < len(waiters) and project_bucket.available():
+            waiter = waiters[index]
+            if waiter.future.done():
+                waiters.pop(index)
+                continue
+
+            # A waiter whose property is exhausted does not hold up other properties
+            property_bucket = self._property_bucket(waiter.property_id) if waiter.property_id else None
+            if property_bucket is not None and not property_bucket.available():
+                wait = property_bucket.wait_time()
+                next_wake = wait if next_wake is None else min(next_wake, wait)
+                index += 1
+                continue
+
+            project_bucket.take()
+            if property_bucket is not None:
+                property_bucket.take()
+            waiters.pop(index)
+            waiter.future.set_result(None)
+
+        if not waiters:
+            self._waiters.pop(project, None)
+            return
+
+        if not project_bucket.available():
+            wait = project_bucket.wait_time()
+            next_wake = wait if next_wake is None else min(next_wake, wait)
+        self._timers[project] = asyncio.get_running_loop().call_later(
+            next_wake or 0.0, self._dispatch, project
+        )
+
+    def _project_bucket(self, project: str) -> TokenBucket:
+        bucket = self._project_buckets.get(project)
+        if bucket is None:
+            self._evict_idle(self._project_buckets, protected=self._waiters)
+            bucket = self._project_buckets[project] = TokenBucket(self.project_rate, self.project_burst)
+        return bucket
+
+    def _property_bucket(self, property_id: str) -> TokenBucket:
+        bucket = self._property_buckets.get(property_id)
+        if bucket is None:
+            waiting = {waiter.property_id for waiters in self._waiters.values() for waiter in waiters}
+            self._evict_idle(self._property_buckets, protected=waiting)
+            bucket = self._property_buckets[property_id] = TokenBucket(self.property_rate, self.property_burst)
+        return bucket
+
+    def _evict_idle(self, buckets: Dict[str, TokenBucket], protected):
+        """Drop full buckets nobody waits on once there are too many"""
+        if len(buckets) < self.max_buckets:
+            return
+        for key in [key for key, bucket in buckets.items() if key not in protected and bucket.is_idle()]:
+            del buckets[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get quota scheduler statistics for monitoring"""
+        admissions = {}
+        for priority, metrics in self.admission_metrics.items():
+            admissions[priority.name.lower()] = {
+                "admitted": metrics["admitted"],
+                "queue_depth": self.queue_depth(priority),
+                "avg_wait": metrics["total_wait"] / metrics["admitted"] if metrics["admitted"] else 0.0,
+                "max_wait": metrics["max_wait"]
+            }
+
+        return {
+            "enabled": self.enabled,
+            "queue_depth": self.queue_depth(),
+            "peak_queue_depth": self.peak_queue_depth,
+            "throttled": self.throttled,
+            "projects": len(self._project_buckets),
+            "properties": len(self._property_buckets),
+            "priorities": admissions
+        }
+
+
+# Global quota scheduler instance
+ga4_quota_scheduler = GA4QuotaScheduler()
@@ -0,0 +1,362 @@
+"""
+Batched GA4 user-link writes for bulk permission operations
+
+``grant_property_access``, ``update_property_access`` and ``revoke_property_access``
+make one Admin API call per user, and updates and revokes first list every user
+link of the property to find one email, so a bulk change costs O(users x links)
+calls. The batcher groups operations by property, resolves link names from the
+cached ``PropertyAccessBinding`` rows instead of re-listing, and sends each group
+as accessBindings batchCreate / batchUpdate / batchDelete calls. Batch calls are
+transactional, so a batch Google rejects is retried one link at a time to report
+exactly which items failed.
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..core.exceptions import GoogleAPIError
+from ..models.db_models import PermissionLevel, PropertyAccessBinding, ServiceAccount, ServiceAccountProperty
+from .audit_service import AuditService
+from .ga4_client_registry import ga4_client_registry
+from .google_api_service import GoogleAnalyticsService
+
+logger = logging.getLogger(__name__)
+
+USER_LINK_ACTIONS = ("grant", "update", "revoke")
+
+# Callback receiving (operation index, user link or None, error or None)
+_Done = Callable[[int, Optional[Dict[str, Any]], Optional[GoogleAPIError]], None]
+
+
+class GA4UserLinkBatcher:
+    """Applies bulk grant / update / revoke operations as per-property batch calls"""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        client_factory: Callable[[ServiceAccount], GoogleAnalyticsService] = ga4_client_registry.get,
+        batch_size: int = settings.GA4_USER_LINK_BATCH_SIZE,
+        max_concurrency: int = settings.GA4_USER_LINK_MAX_CONCURRENCY
+    ):
+        self.db = db
+        self.client_factory = client_factory
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+
+    async def apply(self, operations: List[Dict[str, Any]], actor_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Apply user-link operations, grouped into batch calls per property
+
+        Each operation has an ``action`` (grant, update or revoke), a ``property_id``,
+        an ``email`` and, unless revoking, a ``permission_level``. As with
+        ``update_property_access``, a grant for a user who already has a link updates
+        it and an update for a user without one creates it. When a property and email
+        appear more than once, the last operation wins.
+
+        Returns:
+            Counts per status and one result per operation, in input order
+        """
+        started = time.perf_counter()
+        results = [
+            {
+                "action": operation.get("action"),
+                "property_id": str(operation.get("property_id") or ""),
+                "email": operation.get("email"),
+                "status": "pending",
+                "name": None,
+                "error": None
+            }
+            for operation in operations
+        ]
+        levels: Dict[int, PermissionLevel] = {}
+        latest: Dict[Tuple[str, str], int] = {}
+        for index, (operation, result) in enumerate(zip(operations, results)):
+            error = self._validate(operation, index, levels)
+            if error:
+                result.update(status="failed", error=error)
+                continue
+            key = (result["property_id"], result["email"].lower())
+            if key in latest:
+                results[latest[key]]["status"] = "superseded"
+            latest[key] = index
+
+        by_property: Dict[str, List[int]] = {}
+        for (property_id, _), index in sorted(latest.items(), key=lambda item: item[1]):
+            by_property.setdefault(property_id, []).append(index)
+
+        managers = await self._managing_service_accounts(list(by_property))
+        cached = await self._cached_bindings(managers)
+        stats = {"api_calls": 0, "batch_fallbacks": 0}
+        changes: List[Tuple[str, ServiceAccount, str, Dict[str, Any]]] = []
+        limit = asyncio.Semaphore(self.max_concurrency)
+
+        async def write(property_id: str, indexes: List[int]) -> None:
+            service_account = managers.get(property_id)
+            if service_account is None:
+                for index in indexes:
+                    results[index].update(
+                        status="failed", error=f"No active service account manages property {property_id}"
+                    )
+                return
+            async with limit:
+                await self._write_property(
+                    service_account, property_id, indexes, results, levels,
+                    cached.get((service_account.id, property_id), {}), changes, stats
+                )
+
+        await asyncio.gather(*(write(property_id, indexes) for property_id, indexes in by_property.items()))
+        await self._update_cache(changes, cached)
+
+        counts = Counter(result["status"] for result in results)
+        report = {
+            "operations": len(operations),
+            "properties": len(by_property),
+            **{status: counts.get(status, 0) for status in ("granted", "updated", "revoked", "not_found", "superseded", "failed")},
+            **stats,
+            "results": results,
+            "elapsed_seconds": time.perf_counter() - started
+        }
+
+        await AuditService(self.db).log_action(
+            actor_id=actor_id,
+            action="bulk_user_link_changes",
+            resource_type="ga4_property",
+            resource_id=f"bulk_{len(by_property)}",
+            details=(
+                f"Granted {report['granted']}, updated {report['updated']}, revoked {report['revoked']} "
+                f"user links on {report['properties']} properties in {report['api_calls']} API calls "
+                f"({report['failed']} failed)"
+            )
+        )
+        await self.db.commit()
+
+        logger.info(
+            f"Applied {len(operations)} user-link operations on {report['properties']} properties "
+            f"in {report['api_calls']} API calls ({report['failed']} failed)"
+        )
+        return report
+
+    def _validate(self, operation: Dict[str, Any], index: int, levels: Dict[int, PermissionLevel]) -> Optional[str]:
+        """Error message for a malformed operation; records the permission level of valid ones"""
+        if operation.get("action") not in USER_LINK_ACTIONS:
+            return f"Unknown action {operation.get('action')!r}"
+        if not operation.get("property_id") or not operation.get("email"):
+            return "property_id and email are required"
+        if operation["action"] == "revoke":
+            return None
+        try:
+            levels[index] = PermissionLevel(operation.get("permission_level"))
+        except ValueError:
+            return f"Invalid permission level {operation.get('permission_level')!r}"
+        return None
+
+    async def _managing_service_accounts(self, property_ids: List[str]) -> Dict[str, ServiceAccount]:
+        """Active service account managing each property; the first one discovered when several do"""
+        if not property_ids:
+            return {}
+        result = await self.db.execute(
+            select(ServiceAccountProperty.ga_property_id, ServiceAccount)
+            .join(ServiceAccount, ServiceAccount.id == ServiceAccountProperty.service_account_id)
+            .where(
+                and_(
+                    ServiceAccountProperty.ga_property_id.in_(property_ids),
+                    ServiceAccountProperty.is_active == True,
+                    ServiceAccount.is_active == True
+                )
+            )
+            .order_by(ServiceAccountProperty.id)
+        )
+        managers: Dict[str, ServiceAccount] = {}
+        for property_id, service_account in result.all():
+            managers.setdefault(property_id, service_account)
+        return managers
+
+    async def _cached_bindings(
+        self, managers: Dict[str, ServiceAccount]
+    ) -> Dict[Tuple[int, str], Dict[str, PropertyAccessBinding]]:
+        """Cached bindings of the managing service accounts, by (service account, property) and lowercased email"""
+        if not managers:
+            return {}
+        result = await self.db.execute(
+            select(PropertyAccessBinding).where(PropertyAccessBinding.ga_property_id.in_(list(managers)))
+        )
+        cached: Dict[Tuple[int, str], Dict[str, PropertyAccessBinding]] = {}
+        for binding in result.scalars():
+            if managers[binding.ga_property_id].id == binding.service_account_id:
+                cached.setdefault((binding.service_account_id, binding.ga_property_id), {})[binding.user_email.lower()] = binding
+        return cached
+
+    async def _write_property(
+        self,
+        service_account: ServiceAccount,
+        property_id: str,
+        indexes: List[int],
+        results: List[Dict[str, Any]],
+        levels: Dict[int, PermissionLevel],
+        bindings: Dict[str, PropertyAccessBinding],
+        changes: List[Tuple[str, ServiceAccount, str, Dict[str, Any]]],
+        stats: Dict[str, int]
+    ) -> None:
+        """Send one property's operations as batch create, update and delete calls"""
+        try:
+            ga_service = self.client_factory(service_account)
+        except Exception as e:
+            for index in indexes:
+                results[index].update(status="failed", error=str(e))
+            return
+
+        property_name = f"properties/{property_id}"
+        creates, updates, deletes = [], [], []
+        for index in indexes:
+            binding = bindings.get(results[index]["email"].lower())
+            link_name = binding.binding_name if binding is not None and binding.is_active else None
+            if results[index]["action"] == "revoke":
+                if link_name is None:
+                    results[index]["status"] = "not_found"
+                else:
+                    deletes.append(index)
+            elif link_name is None:
+                creates.append(index)
+            else:
+                updates.append(index)
+
+        def done(status: str) -> _Done:
+            def record(index: int, user_link: Optional[Dict[str, Any]], error: Optional[GoogleAPIError]) -> None:
+                result = results[index]
+                if error is not None:
+                    result.update(status="failed", error=error.message)
+                    return
+                result["status"] = status
+                if status == "revoked":
+                    result["name"] = bindings[result["email"].lower()].binding_name
+                    changes.append(("delete", service_account, property_id, result))
+                    return
+                user_link = user_link or {}
+                result["name"] = user_link.get("name") or bindings[result["email"].lower()].binding_name
+                result["roles"] = sorted(
+                    user_link.get("directRoles") or [ga_service._convert_permission_level(levels[index])]
+                )
+                changes.append(("upsert", service_account, property_id, result))
+            return record
+
+        await self._send_batches(
+            creates,
+            lambda chunk: ga_service.batch_create_user_links(
+                property_name, [(results[index]["email"], levels[index]) for index in chunk]
+            ),
+            done("granted"), stats
+        )
+        await self._send_batches(
+            updates,
+            lambda chunk: ga_service.batch_update_user_links(
+                property_name,
+                [
+                    (bindings[results[index]["email"].lower()].binding_name, results[index]["email"], levels[index])
+                    for index in chunk
+                ]
+            ),
+            done("updated"), stats
+        )
+        await self._send_batches(
+            deletes,
+            lambda chunk: ga_service.batch_delete_user_links(
+                property_name, [bindings[results[index]["email"].lower()].binding_name for index in chunk]
+            ),
+            done("revoked"), stats
+        )
+
+    async def _send_batches(
+        self,
+        indexes: List[int],
+        call: Callable[[List[int]], Awaitable[Optional[List[Dict[str, Any]]]]],
+        done: _Done,
+        stats: Dict[str, int]
+    ) -> None:
+        for start in range(0, len(indexes), self.batch_size):
+            await self._send(indexes[start:start + self.batch_size], call, done, stats)
+
+    async def _send(
+        self,
+        chunk: List[int],
+        call: Callable[[List[int]], Awaitable[Optional[List[Dict[str, Any]]]]],
+        done: _Done,
+        stats: Dict[str, int]
+    ) -> None:
+        """Send one batch; when Google rejects it, retry its items one at a time"""
+        stats["api_calls"] += 1
+        try:
+            user_links = await call(chunk) or []
+        except GoogleAPIError as e:
+            if len(chunk) == 1:
+                done(chunk[0], None, e)
+                return
+            stats["batch_fallbacks"] += 1
+            await asyncio.gather(*(self._send([index], call, done, stats) for index in chunk))
+            return
+
+        for position, index in enumerate(chunk):
+            done(index, user_links[position] if position < len(user_links) else None, None)
+
+    async def _update_cache(
+        self,
+        changes: List[Tuple[str, ServiceAccount, str, Dict[str, Any]]],
+        cached: Dict[Tuple[int, str], Dict[str, PropertyAccessBinding]]
+    ) -> None:
+        """Mirror applied changes into the PropertyAccessBinding cache"""
+        if not changes:
+            return
+
+        now = datetime.utcnow()
+        deleted_ids, new_bindings, touched = [], [], set()
+        for kind, service_account, property_id, result in changes:
+            touched.add((service_account.id, property_id))
+            stored = cached.get((service_account.id, property_id), {}).get(result["email"].lower())
+            if kind == "delete":
+                deleted_ids.append(stored.id)
+            elif stored is not None:
+                stored.roles = result["roles"]
+                stored.binding_name = result["name"]
+                stored.is_active = True
+                stored.synchronized_at = now
+            else:
+                new_bindings.append({
+                    "service_account_id": service_account.id,
+                    "ga_property_id": property_id,
+                    "user_email": result["email"],
+                    "roles": result["roles"],
+                    "binding_name": result["name"],
+                    "is_active": True,
+                    "synchronized_at": now
+                })
+
+        if deleted_ids:
+            await self.db.execute(
+                delete(PropertyAccessBinding)
+                .where(PropertyAccessBinding.id.in_(deleted_ids))
+                .execution_options(synchronize_session=False)
+            )
+        if new_bindings:
+            await self.db.execute(insert(PropertyAccessBinding), new_bindings)
+
+        # The cache no longer matches the last synchronized hash; the next sync diffs these properties
+        for service_account_id in {service_account_id for service_account_id, _ in touched}:
+            await self.db.execute(
+                update(ServiceAccountProperty)
+                .where(
+                    and_(
+                        ServiceAccountProperty.service_account_id == service_account_id,
+                        ServiceAccountProperty.ga_property_id.in_(
+                            [property_id for account_id, property_id in touched if account_id == service_account_id]
+                        )
+                    )
+                )
+                .values(bindings_hash=None)
+            )
@@ -2,50 +2,149 @@
 Google Analytics Admin API service
 """
 
+import functools
 import json
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Tuple
+import google_auth_httplib2
+import httplib2
 from google.auth.transport.requests import Request
 from google.oauth2 import service_account
-from googleapiclient.discovery import build
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build_from_document
 from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
 
 from ..core.config import settings
 from ..core.exceptions import GoogleAPIError
 from ..models.db_models import PermissionLevel
+from .ga4_api_executor import ga4_api_executor
+from .ga4_metadata_cache import ga4_metadata_cache
 
 logger = logging.getLogger(__name__)
 
+ADMIN_API_SCOPES = [
+    'https://www.googleapis.com/auth/analytics.manage.users',
+    'https://www.googleapis.com/auth/analytics.edit'  # searchChangeHistoryEvents
+]
+
+
+# Batch access-binding writes are only published in the v1alpha surface
+ACCESS_BINDINGS_API_VERSION = 'v1alpha'
+
+
+@functools.lru_cache(maxsize=2)
+def _admin_api_discovery_document(version: str = 'v1beta') -> Dict[str, Any]:
+    """Admin API discovery document bundled with googleapiclient, parsed once per version"""
+    return json.loads(discovery_cache.get_static_doc('analyticsadmin', version))
+
+
+def _user_link_from_access_binding(access_binding: Dict[str, Any]) -> Dict[str, Any]:
+    """An access binding in the user-link shape returned by the other user methods"""
+    return {
+        'name': access_binding.get('name'),
+        'emailAddress': access_binding.get('user'),
+        'directRoles': access_binding.get('roles', [])
+    }
+
+
+class ThreadLocalAuthorizedHttp:
+    """
+    Authorized httplib2 transport kept per thread
+    
+    httplib2 is not thread-safe, so executor threads cannot share one transport,
+    but each thread reuses its own and keeps the connection to Google open.
+    """
+    
+    def __init__(self, credentials, timeout: float = settings.GA4_API_TIMEOUT_SECONDS):
+        self.credentials = credentials
+        self.timeout = timeout
+        self._local = threading.local()
+    
+    @property
+    def http(self) -> google_auth_httplib2.AuthorizedHttp:
+        """The calling thread's transport, created on first use"""
+        http = getattr(self._local, "http", None)
+        if http is None:
+            http = google_auth_httplib2.AuthorizedHttp(
+                self.credentials,
+                http=httplib2.Http(timeout=self.timeout)
+            )
+            self._local.http = http
+        return http
+    
+    def request(self, *args, **kwargs):
+        """Send a request on the calling thread's transport"""
+        return self.http.request(*args, **kwargs)
+    
+    def __getattr__(self, name):
+        return getattr(self.http, name)
+
 
 class GoogleAnalyticsService:
     """Google Analytics Admin API service"""
     
-    def __init__(self):
-        self.credentials = None
+    def __init__(self, credentials=None):
+        self.credentials = credentials
         self.service = None
+        self.access_bindings_service = None
+        self._http = None
         self._initialize_service()
     
+    @classmethod
+    def from_service_account_info(cls, info: Dict[str, Any]) -> "GoogleAnalyticsService":
+        """Create a service for a service account key"""
+        try:
+            credentials = service_account.Credentials.from_service_account_info(info, scopes=ADMIN_API_SCOPES)
+        except (ValueError, KeyError) as e:
+            raise GoogleAPIError(f"Invalid service account credentials: {e}")
+        return cls(credentials)
+    
     def _initialize_service(self):
         """Initialize Google Analytics Admin API service"""
         try:
-            if settings.GOOGLE_SERVICE_ACCOUNT_FILE:
-                # Use service account credentials
-                self.credentials = service_account.Credentials.from_service_account_file(
-                    settings.GOOGLE_SERVICE_ACCOUNT_FILE,
-                    scopes=['https://www.googleapis.com/auth/analytics.manage.users']
-                )
-            else:
-                logger.warning("No Google service account file configured")
-                return
-            
-            # Build the Analytics Admin API service
-            self.service = build('analyticsadmin', 'v1beta', credentials=self.credentials)
-            logger.info("Google Analytics Admin API service initialized successfully")
+            if self.credentials is None:
+                if settings.GOOGLE_SERVICE_ACCOUNT_FILE:
+                    # Use service account credentials
+                    self.credentials = service_account.Credentials.from_service_account_file(
+                        settings.GOOGLE_SERVICE_ACCOUNT_FILE,
+                        scopes=ADMIN_API_SCOPES
+                    )
+                else:
+                    logger.warning("No Google service account file configured")
+                    return
+            
+            # Build the Analytics Admin API service. Requests run on the GA4 executor
+            # thread pool, so they resolve their transport on the executing thread.
+            self._http = ThreadLocalAuthorizedHttp(self.credentials)
+            self.service = self._build_admin_api('v1beta')
+            self.access_bindings_service = self._build_admin_api(ACCESS_BINDINGS_API_VERSION)
+            logger.debug("Google Analytics Admin API service initialized")
             
         except Exception as e:
             logger.error(f"Failed to initialize Google Analytics service: {e}")
             raise GoogleAPIError(f"Failed to initialize Google Analytics service: {e}")
     
+    def _build_admin_api(self, version: str):
+        """Admin API client for a discovery document version, sending requests on the per-thread transport"""
+        return build_from_document(
+            _admin_api_discovery_document(version),
+            credentials=self.credentials,
+            requestBuilder=self._build_request,
+            client_options={'api_endpoint': settings.GA4_ADMIN_API_ENDPOINT} if settings.GA4_ADMIN_API_ENDPOINT else None
+        )
+    
+    @property
+    def quota_project(self) -> Optional[str]:
+        """Google Cloud project the Admin API quota of these credentials is charged to"""
+        return getattr(self.credentials, 'project_id', None)
+    
+    def _build_request(self, http, *args, **kwargs) -> HttpRequest:
+        """Build an API request bound to the per-thread authorized transport"""
+        return HttpRequest(self._http, *args, **kwargs)
+    
     def _convert_permission_level(self, permission_level: PermissionLevel) -> str:
         """Convert internal permission level to GA4 permission level"""
         permission_mapping = {
@@ -64,7 +163,7 @@ class GoogleAnalyticsService:
         
         try:
             request = self.service.accounts().list()
-            response = request.execute()
+            response = await ga4_api_executor.execute(request, "accounts.list", project=self.quota_project)
             
             accounts = []
             for account in response.get('accounts', []):
@@ -82,6 +181,81 @@ class GoogleAnalyticsService:
             logger.error(f"Failed to list GA4 accounts: {e}")
             raise GoogleAPIError(f"Failed to list GA4 accounts: {e}")
     
+    async def list_account_summaries(self, page_size: int = 200) -> List[Dict[str, Any]]:
+        """List every property the credentials can access, across all accounts and pages"""
+        if not self.service:
+            raise GoogleAPIError("Google Analytics service not initialized")
+        
+        try:
+            properties = []
+            page_token = None
+            while True:
+                request = self.service.accountSummaries().list(pageSize=page_size, pageToken=page_token)
+                response = await ga4_api_executor.execute(request, "accountSummaries.list", project=self.quota_project)
+                
+                for account_summary in response.get('accountSummaries', []):
+                    account_id = account_summary.get('account', '').split('/')[-1]
+                    for property_summary in account_summary.get('propertySummaries', []):
+                        properties.append({
+                            'property_id': property_summary.get('property', '').split('/')[-1],
+                            'display_name': property_summary.get('displayName'),
+                            'property_type': property_summary.get('propertyType'),
+                            'parent': property_summary.get('parent'),
+                            'account_id': account_id,
+                            'account_name': account_summary.get('displayName')
+                        })
+                
+                page_token = response.get('nextPageToken')
+                if not page_token:
+                    return properties
+        
+        except HttpError as e:
+            logger.error(f"Failed to list GA4 account summaries: {e}")
+            raise GoogleAPIError(f"Failed to list GA4 account summaries: {e}")
+    
+    async def search_change_history_events(
+        self,
+        account_name: str,
+        earliest_change_time: datetime,
+        page_size: int = 200
+    ) -> List[Dict[str, Any]]:
+        """Search an account's change history since a point in time (UTC), across all pages"""
+        if not self.service:
+            raise GoogleAPIError("Google Analytics service not initialized")
+        
+        try:
+            if earliest_change_time.tzinfo is not None:
+                earliest_change_time = earliest_change_time.astimezone(timezone.utc).replace(tzinfo=None)
+            body = {
+                'earliestChangeTime': earliest_change_time.isoformat(timespec='microseconds') + 'Z',
+                'pageSize': page_size
+            }
+            
+            events = []
+            while True:
+                request = self.service.accounts().searchChangeHistoryEvents(account=account_name, body=dict(body))
+                response = await ga4_api_executor.execute(request, "accounts.searchChangeHistoryEvents", project=self.quota_project)
+                
+                for event in response.get('changeHistoryEvents', []):
+                    events.append({
+                        'id': event.get('id'),
+                        'change_time': event.get('changeTime'),
+                        'actor_type': event.get('actorType'),
+                        'user_actor_email': event.get('userActorEmail'),
+                        'changes': [
+                            {'resource': change.get('resource'), 'action': change.get('action')}
+                            for change in event.get('changes', [])
+                        ]
+                    })
+                
+                body['pageToken'] = response.get('nextPageToken')
+                if not body['pageToken']:
+                    return events
+        
+        except HttpError as e:
+            logger.error(f"Failed to search GA4 change history: {e}")
+            raise GoogleAPIError(f"Failed to search GA4 change history: {e}")
+    
     async def list_properties(self, account_name: str) -> List[Dict[str, Any]]:
         """List properties for a specific account"""
         if not self.service:
@@ -91,7 +265,7 @@ class GoogleAnalyticsService:
             request = self.service.properties().list(
                 filter=f"parent:{account_name}"
             )
-            response = request.execute()
+            response = await ga4_api_executor.execute(request, "properties.list", project=self.quota_project)
             
             properties = []
             for property_data in response.get('properties', []):
@@ -121,7 +295,9 @@ class GoogleAnalyticsService:
             request = self.service.properties().userLinks().list(
                 parent=property_name
             )
-            response = request.execute()
+            response = await ga4_api_executor.execute(
+                request, "userLinks.list", project=self.quota_project, property_id=property_name.split('/')[-1]
+            )
             
             users = []
             for user_link in response.get('userLinks', []):
@@ -160,7 +336,10 @@ class GoogleAnalyticsService:
                 parent=property_name,
                 body=user_link
             )
-            response = request.execute()
+            response = await ga4_api_executor.execute(
+                request, "userLinks.create", project=self.quota_project, property_id=property_name.split('/')[-1]
+            )
+            ga4_metadata_cache.invalidate(property_name)
             
             logger.info(f"Granted {permission_level.value} access to {email_address} for property {property_name}")
             
@@ -202,7 +381,10 @@ class GoogleAnalyticsService:
             request = self.service.properties().userLinks().delete(
                 name=user_link_name
             )
-            request.execute()
+            await ga4_api_executor.execute(
+                request, "userLinks.delete", project=self.quota_project, property_id=property_name.split('/')[-1]
+            )
+            ga4_metadata_cache.invalidate(property_name)
             
             logger.info(f"Revoked access for {email_address} from property {property_name}")
             return True
@@ -247,7 +429,10 @@ class GoogleAnalyticsService:
                 name=user_link_name,
                 body=user_link
             )
-            response = request.execute()
+            response = await ga4_api_executor.execute(
+                request, "userLinks.patch", project=self.quota_project, property_id=property_name.split('/')[-1]
+            )
+            ga4_metadata_cache.invalidate(property_name)
             
             logger.info(f"Updated {email_address} access to {new_permission_level.value} for property {property_name}")
             
@@ -262,6 +447,112 @@ class GoogleAnalyticsService:
             logger.error(f"Failed to update property access: {e}")
             raise GoogleAPIError(f"Failed to update property access: {e}")
     
+    async def batch_create_user_links(
+        self,
+        property_name: str,
+        grants: List[Tuple[str, PermissionLevel]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Grant access to many users of a GA4 property in one accessBindings.batchCreate call
+        
+        The call is transactional: if any binding cannot be created, none are.
+        
+        Returns:
+            The created bindings as user links, in request order
+        """
+        if not self.access_bindings_service:
+            raise GoogleAPIError("Google Analytics service not initialized")
+        
+        try:
+            request = self.access_bindings_service.properties().accessBindings().batchCreate(
+                parent=property_name,
+                body={'requests': [
+                    {
+                        'parent': property_name,
+                        'accessBinding': {
+                            'user': email_address,
+                            'roles': [self._convert_permission_level(permission_level)]
+                        }
+                    }
+                    for email_address, permission_level in grants
+                ]}
+            )
+            response = await ga4_api_executor.execute(
+                request, "accessBindings.batchCreate", project=self.quota_project, property_id=property_name.split('/')[-1]
+            )
+            ga4_metadata_cache.invalidate(property_name)
+            
+            logger.info(f"Granted access to {len(grants)} users for property {property_name}")
+            return [_user_link_from_access_binding(binding) for binding in response.get('accessBindings', [])]
+            
+        except HttpError as e:
+            logger.error(f"Failed to batch grant property access: {e}")
+            raise GoogleAPIError(f"Failed to batch grant property access: {e}")
+    
+    async def batch_update_user_links(
+        self,
+        property_name: str,
+        updates: List[Tuple[str, str, PermissionLevel]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Change the access level of many existing bindings in one accessBindings.batchUpdate call
+        
+        Args:
+            updates: (binding name, email address, new permission level) per binding
+        
+        Returns:
+            The updated bindings as user links, in request order
+        """
+        if not self.access_bindings_service:
+            raise GoogleAPIError("Google Analytics service not initialized")
+        
+        try:
+            request = self.access_bindings_service.properties().accessBindings().batchUpdate(
+                parent=property_name,
+                body={'requests': [
+                    {
+                        'accessBinding': {
+                            'name': user_link_name,
+                            'user': email_address,
+                            'roles': [self._convert_permission_level(permission_level)]
+                        }
+                    }
+                    for user_link_name, email_address, permission_level in updates
+                ]}
+            )
+            response = await ga4_api_executor.execute(
+                request, "accessBindings.batchUpdate", project=self.quota_project, property_id=property_name.split('/')[-1]
+            )
+            ga4_metadata_cache.invalidate(property_name)
+            
+            logger.info(f"Updated access of {len(updates)} users for property {property_name}")
+            return [_user_link_from_access_binding(binding) for binding in response.get('accessBindings', [])]
+            
+        except HttpError as e:
+            logger.error(f"Failed to batch update property access: {e}")
+            raise GoogleAPIError(f"Failed to batch update property access: {e}")
+    
+    async def batch_delete_user_links(self, property_name: str, user_link_names: List[str]) -> None:
+        """Revoke many bindings of a GA4 property in one accessBindings.batchDelete call"""
+        if not self.access_bindings_service:
+            raise GoogleAPIError("Google Analytics service not initialized")
+        
+        try:
+            request = self.access_bindings_service.properties().accessBindings().batchDelete(
+                parent=property_name,
+                body={'requests': [{'name': user_link_name} for user_link_name in user_link_names]}
+            )
+            await ga4_api_executor.execute(
+                request, "accessBindings.batchDelete", project=self.quota_project, property_id=property_name.split('/')[-1]
+            )
+            ga4_metadata_cache.invalidate(property_name)
+            
+            logger.info(f"Revoked access of {len(user_link_names)} users from property {property_name}")
+            
+        except HttpError as e:
+            logger.error(f"Failed to batch revoke property access: {e}")
+            raise GoogleAPIError(f"Failed to batch revoke property access: {e}")
+    
     async def validate_property_access(self, property_name: str) -> bool:
         """Validate if the service account has access to manage the property"""
         if not self.service:
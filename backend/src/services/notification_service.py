@@ -3,8 +3,8 @@ Notification service - Legacy compatible
 Handles email and other notification channels
 """
 
+import asyncio
 import json
-import smtplib
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 from email.mime.text import MIMEText
@@ -20,6 +20,7 @@ from ..models.db_models import (
 )
 from ..models.schemas import NotificationLogResponse
 from ..core.config import settings
+from .smtp_pool import smtp_pool
 import logging
 
 logger = logging.getLogger(__name__)
@@ -88,7 +89,7 @@ class NotificationService:
         return NotificationLogResponse.model_validate(notification_log)
     
     async def _send_email(self, recipient: str, subject: str, message_body: str):
-        """Send actual email using SMTP"""
+        """Send actual email through the shared SMTP pool"""
         
         if not settings.SMTP_HOST:
             logger.warning("SMTP not configured, skipping email send")
@@ -98,7 +99,7 @@ class NotificationService:
             # Create message
             msg = MIMEMultipart('alternative')
             msg['Subject'] = subject
-            msg['From'] = settings.SMTP_FROM_EMAIL
+            msg['From'] = f"{settings.EMAIL_FROM_NAME} <{settings.EMAIL_FROM}>"
             msg['To'] = recipient
             
             # Add HTML body
@@ -106,18 +107,75 @@ class NotificationService:
             msg.attach(html_part)
             
             # Send email
-            with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-                if settings.SMTP_TLS:
-                    server.starttls()
-                if settings.SMTP_USERNAME and settings.SMTP_PASSWORD:
-                    server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
-                
-                server.send_message(msg)
+            await smtp_pool.send(msg)
                 
         except Exception as e:
             logger.error(f"SMTP error: {e}")
             raise
     
+    async def send_email_batch(
+        self,
+        messages: List[Dict[str, Any]],
+        concurrency: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Send many emails with bounded concurrency
+        
+        Each message has the keyword arguments of send_email_notification. All
+        notification logs are written in one commit before sending and their
+        outcomes in one commit after, rather than three commits per email.
+        """
+        if not messages:
+            return {"sent": 0, "failed": 0}
+        
+        concurrency = concurrency or settings.NOTIFICATION_SEND_CONCURRENCY
+        notification_logs = [
+            NotificationLog(
+                audit_log_id=message.get("audit_log_id"),
+                channel=NotificationChannel.EMAIL,
+                recipient=message["recipient"],
+                template_type=message["template_type"],
+                subject=message["subject"],
+                message_body=message["message_body"],
+                template_data=json.dumps(message["template_data"]) if message.get("template_data") else None,
+                status=NotificationStatus.PENDING
+            )
+            for message in messages
+        ]
+        self.db.add_all(notification_logs)
+        await self.db.commit()
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def send(notification_log: NotificationLog) -> Optional[Exception]:
+            async with semaphore:
+                try:
+                    await self._send_email(
+                        notification_log.recipient, notification_log.subject, notification_log.message_body
+                    )
+                except Exception as e:
+                    return e
+            return None
+        
+        # The session is only touched again once every send has finished
+        errors = await asyncio.gather(*(send(notification_log) for notification_log in notification_logs))
+        
+        sent_at = datetime.utcnow()
+        for notification_log, error in zip(notification_logs, errors):
+            if error is None:
+                notification_log.status = NotificationStatus.SENT
+                notification_log.sent_at = sent_at
+            else:
+                logger.error(f"Failed to send email to {notification_log.recipient}: {error}")
+                notification_log.error_message = str(error)
+                notification_log.retry_count = 1
+                # Picked up by retry_failed_notifications
+                notification_log.status = NotificationStatus.RETRYING
+        await self.db.commit()
+        
+        failed = sum(1 for error in errors if error is not None)
+        return {"sent": len(messages) - failed, "failed": failed}
+    
     async def send_permission_request_notification(
         self,
         admin_email: str,
@@ -290,21 +348,76 @@ class NotificationService:
     ) -> NotificationLogResponse:
         """Send permission expiry notification"""
         
-        subject = f"GA4 Permission Expiring - {property_name} ({days_until_expiry} days)"
+        message = self._permission_expiry_message(
+            recipient_email,
+            [{
+                "user_name": user_name,
+                "property_name": property_name,
+                "permission_level": permission_level,
+                "expires_at": expires_at,
+                "days_until_expiry": days_until_expiry
+            }]
+        )
+        
+        return await self.send_email_notification(audit_log_id=audit_log_id, **message)
+    
+    async def send_permission_expiry_digests(
+        self,
+        digests: Dict[str, List[Dict[str, Any]]],
+        concurrency: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Send one expiry email per recipient covering all of their expiring permissions
+        
+        ``digests`` maps recipient email to permissions, each with user_name,
+        property_name, permission_level, expires_at and days_until_expiry.
+        """
+        messages = [
+            self._permission_expiry_message(recipient, permissions)
+            for recipient, permissions in digests.items()
+        ]
+        return await self.send_email_batch(messages, concurrency)
+    
+    @staticmethod
+    def _permission_expiry_message(recipient_email: str, permissions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the expiry email for one or more permissions of a recipient"""
+        
+        if len(permissions) == 1:
+            permission = permissions[0]
+            subject = (
+                f"GA4 Permission Expiring - {permission['property_name']} "
+                f"({permission['days_until_expiry']} days)"
+            )
+            heading = "GA4 Permission Expiring Soon"
+            intro = "Your GA4 permission is expiring soon and will need to be renewed."
+            section = "Expiring Permission:"
+        else:
+            soonest = min(permission["days_until_expiry"] for permission in permissions)
+            subject = f"GA4 Permissions Expiring - {len(permissions)} permissions (from {soonest} days)"
+            heading = "GA4 Permissions Expiring Soon"
+            intro = "Several of your GA4 permissions are expiring soon and will need to be renewed."
+            section = "Expiring Permissions:"
+        
+        items = "".join(
+            f"""
+            <ul>
+                <li><strong>Property:</strong> {permission['property_name']}</li>
+                <li><strong>Permission Level:</strong> {permission['permission_level']}</li>
+                <li><strong>Expires:</strong> {permission['expires_at'].strftime('%Y-%m-%d %H:%M:%S UTC')}</li>
+                <li><strong>Days Remaining:</strong> {permission['days_until_expiry']}</li>
+            </ul>
+            """
+            for permission in permissions
+        )
         
         message_body = f"""
         <html>
         <body>
-            <h2>GA4 Permission Expiring Soon</h2>
-            <p>Your GA4 permission is expiring soon and will need to be renewed.</p>
+            <h2>{heading}</h2>
+            <p>{intro}</p>
             
-            <h3>Expiring Permission:</h3>
-            <ul>
-                <li><strong>Property:</strong> {property_name}</li>
-                <li><strong>Permission Level:</strong> {permission_level}</li>
-                <li><strong>Expires:</strong> {expires_at.strftime('%Y-%m-%d %H:%M:%S UTC')}</li>
-                <li><strong>Days Remaining:</strong> {days_until_expiry}</li>
-            </ul>
+            <h3>{section}</h3>
+            {items}
             
             <p>To maintain access, please submit a new permission request or contact your administrator for an extension.</p>
             
@@ -313,22 +426,25 @@ class NotificationService:
         </html>
         """
         
-        template_data = {
-            "user_name": user_name,
-            "property_name": property_name,
-            "permission_level": permission_level,
-            "expires_at": expires_at.isoformat(),
-            "days_until_expiry": days_until_expiry
-        }
+        template_data = [
+            {
+                "user_name": permission["user_name"],
+                "property_name": permission["property_name"],
+                "permission_level": permission["permission_level"],
+                "expires_at": permission["expires_at"].isoformat(),
+                "days_until_expiry": permission["days_until_expiry"]
+            }
+            for permission in permissions
+        ]
         
-        return await self.send_email_notification(
-            recipient=recipient_email,
-            subject=subject,
-            message_body=message_body,
-            template_type="permission_expiry",
-            template_data=template_data,
-            audit_log_id=audit_log_id
-        )
+        return {
+            "recipient": recipient_email,
+            "subject": subject,
+            "message_body": message_body,
+            "template_type": "permission_expiry",
+            # A single permission keeps the original template data shape
+            "template_data": template_data[0] if len(template_data) == 1 else {"permissions": template_data}
+        }
     
     async def send_permission_revoked_notification(
         self,
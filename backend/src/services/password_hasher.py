@@ -0,0 +1,192 @@
+"""
+Off-loop password hashing
+
+bcrypt is deliberately slow (about 0.3 s per hash at cost 12) and used to run
+inline in the login handler, so every login stalled the event loop and every
+other request on the worker for that long. Hashing and verification now run on
+a process pool sized to the available cores. Admission is bounded: when
+PASSWORD_HASH_MAX_PENDING jobs are already queued or running, new ones fail
+fast with a 503 instead of queueing logins behind seconds of CPU work.
+
+verify_and_update also reports whether the stored hash was made with other
+parameters than PASSWORD_HASH_ROUNDS, and returns a fresh hash in that case so
+login can upgrade it transparently.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from passlib.context import CryptContext
+
+from ..core.config import settings
+from ..core.exceptions import ServiceUnavailableError
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def crypt_context(rounds: int) -> CryptContext:
+    """bcrypt context that treats hashes of any other cost as needing an update"""
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds
+    )
+
+
+def available_cores() -> int:
+    """CPU cores this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+# Worker functions; module level so the pool's processes can import them
+
+def _hash(password: str, rounds: int) -> str:
+    return crypt_context(rounds).hash(password)
+
+
+def _verify_and_update(password: str, hashed: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    try:
+        return crypt_context(rounds).verify_and_update(password, hashed)
+    except ValueError:
+        # Not a hash this context can identify
+        return False, None
+
+
+class PasswordHasher:
+    """Bounded process pool for bcrypt hashing and verification"""
+
+    def __init__(
+        self,
+        workers: int = settings.PASSWORD_HASH_WORKERS,
+        max_pending: int = settings.PASSWORD_HASH_MAX_PENDING,
+        rounds: int = settings.PASSWORD_HASH_ROUNDS
+    ):
+        self.workers = workers or available_cores()
+        self.max_pending = max_pending or 4 * self.workers
+        self.rounds = rounds
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.pool_restarts = 0
+        self.total_time = 0.0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Create the worker pool on first use"""
+        if self._pool is None:
+            # spawn rather than fork: the server process has threads (GA4 executor, DB driver)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def _release(self, _: Future) -> None:
+        """Free an admission slot once the worker is done with the job, even if its caller gave up"""
+        with self._lock:
+            self.pending -= 1
+
+    async def _run(self, function: Callable, *args) -> Any:
+        """Run a job on the pool, or fail fast when max_pending jobs are already admitted"""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise ServiceUnavailableError("Too many concurrent sign-ins, please retry shortly")
+            self.pending += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+
+        started = time.perf_counter()
+        try:
+            try:
+                future = self._get_pool().submit(function, *args)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM-killed); replace the pool once
+                logger.warning("Password hashing pool is broken, restarting it")
+                self._pool = None
+                self.pool_restarts += 1
+                future = self._get_pool().submit(function, *args)
+        except BaseException:
+            self._release(None)
+            raise
+
+        future.add_done_callback(self._release)
+        result = await asyncio.wrap_future(future)
+        self.completed += 1
+        self.total_time += time.perf_counter() - started
+        return result
+
+    async def hash(self, password: str) -> str:
+        """Hash a password with the configured parameters"""
+        return await self._run(_hash, password, self.rounds)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        """Verify a password against its hash"""
+        valid, _ = await self._run(_verify_and_update, password, hashed, self.rounds)
+        return valid
+
+    async def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password; on success with outdated hash parameters also return a new hash
+
+        Returns:
+            (valid, new_hash) where new_hash is None unless the stored hash should be replaced
+        """
+        valid, new_hash = await self._run(_verify_and_update, password, hashed, self.rounds)
+        if new_hash:
+            self.rehashed += 1
+        return valid, new_hash
+
+    async def start(self) -> None:
+        """Start the worker processes so the first logins do not pay for spawning them"""
+        pool = self._get_pool()
+        await asyncio.gather(*(
+            asyncio.wrap_future(pool.submit(available_cores)) for _ in range(self.workers)
+        ))
+        logger.info(f"Password hashing pool started with {self.workers} workers")
+
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hasher statistics for monitoring"""
+        return {
+            "workers": self.workers,
+            "rounds": self.rounds,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "peak_pending": self.peak_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "rehashed": self.rehashed,
+            "pool_restarts": self.pool_restarts,
+            "avg_time": self.total_time / self.completed if self.completed else 0.0
+        }
+
+
+# Global hasher shared by the auth and user services
+password_hasher = PasswordHasher()
+
+
+def get_password_hasher_stats() -> Dict[str, Any]:
+    """Get password hasher statistics"""
+    return password_hasher.get_stats()
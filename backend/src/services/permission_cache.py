@@ -0,0 +1,352 @@
+"""
+Process-wide permission decision cache for the RBAC service
+
+RBACService is constructed per request, so decisions are cached here instead of
+on the instance. Entries are bounded (LRU) and expire after a TTL. Role and
+override changes invalidate a single user's entries; with Redis enabled the
+invalidation is also published so every worker drops its copy.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from ..core.config import settings
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - redis is optional
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "rbac:permission-cache:invalidate"
+REDIS_RECONNECT_MIN_DELAY = 1.0
+REDIS_RECONNECT_MAX_DELAY = 30.0
+
+CacheKey = Tuple[int, str, Optional[int], Optional[str], Optional[str]]
+
+
+class PermissionDecisionCache:
+    """Bounded LRU + TTL cache of permission check results"""
+
+    def __init__(
+        self,
+        max_entries: int = settings.RBAC_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = settings.RBAC_CACHE_TTL_SECONDS
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[CacheKey, Tuple[bool, float]]" = OrderedDict()
+        self._user_keys: Dict[int, Set[CacheKey]] = {}
+        self._user_generations: Dict[int, int] = {}
+        self._global_generation = 0
+        self._role_change_listeners: List[Callable[[], None]] = []
+        self._revocation_listeners: List[Callable[[int, float], None]] = []
+        self._resync_listeners: List[Callable[[], None]] = []
+
+        self._redis = None
+        self._listener: Optional[asyncio.Task] = None
+        self._subscribed = False
+        self._instance_id = f"{id(self):x}-{time.time_ns():x}"
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.reconnects = 0
+
+    @staticmethod
+    def make_key(
+        user_id: int,
+        permission: Any,
+        client_id: Optional[int] = None,
+        resource_id: Optional[str] = None,
+        context: Any = None
+    ) -> CacheKey:
+        """Build the cache key for a permission check"""
+        return (
+            user_id,
+            getattr(permission, "value", permission),
+            client_id,
+            resource_id,
+            getattr(context, "value", context)
+        )
+
+    # ==================== LOOKUPS ====================
+
+    def get(self, key: CacheKey) -> Optional[bool]:
+        """Get a cached decision, or None if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        result, expires_at = entry
+        if time.monotonic() >= expires_at:
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def generation(self, user_id: int) -> Tuple[int, int]:
+        """
+        Snapshot of the invalidation state for a user
+
+        Taken before a permission is computed and passed back to ``set`` so a
+        result computed from data that was invalidated meanwhile is not cached.
+        """
+        return self._global_generation, self._user_generations.get(user_id, 0)
+
+    def set(self, key: CacheKey, result: bool, generation: Optional[Tuple[int, int]] = None) -> None:
+        """Cache a decision"""
+        if self.max_entries <= 0:
+            return
+
+        user_id = key[0]
+        if generation is not None and generation != self.generation(user_id):
+            return
+
+        self._entries[key] = (result, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        self._user_keys.setdefault(user_id, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def _remove(self, key: CacheKey) -> None:
+        """Drop a single entry and its per-user index"""
+        self._entries.pop(key, None)
+        user_keys = self._user_keys.get(key[0])
+        if user_keys is not None:
+            user_keys.discard(key)
+            if not user_keys:
+                del self._user_keys[key[0]]
+
+    # ==================== INVALIDATION ====================
+
+    def invalidate_user_local(self, user_id: int) -> None:
+        """Drop all cached decisions for a user in this process"""
+        self._user_generations[user_id] = self._user_generations.get(user_id, 0) + 1
+        if len(self._user_generations) > max(self.max_entries, 1):
+            # Forgetting a user's counter could let a stale in-flight result match
+            # it again, so counters are dropped together with a global bump instead
+            self._user_generations.clear()
+            self._global_generation += 1
+        for key in self._user_keys.pop(user_id, set()):
+            self._entries.pop(key, None)
+        self.invalidations += 1
+
+    def clear_local(self) -> None:
+        """Drop all cached decisions in this process"""
+        self._entries.clear()
+        self._user_keys.clear()
+        self._global_generation += 1
+        self.invalidations += 1
+
+    async def invalidate_user(self, user_id: int) -> None:
+        """Drop a user's decisions here and in every other worker"""
+        self.invalidate_user_local(user_id)
+        await self._publish({"user_id": user_id})
+
+    async def clear(self) -> None:
+        """Drop all decisions here and in every other worker"""
+        self.clear_local()
+        await self._publish({"all": True})
+
+    def add_role_change_listener(self, callback: Callable[[], None]) -> None:
+        """Register a callback run when another worker changes role permissions"""
+        self._role_change_listeners.append(callback)
+
+    async def invalidate_roles(self) -> None:
+        """Drop all decisions after a role permission change, here and in every other worker"""
+        self.clear_local()
+        await self._publish({"all": True, "roles": True})
+
+    def add_revocation_listener(self, callback: Callable[[int, float], None]) -> None:
+        """Register a callback run with (user_id, revoked_at) when another worker revokes a user"""
+        self._revocation_listeners.append(callback)
+
+    def add_resync_listener(self, callback: Callable[[], None]) -> None:
+        """Register a callback run whenever the Redis subscription (re)starts and earlier messages may be missed"""
+        self._resync_listeners.append(callback)
+
+    async def publish_revocation(self, user_id: int, revoked_at: float) -> None:
+        """Tell every other worker that a user's issued tokens must no longer be trusted"""
+        await self._publish({"revoked_user_id": user_id, "revoked_at": revoked_at})
+
+    def _resync(self) -> None:
+        """Notify listeners that invalidations may have been missed"""
+        for callback in self._resync_listeners:
+            callback()
+
+    # ==================== REDIS BACKING ====================
+
+    async def connect_redis(self, url: str = settings.REDIS_URL) -> bool:
+        """Share invalidations with other workers through Redis pub/sub"""
+        if aioredis is None:
+            logger.warning("redis package not installed; permission cache invalidation stays process-local")
+            return False
+
+        try:
+            client = aioredis.from_url(url)
+            pubsub = client.pubsub()
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+        except Exception as e:
+            logger.error(f"Failed to connect permission cache to Redis: {e}")
+            return False
+
+        self._redis = client
+        self._subscribed = True
+        self._resync()
+        self._listener = asyncio.create_task(self._listen(pubsub))
+        logger.info("Permission cache invalidation connected to Redis")
+        return True
+
+    async def disconnect_redis(self) -> None:
+        """Stop listening for invalidations and close the Redis connection"""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+        self._subscribed = False
+
+    @property
+    def redis_connected(self) -> bool:
+        """Whether invalidations from other workers are currently being received"""
+        return self._redis is not None and self._subscribed
+
+    async def _publish(self, message: Dict[str, Any]) -> None:
+        """Publish an invalidation to other workers"""
+        if self._redis is None:
+            return
+
+        try:
+            await self._redis.publish(
+                INVALIDATION_CHANNEL,
+                json.dumps({**message, "origin": self._instance_id})
+            )
+        except Exception as e:
+            # Other workers fall back to TTL expiry
+            logger.error(f"Failed to publish permission cache invalidation: {e}")
+
+    async def _listen(self, pubsub) -> None:
+        """Apply invalidations published by other workers, resubscribing with backoff if Redis drops"""
+        delay = REDIS_RECONNECT_MIN_DELAY
+        while True:
+            try:
+                if pubsub is None:
+                    pubsub = self._redis.pubsub()
+                    await pubsub.subscribe(INVALIDATION_CHANNEL)
+                    self._subscribed = True
+                    self._resync()
+                    self.reconnects += 1
+                    logger.info("Permission cache invalidation resubscribed to Redis")
+                delay = REDIS_RECONNECT_MIN_DELAY
+
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    self.apply_invalidation(message["data"])
+                raise ConnectionError("subscription closed")
+            except asyncio.CancelledError:
+                if pubsub is not None:
+                    try:
+                        await pubsub.unsubscribe(INVALIDATION_CHANNEL)
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+                raise
+            except Exception as e:
+                if self._subscribed:
+                    logger.error(f"Permission cache invalidation listener lost Redis: {e}")
+                self._subscribed = False
+
+            if pubsub is not None:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+                pubsub = None
+
+            # Invalidations published while disconnected were missed
+            self.clear_local()
+            for callback in self._role_change_listeners:
+                callback()
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, REDIS_RECONNECT_MAX_DELAY)
+
+    def apply_invalidation(self, data: Any) -> None:
+        """Apply an invalidation message received from Redis"""
+        try:
+            payload = json.loads(data)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring malformed permission cache invalidation: {data!r}")
+            return
+
+        if payload.get("origin") == self._instance_id:
+            return
+
+        if payload.get("revoked_user_id") is not None:
+            for callback in self._revocation_listeners:
+                callback(int(payload["revoked_user_id"]), float(payload["revoked_at"]))
+            return
+
+        if payload.get("roles"):
+            for callback in self._role_change_listeners:
+                callback()
+
+        if payload.get("all"):
+            self.clear_local()
+        elif payload.get("user_id") is not None:
+            self.invalidate_user_local(int(payload["user_id"]))
+
+    # ==================== MONITORING ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "redis_connected": self.redis_connected,
+            "redis_reconnects": self.reconnects
+        }
+
+    def reset_stats(self) -> None:
+        """Reset hit/miss counters"""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+
+# Global cache instance shared by all RBACService instances
+permission_decision_cache = PermissionDecisionCache()
+
+
+def get_permission_cache_stats() -> Dict[str, Any]:
+    """Get permission decision cache statistics"""
+    return permission_decision_cache.get_stats()
@@ -16,8 +16,9 @@ from ..models.db_models import (
 from ..models.schemas import (
     PermissionRequestCreate, PermissionRequestResponse, 
     ClientPropertiesResponse, ServiceAccountWithPropertiesResponse,
-    AutoApprovalRuleResponse
+    AutoApprovalRuleResponse, CursorPage
 )
+from ..core.pagination import keyset_page
 from ..core.exceptions import (
     ValidationError, BusinessRuleViolationError, DuplicateResourceError,
     UnauthorizedError, ResourceNotFoundError
@@ -467,19 +468,7 @@ class PermissionRequestService:
     ) -> List[PermissionRequestResponse]:
         """Get permission requests for a user"""
         
-        query = (
-            select(PermissionRequest)
-            .options(
-                selectinload(PermissionRequest.user),
-                selectinload(PermissionRequest.client),
-                selectinload(PermissionRequest.processed_by)
-            )
-            .where(PermissionRequest.user_id == user_id)
-        )
-        
-        if status:
-            query = query.where(PermissionRequest.status == status)
-        
+        query = self._user_requests_query(user_id, status)
         query = query.order_by(desc(PermissionRequest.created_at)).limit(limit).offset(offset)
         
         result = await self.db.execute(query)
@@ -495,6 +484,74 @@ class PermissionRequestService:
     ) -> List[PermissionRequestResponse]:
         """Get pending permission requests that the approver can approve"""
         
+        query = await self._pending_requests_query(approver_id)
+        query = query.order_by(desc(PermissionRequest.created_at)).limit(limit).offset(offset)
+        
+        result = await self.db.execute(query)
+        requests = result.scalars().all()
+        
+        return [await self._build_permission_request_response(req) for req in requests]
+    
+    async def get_user_permission_requests_page(
+        self,
+        user_id: int,
+        status: Optional[PermissionRequestStatus] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> CursorPage[PermissionRequestResponse]:
+        """Get a page of a user's permission requests, newest first, continuing after ``cursor``"""
+        
+        requests, next_cursor = await keyset_page(
+            self.db, self._user_requests_query(user_id, status),
+            PermissionRequest.created_at, PermissionRequest.id, limit, cursor
+        )
+        
+        return CursorPage[PermissionRequestResponse](
+            items=[await self._build_permission_request_response(req) for req in requests],
+            next_cursor=next_cursor,
+            size=limit
+        )
+    
+    async def get_pending_requests_for_approval_page(
+        self,
+        approver_id: int,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> CursorPage[PermissionRequestResponse]:
+        """Get a page of the requests an approver can approve, newest first, continuing after ``cursor``"""
+        
+        requests, next_cursor = await keyset_page(
+            self.db, await self._pending_requests_query(approver_id),
+            PermissionRequest.created_at, PermissionRequest.id, limit, cursor
+        )
+        
+        return CursorPage[PermissionRequestResponse](
+            items=[await self._build_permission_request_response(req) for req in requests],
+            next_cursor=next_cursor,
+            size=limit
+        )
+    
+    def _user_requests_query(self, user_id: int, status: Optional[PermissionRequestStatus]):
+        """Unordered query of a user's permission requests"""
+        
+        query = (
+            select(PermissionRequest)
+            .options(
+                selectinload(PermissionRequest.user),
+                selectinload(PermissionRequest.client),
+                selectinload(PermissionRequest.processed_by)
+            )
+            .where(PermissionRequest.user_id == user_id)
+        )
+        
+        if status:
+            query = query.where(PermissionRequest.status == status)
+        
+        return query
+    
+    async def _pending_requests_query(self, approver_id: int):
+        """Unordered query of the pending requests an approver can approve"""
+        
         approver = await self.db.get(User, approver_id)
         if not approver:
             raise ResourceNotFoundError(f"Approver {approver_id} not found")
@@ -525,12 +582,7 @@ class PermissionRequestService:
             # Other roles cannot approve anything
             query = query.where(False)  # Return empty result
         
-        query = query.order_by(desc(PermissionRequest.created_at)).limit(limit).offset(offset)
-        
-        result = await self.db.execute(query)
-        requests = result.scalars().all()
-        
-        return [await self._build_permission_request_response(req) for req in requests]
+        return query
     
     def _has_sufficient_role(self, user_role: UserRole, required_role: UserRole) -> bool:
         """Check if user role is sufficient for the required role"""
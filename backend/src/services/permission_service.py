@@ -14,7 +14,7 @@ from ..models.db_models import (
     PermissionLevel, PermissionStatus, UserRole
 )
 from ..models.schemas import PermissionGrantCreate, PermissionGrantUpdate, PermissionGrantResponse
-from ..services.google_api_service import GoogleAnalyticsService
+from ..services.ga4_client_registry import ga4_client_registry
 from ..services.audit_service import AuditService
 import logging
 
@@ -26,7 +26,7 @@ class PermissionService:
     
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.ga_service = GoogleAnalyticsService()
+        self.ga_service = ga4_client_registry.get()
         self.audit_service = AuditService(db)
     
     async def create_permission_request(
@@ -161,7 +161,8 @@ class PermissionService:
                 action="approve_permission_request",
                 resource_type="permission_grant",
                 resource_id=str(grant.id),
-                details=f"Approved {grant.permission_level.value} access for {grant.target_email}"
+                details=f"Approved {grant.permission_level.value} access for {grant.target_email}",
+                durable=True
             )
             
             logger.info(f"Successfully approved permission grant {grant_id}")
@@ -273,7 +274,8 @@ class PermissionService:
                 action="revoke_permission",
                 resource_type="permission_grant",
                 resource_id=str(grant.id),
-                details=f"Revoked {grant.permission_level.value} access for {grant.target_email}"
+                details=f"Revoked {grant.permission_level.value} access for {grant.target_email}",
+                durable=True
             )
             
             logger.info(f"Successfully revoked permission grant {grant_id}")
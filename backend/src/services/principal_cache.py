@@ -0,0 +1,260 @@
+"""
+Authenticated principal cache
+
+``get_current_user`` used to load the user row on every request. Handlers only
+need a handful of fields (id, email, role, status, client ids), so those are
+resolved once into an immutable principal and cached for a short TTL. In
+stateless mode the principal is built straight from signed token claims and the
+database is only consulted for users whose access was revoked after the token
+was issued.
+
+Revocations are shared between workers over the permission cache's Redis
+channel. Token claims are only trusted while that channel is subscribed, and
+only for tokens issued after the subscription started, so a worker never
+trusts a token whose revocation it may have missed.
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..models.db_models import (
+    User, UserRole, UserStatus, ClientAssignment, ClientAssignmentStatus
+)
+from .permission_cache import PermissionDecisionCache, permission_decision_cache
+
+# Claims embedded in access tokens for stateless authentication
+CLAIM_STATUS = "status"
+CLAIM_CLIENT_IDS = "client_ids"
+
+
+@dataclass(frozen=True)
+class AuthenticatedPrincipal:
+    """The fields of the current user that request handlers rely on"""
+    id: int
+    email: str
+    role: UserRole
+    status: UserStatus
+    client_ids: Tuple[int, ...] = ()
+    source: str = "database"  # 'database' or 'token'
+
+    @property
+    def is_active(self) -> bool:
+        """Check if the principal may use the system"""
+        return self.status == UserStatus.ACTIVE
+
+    @classmethod
+    def from_claims(cls, payload: Dict[str, Any]) -> Optional["AuthenticatedPrincipal"]:
+        """Build a principal from token claims, or None if they are incomplete"""
+        try:
+            return cls(
+                id=int(payload["user_id"]),
+                email=payload["sub"],
+                role=UserRole(payload["role"]),
+                status=UserStatus(payload[CLAIM_STATUS]),
+                client_ids=tuple(int(client_id) for client_id in payload[CLAIM_CLIENT_IDS]),
+                source="token"
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+async def load_principal(db: AsyncSession, email: str) -> Optional[AuthenticatedPrincipal]:
+    """Read a principal from the database without loading the full user row"""
+    result = await db.execute(
+        select(User.id, User.email, User.role, User.status).where(User.email == email)
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+
+    return AuthenticatedPrincipal(
+        id=row.id,
+        email=row.email,
+        role=row.role,
+        status=row.status,
+        client_ids=await load_client_ids(db, row.id)
+    )
+
+
+async def load_client_ids(db: AsyncSession, user_id: int) -> Tuple[int, ...]:
+    """Get the ids of the clients a user is actively assigned to"""
+    result = await db.execute(
+        select(ClientAssignment.client_id)
+        .where(
+            ClientAssignment.user_id == user_id,
+            ClientAssignment.status == ClientAssignmentStatus.ACTIVE
+        )
+        .order_by(ClientAssignment.client_id)
+    )
+    return tuple(result.scalars().all())
+
+
+class PrincipalCache:
+    """Bounded TTL cache of authenticated principals keyed by email"""
+
+    def __init__(
+        self,
+        ttl_seconds: float = settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS,
+        max_entries: int = settings.AUTH_PRINCIPAL_CACHE_MAX_ENTRIES,
+        revocation_channel: Optional[PermissionDecisionCache] = permission_decision_cache
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.revocation_channel = revocation_channel
+        self._entries: "OrderedDict[str, Tuple[AuthenticatedPrincipal, float]]" = OrderedDict()
+        # user_id -> revocation time, oldest first
+        self._revoked_at: "OrderedDict[int, float]" = OrderedDict()
+        # Tokens issued before this are never trusted; None until the channel is subscribed
+        self._trusted_since: Optional[float] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.token_principals = 0
+        self.database_loads = 0
+
+    def get(self, email: str) -> Optional[AuthenticatedPrincipal]:
+        """Get a cached principal, or None if missing or expired"""
+        entry = self._entries.get(email)
+        if entry is None or time.monotonic() >= entry[1]:
+            self._entries.pop(email, None)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(email)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, principal: AuthenticatedPrincipal) -> None:
+        """Cache a principal"""
+        if self.max_entries <= 0:
+            return
+
+        self._entries[principal.email] = (principal, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(principal.email)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # ==================== STATELESS TOKENS ====================
+
+    @property
+    def stateless_available(self) -> bool:
+        """Whether revocations from other workers are being received"""
+        return (
+            self.revocation_channel is not None
+            and self.revocation_channel.redis_connected
+            and self._trusted_since is not None
+        )
+
+    def claims_trusted(self, payload: Dict[str, Any]) -> bool:
+        """Check that token claims were issued after the subscription started and the user's last revocation"""
+        issued_at = payload.get("iat")
+        if issued_at is None or self._trusted_since is None or issued_at <= self._trusted_since:
+            return False
+
+        revoked_at = self._revoked_at.get(payload.get("user_id"))
+        return revoked_at is None or issued_at > revoked_at
+
+    def resync(self, at: Optional[float] = None) -> None:
+        """Distrust tokens issued before now, after revocations may have been missed"""
+        self._trusted_since = time.time() if at is None else at
+
+    def _record_revocation(self, user_id: int, revoked_at: float) -> None:
+        """Remember a revocation for as long as tokens issued before it can be valid"""
+        self._revoked_at.pop(user_id, None)
+        self._revoked_at[user_id] = revoked_at
+
+        horizon = time.time() - settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        while self._revoked_at:
+            oldest_user, oldest_at = next(iter(self._revoked_at.items()))
+            if oldest_at > horizon and len(self._revoked_at) <= self.max_entries:
+                break
+            del self._revoked_at[oldest_user]
+            if oldest_at > horizon and self._trusted_since is not None:
+                # Forgetting a live revocation means distrusting every token issued before it
+                self._trusted_since = max(self._trusted_since, oldest_at)
+
+    async def resolve(
+        self,
+        db: AsyncSession,
+        payload: Dict[str, Any],
+        stateless: Optional[bool] = None
+    ) -> Optional[AuthenticatedPrincipal]:
+        """Resolve the principal for a decoded token"""
+        if stateless is None:
+            stateless = settings.AUTH_STATELESS_TOKENS
+
+        email = payload.get("sub")
+        cached = self.get(email)
+        if cached is not None:
+            return cached
+
+        principal = None
+        if stateless and self.stateless_available and self.claims_trusted(payload):
+            principal = AuthenticatedPrincipal.from_claims(payload)
+            if principal is not None:
+                self.token_principals += 1
+
+        if principal is None:
+            principal = await load_principal(db, email)
+            self.database_loads += 1
+
+        if principal is not None:
+            self.set(principal)
+        return principal
+
+    def invalidate(self, user_id: int, email: Optional[str] = None, revoked_at: Optional[float] = None) -> None:
+        """
+        Forget a user's principal in this process after their role, status or assignments change
+
+        Tokens issued before the revocation stop being trusted for stateless
+        authentication, so the next request for the user reads the database.
+        """
+        self._record_revocation(user_id, time.time() if revoked_at is None else revoked_at)
+        if email is not None:
+            self._entries.pop(email, None)
+        else:
+            for cached_email, (principal, _) in list(self._entries.items()):
+                if principal.id == user_id:
+                    del self._entries[cached_email]
+
+    async def revoke(self, user_id: int, email: Optional[str] = None) -> None:
+        """Forget a user's principal here and in every other worker"""
+        revoked_at = time.time()
+        self.invalidate(user_id, email, revoked_at)
+        if self.revocation_channel is not None:
+            await self.revocation_channel.publish_revocation(user_id, revoked_at)
+
+    def clear(self) -> None:
+        """Drop all cached principals"""
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "token_principals": self.token_principals,
+            "database_loads": self.database_loads,
+            "revoked_users": len(self._revoked_at),
+            "stateless_available": self.stateless_available
+        }
+
+
+# Global principal cache instance
+principal_cache = PrincipalCache()
+
+# Revocations made by other workers arrive through the permission cache's Redis channel
+permission_decision_cache.add_revocation_listener(
+    lambda user_id, revoked_at: principal_cache.invalidate(user_id, revoked_at=revoked_at)
+)
+permission_decision_cache.add_resync_listener(principal_cache.resync)
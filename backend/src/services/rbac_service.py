@@ -20,6 +20,10 @@ from ..models.db_models import (
     Permission, PermissionScope, PermissionContext
 )
 from ..core.exceptions import AuthorizationError
+from .permission_cache import permission_decision_cache, PermissionDecisionCache
+from .role_permission_matrix import (
+    role_permission_matrix, RolePermissionMatrix, RolePermissionSnapshot
+)
 
 logger = logging.getLogger(__name__)
 
@@ -27,10 +31,16 @@ logger = logging.getLogger(__name__)
 class RBACService:
     """Role-Based Access Control Service"""
     
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self,
+        db: AsyncSession,
+        cache: Optional[PermissionDecisionCache] = None,
+        matrix: Optional[RolePermissionMatrix] = None
+    ):
         self.db = db
-        self._permission_cache: Dict[str, Dict] = {}
-        self._cache_ttl = timedelta(minutes=5)  # 5-minute cache TTL
+        # Decisions and the role matrix are shared process-wide; instances are created per request
+        self._permission_cache = cache or permission_decision_cache
+        self._role_matrix = matrix or role_permission_matrix
     
     # ==================== CORE PERMISSION CHECKING ====================
     
@@ -73,12 +83,13 @@ class RBACService:
                 return cached_result
             
             # Perform actual permission check
+            generation = self._permission_cache.generation(user_id)
             has_permission = await self._check_permission_internal(
                 user_id, permission, resource_id, client_id, context
             )
             
-            # Cache the result
-            self._cache_permission(cache_key, has_permission)
+            # Cache the result unless the user was invalidated meanwhile
+            self._cache_permission(cache_key, has_permission, generation)
             
             return has_permission
             
@@ -124,6 +135,8 @@ class RBACService:
                     selectinload(User.client_assignments)
                 )
                 .where(User.id == user_id)
+                # Role/override writes made through this session must be visible
+                .execution_options(populate_existing=True)
             )
             return result.scalar_one_or_none()
         except Exception as e:
@@ -184,14 +197,10 @@ class RBACService:
         if not valid_roles:
             return False
         
-        # Check each role for the permission
+        # The compiled matrix already includes permissions inherited from lower roles
+        snapshot = await self._get_role_matrix()
         for role, role_context in valid_roles:
-            if await self._role_has_permission(role, permission, role_context, resource_id, client_id, context):
-                return True
-        
-        # Check role inheritance - higher roles inherit lower role permissions
-        for role, role_context in valid_roles:
-            if await self._check_inherited_permissions(role, permission, role_context, resource_id, client_id, context):
+            if snapshot.allows(role, permission, role_context, client_id, context):
                 return True
         
         return False
@@ -215,72 +224,9 @@ class RBACService:
         
         return valid_roles
     
-    async def _role_has_permission(
-        self,
-        role: UserRole,
-        permission: Permission,
-        role_client_id: Optional[int],
-        resource_id: Optional[str] = None,
-        client_id: Optional[int] = None,
-        context: Optional[PermissionContext] = None
-    ) -> bool:
-        """Check if a specific role has a permission"""
-        
-        try:
-            # Query role permissions
-            result = await self.db.execute(
-                select(RolePermission)
-                .where(
-                    and_(
-                        RolePermission.role == role,
-                        RolePermission.permission == permission,
-                        RolePermission.is_active == True
-                    )
-                )
-            )
-            
-            role_permissions = result.scalars().all()
-            
-            for role_perm in role_permissions:
-                if self._role_permission_matches_context(role_perm, role_client_id, resource_id, client_id, context):
-                    return True
-            
-            return False
-            
-        except Exception as e:
-            logger.error(f"Error checking role permission {role}:{permission}: {e}")
-            return False
-    
-    async def _check_inherited_permissions(
-        self,
-        role: UserRole,
-        permission: Permission,
-        role_client_id: Optional[int],
-        resource_id: Optional[str] = None,
-        client_id: Optional[int] = None,
-        context: Optional[PermissionContext] = None
-    ) -> bool:
-        """Check inherited permissions from lower-level roles"""
-        
-        # Get all roles that this role inherits from
-        inherited_roles = self._get_inherited_roles(role)
-        
-        for inherited_role in inherited_roles:
-            if await self._role_has_permission(inherited_role, permission, role_client_id, resource_id, client_id, context):
-                return True
-        
-        return False
-    
-    def _get_inherited_roles(self, role: UserRole) -> List[UserRole]:
-        """Get roles that the given role inherits permissions from"""
-        current_level = UserRole.get_hierarchy_level(role)
-        inherited_roles = []
-        
-        for other_role in UserRole:
-            if UserRole.get_hierarchy_level(other_role) < current_level:
-                inherited_roles.append(other_role)
-        
-        return inherited_roles
+    async def _get_role_matrix(self) -> RolePermissionSnapshot:
+        """Get the compiled role permission matrix, loading it on first use"""
+        return await self._role_matrix.get(self.db)
     
     def _context_matches(
         self,
@@ -305,26 +251,6 @@ class RBACService:
         
         return True
     
-    def _role_permission_matches_context(
-        self,
-        role_perm: RolePermission,
-        role_client_id: Optional[int],
-        resource_id: Optional[str] = None,
-        client_id: Optional[int] = None,
-        context: Optional[PermissionContext] = None
-    ) -> bool:
-        """Check if role permission context matches the request context"""
-        
-        # Check scope
-        if role_perm.scope == PermissionScope.CLIENT and role_client_id != client_id:
-            return False
-        
-        # Check context
-        if context is not None and role_perm.context != context and role_perm.context != PermissionContext.ALL:
-            return False
-        
-        return True
-    
     # ==================== PERMISSION MANAGEMENT ====================
     
     async def assign_role_to_user(
@@ -370,7 +296,7 @@ class RBACService:
             await self.db.commit()
             
             # Clear user's permission cache
-            self._clear_user_cache(user_id)
+            await self._clear_user_cache(user_id)
             
             logger.info(f"Role {role} assigned to user {user_id} by {assigned_by_id}")
             return True
@@ -414,7 +340,7 @@ class RBACService:
                 await self.db.commit()
                 
                 # Clear user's permission cache
-                self._clear_user_cache(user_id)
+                await self._clear_user_cache(user_id)
                 
                 logger.info(f"Role {role} revoked from user {user_id} by {revoked_by_id}: {reason}")
                 return True
@@ -460,7 +386,7 @@ class RBACService:
             await self.db.commit()
             
             # Clear user's permission cache
-            self._clear_user_cache(user_id)
+            await self._clear_user_cache(user_id)
             
             action = "granted" if is_granted else "denied"
             logger.info(f"Permission {permission} {action} for user {user_id} by {granted_by_id}")
@@ -471,6 +397,57 @@ class RBACService:
             await self.db.rollback()
             return False
     
+    async def set_role_permission(
+        self,
+        role: UserRole,
+        permission: Permission,
+        is_active: bool = True,
+        scope: PermissionScope = PermissionScope.SYSTEM,
+        context: PermissionContext = PermissionContext.ALL
+    ) -> bool:
+        """Grant or withdraw a permission for a role and recompile the role matrix"""
+        
+        try:
+            result = await self.db.execute(
+                select(RolePermission)
+                .where(
+                    and_(
+                        RolePermission.role == role,
+                        RolePermission.permission == permission,
+                        RolePermission.scope == scope,
+                        RolePermission.context == context
+                    )
+                )
+            )
+            
+            role_permission = result.scalar_one_or_none()
+            if role_permission is None:
+                if not is_active:
+                    return False
+                role_permission = RolePermission(
+                    role=role,
+                    permission=permission,
+                    scope=scope,
+                    context=context
+                )
+                self.db.add(role_permission)
+            
+            role_permission.is_active = is_active
+            await self.db.commit()
+            
+            # Role changes affect every user, so all cached decisions go
+            await self._role_matrix.load(self.db)
+            await self._permission_cache.invalidate_roles()
+            
+            action = "granted to" if is_active else "withdrawn from"
+            logger.info(f"Permission {permission} {action} role {role}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error updating permission {permission} for role {role}: {e}")
+            await self.db.rollback()
+            return False
+    
     # ==================== QUERY METHODS ====================
     
     async def get_user_permissions(
@@ -528,25 +505,16 @@ class RBACService:
         """Get all permissions for a role"""
         
         try:
-            result = await self.db.execute(
-                select(RolePermission)
-                .where(
-                    and_(
-                        RolePermission.role == role,
-                        RolePermission.is_active == True
-                    )
-                )
-            )
+            snapshot = await self._get_role_matrix()
             
-            permissions = []
-            for role_perm in result.scalars().all():
-                permissions.append({
-                    "permission": role_perm.permission,
-                    "scope": role_perm.scope,
-                    "context": role_perm.context
-                })
-            
-            return permissions
+            return [
+                {
+                    "permission": permission,
+                    "scope": rule.scope,
+                    "context": rule.context
+                }
+                for permission, rule in snapshot.role_permissions(role)
+            ]
             
         except Exception as e:
             logger.error(f"Error getting permissions for role {role}: {e}")
@@ -601,58 +569,25 @@ class RBACService:
         resource_id: Optional[str] = None,
         client_id: Optional[int] = None,
         context: Optional[PermissionContext] = None
-    ) -> str:
+    ) -> Tuple:
         """Generate cache key for permission check"""
-        
-        parts = [
-            f"user:{user_id}",
-            f"perm:{permission.value}",
-            f"resource:{resource_id or 'none'}",
-            f"client:{client_id or 'none'}",
-            f"context:{context.value if context else 'none'}"
-        ]
-        
-        return "|".join(parts)
+        return PermissionDecisionCache.make_key(user_id, permission, client_id, resource_id, context)
     
-    def _get_cached_permission(self, cache_key: str) -> Optional[bool]:
+    def _get_cached_permission(self, cache_key: Tuple) -> Optional[bool]:
         """Get cached permission result"""
-        
-        if cache_key not in self._permission_cache:
-            return None
-        
-        cached_data = self._permission_cache[cache_key]
-        
-        # Check if cache is expired
-        if datetime.utcnow() > cached_data["expires_at"]:
-            del self._permission_cache[cache_key]
-            return None
-        
-        return cached_data["result"]
+        return self._permission_cache.get(cache_key)
     
-    def _cache_permission(self, cache_key: str, result: bool) -> None:
+    def _cache_permission(self, cache_key: Tuple, result: bool, generation: Optional[Tuple[int, int]] = None) -> None:
         """Cache permission result"""
-        
-        self._permission_cache[cache_key] = {
-            "result": result,
-            "expires_at": datetime.utcnow() + self._cache_ttl
-        }
+        self._permission_cache.set(cache_key, result, generation)
     
-    def _clear_user_cache(self, user_id: int) -> None:
-        """Clear all cached permissions for a user"""
-        
-        keys_to_delete = []
-        user_prefix = f"user:{user_id}|"
-        
-        for cache_key in self._permission_cache:
-            if cache_key.startswith(user_prefix):
-                keys_to_delete.append(cache_key)
-        
-        for key in keys_to_delete:
-            del self._permission_cache[key]
+    async def _clear_user_cache(self, user_id: int) -> None:
+        """Clear all cached permissions for a user in every worker"""
+        await self._permission_cache.invalidate_user(user_id)
     
-    def clear_all_cache(self) -> None:
+    async def clear_all_cache(self) -> None:
         """Clear all cached permissions"""
-        self._permission_cache.clear()
+        await self._permission_cache.clear()
     
     # ==================== UTILITY METHODS ====================
     
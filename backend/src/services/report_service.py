@@ -5,13 +5,18 @@ Report generation and download tracking service - Legacy compatible
 import json
 import csv
 import io
+import zlib
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, Callable, List, Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, func, and_, or_, case, update
 from sqlalchemy.orm import selectinload
 
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
 from ..core.exceptions import NotFoundError, ValidationError, AuthorizationError
+from ..core.pagination import keyset_rows
 from ..models.db_models import (
     ReportDownloadLog, User, UserPermission, PermissionGrant, 
     GA4Property, Client, AuditLog,
@@ -23,13 +28,53 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+USER_ACTIVITY_FIELDS = [
+    "user_id", "user_name", "user_email", "total_login_count", 
+    "last_login_at", "permission_request_count", "permission_extension_count",
+    "active_permissions", "created_at", "summary_period_start", "summary_period_end"
+]
+
+PERMISSION_SUMMARY_FIELDS = [
+    "permission_id", "user_name", "user_email", "target_email",
+    "property_name", "property_id", "permission_level", "status",
+    "granted_at", "expires_at", "extension_count", "is_active",
+    "days_until_expiry", "revoked_at", "revocation_reason"
+]
+
+AUDIT_LOG_FIELDS = [
+    "id", "action", "resource_type", "resource_id", "actor_name",
+    "actor_email", "details", "ip_address", "user_agent", "created_at"
+]
+
+STREAM_FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+
+
+@dataclass
+class ReportStream:
+    """A report export whose body is produced while it is sent"""
+    report_id: str
+    filename: str
+    media_type: str
+    body: AsyncIterator[bytes]
+
 
 class ReportService:
     """Report generation and download tracking service - Legacy compatible"""
     
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self,
+        db: AsyncSession,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        read_db: Optional[AsyncSession] = None,
+        read_session_factory: Optional[Callable[[], AsyncSession]] = None
+    ):
         self.db = db
         self.audit_service = AuditService(db)
+        # Streamed exports outlive the request's session, so they read through their own
+        self.session_factory = session_factory
+        # Report data may come from a read replica; download logs are written to the primary
+        self.read_db = read_db or db
+        self.read_session_factory = read_session_factory or session_factory
     
     async def generate_system_metrics_report(
         self,
@@ -305,19 +350,19 @@ class ReportService:
         """Collect system metrics data"""
         
         # User counts
-        total_users_result = await self.db.execute(select(func.count(User.id)))
+        total_users_result = await self.read_db.execute(select(func.count(User.id)))
         total_users = total_users_result.scalar()
         
-        active_users_result = await self.db.execute(
+        active_users_result = await self.read_db.execute(
             select(func.count(User.id)).where(User.status == "active")
         )
         active_users = active_users_result.scalar()
         
         # Permission counts
-        total_permissions_result = await self.db.execute(select(func.count(UserPermission.id)))
+        total_permissions_result = await self.read_db.execute(select(func.count(UserPermission.id)))
         total_permissions = total_permissions_result.scalar()
         
-        active_permissions_result = await self.db.execute(
+        active_permissions_result = await self.read_db.execute(
             select(func.count(UserPermission.id)).where(
                 and_(
                     UserPermission.status == PermissionStatus.APPROVED,
@@ -327,7 +372,7 @@ class ReportService:
         )
         active_permissions = active_permissions_result.scalar()
         
-        expired_permissions_result = await self.db.execute(
+        expired_permissions_result = await self.read_db.execute(
             select(func.count(UserPermission.id)).where(
                 and_(
                     UserPermission.status == PermissionStatus.APPROVED,
@@ -337,7 +382,7 @@ class ReportService:
         )
         expired_permissions = expired_permissions_result.scalar()
         
-        expiring_soon_result = await self.db.execute(
+        expiring_soon_result = await self.read_db.execute(
             select(func.count(UserPermission.id)).where(
                 and_(
                     UserPermission.status == PermissionStatus.APPROVED,
@@ -349,19 +394,19 @@ class ReportService:
         expiring_soon_permissions = expiring_soon_result.scalar()
         
         # Client counts
-        total_clients_result = await self.db.execute(select(func.count(Client.id)))
+        total_clients_result = await self.read_db.execute(select(func.count(Client.id)))
         total_clients = total_clients_result.scalar()
         
-        active_clients_result = await self.db.execute(
+        active_clients_result = await self.read_db.execute(
             select(func.count(Client.id)).where(Client.is_active == True)
         )
         active_clients = active_clients_result.scalar()
         
         # Property counts
-        total_properties_result = await self.db.execute(select(func.count(GA4Property.id)))
+        total_properties_result = await self.read_db.execute(select(func.count(GA4Property.id)))
         total_properties = total_properties_result.scalar()
         
-        active_properties_result = await self.db.execute(
+        active_properties_result = await self.read_db.execute(
             select(func.count(GA4Property.id)).where(GA4Property.is_active == True)
         )
         active_properties = active_properties_result.scalar()
@@ -396,7 +441,7 @@ class ReportService:
         if user_id:
             query = query.where(User.id == user_id)
         
-        result = await self.db.execute(query)
+        result = await self.read_db.execute(query)
         users = result.scalars().all()
         
         activity_data = []
@@ -449,7 +494,7 @@ class ReportService:
                 )
             )
         
-        result = await self.db.execute(query)
+        result = await self.read_db.execute(query)
         permissions = result.scalars().all()
         
         summary_data = []
@@ -500,7 +545,7 @@ class ReportService:
         
         query = query.order_by(AuditLog.created_at.desc())
         
-        result = await self.db.execute(query)
+        result = await self.read_db.execute(query)
         audit_logs = result.scalars().all()
         
         audit_data = []
@@ -527,11 +572,7 @@ class ReportService:
         if not data:
             return ""
         
-        fieldnames = [
-            "user_id", "user_name", "user_email", "total_login_count", 
-            "last_login_at", "permission_request_count", "permission_extension_count",
-            "active_permissions", "created_at", "summary_period_start", "summary_period_end"
-        ]
+        fieldnames = USER_ACTIVITY_FIELDS
         
         writer = csv.DictWriter(output, fieldnames=fieldnames)
         writer.writeheader()
@@ -546,12 +587,7 @@ class ReportService:
         if not data:
             return ""
         
-        fieldnames = [
-            "permission_id", "user_name", "user_email", "target_email",
-            "property_name", "property_id", "permission_level", "status",
-            "granted_at", "expires_at", "extension_count", "is_active",
-            "days_until_expiry", "revoked_at", "revocation_reason"
-        ]
+        fieldnames = PERMISSION_SUMMARY_FIELDS
         
         writer = csv.DictWriter(output, fieldnames=fieldnames)
         writer.writeheader()
@@ -566,10 +602,7 @@ class ReportService:
         if not data:
             return ""
         
-        fieldnames = [
-            "id", "action", "resource_type", "resource_id", "actor_name",
-            "actor_email", "details", "ip_address", "user_agent", "created_at"
-        ]
+        fieldnames = AUDIT_LOG_FIELDS
         
         writer = csv.DictWriter(output, fieldnames=fieldnames)
         writer.writeheader()
@@ -577,6 +610,279 @@ class ReportService:
         
         return output.getvalue()
     
+    # ==================== STREAMING EXPORT ====================
+    
+    async def stream_report(
+        self,
+        admin_id: int,
+        report_type: ReportType,
+        file_format: str = "csv",
+        compress: bool = False,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        user_id: Optional[int] = None,
+        client_id: Optional[int] = None,
+        include_expired: bool = False,
+        action_filter: Optional[str] = None,
+        user_id_filter: Optional[int] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> ReportStream:
+        """
+        Export a user activity, permission summary or audit log report as a stream
+        
+        Rows are read a page at a time with keyset pagination and encoded as CSV
+        or JSON Lines (optionally gzipped) as they are sent, so memory use does
+        not grow with the size of the report.
+        """
+        
+        # Validate admin permissions
+        admin_result = await self.db.execute(select(User).where(User.id == admin_id))
+        admin = admin_result.scalar_one_or_none()
+        if not admin:
+            raise NotFoundError("Admin not found")
+        
+        if admin.role not in [UserRole.ADMIN, UserRole.SUPER_ADMIN]:
+            raise AuthorizationError("Insufficient permissions to generate reports")
+        
+        file_format = file_format.lower()
+        if file_format not in STREAM_FORMATS:
+            raise ValidationError(f"Unsupported export format: {file_format}")
+        
+        # Set default date range (last 30 days)
+        if not end_date:
+            end_date = datetime.utcnow()
+        if not start_date:
+            start_date = end_date - timedelta(days=30)
+        
+        if report_type == ReportType.USER_ACTIVITY:
+            rows = lambda session: self._iter_user_activity_rows(session, start_date, end_date, user_id)
+            fieldnames = USER_ACTIVITY_FIELDS
+            report_name = f"User Activity Report ({start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')})"
+        elif report_type == ReportType.PERMISSION_SUMMARY:
+            rows = lambda session: self._iter_permission_summary_rows(session, client_id, include_expired)
+            fieldnames = PERMISSION_SUMMARY_FIELDS
+            report_name = "Permission Summary Report"
+        elif report_type == ReportType.AUDIT_LOG:
+            rows = lambda session: self._iter_audit_log_rows(
+                session, start_date, end_date, action_filter, user_id_filter
+            )
+            fieldnames = AUDIT_LOG_FIELDS
+            report_name = f"Audit Log Report ({start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')})"
+        else:
+            raise ValidationError(f"Report type cannot be exported: {report_type.value}")
+        
+        report_id = f"{report_type.value}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+        
+        # The size is filled in once the stream has been sent
+        download_log = ReportDownloadLog(
+            admin_id=admin_id,
+            report_type=report_type,
+            report_id=report_id,
+            report_name=report_name,
+            file_format=f"{file_format}.gz" if compress else file_format,
+            ip_address=ip_address,
+            user_agent=user_agent
+        )
+        
+        self.db.add(download_log)
+        await self.db.commit()
+        
+        await self.audit_service.log_action(
+            actor_id=admin_id,
+            action=f"export_{report_type.value}_report",
+            resource_type="report",
+            resource_id=report_id,
+            details=f"Exported {report_name} as {file_format}"
+        )
+        
+        logger.info(f"Streaming report {report_id}")
+        
+        return ReportStream(
+            report_id=report_id,
+            filename=f"{report_id}.{file_format}" + (".gz" if compress else ""),
+            media_type="application/gzip" if compress else STREAM_FORMATS[file_format],
+            body=self._stream_body(download_log.id, rows, fieldnames, file_format, compress)
+        )
+    
+    async def _stream_body(
+        self,
+        download_log_id: int,
+        rows: Callable[[AsyncSession], AsyncIterator[Dict[str, Any]]],
+        fieldnames: List[str],
+        file_format: str,
+        compress: bool
+    ) -> AsyncIterator[bytes]:
+        """Encode rows read through a dedicated session and record the size sent"""
+        
+        size = 0
+        async with self.read_session_factory() as read_session:
+            if file_format == "csv":
+                chunks = _encode_csv(rows(read_session), fieldnames)
+            else:
+                chunks = _encode_jsonl(rows(read_session))
+            
+            async for data in _encode_bytes(chunks, compress):
+                size += len(data)
+                yield data
+        
+        async with self.session_factory() as session:
+            await session.execute(
+                update(ReportDownloadLog)
+                .where(ReportDownloadLog.id == download_log_id)
+                .values(file_size_bytes=size)
+            )
+            await session.commit()
+    
+    async def _iter_user_activity_rows(
+        self,
+        session: AsyncSession,
+        start_date: datetime,
+        end_date: datetime,
+        user_id: Optional[int] = None,
+        page_size: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """User activity rows, aggregated in the database one page of users at a time"""
+        
+        page_size = page_size or settings.REPORT_EXPORT_PAGE_SIZE
+        now = datetime.utcnow()
+        in_period = and_(UserPermission.created_at >= start_date, UserPermission.created_at <= end_date)
+        active = and_(UserPermission.status == PermissionStatus.APPROVED, UserPermission.expires_at > now)
+        
+        query = (
+            select(
+                User.id, User.name, User.email, User.last_login_at, User.created_at,
+                func.coalesce(func.sum(case((in_period, 1), else_=0)), 0).label("permission_count"),
+                func.coalesce(
+                    func.sum(case((in_period, UserPermission.extension_count), else_=0)), 0
+                ).label("extension_count"),
+                func.coalesce(func.sum(case((active, 1), else_=0)), 0).label("active_permissions")
+            )
+            .outerjoin(UserPermission, UserPermission.user_id == User.id)
+            .group_by(User.id)
+        )
+        if user_id:
+            query = query.where(User.id == user_id)
+        
+        async for row in keyset_rows(session, query, User.id, page_size=page_size, descending=False):
+            yield {
+                "user_id": row.id,
+                "user_name": row.name,
+                "user_email": row.email,
+                "total_login_count": 0,  # TODO: Implement when login tracking is added
+                "last_login_at": row.last_login_at,
+                "permission_request_count": row.permission_count,
+                "permission_extension_count": row.extension_count,
+                "active_permissions": row.active_permissions,
+                "created_at": row.created_at,
+                "summary_period_start": start_date,
+                "summary_period_end": end_date
+            }
+    
+    async def _iter_permission_summary_rows(
+        self,
+        session: AsyncSession,
+        client_id: Optional[int] = None,
+        include_expired: bool = False,
+        page_size: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Permission summary rows in id order"""
+        
+        page_size = page_size or settings.REPORT_EXPORT_PAGE_SIZE
+        now = datetime.utcnow()
+        
+        query = (
+            select(
+                UserPermission.id, UserPermission.target_email, UserPermission.permission_level,
+                UserPermission.status, UserPermission.granted_at, UserPermission.expires_at,
+                UserPermission.extension_count, UserPermission.revoked_at, UserPermission.revocation_reason,
+                User.name.label("user_name"), User.email.label("user_email"),
+                GA4Property.property_name, GA4Property.property_id
+            )
+            .join(User, User.id == UserPermission.user_id)
+            .join(GA4Property, GA4Property.id == UserPermission.ga_property_id)
+        )
+        
+        if client_id:
+            query = query.where(GA4Property.client_id == client_id)
+        
+        if not include_expired:
+            query = query.where(
+                and_(
+                    UserPermission.status == PermissionStatus.APPROVED,
+                    UserPermission.expires_at > now
+                )
+            )
+        
+        async for row in keyset_rows(session, query, UserPermission.id, page_size=page_size, descending=False):
+            is_active = row.status == PermissionStatus.APPROVED and row.expires_at > now
+            yield {
+                "permission_id": row.id,
+                "user_name": row.user_name,
+                "user_email": row.user_email,
+                "target_email": row.target_email,
+                "property_name": row.property_name,
+                "property_id": row.property_id,
+                "permission_level": row.permission_level.value,
+                "status": row.status.value,
+                "granted_at": row.granted_at,
+                "expires_at": row.expires_at,
+                "extension_count": row.extension_count,
+                "is_active": is_active,
+                "days_until_expiry": (row.expires_at - now).days if row.expires_at > now else 0,
+                "revoked_at": row.revoked_at,
+                "revocation_reason": row.revocation_reason
+            }
+    
+    async def _iter_audit_log_rows(
+        self,
+        session: AsyncSession,
+        start_date: datetime,
+        end_date: datetime,
+        action_filter: Optional[str] = None,
+        user_id_filter: Optional[int] = None,
+        page_size: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Audit log rows, newest first"""
+        
+        page_size = page_size or settings.REPORT_EXPORT_PAGE_SIZE
+        
+        # Same order as the audit log API's cursor pages
+        query = (
+            select(
+                AuditLog.id, AuditLog.action, AuditLog.resource_type, AuditLog.resource_id,
+                AuditLog.details, AuditLog.ip_address, AuditLog.user_agent, AuditLog.created_at,
+                User.name.label("actor_name"), User.email.label("actor_email")
+            )
+            .outerjoin(User, User.id == AuditLog.actor_id)
+            .where(
+                and_(
+                    AuditLog.created_at >= start_date,
+                    AuditLog.created_at <= end_date
+                )
+            )
+        )
+        
+        if action_filter:
+            query = query.where(AuditLog.action.ilike(f"%{action_filter}%"))
+        
+        if user_id_filter:
+            query = query.where(AuditLog.actor_id == user_id_filter)
+        
+        async for row in keyset_rows(session, query, AuditLog.created_at, AuditLog.id, page_size=page_size):
+            yield {
+                "id": row.id,
+                "action": row.action,
+                "resource_type": row.resource_type,
+                "resource_id": row.resource_id,
+                "actor_name": row.actor_name or "System",
+                "actor_email": row.actor_email,
+                "details": row.details,
+                "ip_address": row.ip_address,
+                "user_agent": row.user_agent,
+                "created_at": row.created_at
+            }
+    
     async def get_download_logs(
         self,
         skip: int = 0,
@@ -601,4 +907,57 @@ class ReportService:
         result = await self.db.execute(query)
         logs = result.scalars().all()
         
-        return [ReportDownloadLogResponse.model_validate(log) for log in logs]
\ No newline at end of file
+        return [ReportDownloadLogResponse.model_validate(log) for log in logs]
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+async def _encode_csv(rows: AsyncIterator[Dict[str, Any]], fieldnames: List[str]) -> AsyncIterator[str]:
+    """CSV text in chunks of roughly 64KB"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+    writer.writeheader()
+    
+    async for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= 65536:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    
+    yield buffer.getvalue()
+
+
+async def _encode_jsonl(rows: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    """JSON Lines text in chunks of roughly 64KB"""
+    lines = []
+    size = 0
+    
+    async for row in rows:
+        line = json.dumps(row, default=_json_default) + "\n"
+        lines.append(line)
+        size += len(line)
+        if size >= 65536:
+            yield "".join(lines)
+            lines, size = [], 0
+    
+    yield "".join(lines)
+
+
+async def _encode_bytes(chunks: AsyncIterator[str], compress: bool) -> AsyncIterator[bytes]:
+    """UTF-8 encode text chunks, gzipping them on the fly if requested"""
+    compressor = zlib.compressobj(wbits=31) if compress else None  # wbits=31: gzip container
+    
+    async for chunk in chunks:
+        data = chunk.encode("utf-8")
+        if compressor is not None:
+            data = compressor.compress(data)
+        if data:
+            yield data
+    
+    if compressor is not None:
+        yield compressor.flush()
@@ -0,0 +1,228 @@
+"""
+Precompiled role to permission matrix for the RBAC service
+
+The role_permissions table changes rarely but is consulted on every permission
+check. It is compiled into an immutable snapshot, with role inheritance already
+resolved, and swapped atomically on reload so checks never query it directly.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, FrozenSet, NamedTuple, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..models.db_models import (
+    RolePermission, UserRole, Permission, PermissionScope, PermissionContext
+)
+from .permission_cache import permission_decision_cache
+
+logger = logging.getLogger(__name__)
+
+_PERMISSION_BITS = {permission: 1 << index for index, permission in enumerate(Permission)}
+
+
+class RoleRule(NamedTuple):
+    """Scope and context of a single role permission"""
+    scope: PermissionScope
+    context: PermissionContext
+
+
+class RolePermissionSnapshot:
+    """Immutable compiled view of the role_permissions table"""
+
+    def __init__(self, rows: Tuple[Tuple[UserRole, Permission, PermissionScope, PermissionContext], ...] = ()):
+        own: Dict[Tuple[UserRole, Permission], set] = {}
+        for role, permission, scope, context in rows:
+            own.setdefault((role, permission), set()).add(RoleRule(scope, context))
+
+        self.own_rules: Dict[Tuple[UserRole, Permission], FrozenSet[RoleRule]] = {
+            key: frozenset(rules) for key, rules in own.items()
+        }
+
+        # A role inherits from every role below it in the hierarchy
+        self.inherited_roles: Dict[UserRole, Tuple[UserRole, ...]] = {
+            role: tuple(
+                other for other in UserRole
+                if UserRole.get_hierarchy_level(other) < UserRole.get_hierarchy_level(role)
+            )
+            for role in UserRole
+        }
+
+        effective: Dict[Tuple[UserRole, Permission], FrozenSet[RoleRule]] = {}
+        unconditional: Dict[UserRole, int] = {}
+        for role in UserRole:
+            mask = 0
+            for permission in Permission:
+                rules = self.own_rules.get((role, permission), frozenset()).union(*(
+                    self.own_rules.get((inherited, permission), frozenset())
+                    for inherited in self.inherited_roles[role]
+                ))
+                if not rules:
+                    continue
+                effective[(role, permission)] = rules
+                # Rules that match regardless of the request's client or context
+                if any(rule.scope != PermissionScope.CLIENT and rule.context == PermissionContext.ALL for rule in rules):
+                    mask |= _PERMISSION_BITS[permission]
+            unconditional[role] = mask
+
+        self.effective_rules = effective
+        self.unconditional_mask = unconditional
+        self.row_count = len(rows)
+
+    def rules(self, role: UserRole, permission: Permission, include_inherited: bool = True) -> FrozenSet[RoleRule]:
+        """Get the rules granting a permission to a role"""
+        source = self.effective_rules if include_inherited else self.own_rules
+        return source.get((role, permission), frozenset())
+
+    def allows(
+        self,
+        role: UserRole,
+        permission: Permission,
+        role_client_id: Optional[int],
+        client_id: Optional[int] = None,
+        context: Optional[PermissionContext] = None
+    ) -> bool:
+        """Check a role (and the roles it inherits) for a permission"""
+        if self.unconditional_mask.get(role, 0) & _PERMISSION_BITS[permission]:
+            return True
+
+        for rule in self.effective_rules.get((role, permission), ()):
+            if rule_matches_context(rule, role_client_id, client_id, context):
+                return True
+
+        return False
+
+    def role_permissions(self, role: UserRole) -> Tuple[Tuple[Permission, RoleRule], ...]:
+        """Get a role's own permissions (without inheritance)"""
+        return tuple(
+            (permission, rule)
+            for (rule_role, permission), rules in self.own_rules.items()
+            if rule_role == role
+            for rule in rules
+        )
+
+
+def rule_matches_context(
+    rule: Any,
+    role_client_id: Optional[int],
+    client_id: Optional[int] = None,
+    context: Optional[PermissionContext] = None
+) -> bool:
+    """Check if a role permission's scope and context match the request context"""
+
+    # Check scope
+    if rule.scope == PermissionScope.CLIENT and role_client_id != client_id:
+        return False
+
+    # Check context
+    if context is not None and rule.context != context and rule.context != PermissionContext.ALL:
+        return False
+
+    return True
+
+
+class RolePermissionMatrix:
+    """
+    Holds the current snapshot and reloads it when role permissions change
+
+    Changes made by other workers arrive as Redis invalidations when enabled;
+    snapshots older than max_age_seconds are reloaded regardless, which bounds
+    staleness when that channel is disabled or down.
+    """
+
+    def __init__(self, max_age_seconds: float = settings.RBAC_MATRIX_MAX_AGE_SECONDS):
+        self.max_age_seconds = max_age_seconds
+        self._snapshot: Optional[RolePermissionSnapshot] = None
+        self._stale = True
+        self._expires_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.loads = 0
+        self.loaded_at: Optional[float] = None
+        self.last_load_time = 0.0
+
+    @property
+    def snapshot(self) -> Optional[RolePermissionSnapshot]:
+        """Current snapshot, or None if it has not been loaded yet"""
+        return self._snapshot
+
+    def mark_stale(self) -> None:
+        """Reload on next use (e.g. after another worker changed role permissions)"""
+        self._stale = True
+
+    def _get_lock(self) -> asyncio.Lock:
+        """Get the reload lock bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    async def get(self, db: AsyncSession) -> RolePermissionSnapshot:
+        """Get the current snapshot, loading it first if needed"""
+        snapshot = self._snapshot
+        if snapshot is not None and not self._needs_reload():
+            return snapshot
+
+        async with self._get_lock():
+            if self._snapshot is None or self._needs_reload():
+                await self.load(db)
+            return self._snapshot
+
+    def _needs_reload(self) -> bool:
+        """Check if the snapshot was invalidated or has outlived max_age_seconds"""
+        return self._stale or time.monotonic() >= self._expires_at
+
+    async def load(self, db: AsyncSession) -> RolePermissionSnapshot:
+        """Compile active role permissions and swap in the new snapshot"""
+        started_at = time.perf_counter()
+        # Cleared before querying so a change that lands mid-load marks it stale again
+        self._stale = False
+
+        try:
+            result = await db.execute(
+                select(
+                    RolePermission.role,
+                    RolePermission.permission,
+                    RolePermission.scope,
+                    RolePermission.context
+                ).where(RolePermission.is_active == True)
+            )
+        except Exception:
+            self._stale = True
+            raise
+
+        snapshot = RolePermissionSnapshot(tuple(tuple(row) for row in result.all()))
+
+        self._snapshot = snapshot
+        self._expires_at = time.monotonic() + self.max_age_seconds
+        self.loads += 1
+        self.loaded_at = time.time()
+        self.last_load_time = time.perf_counter() - started_at
+
+        logger.info(f"Compiled {snapshot.row_count} role permissions in {self.last_load_time * 1000:.1f}ms")
+        return snapshot
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get matrix statistics for monitoring"""
+        return {
+            "loaded": self._snapshot is not None,
+            "stale": self._stale,
+            "max_age_seconds": self.max_age_seconds,
+            "rules": self._snapshot.row_count if self._snapshot else 0,
+            "loads": self.loads,
+            "loaded_at": self.loaded_at,
+            "last_load_time": self.last_load_time
+        }
+
+
+# Global matrix instance shared by all RBACService instances
+role_permission_matrix = RolePermissionMatrix()
+
+# Role permission changes made by other workers arrive through the decision cache
+permission_decision_cache.add_role_change_listener(role_permission_matrix.mark_stale)
@@ -5,19 +5,20 @@ Handles periodic tasks like permission expiry checks, notifications, and sync op
 
 import asyncio
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, func, and_, or_, insert, update, union_all, literal
 
+from ..core.config import settings
 from ..core.database import get_async_session
 from ..models.db_models import (
-    UserPermission, PermissionGrant, GA4Property, User,
+    UserPermission, PermissionGrant, GA4Property, User, AuditLog, Client,
     PermissionStatus, NotificationStatus, NotificationLog
 )
 from ..services.notification_service import NotificationService
 from ..services.ga4_property_service import GA4PropertyService
-from ..services.audit_service import AuditService
+from ..services.ga4_fleet_discovery import ga4_fleet_discovery
+from ..services.ga4_quota_scheduler import GA4Priority, ga4_priority
 import logging
 
 logger = logging.getLogger(__name__)
@@ -110,19 +111,26 @@ class SchedulerService:
             await asyncio.sleep(21600)
     
     async def _run_property_sync_check(self):
-        """Periodically sync GA4 properties"""
-        while self.is_running:
-            try:
-                async with get_async_session() as db:
-                    result = await self._sync_ga4_properties(db)
-                    if result['sync_count'] > 0:
-                        logger.info(f"Synced {result['sync_count']} GA4 properties")
+        """Periodically discover and sync GA4 properties"""
+        # Scheduled sync runs behind interactive GA4 calls for Admin API quota
+        with ga4_priority(GA4Priority.SYNC):
+            while self.is_running:
+                try:
+                    # Discovery uses its own sessions: one to read accounts, one to write results
+                    discovery = await ga4_fleet_discovery.run()
+                    if discovery['failed'] > 0:
+                        logger.warning(f"GA4 property discovery failed for {discovery['failed']} service accounts")
+                    
+                    async with get_async_session() as db:
+                        result = await self._sync_ga4_properties(db)
+                        if result['sync_count'] > 0:
+                            logger.info(f"Synced {result['sync_count']} GA4 properties")
+                    
+                except Exception as e:
+                    logger.error(f"Error in property sync check: {e}")
                 
-            except Exception as e:
-                logger.error(f"Error in property sync check: {e}")
-            
-            # Run every 24 hours
-            await asyncio.sleep(86400)
+                # Run every 24 hours
+                await asyncio.sleep(86400)
     
     async def _run_notification_retry_check(self):
         """Periodically retry failed notifications"""
@@ -157,195 +165,185 @@ class SchedulerService:
     
     async def _check_expired_permissions(self, db: AsyncSession) -> Dict[str, Any]:
         """Check and handle expired permissions"""
-        
-        # Find expired user permissions
-        user_permissions_result = await db.execute(
-            select(UserPermission)
-            .options(
-                selectinload(UserPermission.user),
-                selectinload(UserPermission.ga_property)
-            )
-            .where(
-                and_(
-                    UserPermission.status == PermissionStatus.APPROVED,
-                    UserPermission.expires_at <= datetime.utcnow()
-                )
-            )
+        now = datetime.utcnow()
+        
+        user_permissions = await self._expire_in_chunks(
+            db,
+            UserPermission,
+            UserPermission.expires_at <= now,
+            action="expire_user_permission",
+            resource_type="user_permission",
+            details="User permission for {} expired automatically"
         )
-        expired_user_permissions = user_permissions_result.scalars().all()
-        
-        # Find expired permission grants
-        permission_grants_result = await db.execute(
-            select(PermissionGrant)
-            .options(
-                selectinload(PermissionGrant.user),
-                selectinload(PermissionGrant.client)
-            )
-            .where(
-                and_(
-                    PermissionGrant.status == PermissionStatus.APPROVED,
-                    PermissionGrant.expires_at.is_not(None),
-                    PermissionGrant.expires_at <= datetime.utcnow()
-                )
-            )
+        permission_grants = await self._expire_in_chunks(
+            db,
+            PermissionGrant,
+            and_(PermissionGrant.expires_at.is_not(None), PermissionGrant.expires_at <= now),
+            action="expire_permission_grant",
+            resource_type="permission_grant",
+            details="Permission grant for {} expired automatically"
         )
-        expired_permission_grants = permission_grants_result.scalars().all()
         
+        return {
+            "expired_count": user_permissions + permission_grants,
+            "user_permissions": user_permissions,
+            "permission_grants": permission_grants,
+            "checked_at": datetime.utcnow()
+        }
+    
+    async def _expire_in_chunks(
+        self,
+        db: AsyncSession,
+        model,
+        expired,
+        action: str,
+        resource_type: str,
+        details: str,
+        chunk_size: Optional[int] = None
+    ) -> int:
+        """
+        Mark approved rows matching ``expired`` as EXPIRED, chunk by chunk
+        
+        Each chunk is one UPDATE ... RETURNING plus one multi-row audit INSERT,
+        committed together, so memory stays bounded by the chunk size however
+        many grants expire at once.
+        """
+        chunk_size = chunk_size or settings.SCHEDULER_EXPIRY_CHUNK_SIZE
         expired_count = 0
         
-        # Process expired user permissions
-        for permission in expired_user_permissions:
-            permission.status = PermissionStatus.EXPIRED
-            expired_count += 1
-            
-            # Log the expiration
-            audit_service = AuditService(db)
-            await audit_service.log_action(
-                actor_id=None,  # System action
-                action="expire_user_permission",
-                resource_type="user_permission",
-                resource_id=str(permission.id),
-                details=f"User permission for {permission.target_email} expired automatically"
+        while True:
+            chunk = (
+                select(model.id)
+                .where(model.status == PermissionStatus.APPROVED, expired)
+                .limit(chunk_size)
             )
-        
-        # Process expired permission grants
-        for grant in expired_permission_grants:
-            grant.status = PermissionStatus.EXPIRED
-            expired_count += 1
+            result = await db.execute(
+                update(model)
+                # Status is re-checked so a concurrent sweep cannot expire (and audit) a row twice
+                .where(model.id.in_(chunk.scalar_subquery()), model.status == PermissionStatus.APPROVED)
+                .values(status=PermissionStatus.EXPIRED)
+                .returning(model.id, model.target_email)
+                .execution_options(synchronize_session=False)
+            )
+            rows = result.all()
+            if not rows:
+                break
             
-            # Log the expiration
-            audit_service = AuditService(db)
-            await audit_service.log_action(
-                actor_id=None,  # System action
-                action="expire_permission_grant",
-                resource_type="permission_grant",
-                resource_id=str(grant.id),
-                details=f"Permission grant for {grant.target_email} expired automatically"
+            await db.execute(
+                insert(AuditLog),
+                [
+                    {
+                        "actor_id": None,  # System action
+                        "action": action,
+                        "resource_type": resource_type,
+                        "resource_id": str(row.id),
+                        "details": details.format(row.target_email)
+                    }
+                    for row in rows
+                ]
             )
+            await db.commit()
+            expired_count += len(rows)
         
-        await db.commit()
-        
-        return {
-            "expired_count": expired_count,
-            "user_permissions": len(expired_user_permissions),
-            "permission_grants": len(expired_permission_grants),
-            "checked_at": datetime.utcnow()
-        }
+        return expired_count
     
     async def _send_expiry_notifications(self, db: AsyncSession) -> Dict[str, Any]:
-        """Send notifications for permissions expiring soon"""
+        """Send one digest per recipient for permissions expiring soon"""
         
-        notification_service = NotificationService(db)
-        notification_count = 0
+        digests = await self._plan_expiry_notifications(db)
         
-        # Find user permissions expiring in 7 days
-        expiring_threshold = datetime.utcnow() + timedelta(days=7)
+        notification_service = NotificationService(db)
+        result = await notification_service.send_permission_expiry_digests(digests)
         
-        user_permissions_result = await db.execute(
-            select(UserPermission)
-            .options(
-                selectinload(UserPermission.user),
-                selectinload(UserPermission.ga_property)
+        permissions = [permission for recipient_permissions in digests.values() for permission in recipient_permissions]
+        return {
+            "notification_count": result["sent"],
+            "failed_count": result["failed"],
+            "recipients": len(digests),
+            "user_permissions": sum(1 for p in permissions if p["kind"] == "user_permission"),
+            "permission_grants": sum(1 for p in permissions if p["kind"] == "permission_grant"),
+            "checked_at": datetime.utcnow()
+        }
+    
+    async def _plan_expiry_notifications(
+        self,
+        db: AsyncSession,
+        days_ahead: int = 7
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Group permissions expiring within ``days_ahead`` by recipient
+        
+        User permissions and grants are read with one UNION ALL query whose
+        anti-join against notification_logs drops recipients already notified
+        in the last 24 hours, instead of one lookup per permission.
+        """
+        now = datetime.utcnow()
+        expiring_threshold = now + timedelta(days=days_ahead)
+        
+        candidates = union_all(
+            select(
+                literal("user_permission").label("kind"),
+                UserPermission.id.label("id"),
+                UserPermission.target_email.label("recipient"),
+                User.name.label("user_name"),
+                GA4Property.property_name.label("property_name"),
+                UserPermission.permission_level.label("permission_level"),
+                UserPermission.expires_at.label("expires_at")
             )
+            .join(User, User.id == UserPermission.user_id)
+            .join(GA4Property, GA4Property.id == UserPermission.ga_property_id)
             .where(
-                and_(
-                    UserPermission.status == PermissionStatus.APPROVED,
-                    UserPermission.expires_at <= expiring_threshold,
-                    UserPermission.expires_at > datetime.utcnow()
-                )
-            )
-        )
-        expiring_user_permissions = user_permissions_result.scalars().all()
-        
-        # Send notifications for expiring user permissions
-        for permission in expiring_user_permissions:
-            # Check if we already sent a notification recently (within 24 hours)
-            recent_notification_result = await db.execute(
-                select(NotificationLog)
-                .where(
-                    and_(
-                        NotificationLog.recipient == permission.target_email,
-                        NotificationLog.template_type == "permission_expiry",
-                        NotificationLog.created_at > (datetime.utcnow() - timedelta(hours=24))
-                    )
-                )
+                UserPermission.status == PermissionStatus.APPROVED,
+                UserPermission.expires_at <= expiring_threshold,
+                UserPermission.expires_at > now
+            ),
+            select(
+                literal("permission_grant"),
+                PermissionGrant.id,
+                PermissionGrant.target_email,
+                User.name,
+                Client.name + " - " + PermissionGrant.ga_property_id,
+                PermissionGrant.permission_level,
+                PermissionGrant.expires_at
             )
-            recent_notification = recent_notification_result.scalar_one_or_none()
-            
-            if recent_notification:
-                continue  # Skip if already notified recently
-            
-            try:
-                await notification_service.send_permission_expiry_notification(
-                    recipient_email=permission.target_email,
-                    user_name=permission.user.name,
-                    property_name=permission.ga_property.property_name,
-                    permission_level=permission.permission_level.value,
-                    expires_at=permission.expires_at,
-                    days_until_expiry=permission.days_until_expiry
-                )
-                notification_count += 1
-                
-            except Exception as e:
-                logger.error(f"Failed to send expiry notification for permission {permission.id}: {e}")
-        
-        # Find permission grants expiring in 7 days
-        permission_grants_result = await db.execute(
-            select(PermissionGrant)
-            .options(
-                selectinload(PermissionGrant.user),
-                selectinload(PermissionGrant.client)
+            .join(User, User.id == PermissionGrant.user_id)
+            .join(Client, Client.id == PermissionGrant.client_id)
+            .where(
+                PermissionGrant.status == PermissionStatus.APPROVED,
+                PermissionGrant.expires_at.is_not(None),
+                PermissionGrant.expires_at <= expiring_threshold,
+                PermissionGrant.expires_at > now
             )
+        ).subquery()
+        
+        recently_notified = (
+            select(NotificationLog.id)
             .where(
-                and_(
-                    PermissionGrant.status == PermissionStatus.APPROVED,
-                    PermissionGrant.expires_at.is_not(None),
-                    PermissionGrant.expires_at <= expiring_threshold,
-                    PermissionGrant.expires_at > datetime.utcnow()
-                )
+                NotificationLog.recipient == candidates.c.recipient,
+                NotificationLog.template_type == "permission_expiry",
+                NotificationLog.created_at > now - timedelta(hours=24)
             )
+            .exists()
         )
-        expiring_permission_grants = permission_grants_result.scalars().all()
-        
-        # Send notifications for expiring permission grants
-        for grant in expiring_permission_grants:
-            # Check if we already sent a notification recently (within 24 hours)
-            recent_notification_result = await db.execute(
-                select(NotificationLog)
-                .where(
-                    and_(
-                        NotificationLog.recipient == grant.target_email,
-                        NotificationLog.template_type == "permission_expiry",
-                        NotificationLog.created_at > (datetime.utcnow() - timedelta(hours=24))
-                    )
-                )
-            )
-            recent_notification = recent_notification_result.scalar_one_or_none()
-            
-            if recent_notification:
-                continue  # Skip if already notified recently
-            
-            try:
-                days_until_expiry = (grant.expires_at - datetime.utcnow()).days
-                await notification_service.send_permission_expiry_notification(
-                    recipient_email=grant.target_email,
-                    user_name=grant.user.name,
-                    property_name=f"{grant.client.name} - {grant.ga_property_id}",
-                    permission_level=grant.permission_level.value,
-                    expires_at=grant.expires_at,
-                    days_until_expiry=days_until_expiry
-                )
-                notification_count += 1
-                
-            except Exception as e:
-                logger.error(f"Failed to send expiry notification for grant {grant.id}: {e}")
         
-        return {
-            "notification_count": notification_count,
-            "user_permissions": len(expiring_user_permissions),
-            "permission_grants": len(expiring_permission_grants),
-            "checked_at": datetime.utcnow()
-        }
+        result = await db.execute(
+            select(candidates)
+            .where(~recently_notified)
+            .order_by(candidates.c.recipient, candidates.c.expires_at, candidates.c.kind, candidates.c.id)
+        )
+        
+        digests: Dict[str, List[Dict[str, Any]]] = {}
+        for row in result:
+            digests.setdefault(row.recipient, []).append({
+                "kind": row.kind,
+                "id": row.id,
+                "user_name": row.user_name,
+                "property_name": row.property_name,
+                "permission_level": row.permission_level.value,
+                "expires_at": row.expires_at,
+                "days_until_expiry": max((row.expires_at - now).days, 0)
+            })
+        return digests
     
     async def _sync_ga4_properties(self, db: AsyncSession) -> Dict[str, Any]:
         """Sync GA4 properties that need updates"""
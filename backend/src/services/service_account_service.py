@@ -11,15 +11,18 @@ from sqlalchemy import select, func, and_, or_
 from sqlalchemy.orm import selectinload
 
 from ..core.exceptions import NotFoundError, ValidationError, AuthorizationError, GoogleAPIError
+from ..core.pagination import keyset_page
 from ..models.db_models import (
     ServiceAccount, Client, User, UserRole,
     ServiceAccountProperty, PropertyAccessBinding
 )
 from ..models.schemas import (
     ServiceAccountCreate, ServiceAccountUpdate, ServiceAccountResponse,
-    GA4PropertyResponse, PaginatedResponse
+    GA4PropertyResponse, PaginatedResponse, CursorPage
 )
 from ..services.google_api_service import GoogleAnalyticsService
+from ..services.ga4_client_registry import ga4_client_registry
+from ..services.ga4_property_discovery_service import upsert_service_account_properties
 from ..services.audit_service import AuditService
 
 logger = logging.getLogger(__name__)
@@ -30,7 +33,7 @@ class ServiceAccountService:
     
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.ga_service = GoogleAnalyticsService()
+        self.ga_service = ga4_client_registry.get()
         self.audit_service = AuditService(db)
     
     async def create_service_account(
@@ -62,8 +65,8 @@ class ServiceAccountService:
                     raise ValidationError("Service account email does not match credentials")
                 
                 # Test the credentials by initializing GA service
-                test_ga_service = GoogleAnalyticsService(credentials_json=sa_data.credentials_json)
-                await test_ga_service.validate_credentials()
+                test_ga_service = GoogleAnalyticsService.from_service_account_info(credentials_data)
+                await test_ga_service.list_accounts()
                 
             except json.JSONDecodeError:
                 raise ValidationError("Invalid JSON format for credentials")
@@ -122,14 +125,7 @@ class ServiceAccountService:
         query = select(ServiceAccount).options(selectinload(ServiceAccount.client))
         
         # Apply filters
-        conditions = []
-        if client_id:
-            conditions.append(ServiceAccount.client_id == client_id)
-        if is_active is not None:
-            conditions.append(ServiceAccount.is_active == is_active)
-        if accessible_client_ids is not None:
-            conditions.append(ServiceAccount.client_id.in_(accessible_client_ids))
-        
+        conditions = self._list_conditions(client_id, is_active, accessible_client_ids)
         if conditions:
             query = query.where(and_(*conditions))
         
@@ -157,6 +153,47 @@ class ServiceAccountService:
             pages=(total + limit - 1) // limit
         )
     
+    async def list_service_accounts_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        client_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+        accessible_client_ids: Optional[List[int]] = None
+    ) -> CursorPage[ServiceAccountResponse]:
+        """List service accounts newest first, continuing after ``cursor``; no total is counted"""
+        
+        query = select(ServiceAccount).options(selectinload(ServiceAccount.client))
+        conditions = self._list_conditions(client_id, is_active, accessible_client_ids)
+        if conditions:
+            query = query.where(and_(*conditions))
+        
+        service_accounts, next_cursor = await keyset_page(
+            self.db, query, ServiceAccount.created_at, ServiceAccount.id, limit, cursor
+        )
+        
+        return CursorPage[ServiceAccountResponse](
+            items=[ServiceAccountResponse.model_validate(sa) for sa in service_accounts],
+            next_cursor=next_cursor,
+            size=limit
+        )
+    
+    @staticmethod
+    def _list_conditions(
+        client_id: Optional[int],
+        is_active: Optional[bool],
+        accessible_client_ids: Optional[List[int]]
+    ) -> list:
+        """Filters of the service account listings"""
+        conditions = []
+        if client_id:
+            conditions.append(ServiceAccount.client_id == client_id)
+        if is_active is not None:
+            conditions.append(ServiceAccount.is_active == is_active)
+        if accessible_client_ids is not None:
+            conditions.append(ServiceAccount.client_id.in_(accessible_client_ids))
+        return conditions
+    
     async def get_service_account(self, sa_id: int) -> Optional[ServiceAccountResponse]:
         """Get service account by ID"""
         
@@ -290,7 +327,7 @@ class ServiceAccountService:
         
         try:
             # Initialize GA service with service account credentials
-            ga_service = GoogleAnalyticsService(secret_name=service_account.secret_name)
+            ga_service = ga4_client_registry.get(service_account)
             
             # Test basic API access
             accounts = await ga_service.list_accounts()
@@ -334,55 +371,27 @@ class ServiceAccountService:
         
         try:
             # Initialize GA service
-            ga_service = GoogleAnalyticsService(secret_name=service_account.secret_name)
+            ga_service = ga4_client_registry.get(service_account)
             
-            # Get all accessible properties
-            properties = await ga_service.list_properties()
+            # Get all accessible properties: one paginated accountSummaries walk
+            properties = await ga_service.list_account_summaries()
             
-            discovered_properties = []
+            # Upsert them in bulk and deactivate the ones no longer accessible
+            await upsert_service_account_properties(self.db, sa_id, properties)
             
-            for prop in properties:
-                # Check if property already exists in our database
-                existing_result = await self.db.execute(
-                    select(ServiceAccountProperty)
-                    .where(
-                        and_(
-                            ServiceAccountProperty.service_account_id == sa_id,
-                            ServiceAccountProperty.ga_property_id == prop["id"]
-                        )
-                    )
-                )
-                existing_prop = existing_result.scalar_one_or_none()
-                
-                if not existing_prop:
-                    # Create new property record
-                    sa_property = ServiceAccountProperty(
-                        service_account_id=sa_id,
-                        ga_property_id=prop["id"],
-                        property_name=prop.get("name", ""),
-                        property_account_id=prop.get("account_id", ""),
-                        is_active=True,
-                        discovered_at=datetime.utcnow(),
-                        validation_status='valid'
-                    )
-                    self.db.add(sa_property)
-                else:
-                    # Update existing property
-                    existing_prop.property_name = prop.get("name", existing_prop.property_name)
-                    existing_prop.property_account_id = prop.get("account_id", existing_prop.property_account_id)
-                    existing_prop.last_validated_at = datetime.utcnow()
-                    existing_prop.validation_status = 'valid'
-                    existing_prop.is_active = True
-                
-                discovered_properties.append(GA4PropertyResponse(
-                    id=prop["id"],
-                    name=prop.get("name", ""),
-                    account_id=prop.get("account_id", ""),
+            discovered_at = datetime.utcnow()
+            discovered_properties = [
+                GA4PropertyResponse(
+                    id=prop["property_id"],
+                    name=prop.get("display_name") or "",
+                    account_id=prop.get("account_id") or "",
                     service_account_id=sa_id,
                     is_active=True,
-                    discovered_at=datetime.utcnow(),
+                    discovered_at=discovered_at,
                     validation_status='valid'
-                ))
+                )
+                for prop in properties
+            ]
             
             await self.db.commit()
             
@@ -496,7 +505,7 @@ class ServiceAccountService:
         
         try:
             # Test credentials and API access
-            ga_service = GoogleAnalyticsService(secret_name=service_account.secret_name)
+            ga_service = ga4_client_registry.get(service_account)
             
             # Check API access
             accounts = await ga_service.list_accounts()
@@ -0,0 +1,188 @@
+"""
+Pooled async SMTP transport
+
+NotificationService and EmailService used to open a new SMTP connection (TLS
+handshake and login) for every message, the former with blocking smtplib on the
+event loop. Both now send through one shared pool that keeps authenticated
+aiosmtplib connections open and sends many messages over each of them. At most
+SMTP_POOL_SIZE messages are in flight; transient failures (dropped connections,
+4xx replies) are retried on a fresh connection with exponential backoff.
+
+Point SMTP_HOST/SMTP_PORT at a local debugging server (e.g. aiosmtpd) to
+capture mail in development and tests.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from email.message import Message
+from typing import Any, Dict, List, Optional
+
+import aiosmtplib
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PooledConnection:
+    """An open SMTP client and how much it has been used"""
+    client: aiosmtplib.SMTP
+    messages: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+
+def _is_transient(error: Exception) -> bool:
+    """Whether sending may succeed when retried on a new connection"""
+    if isinstance(error, aiosmtplib.SMTPResponseException):
+        return 400 <= error.code < 500
+    return isinstance(error, (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPTimeoutError, OSError))
+
+
+class SMTPPool:
+    """Bounded pool of authenticated SMTP connections"""
+
+    def __init__(
+        self,
+        hostname: Optional[str] = None,
+        port: Optional[int] = None,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: Optional[bool] = None,
+        start_tls: Optional[bool] = None,
+        max_connections: int = settings.SMTP_POOL_SIZE,
+        max_messages_per_connection: int = settings.SMTP_POOL_MAX_MESSAGES_PER_CONNECTION,
+        idle_timeout: float = settings.SMTP_POOL_IDLE_TIMEOUT_SECONDS,
+        max_retries: int = settings.SMTP_MAX_RETRIES,
+        retry_backoff: float = settings.SMTP_RETRY_BACKOFF_SECONDS,
+        timeout: float = settings.SMTP_TIMEOUT_SECONDS
+    ):
+        self.hostname = hostname or settings.SMTP_HOST
+        self.port = port or settings.SMTP_PORT
+        self.username = username if username is not None else settings.SMTP_USER
+        self.password = password if password is not None else settings.SMTP_PASSWORD
+        # SMTP_SSL is implicit TLS; SMTP_TLS upgrades a plain connection with STARTTLS
+        self.use_tls = settings.SMTP_SSL if use_tls is None else use_tls
+        self.start_tls = (settings.SMTP_TLS and not self.use_tls) if start_tls is None else start_tls
+        self.max_connections = max_connections
+        self.max_messages_per_connection = max_messages_per_connection
+        self.idle_timeout = idle_timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.timeout = timeout
+
+        self._idle: List[_PooledConnection] = []
+        self._semaphore = asyncio.Semaphore(max_connections)
+
+        self.sent = 0
+        self.failures = 0
+        self.retries = 0
+        self.connections_opened = 0
+        self.in_flight = 0
+
+    async def send(self, message: Message) -> None:
+        """Send a message, retrying transient failures with backoff"""
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                await self._send_with_retry(message)
+            finally:
+                self.in_flight -= 1
+
+    async def _send_with_retry(self, message: Message) -> None:
+        attempt = 0
+        while True:
+            connection = self._take_idle()
+            reused = connection is not None
+            try:
+                if connection is None:
+                    connection = await self._connect()
+                await connection.client.send_message(message)
+            except Exception as e:
+                if connection is not None:
+                    self._close(connection)
+                if reused and _is_transient(e):
+                    # The server dropped a pooled connection; retry right away on a new one
+                    continue
+                if not _is_transient(e) or attempt >= self.max_retries:
+                    self.failures += 1
+                    raise
+
+                delay = self.retry_backoff * 2 ** attempt
+                attempt += 1
+                self.retries += 1
+                logger.warning(f"SMTP send failed ({e}); retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            self.sent += 1
+            connection.messages += 1
+            connection.last_used = time.monotonic()
+            self._release(connection)
+            return
+
+    def _take_idle(self) -> Optional[_PooledConnection]:
+        """Most recently used connection that is still fit for reuse"""
+        while self._idle:
+            connection = self._idle.pop()
+            if (
+                connection.client.is_connected
+                and time.monotonic() - connection.last_used < self.idle_timeout
+            ):
+                return connection
+            self._close(connection)
+        return None
+
+    async def _connect(self) -> _PooledConnection:
+        """Open, secure and authenticate a new connection"""
+        client = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            username=self.username or None,
+            password=self.password or None,
+            use_tls=self.use_tls,
+            start_tls=self.start_tls,
+            timeout=self.timeout
+        )
+        await client.connect()
+        self.connections_opened += 1
+        return _PooledConnection(client)
+
+    def _release(self, connection: _PooledConnection) -> None:
+        if connection.messages >= self.max_messages_per_connection:
+            # Recycle long-lived connections so server-side limits are never hit
+            self._close(connection)
+        else:
+            self._idle.append(connection)
+
+    @staticmethod
+    def _close(connection: _PooledConnection) -> None:
+        connection.client.close()
+
+    async def close(self) -> None:
+        """Politely close every idle connection"""
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            try:
+                await connection.client.quit()
+            except Exception:
+                connection.client.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics for monitoring"""
+        return {
+            "host": f"{self.hostname}:{self.port}",
+            "max_connections": self.max_connections,
+            "idle_connections": len(self._idle),
+            "in_flight": self.in_flight,
+            "connections_opened": self.connections_opened,
+            "sent": self.sent,
+            "retries": self.retries,
+            "failures": self.failures
+        }
+
+
+# Global SMTP pool shared by NotificationService and EmailService
+smtp_pool = SMTPPool()
@@ -18,7 +18,7 @@ from ..models.schemas import (
     UserPermissionCreate, UserPermissionResponse,
     PermissionExtensionRequest, PermissionRevocationRequest
 )
-from ..services.google_api_service import GoogleAnalyticsService
+from ..services.ga4_client_registry import ga4_client_registry
 from ..services.audit_service import AuditService
 import logging
 
@@ -30,7 +30,7 @@ class UserPermissionService:
     
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.ga_service = GoogleAnalyticsService()
+        self.ga_service = ga4_client_registry.get()
         self.audit_service = AuditService(db)
     
     async def create_user_permission(
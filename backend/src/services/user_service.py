@@ -10,7 +10,9 @@ from sqlalchemy.orm import selectinload
 from ..core.exceptions import ValidationError, NotFoundError, ConflictError
 from ..models.db_models import User, UserRole, UserStatus
 from ..models.schemas import UserCreate, UserUpdate, UserResponse
-from ..services.auth_service import AuthService
+from ..services.password_hasher import password_hasher
+from ..services.principal_cache import principal_cache
+from ..services.permission_cache import permission_decision_cache
 
 
 class UserService:
@@ -51,7 +53,7 @@ class UserService:
             raise ValidationError("Password must be at least 8 characters long")
         
         # Create user
-        hashed_password = AuthService.hash_password(user_data.password)
+        hashed_password = await password_hasher.hash(user_data.password)
         
         # Determine user role and status based on registration context
         user_role = UserRole.REQUESTER  # Default role
@@ -105,6 +107,9 @@ class UserService:
         
         await self.db.commit()
         await self.db.refresh(user)
+        await principal_cache.revoke(user.id, user.email)
+        if user_data.role is not None or user_data.status is not None:
+            await permission_decision_cache.invalidate_user(user.id)
         
         return UserResponse.model_validate(user)
     
@@ -118,6 +123,8 @@ class UserService:
         
         await self.db.delete(user)
         await self.db.commit()
+        await principal_cache.revoke(user_id, user.email)
+        await permission_decision_cache.invalidate_user(user_id)
         
         return True
     
@@ -172,7 +179,7 @@ class UserService:
             raise ValidationError("Password must be at least 8 characters long")
         
         # Update password
-        user.password_hash = AuthService.hash_password(new_password)
+        user.password_hash = await password_hasher.hash(new_password)
         user.password_reset_count += 1
         
         await self.db.commit()
@@ -9,7 +9,7 @@ from datetime import datetime, timedelta
 from typing import AsyncGenerator, Generator, Dict, Any
 from unittest.mock import Mock, AsyncMock
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.pool import StaticPool
 
@@ -45,6 +45,15 @@ async def test_engine():
         echo=False,
     )
     
+    # pysqlite's own transaction handling breaks SAVEPOINTs; let SQLAlchemy emit BEGIN
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+    
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+    
     # Create all tables
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
@@ -58,16 +67,16 @@ async def test_engine():
 async def db_session(test_engine) -> AsyncGenerator[AsyncSession, None]:
     """Create a fresh database session for each test."""
     async with test_engine.begin() as connection:
-        session = AsyncSession(bind=connection, expire_on_commit=False)
+        session = AsyncSession(bind=connection, expire_on_commit=False, join_transaction_mode="create_savepoint")
         
         # Start a nested transaction
         nested = await connection.begin_nested()
         
         yield session
         
-        # Rollback the nested transaction
-        await nested.rollback()
+        # Close the session (ending its own savepoint), then roll back the nested transaction
         await session.close()
+        await nested.rollback()
 
 
 # User fixtures
@@ -112,6 +121,23 @@ def performance_threshold():
     return 200  # 200ms response time threshold
 
 
+# GA4 Admin API fixtures
+@pytest.fixture(autouse=True)
+def unthrottled_ga4_api(monkeypatch):
+    """Admin API stand-ins enforce no quotas; quota scheduler tests build their own executor."""
+    from src.services.ga4_quota_scheduler import ga4_quota_scheduler
+    
+    monkeypatch.setattr(ga4_quota_scheduler, "enabled", False)
+
+
+@pytest.fixture(autouse=True)
+def uncached_ga4_reads(monkeypatch):
+    """GA4 routes reach their Admin API stand-in; cache tests build their own GA4MetadataCache."""
+    from src.services.ga4_metadata_cache import ga4_metadata_cache
+    
+    monkeypatch.setattr(ga4_metadata_cache, "enabled", False)
+
+
 # Mock fixtures
 @pytest.fixture
 def mock_email_service():
@@ -134,6 +160,40 @@ def mock_google_api():
     return mock_instance
 
 
+@pytest.fixture(scope="session")
+def service_account_info() -> Dict[str, Any]:
+    """Service account key material with a real (throwaway) RSA key."""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_key = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ).decode()
+    
+    return {
+        "type": "service_account",
+        "project_id": "test-project",
+        "private_key_id": "test-key-id",
+        "private_key": private_key,
+        "client_email": "test-service@test-project.iam.gserviceaccount.com",
+        "client_id": "1234567890",
+        "token_uri": "https://oauth2.googleapis.com/token",
+    }
+
+
+@pytest.fixture
+def service_account_file(tmp_path, service_account_info) -> str:
+    """Path to a service account key file."""
+    import json
+    
+    path = tmp_path / "service-account.json"
+    path.write_text(json.dumps(service_account_info))
+    return str(path)
+
+
 # Security testing fixtures
 @pytest.fixture
 def malicious_payloads():
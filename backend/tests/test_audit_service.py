@@ -0,0 +1,206 @@
+"""
+Audit service and buffered audit writer tests
+"""
+
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from src.core.database import Base
+from src.models.db_models import AuditLog
+from src.services.audit_service import AuditService
+from src.services.audit_writer import AuditWriter
+
+
+@pytest.fixture
+async def audit_engine():
+    """Separate engine so the writer's background flushes never share the db_session connection"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def audit_sessions(audit_engine):
+    return async_sessionmaker(audit_engine, expire_on_commit=False)
+
+
+@pytest.fixture
+async def audit_db(audit_sessions):
+    async with audit_sessions() as session:
+        yield session
+
+
+def _writer(audit_sessions, **kwargs) -> AuditWriter:
+    return AuditWriter(session_factory=audit_sessions, **kwargs)
+
+
+async def _count(db, action=None) -> int:
+    query = select(func.count(AuditLog.id))
+    if action:
+        query = query.where(AuditLog.action == action)
+    return (await db.execute(query)).scalar()
+
+
+@pytest.mark.database
+class TestAuditService:
+    """log_action with and without the buffered writer"""
+
+    async def test_writes_immediately_when_writer_not_running(self, audit_db, audit_sessions):
+        service = AuditService(audit_db, _writer(audit_sessions))
+
+        audit_log = await service.log_action(action="test_action", resource_type="test")
+
+        assert audit_log.id is not None
+        assert await _count(audit_db, "test_action") == 1
+
+    async def test_buffered_entries_written_on_stop(self, audit_db, audit_sessions):
+        writer = _writer(audit_sessions, batch_size=100, flush_interval=3600)
+        service = AuditService(audit_db, writer)
+        writer.start()
+
+        for index in range(250):
+            await service.log_action(action="buffered", resource_type="test", resource_id=str(index))
+        await asyncio.sleep(0)
+
+        await writer.stop()
+
+        assert await _count(audit_db, "buffered") == 250
+        assert writer.get_stats()["batches"] == 3
+        assert writer.pending == 0
+
+    async def test_batch_size_wakes_flusher(self, audit_db, audit_sessions):
+        writer = _writer(audit_sessions, batch_size=10, flush_interval=3600)
+        service = AuditService(audit_db, writer)
+        writer.start()
+        try:
+            for _ in range(10):
+                await service.log_action(action="threshold", resource_type="test")
+            for _ in range(200):
+                await asyncio.sleep(0.01)
+                if writer.written == 10:
+                    break
+
+            assert writer.written == 10
+        finally:
+            await writer.stop()
+
+    async def test_durable_action_bypasses_queue(self, audit_db, audit_sessions):
+        writer = _writer(audit_sessions, flush_interval=3600)
+        service = AuditService(audit_db, writer)
+        writer.start()
+        try:
+            audit_log = await service.log_action(action="durable", resource_type="test", durable=True)
+
+            assert audit_log.id is not None
+            assert writer.pending == 0
+            assert await _count(audit_db, "durable") == 1
+        finally:
+            await writer.stop()
+
+    async def test_dict_details_are_serialized(self, audit_db, audit_sessions):
+        writer = _writer(audit_sessions, flush_interval=3600)
+        writer.start()
+        await AuditService(audit_db, writer).log_action(
+            action="dict_details", resource_type="test", details={"ids": [1, 2]}
+        )
+        await writer.stop()
+
+        details = (await audit_db.execute(
+            select(AuditLog.details).where(AuditLog.action == "dict_details")
+        )).scalar_one()
+        assert details == '{"ids": [1, 2]}'
+
+
+@pytest.mark.unit
+class TestAuditWriter:
+    """Failure handling of the audit writer"""
+
+    async def test_failed_batch_is_retried(self):
+        attempts = []
+
+        def broken_session():
+            attempts.append(1)
+            raise RuntimeError("database unavailable")
+
+        writer = AuditWriter(batch_size=2, max_pending=10, session_factory=broken_session)
+        for index in range(3):
+            await writer.submit({"action": "retry", "resource_type": "test", "resource_id": str(index)})
+
+        assert await writer.flush() == 0
+        assert writer.pending == 3
+        assert [entry["resource_id"] for entry in writer._pending] == ["0", "1", "2"]
+        # The whole batch, then each of its rows
+        assert len(attempts) == 3
+        assert writer.get_stats()["quarantined"] == 0
+
+    async def test_bad_row_is_quarantined(self, audit_db, audit_sessions):
+        writer = _writer(audit_sessions, batch_size=10)
+        await writer.submit({"action": "good", "resource_type": "test"})
+        await writer.submit({"action": "bad", "resource_type": None})  # NOT NULL violation
+        await writer.submit({"action": "good", "resource_type": "test"})
+
+        assert await writer.flush() == 2
+        assert writer.pending == 0
+        assert writer.get_stats()["quarantined"] == 1
+        assert await _count(audit_db, "good") == 2
+
+    async def test_stop_waits_for_inflight_flush(self, audit_db, audit_sessions):
+        writer = _writer(audit_sessions, batch_size=5, flush_interval=3600)
+        writer.start()
+        for _ in range(5):
+            await writer.submit({"action": "inflight", "resource_type": "test"})
+
+        # The background flush is woken but has not run yet
+        await writer.stop()
+
+        assert await _count(audit_db, "inflight") == 5
+        assert writer.written == 5
+
+    async def test_queue_is_bounded(self):
+        def broken_session():
+            raise RuntimeError("database unavailable")
+
+        writer = AuditWriter(batch_size=2, max_pending=5, session_factory=broken_session)
+        for index in range(8):
+            await writer.submit({"action": "overflow", "resource_type": "test", "resource_id": str(index)})
+
+        assert writer.pending <= 5
+        assert writer._pending[-1]["resource_id"] == "7"
+        assert writer.get_stats()["dropped"] == 3
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestAuditWriterBenchmark:
+    """Audit rows/sec: commit per entry vs buffered batches"""
+
+    async def test_rows_per_second(self, audit_db, audit_sessions):
+        entries = 2000
+
+        service = AuditService(audit_db, _writer(audit_sessions))
+        started = time.perf_counter()
+        for index in range(entries):
+            await service.log_action(action="bench_sync", resource_type="test", resource_id=str(index))
+        sync_rate = entries / (time.perf_counter() - started)
+
+        writer = _writer(audit_sessions, batch_size=500, flush_interval=3600)
+        service = AuditService(audit_db, writer)
+        writer.start()
+        started = time.perf_counter()
+        for index in range(entries):
+            await service.log_action(action="bench_batched", resource_type="test", resource_id=str(index))
+        await writer.stop()
+        batched_rate = entries / (time.perf_counter() - started)
+
+        print(f"\naudit log: {sync_rate:,.0f} rows/s committed per entry, {batched_rate:,.0f} rows/s batched")
+        assert await _count(audit_db, "bench_batched") == entries
+        assert batched_rate > sync_rate * 3
@@ -0,0 +1,311 @@
+"""
+Request authentication tests: principal cache, stateless tokens and batched activity
+"""
+
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core import auth_dependencies
+from src.core.exceptions import AuthenticationError
+from src.models.db_models import (
+    Client, ClientAssignment, ClientAssignmentStatus, User, UserRole, UserStatus
+)
+from src.services.activity_tracker import ActivityTracker
+from src.services.auth_service import AuthService
+from src.services.permission_cache import PermissionDecisionCache
+from src.services.principal_cache import AuthenticatedPrincipal, PrincipalCache
+
+
+@pytest.fixture
+def channel():
+    """Revocation channel of a worker subscribed to Redis"""
+    channel = PermissionDecisionCache()
+    channel._redis, channel._subscribed = object(), True
+    return channel
+
+
+@pytest.fixture
+def principals(monkeypatch, channel):
+    cache = PrincipalCache(ttl_seconds=60, max_entries=100, revocation_channel=channel)
+    cache.resync(at=time.time() - 60)
+    monkeypatch.setattr(auth_dependencies, "principal_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def tracker(monkeypatch, db_session):
+    # Flushes join the test transaction through a savepoint
+    tracker = ActivityTracker(
+        flush_interval=3600,
+        session_factory=lambda: AsyncSession(
+            bind=db_session.bind, expire_on_commit=False, join_transaction_mode="create_savepoint"
+        )
+    )
+    monkeypatch.setattr(auth_dependencies, "activity_tracker", tracker)
+    return tracker
+
+
+@pytest.fixture
+def stateless(monkeypatch):
+    monkeypatch.setattr(auth_dependencies.settings, "AUTH_STATELESS_TOKENS", True)
+
+
+@pytest.fixture
+def statements(test_engine):
+    """Record SQL statements issued while the test runs"""
+    recorded = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        recorded.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", record)
+    yield recorded
+    event.remove(test_engine.sync_engine, "before_cursor_execute", record)
+
+
+async def _token(db_session, user: User) -> HTTPAuthorizationCredentials:
+    token_data = await AuthService(db_session)._access_token_data(user)
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=AuthService.create_access_token(token_data))
+
+
+@pytest.mark.unit
+class TestAuthenticatedPrincipal:
+    """Principals built from token claims"""
+
+    def test_from_claims(self):
+        principal = AuthenticatedPrincipal.from_claims({
+            "sub": "a@example.com", "user_id": 7, "role": "Admin", "status": "active", "client_ids": [3, 1]
+        })
+
+        assert principal == AuthenticatedPrincipal(
+            id=7, email="a@example.com", role=UserRole.ADMIN, status=UserStatus.ACTIVE,
+            client_ids=(3, 1), source="token"
+        )
+
+    def test_incomplete_claims_are_rejected(self):
+        # Tokens issued before the stateless claims existed
+        assert AuthenticatedPrincipal.from_claims({"sub": "a@example.com", "user_id": 7, "role": "Admin"}) is None
+        assert AuthenticatedPrincipal.from_claims({
+            "sub": "a@example.com", "user_id": 7, "role": "Nobody", "status": "active", "client_ids": []
+        }) is None
+
+    def test_revocation_distrusts_older_tokens(self, principals):
+        payload = {"user_id": 7, "iat": int(time.time()) - 5}
+        assert principals.claims_trusted(payload)
+
+        principals.invalidate(7)
+
+        assert not principals.claims_trusted(payload)
+        assert not principals.claims_trusted({"user_id": 7})
+        assert principals.claims_trusted({"user_id": 7, "iat": time.time() + 5})
+
+    def test_tokens_before_subscription_are_not_trusted(self, channel):
+        cache = PrincipalCache(revocation_channel=channel)
+        payload = {"user_id": 7, "iat": int(time.time()) - 5}
+        assert not cache.stateless_available
+
+        # Revocations sent before this worker subscribed were never seen
+        cache.resync()
+        assert cache.stateless_available
+        assert not cache.claims_trusted(payload)
+
+        channel._subscribed = False
+        assert not cache.stateless_available
+
+    def test_revocation_from_another_worker(self, principals, channel):
+        channel.add_revocation_listener(lambda user_id, at: principals.invalidate(user_id, revoked_at=at))
+        principals.set(AuthenticatedPrincipal(7, "a@example.com", UserRole.ADMIN, UserStatus.ACTIVE))
+        payload = {"user_id": 7, "iat": int(time.time()) - 5}
+
+        channel.apply_invalidation(json.dumps({"revoked_user_id": 7, "revoked_at": time.time(), "origin": "other"}))
+
+        assert principals.get("a@example.com") is None
+        assert not principals.claims_trusted(payload)
+
+    def test_revocations_are_bounded(self, principals):
+        principals.max_entries = 2
+        for user_id in range(3):
+            principals.invalidate(user_id)
+
+        assert principals.get_stats()["revoked_users"] == 2
+        # The forgotten revocation still distrusts every token issued before it
+        assert not principals.claims_trusted({"user_id": 0, "iat": int(time.time()) - 5})
+
+    def test_entries_expire_and_are_bounded(self):
+        cache = PrincipalCache(ttl_seconds=60, max_entries=2)
+        for user_id in range(3):
+            cache.set(AuthenticatedPrincipal(user_id, f"{user_id}@example.com", UserRole.VIEWER, UserStatus.ACTIVE))
+
+        assert cache.get("0@example.com") is None
+        assert cache.get("2@example.com").id == 2
+
+        cache.ttl_seconds = 0
+        cache.set(AuthenticatedPrincipal(2, "2@example.com", UserRole.VIEWER, UserStatus.ACTIVE))
+        assert cache.get("2@example.com") is None
+
+
+@pytest.mark.database
+class TestGetCurrentUser:
+    """get_current_user with the principal cache and activity tracker"""
+
+    async def test_cached_principal_skips_database(self, db_session, test_user, principals, tracker, statements):
+        credentials = await _token(db_session, test_user)
+
+        first = await auth_dependencies.get_current_user(credentials, db_session)
+        statements.clear()
+        second = await auth_dependencies.get_current_user(credentials, db_session)
+
+        assert first == second
+        assert first.id == test_user.id and first.role == UserRole.REQUESTER
+        assert statements == []
+        assert principals.get_stats()["database_loads"] == 1
+
+    async def test_stateless_token_skips_database(self, db_session, test_user, principals, tracker, stateless, statements):
+        credentials = await _token(db_session, test_user)
+        statements.clear()
+
+        principal = await auth_dependencies.get_current_user(credentials, db_session)
+
+        assert principal.source == "token"
+        assert principal.id == test_user.id
+        assert statements == []
+
+    async def test_invalidated_user_is_reloaded(self, db_session, test_user, principals, tracker, stateless):
+        credentials = await _token(db_session, test_user)
+        await auth_dependencies.get_current_user(credentials, db_session)
+
+        test_user.status = UserStatus.SUSPENDED
+        await db_session.commit()
+        principals.invalidate(test_user.id, test_user.email)
+
+        with pytest.raises(AuthenticationError):
+            await auth_dependencies.get_current_user(credentials, db_session)
+
+    async def test_client_ids_loaded_from_active_assignments(self, db_session, test_user, principals, tracker):
+        clients = [Client(name=f"Client {index}") for index in range(3)]
+        db_session.add_all(clients)
+        await db_session.flush()
+        db_session.add_all([
+            ClientAssignment(user_id=test_user.id, client_id=clients[0].id, assigned_by_id=test_user.id),
+            ClientAssignment(user_id=test_user.id, client_id=clients[2].id, assigned_by_id=test_user.id),
+            ClientAssignment(
+                user_id=test_user.id, client_id=clients[1].id, assigned_by_id=test_user.id,
+                status=ClientAssignmentStatus.INACTIVE
+            ),
+        ])
+        await db_session.commit()
+
+        principal = await auth_dependencies.get_current_user(await _token(db_session, test_user), db_session)
+
+        assert principal.client_ids == (clients[0].id, clients[2].id)
+        assert await auth_dependencies.get_user_accessible_clients(principal, db_session) == [clients[0].id, clients[2].id]
+
+    async def test_activity_is_flushed_in_one_update(self, db_session, test_user, principals, tracker, statements):
+        credentials = await _token(db_session, test_user)
+        for _ in range(5):
+            await auth_dependencies.get_current_user(credentials, db_session)
+
+        assert tracker.pending == 1
+        statements.clear()
+        assert await tracker.flush() == 1
+
+        assert len([statement for statement in statements if statement.startswith("UPDATE users")]) == 1
+        last_login_at = (await db_session.execute(
+            select(User.last_login_at).where(User.id == test_user.id)
+        )).scalar_one()
+        assert last_login_at is not None
+
+    async def test_deleted_user_does_not_block_flush(self, db_session, test_user, tracker):
+        tracker.record(test_user.id)
+        tracker.record(999999)
+
+        assert await tracker.flush() == 2
+        assert tracker.pending == 0
+        last_login_at = (await db_session.execute(
+            select(User.last_login_at).where(User.id == test_user.id)
+        )).scalar_one()
+        assert last_login_at is not None
+
+
+@pytest.mark.unit
+class TestActivityTracker:
+    """Coalescing of activity timestamps"""
+
+    def test_keeps_latest_timestamp_per_user(self):
+        tracker = ActivityTracker()
+        now = datetime.utcnow()
+        tracker.record(1, now)
+        tracker.record(1, now - timedelta(minutes=1))
+        tracker.record(2, now)
+
+        assert tracker.pending == 2
+        assert tracker._pending[1] == now
+        assert tracker.get_stats()["recorded"] == 3
+
+    async def test_failed_flush_keeps_pending_activity(self):
+        def broken_session():
+            raise RuntimeError("database unavailable")
+
+        tracker = ActivityTracker(session_factory=broken_session)
+        tracker.record(1)
+
+        assert await tracker.flush() == 0
+        assert tracker.pending == 1
+
+
+async def _legacy_get_current_user(db_session, email):
+    """User lookup and per-request last_login_at commit as done before the principal cache"""
+    result = await db_session.execute(select(User).where(User.email == email))
+    user = result.scalar_one_or_none()
+    user.last_login_at = datetime.utcnow()
+    await db_session.commit()
+    return user
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestAuthenticationLoad:
+    """Database statements and write transactions per authenticated request"""
+
+    async def test_transactions_per_request(self, db_session, principals, tracker, statements):
+        users = [
+            User(
+                email=f"load{index}@example.com", name=f"Load {index}", company="Load",
+                password_hash="x", role=UserRole.VIEWER, status=UserStatus.ACTIVE
+            )
+            for index in range(20)
+        ]
+        db_session.add_all(users)
+        await db_session.commit()
+        credentials = [await _token(db_session, user) for user in users]
+        requests = 1000
+
+        def counts():
+            writes = [s for s in statements if s.startswith(("UPDATE", "RELEASE SAVEPOINT"))]
+            return len(statements), len([s for s in writes if s.startswith("RELEASE SAVEPOINT")])
+
+        statements.clear()
+        for index in range(requests):
+            await _legacy_get_current_user(db_session, users[index % len(users)].email)
+        legacy_statements, legacy_commits = counts()
+
+        statements.clear()
+        for index in range(requests):
+            await auth_dependencies.get_current_user(credentials[index % len(credentials)], db_session)
+        await tracker.flush()
+        new_statements, new_commits = counts()
+
+        print(
+            f"\n{requests} requests: {legacy_statements / requests:.2f} statements and "
+            f"{legacy_commits / requests:.2f} commits per request before, "
+            f"{new_statements / requests:.3f} statements and {new_commits / requests:.3f} commits after"
+        )
+        assert legacy_commits == requests
+        assert new_commits == 1
+        assert new_statements < legacy_statements / 10
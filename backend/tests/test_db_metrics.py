@@ -0,0 +1,269 @@
+"""
+Database instrumentation tests: statement histograms, slow-query log, per-request counts, pool gauges and overhead
+"""
+
+import logging
+import time
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from src.api.routers import metrics
+from src.core import database
+from src.core.db_metrics import (
+    OTHER_STATEMENTS, DatabaseMetrics, Histogram, InstrumentedAsyncQueuePool, normalize_sql, redact_parameters
+)
+from src.core.rbac import get_current_user_with_permissions
+
+
+def _memory_engine():
+    return create_async_engine(
+        "sqlite+aiosqlite:///:memory:", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+
+
+@pytest.fixture
+async def engine():
+    engine = _memory_engine()
+    yield engine
+    await engine.dispose()
+
+
+def _statement(stats, key: str):
+    return next(entry for entry in stats["statements"] if entry["statement"] == key)
+
+
+@pytest.mark.unit
+class TestNormalization:
+    """Statement keys and redacted parameters"""
+
+    @pytest.mark.parametrize("statement, key", [
+        ("SELECT * FROM users WHERE id = 42", "SELECT * FROM users WHERE id = ?"),
+        ("SELECT * FROM users WHERE email = 'a@b.c' AND name = 'O''Brien'",
+         "SELECT * FROM users WHERE email = ? AND name = ?"),
+        ("SELECT *\n  FROM users\n WHERE id = $1 AND role = %s AND status = %(status)s",
+         "SELECT * FROM users WHERE id = ? AND role = ? AND status = ?"),
+        ("SELECT * FROM users WHERE id IN (?, ?, ?, ?) LIMIT ? OFFSET ?",
+         "SELECT * FROM users WHERE id IN (?, ...) LIMIT ? OFFSET ?"),
+        ("SELECT * FROM users WHERE id IN (__[POSTCOMPILE_id_1]) AND ga4_id = :ga4_id",
+         "SELECT * FROM users WHERE id IN (__[POSTCOMPILE_id_1]) AND ga4_id = ?"),
+        ("SELECT t1.id FROM table2 t1", "SELECT t1.id FROM table2 t1"),
+    ])
+    def test_literals_and_placeholders_share_one_key(self, statement, key):
+        assert normalize_sql(statement) == key
+
+    def test_parameter_values_are_redacted(self):
+        assert redact_parameters(("hunter2", 42, None)) == ["<str>", "<int>", "<NoneType>"]
+        assert redact_parameters({"password": "hunter2"}) == {"password": "<str>"}
+        assert redact_parameters([("hunter2",), ("swordfish",)]) == [["<str>"], "... 2 rows"]
+        assert "hunter2" not in repr(redact_parameters([{"password": "hunter2"}]))
+
+    def test_histogram_quantiles(self):
+        histogram = Histogram((1, 2, 5))
+        for value in [0.5] * 90 + [3] * 9 + [7]:
+            histogram.observe(value)
+
+        assert histogram.quantile(0.5) == 1
+        assert histogram.quantile(0.95) == 5
+        assert histogram.quantile(1.0) == 7
+        assert histogram.get_stats()["buckets"] == {"le_1": 90, "le_2": 0, "le_5": 9, "le_inf": 1}
+
+
+@pytest.mark.unit
+class TestStatementMetrics:
+    """Listeners on an instrumented engine"""
+
+    async def test_repeated_statements_share_a_histogram(self, engine):
+        db_metrics = DatabaseMetrics(slow_query_seconds=60)
+        db_metrics.instrument(engine)
+
+        async with engine.connect() as conn:
+            for value in range(5):
+                await conn.execute(text("SELECT :value + 1"), {"value": value})
+            await conn.execute(text("SELECT 'literal'"))
+
+        stats = db_metrics.get_stats()
+        assert _statement(stats, "SELECT ? + ?")["count"] == 5
+        assert _statement(stats, "SELECT ?")["count"] == 1
+        assert stats["slow_queries"] == []
+
+    async def test_slow_queries_are_logged_without_parameter_values(self, engine, caplog):
+        db_metrics = DatabaseMetrics(slow_query_seconds=0)
+        db_metrics.instrument(engine)
+
+        with caplog.at_level(logging.WARNING, logger="src.core.db_metrics"):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT :password"), {"password": "hunter2"})
+
+        [entry] = db_metrics.get_stats()["slow_queries"]
+        assert entry["statement"] == "SELECT ?"
+        assert entry["parameters"] == ["<str>"]
+        assert "Slow query" in caplog.text
+        assert "hunter2" not in caplog.text and "hunter2" not in repr(entry)
+
+    async def test_failed_statements_are_counted(self, engine):
+        db_metrics = DatabaseMetrics(slow_query_seconds=60)
+        db_metrics.instrument(engine)
+
+        async with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                await conn.execute(text("SELECT * FROM missing_table WHERE id = 1"))
+            await conn.execute(text("SELECT 1"))
+
+        stats = db_metrics.get_stats()
+        assert _statement(stats, "SELECT * FROM missing_table WHERE id = ?")["errors"] == 1
+        assert _statement(stats, "SELECT ?")["count"] == 1
+
+    async def test_distinct_statements_are_capped(self, engine):
+        db_metrics = DatabaseMetrics(slow_query_seconds=60, max_statements=3)
+        db_metrics.instrument(engine)
+
+        async with engine.connect() as conn:
+            for column in range(6):
+                await conn.execute(text(f"SELECT 1 AS c{column}"))
+
+        stats = db_metrics.get_stats()
+        assert stats["distinct_statements"] == 4
+        assert _statement(stats, OTHER_STATEMENTS)["count"] == 3
+
+
+@pytest.mark.unit
+class TestRequestCounts:
+    """Statements per get_db session"""
+
+    async def test_get_db_counts_each_request(self, engine, monkeypatch):
+        db_metrics = DatabaseMetrics(slow_query_seconds=60)
+        db_metrics.instrument(engine)
+        monkeypatch.setattr(database, "db_metrics", db_metrics)
+        monkeypatch.setattr(database, "AsyncSessionLocal", async_sessionmaker(engine, expire_on_commit=False))
+
+        app = FastAPI()
+
+        @app.get("/queries/{count}")
+        async def run_queries(count: int, db=Depends(database.get_db)):
+            for _ in range(count):
+                await db.execute(text("SELECT 1"))
+            return {"ok": True}
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            for count in (1, 3, 30):
+                assert (await client.get(f"/queries/{count}")).status_code == 200
+
+        # Statements outside a request are not attributed to one
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+        stats = db_metrics.get_stats()
+        assert stats["requests"] == 3
+        assert stats["statements_per_request"]["max"] == 30
+        assert stats["statements_per_request"]["buckets"]["le_1"] == 1
+        assert stats["statements_per_request"]["buckets"]["le_5"] == 1
+        assert stats["statements_per_request"]["buckets"]["le_50"] == 1
+        assert _statement(stats, "SELECT ?")["count"] == 35
+
+
+@pytest.mark.unit
+class TestPoolMetrics:
+    """Checkout waits, exhaustion and occupancy of InstrumentedAsyncQueuePool"""
+
+    async def test_exhausted_pool_times_out_and_is_reported(self, tmp_path):
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+            poolclass=InstrumentedAsyncQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.1
+        )
+        db_metrics = DatabaseMetrics(slow_query_seconds=60)
+        db_metrics.instrument(engine)
+
+        try:
+            async with engine.connect() as held:
+                await held.execute(text("SELECT 1"))
+                [pool] = db_metrics.get_stats()["pools"]
+                assert (pool["size"], pool["checked_out"], pool["checked_in"]) == (1, 1, 0)
+
+                started = time.perf_counter()
+                with pytest.raises(PoolTimeoutError):
+                    async with engine.connect():
+                        pass
+                assert time.perf_counter() - started < 1
+
+            stats = db_metrics.get_stats()
+            assert stats["pool_timeouts"] == 1
+            assert stats["pool_wait"]["count"] == 2
+            assert stats["pool_wait"]["max"] >= 0.1
+            assert stats["pools"][0]["checked_out"] == 0
+
+            # dispose() swaps in a new pool, which keeps reporting
+            await engine.dispose()
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            assert db_metrics.get_stats()["pool_wait"]["count"] == 3
+        finally:
+            await engine.dispose()
+
+    def test_pool_options_apply_to_server_databases_only(self):
+        server = database.engine_options("postgresql+asyncpg://app:secret@db/ga4")
+        sqlite = database.engine_options("sqlite+aiosqlite:///./app.db")
+
+        assert server["poolclass"] is InstrumentedAsyncQueuePool
+        assert server["pool_size"] == database.settings.DATABASE_POOL_SIZE
+        assert server["pool_timeout"] == database.settings.DATABASE_POOL_TIMEOUT
+        assert "poolclass" not in sqlite and "pool_size" not in sqlite
+
+
+@pytest.mark.unit
+class TestMetricsEndpoint:
+    """GET /api/admin/metrics/database"""
+
+    @pytest.mark.parametrize("role, status_code", [("Admin", 200), ("Viewer", 403)])
+    async def test_requires_system_health(self, role, status_code):
+        app = FastAPI()
+        app.include_router(metrics.router, prefix="/api/admin/metrics")
+        app.dependency_overrides[get_current_user_with_permissions] = lambda: {"user_id": 1, "role": role}
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/api/admin/metrics/database", params={"top": 5})
+
+        assert response.status_code == status_code
+        if status_code == 200:
+            body = response.json()
+            assert {"pools", "pool_wait", "pool_timeouts", "statements", "statements_per_request", "slow_queries"} <= body.keys()
+            assert len(body["statements"]) <= 5
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestInstrumentationOverheadBenchmark:
+    """Cost of the listeners on small statements"""
+
+    STATEMENTS = 3000
+
+    async def _run(self, engine) -> float:
+        async with engine.connect() as conn:
+            started = time.perf_counter()
+            for value in range(self.STATEMENTS):
+                await conn.execute(text("SELECT :value"), {"value": value})
+            return (time.perf_counter() - started) / self.STATEMENTS
+
+    async def test_overhead_per_statement(self):
+        plain, instrumented = _memory_engine(), _memory_engine()
+        db_metrics = DatabaseMetrics(slow_query_seconds=60)
+        db_metrics.instrument(instrumented)
+        try:
+            await self._run(plain)
+            await self._run(instrumented)
+            baseline = min([await self._run(plain) for _ in range(3)])
+            measured = min([await self._run(instrumented) for _ in range(3)])
+        finally:
+            await plain.dispose()
+            await instrumented.dispose()
+
+        print(
+            f"\n{self.STATEMENTS} statements on aiosqlite: plain {baseline * 1e6:.0f} µs, "
+            f"instrumented {measured * 1e6:.0f} µs per statement"
+        )
+        assert measured < baseline * 1.25
@@ -0,0 +1,228 @@
+"""
+Read-replica routing tests: replica selection, read-your-writes stickiness and lag fallback
+
+Two SQLite files stand in for the primary and its replica. Nothing replicates
+between them, so which database answered a read shows where it was routed.
+"""
+
+import asyncio
+from functools import partial
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI, Request
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.core import database
+from src.core.database import Base
+from src.core.db_replicas import ReplicaRouter, WriteTrackingSession
+from src.models.db_models import Client
+
+
+class Lag:
+    """Lag probe whose reading the test sets"""
+
+    def __init__(self, seconds: float = 0.0):
+        self.seconds = seconds
+        self.checks = 0
+
+    async def __call__(self, conn) -> float:
+        await conn.execute(text("SELECT 1"))
+        self.checks += 1
+        return self.seconds
+
+
+async def _database(path, client_name: str):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[Client.__table__])
+        await conn.execute(Client.__table__.insert().values(name=client_name, is_active=True))
+    return engine
+
+
+@pytest.fixture
+async def primary(tmp_path):
+    engine = await _database(tmp_path / "primary.db", "on-primary")
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def replica(tmp_path):
+    engine = await _database(tmp_path / "replica.db", "on-replica")
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def primary_sessions(primary):
+    return async_sessionmaker(
+        primary, class_=AsyncSession, sync_session_class=WriteTrackingSession, expire_on_commit=False
+    )
+
+
+async def _answered_by(sessions) -> str:
+    async with sessions() as session:
+        return (await session.execute(select(Client.name).order_by(Client.id))).scalars().first()
+
+
+@pytest.mark.unit
+class TestReplicaSelection:
+    """sessions_for without stickiness"""
+
+    async def test_reads_use_a_current_replica(self, primary_sessions, replica):
+        router = ReplicaRouter(primary_sessions, [replica], max_lag_seconds=1, lag_probe=Lag(0.2))
+
+        # Replicas are unusable until their lag is known
+        assert await _answered_by(router.sessions_for()) == "on-primary"
+        await router.check_replicas()
+
+        assert await _answered_by(router.sessions_for()) == "on-replica"
+        stats = router.get_stats()
+        assert stats["replica_reads"] == 1 and stats["fallback_reads"] == 1
+        assert stats["replicas"][0]["lag_seconds"] == 0.2
+
+    async def test_healthy_replicas_take_turns(self, primary_sessions, replica, tmp_path):
+        second = await _database(tmp_path / "replica2.db", "on-second-replica")
+        router = ReplicaRouter(primary_sessions, [replica, second], lag_probe=Lag())
+        await router.check_replicas()
+
+        try:
+            answers = [await _answered_by(router.sessions_for()) for _ in range(4)]
+        finally:
+            await second.dispose()
+
+        assert sorted(answers) == ["on-replica", "on-replica", "on-second-replica", "on-second-replica"]
+
+    async def test_without_replicas_everything_reads_the_primary(self, primary_sessions):
+        router = ReplicaRouter(primary_sessions)
+
+        assert router.sessions_for("user@example.com") is primary_sessions
+        await router.start()
+        assert not router.running
+        assert router.get_stats()["primary_reads"] == 1
+
+
+@pytest.mark.unit
+class TestLagFallback:
+    """Lagging or unreachable replicas are skipped"""
+
+    async def test_lagging_replica_falls_back_to_primary_and_recovers(self, primary_sessions, replica):
+        lag = Lag(30)
+        router = ReplicaRouter(primary_sessions, [replica], max_lag_seconds=5, lag_probe=lag)
+        await router.check_replicas()
+        assert await _answered_by(router.sessions_for()) == "on-primary"
+
+        lag.seconds = 1
+        await router.check_replicas()
+        assert await _answered_by(router.sessions_for()) == "on-replica"
+
+        lag.seconds = 6
+        await router.check_replicas()
+        assert await _answered_by(router.sessions_for()) == "on-primary"
+        assert router.get_stats()["fallback_reads"] == 2
+
+    async def test_unreachable_replica_falls_back_to_primary(self, primary_sessions, tmp_path):
+        unreachable = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}")
+        router = ReplicaRouter(primary_sessions, [unreachable], lag_probe=Lag())
+        await router.check_replicas()
+
+        assert await _answered_by(router.sessions_for()) == "on-primary"
+        assert router.get_stats()["replicas"][0]["check_failures"] == 1
+        await unreachable.dispose()
+
+    async def test_background_checks_follow_the_lag(self, primary_sessions, replica):
+        lag = Lag(0)
+        router = ReplicaRouter(primary_sessions, [replica], max_lag_seconds=5, check_interval=0.01, lag_probe=lag)
+        await router.start()
+        try:
+            assert router.running
+            assert await _answered_by(router.sessions_for()) == "on-replica"
+
+            lag.seconds = 60
+            checks = lag.checks
+            while lag.checks < checks + 2:
+                await asyncio.sleep(0.01)
+            assert await _answered_by(router.sessions_for()) == "on-primary"
+        finally:
+            await router.stop()
+        assert not router.running
+
+
+@pytest.mark.unit
+class TestReadYourWrites:
+    """Committed writes send the writer's reads to the primary"""
+
+    async def _session(self, primary_sessions, router, user_key):
+        session = primary_sessions()
+        session.info["write_observer"] = partial(router.record_write, user_key)
+        return session
+
+    async def test_only_committed_changes_make_reads_sticky(self, primary_sessions, replica):
+        router = ReplicaRouter(primary_sessions, [replica], lag_probe=Lag())
+        await router.check_replicas()
+
+        async with await self._session(primary_sessions, router, "reader@example.com") as session:
+            await session.execute(select(Client))
+            await session.commit()
+        async with await self._session(primary_sessions, router, "rollback@example.com") as session:
+            session.add(Client(name="rolled back"))
+            await session.flush()
+            await session.rollback()
+            await session.commit()
+        assert router.get_stats()["writes_recorded"] == 0
+
+        async with await self._session(primary_sessions, router, "orm@example.com") as session:
+            session.add(Client(name="added"))
+            await session.commit()
+        async with await self._session(primary_sessions, router, "bulk@example.com") as session:
+            await session.execute(update(Client).values(description="bulk"))
+            await session.commit()
+
+        for user_key in ("orm@example.com", "bulk@example.com"):
+            assert await _answered_by(router.sessions_for(user_key)) == "on-primary"
+        for user_key in ("reader@example.com", "rollback@example.com", None):
+            assert await _answered_by(router.sessions_for(user_key)) == "on-replica"
+        assert router.get_stats()["sticky_users"] == 2
+
+    async def test_stickiness_expires(self, primary_sessions, replica):
+        router = ReplicaRouter(primary_sessions, [replica], sticky_seconds=0.05, lag_probe=Lag())
+        await router.check_replicas()
+
+        router.record_write("writer@example.com")
+        assert router.sessions_for("writer@example.com") is primary_sessions
+        await asyncio.sleep(0.06)
+        assert router.sessions_for("writer@example.com") is not primary_sessions
+
+    async def test_get_db_and_get_read_db(self, primary_sessions, replica, monkeypatch):
+        router = ReplicaRouter(primary_sessions, [replica], lag_probe=Lag())
+        await router.check_replicas()
+        monkeypatch.setattr(database, "AsyncSessionLocal", primary_sessions)
+        monkeypatch.setattr(database, "replica_router", router)
+
+        app = FastAPI()
+
+        @app.middleware("http")
+        async def token_subject(request: Request, call_next):
+            # Stands in for SecurityMiddleware's decoded token
+            request.scope.setdefault("state", {})["token_payload"] = {"sub": request.headers["x-user"]}
+            return await call_next(request)
+
+        @app.post("/clients/{name}")
+        async def create_client(name: str, db: AsyncSession = Depends(database.get_db)):
+            db.add(Client(name=name))
+            await db.commit()
+
+        @app.get("/clients")
+        async def list_clients(db: AsyncSession = Depends(database.get_read_db)):
+            return (await db.execute(select(Client.name).order_by(Client.id))).scalars().all()
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            writer, other = {"x-user": "writer@example.com"}, {"x-user": "other@example.com"}
+            assert (await client.get("/clients", headers=writer)).json() == ["on-replica"]
+
+            assert (await client.post("/clients/new", headers=writer)).status_code == 200
+
+            assert (await client.get("/clients", headers=writer)).json() == ["on-primary", "new"]
+            assert (await client.get("/clients", headers=other)).json() == ["on-replica"]
@@ -0,0 +1,267 @@
+"""
+GA4 Admin client registry tests against a local fake Admin API
+"""
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from google.oauth2 import service_account
+from googleapiclient.discovery import build
+
+from src.api.routers import ga4
+from src.core.config import settings
+from src.core.database import get_db
+from src.core.exceptions import GoogleAPIError
+from src.core.rbac import get_current_user_with_permissions
+from src.models.db_models import ServiceAccount
+from src.services.ga4_client_registry import GA4ClientRegistry
+from src.services.google_api_service import ADMIN_API_SCOPES, GoogleAnalyticsService, ThreadLocalAuthorizedHttp
+
+
+class _FakeAdminApi(BaseHTTPRequestHandler):
+    """OAuth token endpoint and the Admin API list calls"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    token_requests = 0
+    api_requests = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        type(self).token_requests += 1
+        self._reply({"access_token": f"token-{self.token_requests}", "expires_in": 3600, "token_type": "Bearer"})
+
+    def do_GET(self):
+        type(self).api_requests += 1
+        if self.path.startswith("/v1beta/accounts"):
+            self._reply({"accounts": [{"name": "accounts/1", "displayName": "Account"}]})
+        else:
+            self._reply({"properties": [{"name": "properties/123", "displayName": "Site", "timeZone": "UTC"}]})
+
+    def _reply(self, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def admin_api(monkeypatch):
+    handler = type("FakeAdminApi", (_FakeAdminApi,), {})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    monkeypatch.setattr(settings, "GA4_ADMIN_API_ENDPOINT", url)
+    yield handler, url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def key_info(admin_api, service_account_info):
+    _, url = admin_api
+    return {**service_account_info, "token_uri": f"{url}token"}
+
+
+@pytest.fixture
+def key_file(key_info, tmp_path, monkeypatch):
+    path = tmp_path / "service-account.json"
+    path.write_text(json.dumps(key_info))
+    monkeypatch.setattr(settings, "GOOGLE_SERVICE_ACCOUNT_FILE", str(path))
+    return str(path)
+
+
+def _service_account(secret_name: str, key_version: int = 1) -> ServiceAccount:
+    return ServiceAccount(email=f"{secret_name}@example.com", secret_name=secret_name, key_version=key_version)
+
+
+@pytest.mark.unit
+class TestGA4ClientRegistry:
+    """Client reuse, keys, eviction and token refresh"""
+
+    async def test_default_client_is_reused(self, admin_api, key_file):
+        handler, _ = admin_api
+        registry = GA4ClientRegistry()
+
+        first = registry.get()
+        assert await first.list_accounts() == [{
+            "name": "accounts/1", "displayName": "Account", "regionCode": None, "createTime": None, "updateTime": None
+        }]
+        second = registry.get()
+        await second.list_properties("accounts/1")
+
+        assert second is first
+        assert handler.token_requests == 1
+        assert registry.get_stats()["builds"] == 1
+        assert registry.get_stats()["hits"] == 1
+
+    async def test_clients_per_service_account_key(self, key_info):
+        loaded = []
+        registry = GA4ClientRegistry(key_loader=lambda secret_name: loaded.append(secret_name) or key_info)
+
+        first = registry.get(_service_account("first"))
+        assert registry.get(_service_account("first")) is first
+        assert registry.get(_service_account("second")) is not first
+        # A rotated key gets its own client
+        rotated = registry.get(_service_account("first", key_version=2))
+
+        assert rotated is not first
+        assert loaded == ["first", "second", "first"]
+        registry.evict(_service_account("first"))
+        assert registry.get_stats()["clients"] == 1
+
+    def test_missing_key_store(self, monkeypatch):
+        monkeypatch.setattr(settings, "GOOGLE_SERVICE_ACCOUNT_KEYS_DIR", None)
+
+        with pytest.raises(GoogleAPIError):
+            GA4ClientRegistry().get(_service_account("missing"))
+
+    def test_key_store_directory(self, key_info, tmp_path, monkeypatch):
+        (tmp_path / "managed.json").write_text(json.dumps(key_info))
+        monkeypatch.setattr(settings, "GOOGLE_SERVICE_ACCOUNT_KEYS_DIR", str(tmp_path))
+
+        service = GA4ClientRegistry().get(_service_account("managed"))
+
+        assert service.credentials.service_account_email == key_info["client_email"]
+
+    def test_unconfigured_client_is_not_kept(self, monkeypatch):
+        monkeypatch.setattr(settings, "GOOGLE_SERVICE_ACCOUNT_FILE", None)
+        registry = GA4ClientRegistry()
+
+        assert registry.get().service is None
+        assert registry.get_stats()["clients"] == 0
+
+    def test_idle_and_excess_clients_are_evicted(self, key_info):
+        registry = GA4ClientRegistry(max_clients=2, idle_timeout=0.5, key_loader=lambda _: key_info)
+
+        first = registry.get(_service_account("first"))
+        registry.get(_service_account("second"))
+        registry.get(_service_account("third"))
+        assert registry.get_stats()["clients"] == 2
+        assert registry.get(_service_account("first")) is not first
+
+        time.sleep(0.6)
+        registry.get(_service_account("fourth"))
+        assert registry.get_stats()["clients"] == 1
+        assert registry.get_stats()["evictions"] == 4
+
+    async def test_token_is_refreshed_ahead_of_expiry(self, admin_api, key_file):
+        handler, _ = admin_api
+        registry = GA4ClientRegistry(refresh_margin=300)
+        service = registry.get()
+        await service.list_accounts()
+        assert handler.token_requests == 1
+
+        # Still valid, but inside the refresh margin
+        service.credentials.expiry = datetime.utcnow() + timedelta(seconds=60)
+        assert registry.get() is service
+        assert registry.get() is service  # a refresh is already running
+        await registry._entries["default"].refresh_task
+
+        assert handler.token_requests == 2
+        assert service.credentials.token == "token-2"
+        assert service.credentials.expiry > datetime.utcnow() + timedelta(seconds=3000)
+        assert registry.get_stats()["token_refreshes"] == 1
+
+        await service.list_accounts()
+        assert handler.token_requests == 2
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(ga4.router, prefix="/api/ga4")
+    app.dependency_overrides[get_current_user_with_permissions] = lambda: {"user_id": 1, "role": "Super Admin"}
+    app.dependency_overrides[get_db] = lambda: None
+    return app
+
+
+def _legacy_ga_service() -> GoogleAnalyticsService:
+    """Previous per-request construction: credentials file, discovery document and a cold token"""
+    service = GoogleAnalyticsService.__new__(GoogleAnalyticsService)
+    service.credentials = service_account.Credentials.from_service_account_file(
+        settings.GOOGLE_SERVICE_ACCOUNT_FILE, scopes=ADMIN_API_SCOPES
+    )
+    service._http = ThreadLocalAuthorizedHttp(service.credentials)
+    service.service = build(
+        "analyticsadmin", "v1beta", credentials=service.credentials, requestBuilder=service._build_request,
+        client_options={"api_endpoint": settings.GA4_ADMIN_API_ENDPOINT}
+    )
+    return service
+
+
+@pytest.mark.unit
+class TestGA4Router:
+    """GA4 router endpoints through the registry"""
+
+    async def test_endpoints_share_one_client(self, admin_api, key_file, monkeypatch):
+        handler, _ = admin_api
+        registry = GA4ClientRegistry()
+        monkeypatch.setattr(ga4, "ga4_client_registry", registry)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=_app()), base_url="http://test") as client:
+            accounts = await client.get("/api/ga4/accounts")
+            properties = await client.get("/api/ga4/accounts/1/properties")
+
+        assert accounts.status_code == 200
+        assert accounts.json()[0]["name"] == "accounts/1"
+        assert properties.json()[0]["timeZone"] == "UTC"
+        assert handler.token_requests == 1
+        assert registry.get_stats()["builds"] == 1
+
+    async def test_unloadable_credentials_are_unavailable(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "GOOGLE_SERVICE_ACCOUNT_FILE", str(tmp_path / "missing.json"))
+        monkeypatch.setattr(ga4, "ga4_client_registry", GA4ClientRegistry())
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=_app()), base_url="http://test") as client:
+            response = await client.get("/api/ga4/accounts")
+
+        assert response.status_code == 503
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestGA4ClientRegistryBenchmark:
+    """Per-request overhead of the GA4 router with and without the registry"""
+
+    async def test_router_overhead(self, admin_api, key_file, monkeypatch):
+        handler, _ = admin_api
+        requests = 200
+        registry = GA4ClientRegistry()
+        monkeypatch.setattr(ga4, "ga4_client_registry", registry)
+
+        async def run(app) -> float:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                started = time.perf_counter()
+                for index in range(requests):
+                    path = "/api/ga4/accounts" if index % 2 else "/api/ga4/accounts/1/properties"
+                    assert (await client.get(path)).status_code == 200
+                return (time.perf_counter() - started) / requests
+
+        legacy_app = _app()
+        legacy_app.dependency_overrides[ga4.get_ga_service] = _legacy_ga_service
+        legacy = await run(legacy_app)
+        legacy_tokens = handler.token_requests
+
+        pooled = await run(_app())
+        pooled_tokens = handler.token_requests - legacy_tokens
+
+        print(
+            f"\nGA4 router, {requests} requests against a local fake Admin API: "
+            f"{legacy * 1000:.2f} ms/request building a client per request ({legacy_tokens} token fetches), "
+            f"{pooled * 1000:.2f} ms/request with the registry ({pooled_tokens} token fetch)"
+        )
+        assert pooled_tokens == 1
+        assert pooled < legacy / 2
@@ -0,0 +1,283 @@
+"""
+Fleet-wide GA4 property discovery tests against a latency-injecting Admin API stand-in
+"""
+
+import threading
+import time
+from collections import defaultdict
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from src.core.config import settings
+from src.core.database import Base
+from src.models.db_models import AuditLog, Client, ServiceAccount, ServiceAccountProperty
+from src.services.audit_service import AuditService
+from src.services.ga4_fleet_discovery import GA4FleetDiscovery, project_key
+from src.services.ga4_property_discovery_service import GA4PropertyDiscoveryService
+from src.services.google_api_service import GoogleAnalyticsService
+
+
+class _Request:
+    def __init__(self, admin_api, service_account, response):
+        self.admin_api = admin_api
+        self.service_account = service_account
+        self.response = response
+
+    def execute(self):
+        return self.admin_api.call(self.service_account, self.response)
+
+
+class _Collection:
+    def __init__(self, admin_api, service_account, list_call):
+        self.admin_api = admin_api
+        self.service_account = service_account
+        self.list_call = list_call
+
+    def list(self, **kwargs):
+        return _Request(self.admin_api, self.service_account, lambda: self.list_call(**kwargs))
+
+
+class _AdminResource:
+    """Stand-in for a service account's Admin API resource"""
+
+    def __init__(self, admin_api, service_account):
+        self.admin_api = admin_api
+        self.service_account = service_account
+
+    def accountSummaries(self):
+        return _Collection(self.admin_api, self.service_account, self._account_summaries)
+
+    def accounts(self):
+        return _Collection(self.admin_api, self.service_account, lambda: {"accounts": [
+            {"name": f"accounts/{account}"} for account in self.admin_api.account_ids(self.service_account)
+        ]})
+
+    def properties(self):
+        return _Collection(self.admin_api, self.service_account, self._properties)
+
+    def _account_summaries(self, pageSize, pageToken=None):
+        accounts = self.admin_api.account_ids(self.service_account)
+        start = int(pageToken or 0)
+        page = {"accountSummaries": [
+            {
+                "account": f"accounts/{account}",
+                "displayName": f"Account {account}",
+                "propertySummaries": [
+                    {"property": f"properties/{property_id}", "displayName": f"Property {property_id}",
+                     "propertyType": "PROPERTY_TYPE_ORDINARY", "parent": f"accounts/{account}"}
+                    for property_id in self.admin_api.property_ids(account)
+                ]
+            }
+            for account in accounts[start:start + pageSize]
+        ]}
+        if start + pageSize < len(accounts):
+            page["nextPageToken"] = str(start + pageSize)
+        return page
+
+    def _properties(self, filter):
+        account = filter.split("/")[-1]
+        return {"properties": [
+            {"name": f"properties/{property_id}", "displayName": f"Property {property_id}"}
+            for property_id in self.admin_api.property_ids(account)
+        ]}
+
+
+class _AdminApiStandIn:
+    """Admin API stand-in that sleeps for each call and tracks concurrency per project"""
+
+    def __init__(self, latency: float = 0.0, accounts: int = 2, properties: int = 3, failing=()):
+        self.latency = latency
+        self.accounts = accounts
+        self.properties = properties
+        self.failing = set(failing)
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._project_in_flight = defaultdict(int)
+        self.max_in_flight = 0
+        self.max_project_in_flight = defaultdict(int)
+
+    def account_ids(self, service_account):
+        return [f"{service_account.id}{index}" for index in range(self.accounts)]
+
+    def property_ids(self, account):
+        return [f"{account}{index:03d}" for index in range(self.properties)]
+
+    def call(self, service_account, response):
+        project = project_key(service_account)
+        with self._lock:
+            self.calls += 1
+            self._in_flight += 1
+            self._project_in_flight[project] += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+            self.max_project_in_flight[project] = max(
+                self.max_project_in_flight[project], self._project_in_flight[project]
+            )
+        try:
+            time.sleep(self.latency)
+            if service_account.email in self.failing:
+                raise HttpError(httplib2.Response({"status": 403}), b'{"error": {"message": "denied"}}')
+            return response()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._project_in_flight[project] -= 1
+
+    def client_for(self, service_account) -> GoogleAnalyticsService:
+        ga_service = GoogleAnalyticsService.__new__(GoogleAnalyticsService)
+        ga_service.credentials = None
+        ga_service._http = None
+        ga_service.service = _AdminResource(self, service_account)
+        return ga_service
+
+
+@pytest.fixture
+async def fleet_engine():
+    """Separate engine: discovery reads and writes through its own sessions"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def fleet_sessions(fleet_engine):
+    return async_sessionmaker(fleet_engine, expire_on_commit=False)
+
+
+async def _seed(sessions, count: int, projects: int = 1, active: bool = True, prefix: str = "sa"):
+    async with sessions() as db:
+        client = Client(name=f"Fleet Client {prefix}")
+        db.add(client)
+        await db.flush()
+        service_accounts = [
+            ServiceAccount(
+                client_id=client.id, email=f"{prefix}{index}@project-{index % projects}.iam.gserviceaccount.com",
+                secret_name=f"{prefix}{index}", is_active=active
+            )
+            for index in range(count)
+        ]
+        db.add_all(service_accounts)
+        await db.commit()
+        return service_accounts
+
+
+async def _count(sessions, *criteria) -> int:
+    async with sessions() as db:
+        return (await db.execute(select(func.count(ServiceAccountProperty.id)).where(*criteria))).scalar()
+
+
+@pytest.mark.unit
+class TestFleetDiscovery:
+    """GA4FleetDiscovery"""
+
+    async def test_discovers_and_stores_all_pages(self, fleet_sessions):
+        service_accounts = await _seed(fleet_sessions, 5)
+        await _seed(fleet_sessions, 1, active=False, prefix="inactive")
+        admin_api = _AdminApiStandIn(accounts=3, properties=4)
+        discovery = GA4FleetDiscovery(fleet_sessions, client_factory=admin_api.client_for, page_size=2)
+
+        report = await discovery.run()
+
+        assert report["service_accounts"] == 5
+        assert report["succeeded"] == 5
+        assert report["properties"] == 5 * 3 * 4
+        # Two accountSummaries pages per service account
+        assert admin_api.calls == 10
+        assert await _count(fleet_sessions) == 60
+        async with fleet_sessions() as db:
+            stored = (await db.execute(
+                select(ServiceAccountProperty).where(ServiceAccountProperty.service_account_id == service_accounts[0].id)
+                .order_by(ServiceAccountProperty.ga_property_id)
+            )).scalars().all()
+            health = set((await db.execute(select(ServiceAccount.health_status).where(ServiceAccount.is_active == True))).scalars())
+            audit = (await db.execute(select(AuditLog).where(AuditLog.action == "discover_ga4_properties_fleet"))).scalar_one()
+        assert stored[0].ga_property_id == f"{service_accounts[0].id}0000"
+        assert stored[0].property_account_id == f"{service_accounts[0].id}0"
+        assert stored[0].property_name == f"Property {service_accounts[0].id}0000"
+        assert health == {"healthy"}
+        assert "60 properties for 5 of 5" in audit.details
+
+    async def test_failures_are_isolated(self, fleet_sessions):
+        service_accounts = await _seed(fleet_sessions, 4)
+        admin_api = _AdminApiStandIn(failing={service_accounts[1].email})
+
+        report = await GA4FleetDiscovery(fleet_sessions, client_factory=admin_api.client_for).run()
+
+        assert report["succeeded"] == 3
+        assert report["failed"] == 1
+        assert report["errors"][0]["service_account_id"] == service_accounts[1].id
+        assert await _count(fleet_sessions) == 3 * 6
+        async with fleet_sessions() as db:
+            failed = await db.get(ServiceAccount, service_accounts[1].id)
+        assert failed.health_status == "unhealthy"
+        assert failed.last_used_at is None
+
+    async def test_concurrency_is_bounded_globally_and_per_project(self, fleet_sessions):
+        await _seed(fleet_sessions, 40, projects=2)
+        admin_api = _AdminApiStandIn(latency=0.02)
+        discovery = GA4FleetDiscovery(
+            fleet_sessions, client_factory=admin_api.client_for, max_concurrency=5, per_project_concurrency=3
+        )
+
+        await discovery.run()
+
+        assert admin_api.max_in_flight == 5
+        assert max(admin_api.max_project_in_flight.values()) == 3
+
+    def test_project_key(self):
+        assert project_key(ServiceAccount(email="a@my-project.iam.gserviceaccount.com")) == "my-project"
+        assert project_key(ServiceAccount(email="a@x.iam.gserviceaccount.com", project_id="explicit")) == "explicit"
+
+
+async def _legacy_discover(sessions, admin_api, service_accounts) -> None:
+    """Previous sweep: one service account at a time, accounts.list then properties.list per account"""
+    async with sessions() as db:
+        discovery_service = GA4PropertyDiscoveryService(db, None, AuditService(db))
+        for service_account in service_accounts:
+            ga_service = admin_api.client_for(service_account)
+            properties = []
+            for account in await ga_service.list_accounts():
+                account_id = account["name"].split("/")[-1]
+                properties.extend(
+                    {"property_id": prop["name"].split("/")[-1], "display_name": prop["displayName"], "account_id": account_id}
+                    for prop in await ga_service.list_properties(account["name"])
+                )
+            await discovery_service._update_service_account_properties(service_account.id, properties)
+            await db.commit()
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestFleetDiscoveryBenchmark:
+    """Wall-clock time to discover 500 service accounts with 50 ms per Admin API call"""
+
+    async def test_discover_500_service_accounts(self, fleet_sessions):
+        latency, sample = 0.05, 20
+        service_accounts = await _seed(fleet_sessions, 500, projects=25)
+        admin_api = _AdminApiStandIn(latency=latency)
+
+        started = time.perf_counter()
+        await _legacy_discover(fleet_sessions, admin_api, service_accounts[:sample])
+        legacy_estimate = (time.perf_counter() - started) * len(service_accounts) / sample
+
+        discovery = GA4FleetDiscovery(fleet_sessions, client_factory=admin_api.client_for, page_size=1)
+        report = await discovery.run()
+
+        print(
+            f"\nGA4 discovery of {report['service_accounts']} service accounts at {latency * 1000:.0f} ms per call: "
+            f"~{legacy_estimate:.0f}s sequential (extrapolated from {sample}), {report['elapsed_seconds']:.1f}s "
+            f"fleet ({settings.GA4_DISCOVERY_MAX_CONCURRENCY} concurrent, "
+            f"{settings.GA4_DISCOVERY_PER_PROJECT_CONCURRENCY} per project)"
+        )
+        assert report["succeeded"] == 500
+        assert await _count(fleet_sessions) == 500 * 6
+        assert report["elapsed_seconds"] < legacy_estimate / 5
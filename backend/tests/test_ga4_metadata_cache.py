@@ -0,0 +1,204 @@
+"""
+GA4 metadata cache tests: single-flight loads, stale-while-revalidate, negative caching
+and invalidation by our own writes
+"""
+
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.core.exceptions import GoogleAPIError
+from src.models.db_models import PermissionLevel
+from src.services.ga4_metadata_cache import GA4MetadataCache, cache_key, ga4_metadata_cache
+from src.services.google_api_service import GoogleAnalyticsService
+
+KEY = ("sa@project.iam.gserviceaccount.com", "users", "123")
+
+
+class _Loader:
+    """Upstream read that takes ``latency`` seconds and counts its calls"""
+
+    def __init__(self, latency: float = 0.0, error: bool = False):
+        self.latency = latency
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        call = self.calls
+        await asyncio.sleep(self.latency)
+        if self.error:
+            raise GoogleAPIError("Failed to get property users: 403")
+        return [{"emailAddress": f"user{call}@example.com"}]
+
+
+@pytest.mark.unit
+class TestGA4MetadataCache:
+    """GA4MetadataCache"""
+
+    async def test_fresh_entries_are_served_from_cache(self):
+        cache, loader = GA4MetadataCache(), _Loader()
+
+        first = await cache.get(KEY, loader)
+        second = await cache.get(KEY, loader)
+
+        assert first is second
+        assert loader.calls == 1
+        assert cache.get_stats()["hit_ratio"] == 0.5
+
+    async def test_concurrent_misses_share_one_upstream_call(self):
+        cache, loader = GA4MetadataCache(), _Loader(latency=0.05)
+
+        results = await asyncio.gather(*(cache.get(KEY, loader) for _ in range(20)))
+
+        assert loader.calls == 1
+        assert all(result is results[0] for result in results)
+        stats = cache.get_stats()
+        assert (stats["misses"], stats["coalesced"], stats["upstream_calls"]) == (1, 19, 1)
+
+    async def test_stale_entries_are_served_while_refreshing(self):
+        cache, loader = GA4MetadataCache(fresh_seconds=0.05, stale_seconds=10), _Loader()
+        await cache.get(KEY, loader)
+        await asyncio.sleep(0.06)
+        loader.latency = 0.05
+
+        started = time.perf_counter()
+        stale = await asyncio.gather(*(cache.get(KEY, loader) for _ in range(5)))
+
+        assert time.perf_counter() - started < 0.04
+        assert stale[0] == [{"emailAddress": "user1@example.com"}]
+        assert cache.get_stats()["refreshes"] == 1
+        await asyncio.sleep(0.08)
+        assert await cache.get(KEY, loader) == [{"emailAddress": "user2@example.com"}]
+        assert loader.calls == 2
+
+    async def test_stale_entries_outlive_upstream_errors(self):
+        cache, loader = GA4MetadataCache(fresh_seconds=0.01, stale_seconds=10), _Loader()
+        await cache.get(KEY, loader)
+        await asyncio.sleep(0.02)
+        loader.error = True
+
+        await cache.get(KEY, loader)
+        await asyncio.sleep(0.01)
+
+        assert await cache.get(KEY, loader) == [{"emailAddress": "user1@example.com"}]
+        assert cache.get_stats()["upstream_errors"] == 1
+
+    async def test_errors_are_cached_briefly(self):
+        cache, loader = GA4MetadataCache(negative_seconds=0.05), _Loader(error=True)
+
+        for _ in range(3):
+            with pytest.raises(GoogleAPIError):
+                await cache.get(KEY, loader)
+        assert loader.calls == 1
+        assert cache.get_stats()["negative_hits"] == 2
+
+        await asyncio.sleep(0.06)
+        loader.error = False
+        assert await cache.get(KEY, loader) == [{"emailAddress": "user2@example.com"}]
+
+    async def test_invalidation_drops_entries_and_in_flight_loads(self):
+        cache, loader = GA4MetadataCache(), _Loader()
+        other = ("sa@project.iam.gserviceaccount.com", "users", "456")
+        await cache.get(KEY, loader)
+        await cache.get(other, loader)
+
+        cache.invalidate("properties/123")
+
+        assert await cache.get(KEY, loader) == [{"emailAddress": "user3@example.com"}]
+        assert await cache.get(other, loader) == [{"emailAddress": "user2@example.com"}]
+
+        # A load that started before the write is not cached and not joined
+        loader.latency = 0.05
+        cache.invalidate("123")
+        before_write = asyncio.create_task(cache.get(KEY, loader))
+        await asyncio.sleep(0.01)
+        cache.invalidate("123")
+        after_write = await cache.get(KEY, loader)
+        assert await before_write == [{"emailAddress": "user4@example.com"}]
+        assert after_write == [{"emailAddress": "user5@example.com"}]
+        assert await cache.get(KEY, loader) is after_write
+
+    async def test_cancelled_request_does_not_cancel_the_load(self):
+        cache, loader = GA4MetadataCache(), _Loader(latency=0.05)
+
+        cancelled = asyncio.create_task(cache.get(KEY, loader))
+        waiting = asyncio.create_task(cache.get(KEY, loader))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+
+        assert await waiting == [{"emailAddress": "user1@example.com"}]
+        assert loader.calls == 1
+
+    async def test_entries_are_bounded(self):
+        cache, loader = GA4MetadataCache(max_entries=2), _Loader()
+
+        for resource in ("1", "2", "3"):
+            await cache.get((None, "users", resource), loader)
+
+        assert cache.get_stats()["size"] == 2
+        assert cache.get_stats()["evictions"] == 1
+
+    async def test_disabled(self):
+        cache, loader = GA4MetadataCache(enabled=False), _Loader()
+
+        await cache.get(KEY, loader)
+        await cache.get(KEY, loader)
+
+        assert loader.calls == 2
+
+    async def test_grants_and_revokes_invalidate_the_property(self, monkeypatch):
+        monkeypatch.setattr(ga4_metadata_cache, "enabled", True)
+        ga_service = GoogleAnalyticsService()
+        ga_service.service = MagicMock()
+        user_links = ga_service.service.properties.return_value.userLinks.return_value
+        user_links.create.return_value.execute.return_value = {"name": "properties/123/userLinks/1"}
+        ga_service.access_bindings_service = MagicMock()
+        access_bindings = ga_service.access_bindings_service.properties.return_value.accessBindings.return_value
+        access_bindings.batchDelete.return_value.execute.return_value = {}
+        key, loader = cache_key(ga_service, "users", "123"), _Loader()
+        ga4_metadata_cache.clear()
+
+        cached = await ga4_metadata_cache.get(key, loader)
+        assert await ga4_metadata_cache.get(key, loader) is cached
+        await ga_service.grant_property_access("properties/123", "a@example.com", PermissionLevel.VIEWER)
+        await ga4_metadata_cache.get(key, loader)
+        await ga_service.batch_delete_user_links("properties/123", ["properties/123/accessBindings/1"])
+        await ga4_metadata_cache.get(key, loader)
+
+        assert loader.calls == 3
+        ga4_metadata_cache.clear()
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestGA4MetadataCacheBenchmark:
+    """A dozen admins opening the same property page ten times, with 50 ms per upstream call"""
+
+    async def test_property_page_burst(self):
+        admins, rounds, latency = 12, 10, 0.05
+
+        async def page_views(get):
+            started = time.perf_counter()
+            for _ in range(rounds):
+                await asyncio.gather(*(get() for _ in range(admins)))
+            return time.perf_counter() - started
+
+        legacy_loader = _Loader(latency=latency)
+        legacy_elapsed = await page_views(legacy_loader)
+
+        cache, loader = GA4MetadataCache(), _Loader(latency=latency)
+        elapsed = await page_views(lambda: cache.get(KEY, loader))
+        stats = cache.get_stats()
+
+        print(
+            f"\n{admins} admins x {rounds} property page views at {latency * 1000:.0f} ms per call: "
+            f"uncached {legacy_loader.calls} upstream calls in {legacy_elapsed:.2f}s, "
+            f"cached {stats['upstream_calls']} upstream call in {elapsed:.3f}s "
+            f"(hit ratio {stats['hit_ratio']:.2f}, {stats['coalesced']} coalesced)"
+        )
+        assert legacy_loader.calls == admins * rounds
+        assert stats["upstream_calls"] == 1
+        assert elapsed < legacy_elapsed / 5
@@ -0,0 +1,334 @@
+"""
+GA4 Admin API quota scheduler tests: token buckets, priority admission and retries
+against a local stand-in that enforces quotas
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
+from googleapiclient.model import JsonModel
+
+from src.services.ga4_api_executor import GA4ApiExecutor
+from src.services.ga4_quota_scheduler import (
+    GA4Priority, GA4QuotaScheduler, TokenBucket, current_ga4_priority, ga4_priority
+)
+
+
+def http_error(status: int, headers=None) -> HttpError:
+    return HttpError(httplib2.Response({"status": status, **(headers or {})}), b'{"error": {"message": "quota"}}')
+
+
+class _FlakyRequest:
+    """Request that fails with the given statuses before succeeding"""
+
+    def __init__(self, *statuses: int):
+        self.statuses = list(statuses)
+        self.attempts = 0
+
+    def execute(self):
+        self.attempts += 1
+        if self.statuses:
+            raise http_error(self.statuses.pop(0))
+        return {"ok": True}
+
+
+@pytest.fixture
+def executor():
+    executor = GA4ApiExecutor(
+        max_workers=4, max_concurrency=4, default_timeout=5.0,
+        quota_scheduler=GA4QuotaScheduler(project_rate=1000, project_burst=100, property_rate=1000, property_burst=100),
+        max_retries=3, retry_base=0.01, retry_max=0.05
+    )
+    yield executor
+    executor.shutdown()
+
+
+@pytest.mark.unit
+class TestTokenBucket:
+    """TokenBucket"""
+
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(rate=10, capacity=3)
+
+        for _ in range(3):
+            assert bucket.available()
+            bucket.take()
+
+        assert not bucket.available()
+        assert 0.05 < bucket.wait_time() <= 0.1
+        time.sleep(0.11)
+        assert bucket.available()
+
+    def test_pause(self):
+        bucket = TokenBucket(rate=10, capacity=3)
+
+        bucket.pause(0.5)
+
+        assert 0.45 < bucket.wait_time() <= 0.6
+
+
+@pytest.mark.unit
+class TestGA4QuotaScheduler:
+    """Admission by project and property buckets in priority order"""
+
+    async def test_project_rate(self):
+        scheduler = GA4QuotaScheduler(project_rate=50, project_burst=5, property_rate=1000, property_burst=100)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(scheduler.acquire("project") for _ in range(15)))
+
+        # 5 from the burst, then 10 at 50 per second
+        assert 0.18 < time.perf_counter() - started < 0.5
+        assert scheduler.get_stats()["priorities"]["interactive"]["admitted"] == 15
+
+    async def test_projects_have_separate_buckets(self):
+        scheduler = GA4QuotaScheduler(project_rate=1, project_burst=1, property_rate=1000, property_burst=100)
+
+        await scheduler.acquire("first")
+        await asyncio.wait_for(scheduler.acquire("second"), timeout=0.1)
+
+    async def test_interactive_calls_go_first(self):
+        scheduler = GA4QuotaScheduler(project_rate=50, project_burst=1, property_rate=1000, property_burst=100)
+        await scheduler.acquire("project")
+        admitted = []
+
+        async def call(name, priority):
+            await scheduler.acquire("project", priority=priority)
+            admitted.append(name)
+
+        syncs = [asyncio.create_task(call(f"sync-{index}", GA4Priority.SYNC)) for index in range(3)]
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(call("grant", GA4Priority.INTERACTIVE))
+        await asyncio.sleep(0)
+        assert scheduler.queue_depth() == 4
+        assert scheduler.queue_depth(GA4Priority.SYNC) == 3
+
+        await asyncio.gather(interactive, *syncs)
+
+        assert admitted == ["grant", "sync-0", "sync-1", "sync-2"]
+        assert scheduler.get_stats()["peak_queue_depth"] == 4
+        assert scheduler.get_stats()["queue_depth"] == 0
+
+    async def test_exhausted_property_does_not_block_others(self):
+        scheduler = GA4QuotaScheduler(project_rate=1000, project_burst=100, property_rate=2, property_burst=1)
+        admitted = []
+
+        async def call(property_id):
+            await scheduler.acquire("project", property_id)
+            admitted.append(property_id)
+
+        await asyncio.wait_for(asyncio.gather(call("1"), call("1"), call("2")), timeout=1.0)
+
+        assert admitted == ["1", "2", "1"]
+
+    async def test_priority_follows_the_context(self):
+        scheduler = GA4QuotaScheduler(project_rate=50, project_burst=1, property_rate=1000, property_burst=100)
+        assert current_ga4_priority() == GA4Priority.INTERACTIVE
+
+        with ga4_priority(GA4Priority.SYNC):
+            task = asyncio.create_task(scheduler.acquire("project"))
+        await task
+
+        assert current_ga4_priority() == GA4Priority.INTERACTIVE
+        assert scheduler.get_stats()["priorities"]["sync"]["admitted"] == 1
+
+    async def test_cancelled_waiter_leaves_the_queue(self):
+        scheduler = GA4QuotaScheduler(project_rate=1, project_burst=1, property_rate=1000, property_burst=100)
+        await scheduler.acquire("project")
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(scheduler.acquire("project"), timeout=0.05)
+
+        assert scheduler.queue_depth() == 0
+
+    async def test_disabled(self):
+        scheduler = GA4QuotaScheduler(project_rate=1, project_burst=1, enabled=False)
+
+        await asyncio.wait_for(asyncio.gather(*(scheduler.acquire("project") for _ in range(10))), timeout=0.1)
+
+
+@pytest.mark.unit
+class TestExecutorRetries:
+    """GA4ApiExecutor retries on 429 and 5xx"""
+
+    async def test_retries_server_errors(self, executor):
+        request = _FlakyRequest(503, 500)
+
+        assert await executor.execute(request, "accessBindings.create", project="p", property_id="1") == {"ok": True}
+
+        assert request.attempts == 3
+        assert executor.get_stats()["operations"]["accessBindings.create"]["retries"] == 2
+
+    async def test_throttled_call_pauses_its_buckets(self, executor):
+        request = _FlakyRequest(429)
+
+        await executor.execute(request, "accessBindings.list", project="p", property_id="1")
+
+        assert executor.get_stats()["quota"]["throttled"] == 1
+
+    async def test_client_errors_are_not_retried(self, executor):
+        request = _FlakyRequest(403)
+
+        with pytest.raises(HttpError):
+            await executor.execute(request, "accessBindings.create", project="p")
+
+        assert request.attempts == 1
+
+    async def test_retries_are_bounded(self, executor):
+        request = _FlakyRequest(503, 503, 503, 503, 503)
+
+        with pytest.raises(HttpError):
+            await executor.execute(request, "accessBindings.create", project="p")
+
+        assert request.attempts == 4
+
+    def test_retry_delay(self, executor):
+        assert executor._retry_delay(0, http_error(429, {"retry-after": "0.03"})) == 0.03
+        assert executor._retry_delay(5, http_error(429, {"retry-after": "120"})) == executor.retry_max
+        for attempt in range(4):
+            backoff = min(executor.retry_max, executor.retry_base * 2 ** attempt)
+            assert backoff / 2 <= executor._retry_delay(attempt, http_error(503)) <= backoff
+
+
+class _QuotaEnforcingAdminApi(BaseHTTPRequestHandler):
+    """accessBindings.create that answers 429 above a per-project and per-property rate"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    project_limit = 60  # requests per rolling second
+    property_limit = 15
+    lock = threading.Lock()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        handler = type(self)
+        project = self.headers.get("X-Goog-User-Project")
+        property_id = self.path.split("/")[3]
+        now = time.monotonic()
+
+        with handler.lock:
+            windows = [(handler.windows[f"project:{project}"], handler.project_limit),
+                       (handler.windows[f"property:{property_id}"], handler.property_limit)]
+            for window, _ in windows:
+                while window and window[0] <= now - 1.0:
+                    window.popleft()
+            allowed = all(len(window) < limit for window, limit in windows)
+            if allowed:
+                for window, _ in windows:
+                    window.append(now)
+            handler.statuses[200 if allowed else 429] += 1
+
+        body = json.dumps({"name": f"properties/{property_id}/accessBindings/1"} if allowed else {
+            "error": {"code": 429, "status": "RESOURCE_EXHAUSTED"}
+        }).encode()
+        self.send_response(200 if allowed else 429)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _BurstServer(ThreadingHTTPServer):
+    # The unscheduled burst connects all at once; the default backlog of 5 resets connections
+    request_queue_size = 256
+
+
+@pytest.fixture
+def quota_api():
+    handler = type("QuotaEnforcingAdminApi", (_QuotaEnforcingAdminApi,), {
+        "windows": defaultdict(deque), "statuses": defaultdict(int)
+    })
+    server = _BurstServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield handler, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _grant_request(url: str, project: str, property_id: str, email: str) -> HttpRequest:
+    return HttpRequest(
+        httplib2.Http(), JsonModel().response,
+        f"{url}/v1alpha/properties/{property_id}/accessBindings",
+        method="POST",
+        body=json.dumps({"user": email, "roles": ["predefinedRoles/viewer"]}),
+        headers={"content-type": "application/json", "x-goog-user-project": project}
+    )
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestQuotaSchedulerBenchmark:
+    """A bulk grant burst plus interactive grants against a stand-in enforcing 60/s per project, 15/s per property"""
+
+    async def test_grant_burst(self, quota_api):
+        handler, url = quota_api
+        properties, per_property, interactive = 4, 30, 5
+
+        async def burst(executor):
+            async def grant(property_id, email, priority):
+                started = time.perf_counter()
+                try:
+                    await executor.execute(
+                        _grant_request(url, "project", property_id, email), "accessBindings.create",
+                        project="project", property_id=property_id, priority=priority
+                    )
+                    return True, time.perf_counter() - started
+                except HttpError:
+                    return False, time.perf_counter() - started
+
+            syncs = [
+                asyncio.create_task(grant(str(property_index), f"user{index}@example.com", GA4Priority.SYNC))
+                for index in range(per_property) for property_index in range(properties)
+            ]
+            await asyncio.sleep(0.3)
+            grants = [
+                asyncio.create_task(grant(str(index % properties), f"grant{index}@example.com", GA4Priority.INTERACTIVE))
+                for index in range(interactive)
+            ]
+            started = time.perf_counter()
+            sync_results = await asyncio.gather(*syncs)
+            grant_results = await asyncio.gather(*grants)
+            return time.perf_counter() - started, sync_results, grant_results
+
+        unscheduled = GA4ApiExecutor(
+            max_workers=16, max_concurrency=16, max_retries=0,
+            quota_scheduler=GA4QuotaScheduler(enabled=False)
+        )
+        legacy_elapsed, legacy_syncs, legacy_grants = await burst(unscheduled)
+        legacy_failed = sum(not ok for ok, _ in legacy_syncs + legacy_grants)
+        unscheduled.shutdown()
+        legacy_429s = handler.statuses[429]
+        await asyncio.sleep(1.1)
+
+        scheduler = GA4QuotaScheduler(project_rate=40, project_burst=10, property_rate=10, property_burst=3)
+        scheduled = GA4ApiExecutor(max_workers=16, max_concurrency=16, quota_scheduler=scheduler)
+        elapsed, syncs, grants = await burst(scheduled)
+        scheduled.shutdown()
+        scheduled_429s = handler.statuses[429] - legacy_429s
+        stats = scheduler.get_stats()
+
+        print(
+            f"\n{properties * per_property} sync grants + {interactive} interactive grants: "
+            f"unscheduled {legacy_failed} failed ({legacy_429s} x 429) in {legacy_elapsed:.2f}s, "
+            f"scheduled {sum(not ok for ok, _ in syncs + grants)} failed ({scheduled_429s} x 429) in {elapsed:.2f}s; "
+            f"interactive wait {stats['priorities']['interactive']['avg_wait'] * 1000:.0f} ms avg, "
+            f"sync wait {stats['priorities']['sync']['avg_wait'] * 1000:.0f} ms avg, "
+            f"peak queue depth {stats['peak_queue_depth']}"
+        )
+        assert legacy_failed > 0
+        assert all(ok for ok, _ in syncs + grants)
+        assert scheduled_429s == 0
+        assert stats["priorities"]["interactive"]["max_wait"] < stats["priorities"]["sync"]["max_wait"] / 2
@@ -0,0 +1,247 @@
+"""
+Google Analytics Admin API service tests
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+from src.core.config import settings
+from src.core.exceptions import GoogleAPIError
+from src.models.db_models import PermissionLevel
+from src.services.google_api_service import GoogleAnalyticsService
+
+PROPERTY_NAME = "properties/123456789"
+
+
+def http_error(status: int = 403) -> HttpError:
+    return HttpError(httplib2.Response({"status": status}), b'{"error": {"message": "denied"}}')
+
+
+@pytest.fixture
+def ga_service():
+    """A GoogleAnalyticsService whose Admin API resources are mocks"""
+    service = GoogleAnalyticsService()
+    service.service = MagicMock()
+    service.access_bindings_service = MagicMock()
+    return service
+
+
+def user_links(ga_service):
+    return ga_service.service.properties.return_value.userLinks.return_value
+
+
+def access_bindings(ga_service):
+    return ga_service.access_bindings_service.properties.return_value.accessBindings.return_value
+
+
+@pytest.mark.unit
+class TestInitialization:
+    """Service construction"""
+
+    def test_without_credentials_file(self, monkeypatch):
+        monkeypatch.setattr(settings, "GOOGLE_SERVICE_ACCOUNT_FILE", None)
+
+        service = GoogleAnalyticsService()
+
+        assert service.service is None
+
+    def test_with_credentials_file(self, monkeypatch, service_account_file):
+        monkeypatch.setattr(settings, "GOOGLE_SERVICE_ACCOUNT_FILE", service_account_file)
+
+        service = GoogleAnalyticsService()
+        request = service.service.accounts().list()
+
+        assert service.credentials.service_account_email.endswith("iam.gserviceaccount.com")
+        assert request.http is service._build_request(None, None, request.uri).http
+
+    def test_transport_is_reused_per_thread(self, monkeypatch, service_account_file):
+        monkeypatch.setattr(settings, "GOOGLE_SERVICE_ACCOUNT_FILE", service_account_file)
+        transport = GoogleAnalyticsService()._http
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            other_thread = pool.submit(lambda: transport.http).result()
+
+        assert transport.http is transport.http
+        assert other_thread is not transport.http
+        assert transport.http.credentials is other_thread.credentials
+
+    def test_with_invalid_credentials_file(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(settings, "GOOGLE_SERVICE_ACCOUNT_FILE", str(tmp_path / "missing.json"))
+
+        with pytest.raises(GoogleAPIError):
+            GoogleAnalyticsService()
+
+    def test_batch_methods_resolve_in_the_bundled_discovery_documents(self, monkeypatch, service_account_file):
+        monkeypatch.setattr(settings, "GOOGLE_SERVICE_ACCOUNT_FILE", service_account_file)
+        access_bindings = GoogleAnalyticsService().access_bindings_service.properties().accessBindings()
+
+        requests = {
+            method: getattr(access_bindings, method)(parent=PROPERTY_NAME, body={"requests": []})
+            for method in ("batchCreate", "batchUpdate", "batchDelete")
+        }
+
+        for method, request in requests.items():
+            assert request.method == "POST"
+            assert request.uri.split("?")[0].endswith(f"/v1alpha/{PROPERTY_NAME}/accessBindings:{method}")
+
+    @pytest.mark.parametrize("method, args", [
+        ("list_accounts", ()),
+        ("list_properties", ("accounts/1",)),
+        ("get_property_users", (PROPERTY_NAME,)),
+        ("grant_property_access", (PROPERTY_NAME, "a@example.com", PermissionLevel.VIEWER)),
+        ("revoke_property_access", (PROPERTY_NAME, "a@example.com")),
+        ("update_property_access", (PROPERTY_NAME, "a@example.com", PermissionLevel.VIEWER)),
+        ("validate_property_access", (PROPERTY_NAME,)),
+        ("batch_create_user_links", (PROPERTY_NAME, [("a@example.com", PermissionLevel.VIEWER)])),
+        ("batch_update_user_links", (PROPERTY_NAME, [("link", "a@example.com", PermissionLevel.VIEWER)])),
+        ("batch_delete_user_links", (PROPERTY_NAME, ["link"])),
+    ])
+    async def test_uninitialized_service_raises(self, method, args):
+        service = GoogleAnalyticsService()
+        service.service = None
+
+        with pytest.raises(GoogleAPIError):
+            await getattr(service, method)(*args)
+
+
+@pytest.mark.unit
+class TestAdminApiCalls:
+    """Admin API calls through the GA4 executor"""
+
+    def test_permission_level_mapping(self, ga_service):
+        assert ga_service._convert_permission_level(PermissionLevel.EDITOR) == "predefinedRoles/analyticsEditor"
+        assert ga_service._convert_permission_level("unknown") == "predefinedRoles/analyticsViewer"
+
+    async def test_list_accounts_and_properties(self, ga_service):
+        ga_service.service.accounts.return_value.list.return_value.execute.return_value = {
+            "accounts": [{"name": "accounts/1", "displayName": "Account"}]
+        }
+        ga_service.service.properties.return_value.list.return_value.execute.return_value = {
+            "properties": [{"name": PROPERTY_NAME, "displayName": "Site", "timeZone": "UTC"}]
+        }
+
+        accounts = await ga_service.list_accounts()
+        properties = await ga_service.list_properties("accounts/1")
+
+        assert accounts[0]["displayName"] == "Account"
+        assert properties[0]["timeZone"] == "UTC"
+        ga_service.service.properties.return_value.list.assert_called_with(filter="parent:accounts/1")
+
+    async def test_list_errors_are_wrapped(self, ga_service):
+        ga_service.service.accounts.return_value.list.return_value.execute.side_effect = http_error()
+        ga_service.service.properties.return_value.list.return_value.execute.side_effect = http_error()
+
+        with pytest.raises(GoogleAPIError):
+            await ga_service.list_accounts()
+        with pytest.raises(GoogleAPIError):
+            await ga_service.list_properties("accounts/1")
+
+    async def test_get_property_users(self, ga_service):
+        user_links(ga_service).list.return_value.execute.return_value = {
+            "userLinks": [{"name": f"{PROPERTY_NAME}/userLinks/1", "emailAddress": "a@example.com"}]
+        }
+
+        users = await ga_service.get_property_users(PROPERTY_NAME)
+
+        assert users == [{
+            "name": f"{PROPERTY_NAME}/userLinks/1",
+            "emailAddress": "a@example.com",
+            "directRoles": [],
+            "directGroupMemberships": []
+        }]
+        assert await ga_service.validate_property_access(PROPERTY_NAME)
+
+        user_links(ga_service).list.return_value.execute.side_effect = http_error()
+        with pytest.raises(GoogleAPIError):
+            await ga_service.get_property_users(PROPERTY_NAME)
+        assert not await ga_service.validate_property_access(PROPERTY_NAME)
+
+        user_links(ga_service).list.return_value.execute.side_effect = RuntimeError("socket closed")
+        assert not await ga_service.validate_property_access(PROPERTY_NAME)
+
+    async def test_grant_property_access(self, ga_service):
+        user_links(ga_service).create.return_value.execute.return_value = {
+            "name": f"{PROPERTY_NAME}/userLinks/1", "emailAddress": "a@example.com",
+            "directRoles": ["predefinedRoles/analyticsViewer"]
+        }
+
+        result = await ga_service.grant_property_access(PROPERTY_NAME, "a@example.com", PermissionLevel.VIEWER)
+
+        assert result["status"] == "granted"
+        user_links(ga_service).create.assert_called_with(parent=PROPERTY_NAME, body={
+            "emailAddress": "a@example.com", "directRoles": ["predefinedRoles/analyticsViewer"]
+        })
+
+        user_links(ga_service).create.return_value.execute.side_effect = http_error(409)
+        with pytest.raises(GoogleAPIError):
+            await ga_service.grant_property_access(PROPERTY_NAME, "a@example.com", PermissionLevel.VIEWER)
+
+    async def test_revoke_property_access(self, ga_service):
+        link_name = f"{PROPERTY_NAME}/userLinks/1"
+        user_links(ga_service).list.return_value.execute.return_value = {
+            "userLinks": [{"name": link_name, "emailAddress": "a@example.com"}]
+        }
+        user_links(ga_service).delete.return_value.execute.return_value = {}
+
+        assert await ga_service.revoke_property_access(PROPERTY_NAME, "a@example.com")
+        user_links(ga_service).delete.assert_called_with(name=link_name)
+        assert not await ga_service.revoke_property_access(PROPERTY_NAME, "b@example.com")
+
+        user_links(ga_service).delete.return_value.execute.side_effect = http_error(404)
+        with pytest.raises(GoogleAPIError):
+            await ga_service.revoke_property_access(PROPERTY_NAME, "a@example.com")
+
+    async def test_update_property_access(self, ga_service):
+        link_name = f"{PROPERTY_NAME}/userLinks/1"
+        user_links(ga_service).list.return_value.execute.return_value = {
+            "userLinks": [{"name": link_name, "emailAddress": "a@example.com"}]
+        }
+        user_links(ga_service).patch.return_value.execute.return_value = {"name": link_name}
+        user_links(ga_service).create.return_value.execute.return_value = {"name": "new"}
+
+        updated = await ga_service.update_property_access(PROPERTY_NAME, "a@example.com", PermissionLevel.EDITOR)
+        created = await ga_service.update_property_access(PROPERTY_NAME, "b@example.com", PermissionLevel.EDITOR)
+
+        assert updated["status"] == "updated"
+        assert created["status"] == "granted"
+
+        user_links(ga_service).patch.return_value.execute.side_effect = http_error()
+        with pytest.raises(GoogleAPIError):
+            await ga_service.update_property_access(PROPERTY_NAME, "a@example.com", PermissionLevel.EDITOR)
+
+    async def test_batch_user_links(self, ga_service):
+        binding_name = f"{PROPERTY_NAME}/accessBindings/1"
+        binding = {"name": binding_name, "user": "a@example.com", "roles": ["predefinedRoles/analyticsViewer"]}
+        access_bindings(ga_service).batchCreate.return_value.execute.return_value = {"accessBindings": [binding]}
+        access_bindings(ga_service).batchUpdate.return_value.execute.return_value = {"accessBindings": [binding]}
+        access_bindings(ga_service).batchDelete.return_value.execute.return_value = {}
+
+        created = await ga_service.batch_create_user_links(PROPERTY_NAME, [("a@example.com", PermissionLevel.VIEWER)])
+        updated = await ga_service.batch_update_user_links(
+            PROPERTY_NAME, [(binding_name, "a@example.com", PermissionLevel.EDITOR)]
+        )
+        await ga_service.batch_delete_user_links(PROPERTY_NAME, [binding_name])
+
+        assert created == updated == [{
+            "name": binding_name, "emailAddress": "a@example.com", "directRoles": ["predefinedRoles/analyticsViewer"]
+        }]
+        access_bindings(ga_service).batchCreate.assert_called_with(parent=PROPERTY_NAME, body={"requests": [{
+            "parent": PROPERTY_NAME,
+            "accessBinding": {"user": "a@example.com", "roles": ["predefinedRoles/analyticsViewer"]}
+        }]})
+        access_bindings(ga_service).batchUpdate.assert_called_with(parent=PROPERTY_NAME, body={"requests": [{
+            "accessBinding": {
+                "name": binding_name, "user": "a@example.com", "roles": ["predefinedRoles/analyticsEditor"]
+            }
+        }]})
+        access_bindings(ga_service).batchDelete.assert_called_with(
+            parent=PROPERTY_NAME, body={"requests": [{"name": binding_name}]}
+        )
+
+        access_bindings(ga_service).batchCreate.return_value.execute.side_effect = http_error(409)
+        with pytest.raises(GoogleAPIError):
+            await ga_service.batch_create_user_links(PROPERTY_NAME, [("a@example.com", PermissionLevel.VIEWER)])
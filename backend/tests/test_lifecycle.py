@@ -0,0 +1,79 @@
+"""
+Background service lifecycle shared by main.py and src/main_enhanced.py
+"""
+
+from typing import List
+
+import pytest
+
+from src.core import lifecycle
+
+
+class Recorder:
+    """Stands in for every background component and records the calls made to it"""
+
+    def __init__(self, name: str, calls: List[str]):
+        self.name = name
+        self.calls = calls
+
+    def __getattr__(self, method: str):
+        def call(*args, **kwargs):
+            self.calls.append(f"{self.name}.{method}")
+
+            async def done():
+                return None
+            # Components mix sync (start, shutdown) and async (stop, close) methods
+            return done() if method in ASYNC_METHODS.get(self.name, ()) else None
+        return call
+
+
+ASYNC_METHODS = {
+    "replica_router": ("start",),
+    "password_hasher": ("start",),
+    "activity_tracker": ("stop",),
+    "audit_writer": ("stop",),
+    "smtp_pool": ("close",),
+}
+
+
+@pytest.fixture
+def calls(monkeypatch) -> List[str]:
+    calls: List[str] = []
+    for name in ("replica_router", "activity_tracker", "audit_writer", "password_hasher", "smtp_pool", "ga4_api_executor"):
+        monkeypatch.setattr(lifecycle, name, Recorder(name, calls))
+
+    async def close_db():
+        calls.append("close_db")
+    monkeypatch.setattr(lifecycle, "close_db", close_db)
+    return calls
+
+
+@pytest.mark.unit
+class TestBackgroundServices:
+    """start_background_services / stop_background_services"""
+
+    async def test_start_runs_every_component(self, calls):
+        await lifecycle.start_background_services()
+
+        assert calls == [
+            "replica_router.start", "activity_tracker.start", "audit_writer.start", "password_hasher.start"
+        ]
+
+    async def test_stop_flushes_writers_before_closing_the_database(self, calls):
+        await lifecycle.stop_background_services()
+
+        assert calls == [
+            "ga4_api_executor.shutdown", "activity_tracker.stop", "audit_writer.stop",
+            "password_hasher.shutdown", "smtp_pool.close", "close_db"
+        ]
+
+    async def test_main_app_lifespan_uses_the_shared_helpers(self, calls, monkeypatch):
+        import main
+
+        async def init_db():
+            calls.append("init_db")
+        monkeypatch.setattr(main, "init_db", init_db)
+
+        async with main.lifespan(main.app):
+            assert calls[0] == "init_db" and "replica_router.start" in calls
+        assert calls[-1] == "close_db"
@@ -0,0 +1,212 @@
+"""
+Keyset pagination tests: opaque cursors, exact paging through ties, and page latency at depth
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from src.core.database import Base
+from src.core.exceptions import ValidationError
+from src.core.pagination import decode_cursor, encode_cursor, keyset_page, keyset_rows
+from src.models.db_models import AuditLog, Client, ServiceAccount
+from src.services.audit_service import AuditService
+from src.services.report_service import ReportService
+from src.services.service_account_service import ServiceAccountService
+
+START = datetime(2026, 1, 1)
+
+
+@pytest.fixture
+async def page_engine():
+    """Separate engine so large fixtures are thrown away with it"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def page_db(page_engine):
+    async with async_sessionmaker(page_engine, expire_on_commit=False)() as session:
+        yield session
+
+
+async def _seed_audit_logs(db, count: int) -> None:
+    """Audit logs in bursts of three sharing a timestamp, so pages split ties"""
+    await db.execute(insert(AuditLog), [
+        {
+            "actor_id": index % 4 + 1, "action": "login", "resource_type": "user",
+            "resource_id": str(index), "created_at": START + timedelta(seconds=index // 3)
+        }
+        for index in range(count)
+    ])
+    await db.commit()
+
+
+@pytest.mark.unit
+class TestCursors:
+    """encode_cursor / decode_cursor"""
+
+    def test_round_trip(self):
+        created_at = datetime(2026, 3, 4, 5, 6, 7, 890123)
+
+        cursor = encode_cursor(AuditLog.created_at, created_at, 42)
+
+        assert decode_cursor(AuditLog.created_at, cursor) == (created_at, 42)
+        assert decode_cursor(Client.name, encode_cursor(Client.name, "Acme", 7)) == ("Acme", 7)
+
+    @pytest.mark.parametrize("cursor", ["not a cursor", "e30", encode_cursor(AuditLog.created_at, START, 1)[:-3]])
+    def test_malformed_cursors_are_rejected(self, cursor):
+        with pytest.raises(ValidationError):
+            decode_cursor(AuditLog.created_at, cursor)
+
+    def test_cursors_of_another_listing_are_rejected(self):
+        cursor = encode_cursor(ServiceAccount.created_at, START, 1)
+
+        with pytest.raises(ValidationError):
+            decode_cursor(AuditLog.created_at, cursor)
+
+
+@pytest.mark.unit
+class TestKeysetPagination:
+    """Cursor pages against the OFFSET listings they replace"""
+
+    async def test_audit_pages_match_offset_order(self, page_db):
+        await _seed_audit_logs(page_db, 250)
+        service = AuditService(page_db)
+
+        expected = [log.id for log in await service.get_audit_logs(limit=1000, actor_id=2)]
+        seen, cursor, pages = [], None, 0
+        while True:
+            page = await service.get_audit_logs_page(limit=7, cursor=cursor, actor_id=2)
+            seen += [log.id for log in page.items]
+            pages += 1
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+
+        assert seen == expected
+        assert pages == (len(expected) + 6) // 7
+
+    async def test_last_full_page_has_no_next_cursor(self, page_db):
+        await _seed_audit_logs(page_db, 20)
+
+        page = await AuditService(page_db).get_audit_logs_page(limit=20)
+
+        assert len(page.items) == 20
+        assert page.next_cursor is None
+
+    async def test_ascending_pages(self, page_db):
+        page_db.add_all([Client(name=f"Client {index:02d}") for index in reversed(range(25))])
+        await page_db.commit()
+
+        names, cursor = [], None
+        while True:
+            clients, cursor = await keyset_page(page_db, select(Client), Client.name, Client.id, 10, cursor, descending=False)
+            names += [client.name for client in clients]
+            if cursor is None:
+                break
+
+        assert names == [f"Client {index:02d}" for index in range(25)]
+
+    async def test_audit_export_streams_in_api_page_order(self, page_db):
+        await _seed_audit_logs(page_db, 60)
+        # Backfilled entries: newer ids with older timestamps
+        await page_db.execute(insert(AuditLog), [
+            {"action": "login", "resource_type": "user", "resource_id": f"late-{index}", "created_at": START}
+            for index in range(5)
+        ])
+        await page_db.commit()
+
+        api_ids, cursor = [], None
+        while True:
+            page = await AuditService(page_db).get_audit_logs_page(limit=7, cursor=cursor)
+            api_ids += [log.id for log in page.items]
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+
+        rows = ReportService(page_db)._iter_audit_log_rows(
+            page_db, START - timedelta(days=1), START + timedelta(days=1), page_size=7
+        )
+        assert [row["id"] async for row in rows] == api_ids
+
+    async def test_rows_with_a_unique_sort_column(self, page_db):
+        page_db.add_all([Client(name=f"Client {index:02d}") for index in range(25)])
+        await page_db.commit()
+
+        rows = keyset_rows(page_db, select(Client.id, Client.name), Client.id, page_size=10, descending=False)
+
+        assert [row.name async for row in rows] == [f"Client {index:02d}" for index in range(25)]
+
+    async def test_service_account_pages_apply_access_control(self, page_db):
+        clients = [Client(name="Visible"), Client(name="Hidden")]
+        page_db.add_all(clients)
+        await page_db.flush()
+        page_db.add_all([
+            ServiceAccount(
+                client_id=clients[index % 2].id, email=f"sa{index}@test.iam.gserviceaccount.com", secret_name=f"sa{index}",
+                created_at=START + timedelta(minutes=index)
+            )
+            for index in range(9)
+        ])
+        await page_db.commit()
+        service = ServiceAccountService(page_db)
+
+        first = await service.list_service_accounts_page(limit=3, accessible_client_ids=[clients[0].id])
+        second = await service.list_service_accounts_page(
+            limit=3, cursor=first.next_cursor, accessible_client_ids=[clients[0].id]
+        )
+
+        emails = [sa.email for sa in first.items + second.items]
+        assert emails == [f"sa{index}@test.iam.gserviceaccount.com" for index in (8, 6, 4, 2, 0)]
+        assert second.next_cursor is None
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestKeysetPaginationBenchmark:
+    """A 100-row audit page a million rows deep, by OFFSET and by cursor"""
+
+    async def test_deep_page_latency(self, page_db):
+        rows, depth, limit = 1_000_100, 1_000_000, 100
+        await page_db.execute(text(
+            "WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < :rows) "
+            "INSERT INTO audit_logs (actor_id, action, resource_type, resource_id, created_at) "
+            "SELECT n % 200 + 1, 'login', 'user', n, datetime('2026-01-01', '+' || n || ' seconds') || '.000000' FROM seq"
+        ), {"rows": rows})
+        await page_db.commit()
+        service = AuditService(page_db)
+
+        # The cursor a client holds after reading the first million rows
+        last_seen = (await page_db.execute(
+            select(AuditLog).order_by(AuditLog.created_at.desc(), AuditLog.id.desc()).offset(depth - 1).limit(1)
+        )).scalar_one()
+        cursor = encode_cursor(AuditLog.created_at, last_seen.created_at, last_seen.id)
+
+        started = time.perf_counter()
+        by_offset = await service.get_audit_logs(skip=depth, limit=limit)
+        offset_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        by_cursor = await service.get_audit_logs_page(limit=limit, cursor=cursor)
+        cursor_elapsed = time.perf_counter() - started
+
+        first_page_started = time.perf_counter()
+        await service.get_audit_logs_page(limit=limit)
+        first_page_elapsed = time.perf_counter() - first_page_started
+
+        print(
+            f"\n{limit}-row audit page at depth {depth:,}: OFFSET {offset_elapsed * 1000:.1f} ms, "
+            f"cursor {cursor_elapsed * 1000:.2f} ms (first page {first_page_elapsed * 1000:.2f} ms)"
+        )
+        assert [log.id for log in by_cursor.items] == [log.id for log in by_offset]
+        assert cursor_elapsed < offset_elapsed / 5
@@ -0,0 +1,145 @@
+"""
+Password hasher tests: off-loop hashing, fast-fail admission, rehash on login and login throughput
+"""
+
+import asyncio
+import time
+from typing import List
+
+import pytest
+from sqlalchemy import select
+
+from src.core.exceptions import ServiceUnavailableError
+from src.models.db_models import User, UserRole, UserStatus
+from src.models.schemas import UserLogin
+from src.services import auth_service
+from src.services.auth_service import AuthService
+from src.services.password_hasher import PasswordHasher, crypt_context
+
+# bcrypt's minimum cost keeps the unit tests fast
+ROUNDS = 4
+
+
+@pytest.fixture
+async def hasher():
+    hasher = PasswordHasher(workers=1, max_pending=2, rounds=ROUNDS)
+    await hasher.start()
+    yield hasher
+    hasher.shutdown()
+
+
+@pytest.mark.unit
+class TestPasswordHasher:
+    """Hashing and verification on the process pool"""
+
+    async def test_hash_and_verify(self, hasher):
+        hashed = await hasher.hash("correct horse")
+
+        assert hashed.startswith(f"$2b$0{ROUNDS}$")
+        assert await hasher.verify("correct horse", hashed)
+        assert not await hasher.verify("wrong horse", hashed)
+        assert not await hasher.verify("correct horse", "not a hash")
+
+    async def test_outdated_hashes_are_rehashed(self, hasher):
+        outdated = crypt_context(ROUNDS + 1).hash("correct horse")
+        current = crypt_context(ROUNDS).hash("correct horse")
+
+        valid, new_hash = await hasher.verify_and_update("correct horse", outdated)
+
+        assert valid and new_hash.startswith(f"$2b$0{ROUNDS}$")
+        assert await hasher.verify_and_update("correct horse", current) == (True, None)
+        assert await hasher.verify_and_update("wrong horse", outdated) == (False, None)
+        assert hasher.get_stats()["rehashed"] == 1
+
+    async def test_saturated_pool_fails_fast(self, hasher):
+        slow = crypt_context(12).hash("correct horse")
+        admitted = [asyncio.ensure_future(hasher.verify("correct horse", slow)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        started = time.perf_counter()
+        with pytest.raises(ServiceUnavailableError) as raised:
+            await hasher.verify("correct horse", slow)
+
+        assert time.perf_counter() - started < 0.05
+        assert raised.value.status_code == 503
+        assert await asyncio.gather(*admitted) == [True, True]
+        assert hasher.get_stats()["pending"] == 0
+        assert hasher.get_stats()["rejected"] == 1
+
+
+@pytest.mark.unit
+class TestLoginRehash:
+    """AuthService.authenticate_user upgrades hashes of another cost"""
+
+    async def test_login_stores_upgraded_hash(self, db_session, hasher, monkeypatch):
+        monkeypatch.setattr(auth_service, "password_hasher", hasher)
+        user = User(
+            email="rehash@example.com", name="Rehash", password_hash=crypt_context(ROUNDS + 1).hash("secret123"),
+            role=UserRole.VIEWER, status=UserStatus.ACTIVE
+        )
+        db_session.add(user)
+        await db_session.commit()
+
+        await AuthService(db_session).authenticate_user(UserLogin(email="rehash@example.com", password="secret123"))
+
+        stored = (await db_session.execute(
+            select(User.password_hash).where(User.email == "rehash@example.com")
+        )).scalar_one()
+        assert stored.startswith(f"$2b$0{ROUNDS}$")
+        assert crypt_context(ROUNDS).verify("secret123", stored)
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestLoginThroughputBenchmark:
+    """Concurrent logins with bcrypt inline on the event loop and on the process pool"""
+
+    LOGINS, ROUNDS = 24, 10
+
+    async def _run(self, verify) -> tuple:
+        """Logins/sec and p99 lateness of a 5 ms ticker standing in for other requests"""
+        hashed = crypt_context(self.ROUNDS).hash("secret123")
+        lateness: List[float] = []
+        done = asyncio.Event()
+
+        async def ticker():
+            while not done.is_set():
+                started = time.perf_counter()
+                await asyncio.sleep(0.005)
+                lateness.append(time.perf_counter() - started - 0.005)
+
+        async def login():
+            await asyncio.sleep(0)  # The user lookup
+            assert await verify("secret123", hashed)
+
+        ticking = asyncio.ensure_future(ticker())
+        await asyncio.sleep(0.01)
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(self.LOGINS)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await ticking
+
+        lateness.sort()
+        return self.LOGINS / elapsed, lateness[int(len(lateness) * 0.99)]
+
+    async def test_login_throughput_and_loop_latency(self):
+        async def inline(password, hashed):
+            # What the login handlers did before: bcrypt on the event loop
+            return crypt_context(self.ROUNDS).verify(password, hashed)
+
+        hasher = PasswordHasher(max_pending=self.LOGINS, rounds=self.ROUNDS)
+        await hasher.start()
+        try:
+            inline_rate, inline_p99 = await self._run(inline)
+            pool_rate, pool_p99 = await self._run(hasher.verify)
+        finally:
+            hasher.shutdown()
+
+        print(
+            f"\n{self.LOGINS} concurrent logins at cost {self.ROUNDS} on {hasher.workers} worker(s): "
+            f"inline {inline_rate:.1f} logins/s, p99 loop lag {inline_p99 * 1000:.1f} ms; "
+            f"pool {pool_rate:.1f} logins/s, p99 loop lag {pool_p99 * 1000:.1f} ms"
+        )
+        assert pool_p99 < inline_p99 / 3
+        assert pool_rate > inline_rate * 0.5
@@ -0,0 +1,162 @@
+"""
+Pattern scanner tests: compiled pattern sets, streamed bodies, hot reload and scan cost by body size
+"""
+
+import os
+import random
+import string
+import time
+
+import pytest
+
+from src.core.config import settings
+from src.middleware.pattern_scanner import (
+    AHO_CORASICK, REGEX, PatternScanner, ReloadingPatternScanner, ahocorasick
+)
+
+PATTERNS = settings.SECURITY_SUSPICIOUS_PATTERNS
+
+ENGINES = [
+    REGEX,
+    pytest.param(AHO_CORASICK, marks=pytest.mark.skipif(ahocorasick is None, reason="pyahocorasick not installed")),
+]
+
+CLEAN = b'{"name": "GA4 Property", "notes": "Quarterly Report For The Marketing Team", "id": 12345}, '
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("engine", ENGINES)
+class TestPatternScanner:
+    """One compiled pass over raw bytes"""
+
+    def test_finds_every_pattern_case_insensitively(self, engine):
+        scanner = PatternScanner(PATTERNS, engine)
+
+        for pattern in PATTERNS:
+            assert scanner.search(CLEAN + pattern.upper().encode() + CLEAN) == pattern.encode()
+        assert scanner.search(CLEAN * 100) is None
+
+    def test_raw_bytes_that_are_not_utf8(self, engine):
+        scanner = PatternScanner(PATTERNS, engine)
+
+        assert scanner.search(b"\xff\xfe<ScRiPt\x80") == b"<script"
+        assert scanner.search(bytes(range(256)) * 4) is None
+
+    def test_patterns_sharing_prefixes(self, engine):
+        scanner = PatternScanner(["ab", "abc", "b", "xyz"], engine)
+
+        assert scanner.search(b"--abc--") in (b"ab", b"abc")
+        assert scanner.search(b"--b--") == b"b"
+        assert scanner.search(b"--xy--") is None
+
+    def test_stream_finds_patterns_split_across_chunks(self, engine):
+        scanner = PatternScanner(PATTERNS, engine)
+        body = CLEAN * 3 + b"document.cookie" + CLEAN
+
+        for split in range(1, len(body)):
+            stream = scanner.stream(max_bytes=1 << 20)
+            assert stream.feed(body[:split]) or stream.feed(body[split:])
+
+    def test_stream_stops_at_the_size_cap(self, engine):
+        stream = PatternScanner(PATTERNS, engine).stream(max_bytes=len(CLEAN) * 2)
+
+        assert not stream.feed(CLEAN * 2)
+        assert not stream.feed(b"<script>")
+        assert stream.scanned == len(CLEAN) * 2
+
+    def test_empty_pattern_sets_are_rejected(self, engine):
+        with pytest.raises(ValueError):
+            PatternScanner(["", ""], engine)
+
+
+@pytest.mark.unit
+class TestReloadingPatternScanner:
+    """Pattern lists reloaded from SECURITY_PATTERNS_FILE"""
+
+    def test_file_changes_are_picked_up(self, tmp_path):
+        path = tmp_path / "patterns.txt"
+        path.write_text("# extra probes\nwp-login.php\n\nxp_cmdshell\n")
+        scanner = ReloadingPatternScanner(PATTERNS, str(path), check_interval=0)
+
+        assert scanner.current.search(b"GET /wp-login.php") == b"wp-login.php"
+        assert scanner.current.search(b"<script>") is None
+
+        path.write_text("<script\n")
+        os.utime(path, (time.time() + 10, time.time() + 10))
+
+        assert scanner.current.search(b"<script>") == b"<script"
+        assert scanner.current.search(b"GET /wp-login.php") is None
+        assert scanner.reloads == 2
+
+    def test_unreadable_files_keep_the_current_patterns(self, tmp_path):
+        scanner = ReloadingPatternScanner(PATTERNS, str(tmp_path / "missing.txt"), check_interval=0)
+        assert scanner.current.search(b"<script>") == b"<script"
+
+        (tmp_path / "missing.txt").write_text("\n# only comments\n")
+        assert scanner.current.search(b"<script>") == b"<script"
+        assert scanner.reload_errors == 2
+
+    def test_checks_are_rate_limited(self, tmp_path):
+        path = tmp_path / "patterns.txt"
+        path.write_text("first\n")
+        scanner = ReloadingPatternScanner(PATTERNS, str(path), check_interval=3600)
+        assert scanner.current.search(b"first") == b"first"
+
+        path.write_text("second\n")
+        os.utime(path, (time.time() + 10, time.time() + 10))
+
+        assert scanner.current.search(b"second") is None
+
+
+def _legacy_search(patterns, body: bytes) -> bool:
+    """Previous SecurityMiddleware body check: decode, lowercase, one substring search per pattern"""
+    text = body.decode('utf-8', errors='ignore').lower()
+    for pattern in patterns:
+        if pattern in text:
+            return True
+    return False
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestPatternScannerBenchmark:
+    """Full scans of clean bodies from 1 KB to 10 MB, old loop against the compiled scanner"""
+
+    SIZES = (1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024)
+
+    def _time(self, scan, body: bytes) -> float:
+        runs = max(1, (1024 * 1024) // len(body))
+        started = time.perf_counter()
+        for _ in range(runs):
+            assert not scan(body)
+        return (time.perf_counter() - started) / runs
+
+    def test_scan_cost_by_body_size(self):
+        rng = random.Random(1)
+        extra = [
+            "".join(rng.choice(string.ascii_lowercase + "(=<") for _ in range(rng.randint(6, 12))) + "~"
+            for _ in range(200)
+        ]
+        engines = [REGEX] + ([AHO_CORASICK] if ahocorasick is not None else [])
+
+        results = {}
+        for patterns in (PATTERNS, PATTERNS + extra):
+            scanners = {engine: PatternScanner(patterns, engine) for engine in engines}
+            print(f"\n{len(patterns)} patterns:")
+            for size in self.SIZES:
+                body = (CLEAN * (size // len(CLEAN) + 1))[:size]
+                old = self._time(lambda data: _legacy_search(patterns, data), body)
+                new = {
+                    engine: self._time(lambda data, scanner=scanner: scanner.search(data) is not None, body)
+                    for engine, scanner in scanners.items()
+                }
+                results[len(patterns), size] = old, new
+                print(f"  {size // 1024:>6} KB: old {old * 1000:8.2f} ms" + "".join(
+                    f", {engine} {elapsed * 1000:8.2f} ms" for engine, elapsed in new.items()
+                ))
+
+        default_engine = PatternScanner(PATTERNS).engine
+        for (count, size), (old, new) in results.items():
+            if size >= 1024 * 1024:
+                # Roughly as fast as the per-pattern loop with the default set, far faster as the set grows
+                assert new[default_engine] < old * (2 if count == len(PATTERNS) else 0.5)
@@ -0,0 +1,266 @@
+"""
+Query plan regression tests: hot queries on seeded large tables must use an index
+
+Every statement a hot code path issues is re-run under EXPLAIN QUERY PLAN on
+SQLite after ANALYZE; a plain ``SCAN <table>`` of a hot table means the query
+has regressed to reading the whole table.
+"""
+
+import importlib.util
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+import pytest
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import event, insert, inspect, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from src.core.database import Base
+from src.models.db_models import (
+    AuditLog, Client, ClientAssignment, ClientAssignmentStatus, NotificationChannel, NotificationLog,
+    NotificationStatus, PermissionGrant, PermissionLevel, PermissionStatus, PropertyAccessBinding,
+    ServiceAccount, ServiceAccountProperty, User
+)
+from src.services.audit_service import AuditService
+from src.services.ga4_user_link_batcher import GA4UserLinkBatcher
+from src.services.notification_service import NotificationService
+from src.services.principal_cache import load_client_ids
+from src.services.scheduler_service import SchedulerService
+
+HOT_TABLES = (
+    "audit_logs", "permission_grants", "notification_logs", "client_assignments",
+    "service_account_properties", "property_access_bindings"
+)
+FULL_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+MIGRATION = Path(__file__).resolve().parents[1] / "alembic" / "versions" / "c4d9d28675ba_hot_query_indexes.py"
+
+USERS, CLIENTS = 200, 50
+NOW = datetime.utcnow()
+
+
+async def _seed(db: AsyncSession) -> None:
+    """Tables large enough, with ANALYZE statistics, that the planner prefers an index when one fits"""
+    statuses = list(PermissionStatus)
+    notification_statuses = list(NotificationStatus)
+    resource_types = ["permission_grant", "user_permission", "client_assignment", "user", "service_account"]
+
+    await db.execute(insert(User), [
+        {"email": f"user{index}@example.com", "name": f"User {index}", "password_hash": "x"}
+        for index in range(1, USERS + 1)
+    ])
+    await db.execute(insert(Client), [{"name": f"Client {index}"} for index in range(1, CLIENTS + 1)])
+    await db.execute(insert(ServiceAccount), [
+        {"client_id": index, "email": f"sa{index}@test.iam.gserviceaccount.com", "secret_name": f"sa{index}"}
+        for index in range(1, CLIENTS + 1)
+    ])
+    await db.execute(insert(AuditLog), [
+        {
+            "actor_id": None if index % 3 == 0 else index % USERS + 1,
+            "action": f"action_{index % 20}",
+            "resource_type": resource_types[index % len(resource_types)],
+            "resource_id": str(index),
+            "created_at": NOW - timedelta(minutes=index)
+        }
+        for index in range(20000)
+    ])
+    await db.execute(insert(PermissionGrant), [
+        {
+            "user_id": index % USERS + 1, "client_id": index % CLIENTS + 1, "service_account_id": index % CLIENTS + 1,
+            "ga_property_id": str(100000 + index % 2000), "target_email": f"grantee{index % 3000}@example.com",
+            "permission_level": PermissionLevel.VIEWER, "status": statuses[index % len(statuses)],
+            "expires_at": None if index % 10 == 0 else NOW + timedelta(days=index % 90 - 1)
+        }
+        for index in range(10000)
+    ])
+    await db.execute(insert(NotificationLog), [
+        {
+            "channel": NotificationChannel.EMAIL, "recipient": f"grantee{index % 3000}@example.com",
+            "template_type": ("permission_expiry", "permission_granted", "permission_revoked")[index % 3],
+            "status": notification_statuses[index % len(notification_statuses)],
+            "retry_count": 3,  # The retry queue gives up on these instead of sending email
+            "created_at": NOW - timedelta(minutes=3 * index)
+        }
+        for index in range(20000)
+    ])
+    await db.execute(insert(ClientAssignment), [
+        {
+            "user_id": index % USERS + 1, "client_id": index // USERS % CLIENTS + 1, "assigned_by_id": 1,
+            "status": ClientAssignmentStatus.ACTIVE if index % 4 else ClientAssignmentStatus.INACTIVE,
+            "assigned_at": NOW, "created_at": NOW, "updated_at": NOW
+        }
+        for index in range(5000)
+    ])
+    await db.execute(insert(ServiceAccountProperty), [
+        {"service_account_id": index % CLIENTS + 1, "ga_property_id": str(100000 + index)}
+        for index in range(5000)
+    ])
+    await db.execute(insert(PropertyAccessBinding), [
+        {
+            "service_account_id": index % 5000 % CLIENTS + 1, "ga_property_id": str(100000 + index % 5000),
+            "user_email": f"grantee{index}@example.com", "roles": ["predefinedRoles/viewer"]
+        }
+        for index in range(20000)
+    ])
+    await db.commit()
+    await db.execute(text("ANALYZE"))
+    await db.commit()
+
+
+async def _bulk_property_lookups(db: AsyncSession) -> None:
+    batcher = GA4UserLinkBatcher(db)
+    managers = await batcher._managing_service_accounts([str(100000 + index) for index in range(0, 500, 7)])
+    await batcher._cached_bindings(managers)
+
+
+# The queries behind audit views, request authentication, the scheduler and bulk GA4 writes
+HOT_QUERIES: Dict[str, Callable[[AsyncSession], Awaitable]] = {
+    "audit logs by actor": lambda db: AuditService(db).get_audit_logs(actor_id=7),
+    "audit log count by actor": lambda db: AuditService(db).count_audit_logs(actor_id=7),
+    "audit logs by resource type": lambda db: AuditService(db).get_audit_logs(resource_type="client_assignment"),
+    "audit logs by date range": lambda db: AuditService(db).get_audit_logs(
+        start_date=NOW - timedelta(days=2), end_date=NOW - timedelta(days=1)
+    ),
+    "recent activity": lambda db: AuditService(db).get_recent_activity(resource_types=["permission_grant"]),
+    "permission expiry sweep": lambda db: SchedulerService()._check_expired_permissions(db),
+    "expiry notice digests": lambda db: SchedulerService()._plan_expiry_notifications(db),
+    "notification retry queue": lambda db: NotificationService(db).retry_failed_notifications(),
+    "notification logs by status": lambda db: NotificationService(db).get_notification_logs(
+        status=NotificationStatus.FAILED
+    ),
+    "notification retention cleanup": lambda db: SchedulerService()._cleanup_old_data(db),
+    "principal client ids": lambda db: load_client_ids(db, 7),
+    # ClientAssignmentService.get_user_assignments / get_client_assignments filters
+    "user assignments": lambda db: db.execute(select(ClientAssignment).where(ClientAssignment.user_id == 7)),
+    "client assignments": lambda db: db.execute(
+        select(ClientAssignment).where(
+            ClientAssignment.client_id == 3, ClientAssignment.status == ClientAssignmentStatus.ACTIVE
+        )
+    ),
+    "bulk user-link property lookups": _bulk_property_lookups,
+}
+
+
+@pytest.fixture
+async def plan_engine():
+    """Separate engine so the seeded tables are thrown away with it"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine)() as db:
+        await _seed(db)
+    yield engine
+    await engine.dispose()
+
+
+async def _full_scans(engine, run: Callable[[AsyncSession], Awaitable]) -> List[Tuple[str, str]]:
+    """Run a code path, then EXPLAIN every query it issued; returns (plan row, statement) for full scans of hot tables"""
+    issued = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            issued.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+            await run(db)
+            await db.rollback()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert issued, "the code path issued no queries"
+    scans = []
+    async with engine.connect() as conn:
+        for statement, parameters in issued:
+            for row in await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters):
+                match = FULL_SCAN.match(row[3])
+                if match and match.group(1) in HOT_TABLES:
+                    scans.append((row[3], " ".join(statement.split())))
+    return scans
+
+
+async def _drop_model_indexes(engine) -> None:
+    def drop(sync_conn):
+        for table in HOT_TABLES:
+            for index in Base.metadata.tables[table].indexes:
+                index.drop(sync_conn)
+        sync_conn.exec_driver_sql("ANALYZE")
+
+    async with engine.begin() as conn:
+        await conn.run_sync(drop)
+
+
+@pytest.mark.unit
+class TestHotQueryPlans:
+    """EXPLAIN QUERY PLAN of the hot queries"""
+
+    async def test_hot_queries_use_indexes(self, plan_engine):
+        regressions = {}
+        for name, run in HOT_QUERIES.items():
+            scans = await _full_scans(plan_engine, run)
+            if scans:
+                regressions[name] = scans
+
+        assert not regressions, "\n".join(
+            f"{name}: {plan} in {statement}" for name, scans in regressions.items() for plan, statement in scans
+        )
+
+    async def test_dropping_the_indexes_is_detected(self, plan_engine):
+        await _drop_model_indexes(plan_engine)
+
+        scanned = {
+            name for name, run in HOT_QUERIES.items()
+            if await _full_scans(plan_engine, run)
+        }
+
+        assert {
+            "audit logs by actor", "audit logs by date range", "permission expiry sweep", "expiry notice digests",
+            "notification retry queue", "principal client ids", "client assignments", "bulk user-link property lookups"
+        } <= scanned
+
+
+@pytest.mark.unit
+class TestHotQueryIndexMigration:
+    """The Alembic revision creates the indexes declared on the models"""
+
+    async def test_upgrade_and_downgrade(self, plan_engine):
+        spec = importlib.util.spec_from_file_location("hot_query_indexes", MIGRATION)
+        migration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(migration)
+        await _drop_model_indexes(plan_engine)
+
+        def index_names(sync_conn):
+            inspector = inspect(sync_conn)
+            return {index["name"] for table in HOT_TABLES for index in inspector.get_indexes(table)}
+
+        def migrate(step):
+            def run(sync_conn):
+                # Like alembic/env.py: each revision runs in the migration context's own transaction
+                sync_conn.commit()
+                context = MigrationContext.configure(sync_conn)
+                with context.begin_transaction(), Operations.context(context):
+                    step()
+                return index_names(sync_conn)
+            return run
+
+        def create_existing(sync_conn):
+            """What migrations/003 created on databases set up from the SQL scripts"""
+            for name, table, columns, _ in migration.EXISTING_INDEXES:
+                sync_conn.exec_driver_sql(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})")
+
+        declared = {index.name for table in HOT_TABLES for index in Base.metadata.tables[table].indexes}
+        existing = {name for name, *_ in migration.EXISTING_INDEXES}
+        async with plan_engine.connect() as conn:
+            assert not await conn.run_sync(index_names) & declared
+            await conn.run_sync(create_existing)
+
+            assert await conn.run_sync(migrate(migration.upgrade)) == declared
+            assert await conn.run_sync(migrate(migration.upgrade)) == declared
+            assert await conn.run_sync(migrate(migration.downgrade)) == existing
@@ -0,0 +1,268 @@
+"""
+Rate limiter tests: GCRA Lua script on Redis, in-process fallback and SecurityMiddleware
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from redis.exceptions import ConnectionError as RedisConnectionError
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+
+from src.middleware.rate_limit import (
+    ALLOWED, BLOCKED, LIMITED, NEWLY_BLOCKED, InMemoryRateLimiter, RedisRateLimiter
+)
+from src.middleware.security import SecurityMiddleware
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def redis_server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def redis_client(redis_server):
+    return fakeredis.FakeAsyncRedis(server=redis_server)
+
+
+class _UnavailableRedis:
+    """Async Redis client whose server cannot be reached"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def register_script(self, script):
+        async def run(keys=None, args=None):
+            self.calls += 1
+            raise RedisConnectionError("Connection refused")
+        return run
+
+    async def set(self, *args, **kwargs):
+        raise RedisConnectionError("Connection refused")
+
+
+def _app(rate_limiter) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/items")
+    async def items():
+        return {"ok": True}
+
+    app.add_middleware(SecurityMiddleware, rate_limiter=rate_limiter, rate_limit_enabled=True)
+    return app
+
+
+async def _states(limiter, count: int, limit: int = 3, window: float = 60, ip: str = "10.0.0.1"):
+    return [(await limiter.hit(ip, "/api/items", limit, window)).state for _ in range(count)]
+
+
+@pytest.mark.unit
+class TestInMemoryRateLimiter:
+    """GCRA semantics of the in-process limiter"""
+
+    async def test_limit_violations_and_block(self):
+        limiter = InMemoryRateLimiter(max_violations=2, block_seconds=60)
+
+        assert await _states(limiter, 6) == [ALLOWED, ALLOWED, ALLOWED, LIMITED, NEWLY_BLOCKED, BLOCKED]
+        # Other clients are unaffected
+        assert await _states(limiter, 1, ip="10.0.0.2") == [ALLOWED]
+
+    async def test_requests_recover_at_the_emission_rate(self):
+        limiter = InMemoryRateLimiter()
+        await _states(limiter, 3, limit=3, window=0.3)
+
+        decision = await limiter.hit("10.0.0.1", "/api/items", 3, 0.3)
+        assert decision.state == LIMITED
+        assert 0 < decision.retry_after <= 0.1
+
+        await asyncio.sleep(decision.retry_after + 0.01)
+        assert (await limiter.hit("10.0.0.1", "/api/items", 3, 0.3)).allowed
+
+    async def test_keys_are_bounded(self):
+        limiter = InMemoryRateLimiter(max_keys=10)
+        for index in range(50):
+            await limiter.hit(f"10.0.0.{index}", "/api/items", 100, 3600)
+
+        assert len(limiter._tat) <= 10
+
+
+@pytest.mark.unit
+class TestRedisRateLimiter:
+    """Lua script limits shared through Redis"""
+
+    async def test_limit_violations_and_block(self, redis_client):
+        limiter = RedisRateLimiter(redis_client, max_violations=2, block_seconds=60)
+
+        assert await _states(limiter, 6) == [ALLOWED, ALLOWED, ALLOWED, LIMITED, NEWLY_BLOCKED, BLOCKED]
+        assert limiter.get_stats()["redis_checks"] == 6
+        assert 0 < await redis_client.pttl("blocked_ip:10.0.0.1") <= 60_000
+
+    async def test_limits_are_shared_between_workers(self, redis_server):
+        first = RedisRateLimiter(fakeredis.FakeAsyncRedis(server=redis_server))
+        second = RedisRateLimiter(fakeredis.FakeAsyncRedis(server=redis_server))
+
+        assert await _states(first, 2) == [ALLOWED, ALLOWED]
+        assert await _states(second, 2) == [ALLOWED, LIMITED]
+
+        await first.block("10.0.0.9", 60)
+        assert await _states(second, 1, ip="10.0.0.9") == [BLOCKED]
+
+    async def test_falls_back_to_memory_when_redis_is_down(self):
+        redis_client = _UnavailableRedis()
+        limiter = RedisRateLimiter(redis_client, retry_seconds=0.05)
+
+        # Limits still apply instead of failing open
+        assert await _states(limiter, 4) == [ALLOWED, ALLOWED, ALLOWED, LIMITED]
+        # Redis is only tried again after the retry delay
+        assert redis_client.calls == 1
+        assert not limiter.redis_available
+
+        await asyncio.sleep(0.06)
+        await _states(limiter, 1)
+        assert redis_client.calls == 2
+        assert limiter.get_stats()["fallback_checks"] == 5
+
+
+@pytest.mark.unit
+class TestSecurityMiddlewareRateLimit:
+    """Responses of SecurityMiddleware for limited and blocked clients"""
+
+    async def test_limited_then_blocked(self, redis_client):
+        limiter = RedisRateLimiter(redis_client, max_violations=2)
+
+        async with _client(_app(limiter, requests=2)) as client:
+            responses = [await client.get("/api/items") for _ in range(5)]
+
+        assert [response.status_code for response in responses] == [200, 200, 429, 429, 429]
+        assert responses[0].headers["X-Frame-Options"] == "DENY"
+        assert responses[2].json()["error"] == "RATE_LIMIT_EXCEEDED"
+        assert int(responses[2].headers["Retry-After"]) >= 1
+        assert responses[3].json()["error"] == "RATE_LIMIT_EXCEEDED"
+        assert responses[4].json()["error"] == "IP_BLOCKED"
+
+    async def test_redis_outage_keeps_limiting(self):
+        limiter = RedisRateLimiter(_UnavailableRedis())
+
+        async with _client(_app(limiter, requests=2)) as client:
+            statuses = [(await client.get("/api/items")).status_code for _ in range(3)]
+
+        assert statuses == [200, 200, 429]
+
+
+class _SlowSyncRedis:
+    """Sync fakeredis client that blocks for a network round-trip per command"""
+
+    def __init__(self, client, rtt: float):
+        self.client = client
+        self.rtt = rtt
+        self.round_trips = 0
+
+    def _wait(self):
+        self.round_trips += 1
+        time.sleep(self.rtt)
+
+    def get(self, key):
+        self._wait()
+        return self.client.get(key)
+
+    def incr_with_ttl(self, key, ttl):
+        self._wait()
+        pipeline = self.client.pipeline()
+        pipeline.incr(key)
+        pipeline.expire(key, ttl)
+        pipeline.execute()
+
+
+class _LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    """Previous fixed-window check: blocking GET block, GET count, INCR + EXPIRE"""
+
+    def __init__(self, app, redis_client, requests: int, window: int = 3600):
+        super().__init__(app)
+        self.redis_client = redis_client
+        self.requests = requests
+        self.window = window
+
+    async def dispatch(self, request, call_next):
+        ip = request.client.host
+        blocked_until = self.redis_client.get(f"blocked_ip:{ip}")
+        if blocked_until and float(blocked_until) > time.time():
+            return JSONResponse({"error": "IP_BLOCKED"}, status_code=429)
+
+        window_start = int(time.time()) // self.window * self.window
+        key = f"rate_limit:{ip}:{request.url.path}:{window_start}"
+        current_count = int(self.redis_client.get(key) or 0)
+        if current_count >= self.requests:
+            return JSONResponse({"error": "RATE_LIMIT_EXCEEDED"}, status_code=429)
+        self.redis_client.incr_with_ttl(key, self.window)
+        return await call_next(request)
+
+
+def _app(rate_limiter=None, requests: int = 100, window: float = 3600, legacy_redis=None) -> FastAPI:
+    """App behind SecurityMiddleware with its default limit set to requests per window"""
+
+    class LimitedSecurityMiddleware(SecurityMiddleware):
+        def __init__(self, app, **kwargs):
+            super().__init__(app, **kwargs)
+            self.rate_limits["default"] = {"requests": requests, "window": window}
+
+    app = FastAPI()
+
+    @app.get("/api/items")
+    async def items():
+        return {"ok": True}
+
+    if legacy_redis is not None:
+        app.add_middleware(_LegacyRateLimitMiddleware, redis_client=legacy_redis, requests=requests)
+    else:
+        app.add_middleware(LimitedSecurityMiddleware, rate_limiter=rate_limiter, rate_limit_enabled=True)
+    return app
+
+
+def _client(app) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestRateLimitBenchmark:
+    """Middleware overhead under load with a 1 ms Redis round-trip"""
+
+    async def test_concurrent_requests(self, redis_server):
+        requests, concurrency, rtt = 400, 50, 0.001
+
+        async def run(app) -> float:
+            semaphore = asyncio.Semaphore(concurrency)
+            async with _client(app) as client:
+                async def get():
+                    async with semaphore:
+                        assert (await client.get("/api/items")).status_code == 200
+
+                started = time.perf_counter()
+                await asyncio.gather(*(get() for _ in range(requests)))
+                return (time.perf_counter() - started) / requests
+
+        legacy_redis = _SlowSyncRedis(fakeredis.FakeRedis(server=redis_server), rtt)
+        legacy = await run(_app(legacy_redis=legacy_redis, requests=requests))
+
+        limiter = RedisRateLimiter(fakeredis.FakeAsyncRedis(server=redis_server))
+        script = limiter._script
+
+        async def slow_script(**kwargs):
+            await asyncio.sleep(rtt)
+            return await script(**kwargs)
+
+        limiter._script = slow_script
+        current = await run(_app(limiter, requests=requests))
+
+        print(
+            f"\nrate limit middleware, {requests} requests x{concurrency} concurrent, {rtt * 1000:.0f} ms RTT: "
+            f"{legacy * 1000:.2f} ms/request with {legacy_redis.round_trips / requests:.0f} blocking round-trips, "
+            f"{current * 1000:.2f} ms/request with {limiter.redis_checks / requests:.0f} async round-trip"
+        )
+        assert limiter.redis_checks == requests
+        assert current < legacy / 2
@@ -0,0 +1,411 @@
+"""
+RBAC service permission decision cache tests
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+from sqlalchemy import and_, event, select
+
+from src.models.db_models import (
+    Permission, PermissionContext, PermissionScope, RolePermission, UserRole
+)
+from src.services import permission_cache
+from src.services.permission_cache import PermissionDecisionCache
+from src.services.role_permission_matrix import RolePermissionMatrix, RolePermissionSnapshot
+from src.models.schemas import UserUpdate
+from src.services import user_service
+from src.services.rbac_service import RBACService
+from src.services.user_service import UserService
+
+
+@pytest.fixture
+def cache():
+    return PermissionDecisionCache(max_entries=100, ttl_seconds=60)
+
+
+@pytest.fixture
+def matrix():
+    return RolePermissionMatrix()
+
+
+@pytest.fixture
+async def role_permissions(db_session):
+    """Seed a small role/permission matrix"""
+    db_session.add_all([
+        RolePermission(role=UserRole.REQUESTER, permission=Permission.PERMISSION_CREATE),
+        RolePermission(role=UserRole.ADMIN, permission=Permission.USER_READ),
+    ])
+    await db_session.commit()
+
+
+@pytest.mark.unit
+class TestPermissionDecisionCache:
+    """PermissionDecisionCache"""
+
+    def test_hit_and_miss_counters(self, cache):
+        key = cache.make_key(1, Permission.USER_READ, client_id=2, context=PermissionContext.ALL)
+
+        assert cache.get(key) is None
+        cache.set(key, True)
+        assert cache.get(key) is True
+
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+        assert stats["hit_ratio"] == 0.5
+
+    def test_key_distinguishes_context(self, cache):
+        cache.set(cache.make_key(1, Permission.USER_READ, client_id=1), True)
+
+        assert cache.get(cache.make_key(1, Permission.USER_READ, client_id=2)) is None
+        assert cache.get(cache.make_key(1, Permission.USER_READ, resource_id="x", client_id=1)) is None
+
+    def test_lru_eviction(self):
+        cache = PermissionDecisionCache(max_entries=2, ttl_seconds=60)
+        first, second, third = (cache.make_key(i, Permission.USER_READ) for i in range(3))
+
+        cache.set(first, True)
+        cache.set(second, True)
+        assert cache.get(first) is True  # first is now most recently used
+        cache.set(third, True)
+
+        assert cache.get(second) is None
+        assert cache.get(first) is True
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_ttl_expiry(self, cache, monkeypatch):
+        key = cache.make_key(1, Permission.USER_READ)
+        cache.set(key, False)
+
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+
+        assert cache.get(key) is None
+        assert cache.get_stats()["size"] == 0
+
+    async def test_invalidate_user_is_precise(self, cache):
+        user_key = cache.make_key(1, Permission.USER_READ)
+        other_key = cache.make_key(2, Permission.USER_READ)
+        cache.set(user_key, True)
+        cache.set(other_key, True)
+
+        await cache.invalidate_user(1)
+
+        assert cache.get(user_key) is None
+        assert cache.get(other_key) is True
+
+    def test_result_computed_before_invalidation_is_not_cached(self, cache):
+        key = cache.make_key(1, Permission.USER_READ)
+        generation = cache.generation(1)
+
+        cache.invalidate_user_local(1)
+        cache.set(key, True, generation)
+
+        assert cache.get(key) is None
+
+    def test_invalidation_counters_are_bounded(self):
+        cache = PermissionDecisionCache(max_entries=3, ttl_seconds=60)
+        key = cache.make_key(1, Permission.USER_READ)
+        generation = cache.generation(1)
+
+        for user_id in range(1, 11):
+            cache.invalidate_user_local(user_id)
+            assert len(cache._user_generations) <= 3
+
+        # Counters were dropped, yet results computed before the invalidation still are not cached
+        cache.set(key, True, generation)
+        assert cache.get(key) is None
+        cache.set(key, True, cache.generation(1))
+        assert cache.get(key) is True
+
+    def test_remote_invalidation_messages(self, cache):
+        cache.set(cache.make_key(1, Permission.USER_READ), True)
+        cache.set(cache.make_key(2, Permission.USER_READ), True)
+
+        cache.apply_invalidation(json.dumps({"user_id": 1, "origin": "other-worker"}))
+        assert cache.get_stats()["size"] == 1
+
+        cache.apply_invalidation(json.dumps({"all": True, "origin": cache._instance_id}))
+        assert cache.get_stats()["size"] == 1  # own messages are ignored
+
+        cache.apply_invalidation(json.dumps({"all": True, "origin": "other-worker"}))
+        assert cache.get_stats()["size"] == 0
+
+    async def test_publishes_invalidations_when_redis_connected(self, cache):
+        published = []
+
+        class _Redis:
+            async def publish(self, channel, message):
+                published.append(json.loads(message))
+
+        cache._redis = _Redis()
+        await cache.invalidate_user(7)
+
+        assert published[0]["user_id"] == 7
+        assert published[0]["origin"] == cache._instance_id
+
+
+    async def test_listener_resubscribes_after_redis_drops(self, cache, monkeypatch):
+        monkeypatch.setattr(permission_cache, "REDIS_RECONNECT_MIN_DELAY", 0)
+        received = asyncio.Event()
+
+        class _PubSub:
+            def __init__(self, messages, fail):
+                self.messages, self.fail = messages, fail
+
+            async def subscribe(self, channel):
+                pass
+
+            async def unsubscribe(self, channel):
+                pass
+
+            async def aclose(self):
+                pass
+
+            async def listen(self):
+                for message in self.messages:
+                    yield message
+                if self.fail:
+                    raise ConnectionError("connection reset")
+                received.set()
+                await asyncio.Event().wait()
+
+        class _Redis:
+            def pubsub(self):
+                return _PubSub([{"type": "message", "data": json.dumps({"user_id": 1, "origin": "other"})}], False)
+
+            async def aclose(self):
+                pass
+
+        cache._redis = _Redis()
+        cache._subscribed = True
+        cache.set(cache.make_key(2, Permission.USER_READ), True)
+        cache._listener = asyncio.create_task(cache._listen(_PubSub([], True)))
+
+        await asyncio.wait_for(received.wait(), timeout=1)
+
+        stats = cache.get_stats()
+        assert stats["redis_connected"] and stats["redis_reconnects"] == 1
+        # Entries are dropped since invalidations may have been missed while disconnected
+        assert stats["size"] == 0
+        await cache.disconnect_redis()
+        assert not cache.get_stats()["redis_connected"]
+
+
+@pytest.mark.database
+class TestRBACServiceCaching:
+    """RBACService with a shared decision cache"""
+
+    async def test_decisions_survive_across_service_instances(self, db_session, test_user, role_permissions, cache, matrix):
+        assert await RBACService(db_session, cache, matrix).check_permission(test_user.id, Permission.PERMISSION_CREATE)
+        assert await RBACService(db_session, cache, matrix).check_permission(test_user.id, "permission:create")
+
+        assert cache.get_stats()["hits"] == 1
+
+    async def test_inherited_role_permission(
+        self, monkeypatch, db_session, test_user, role_permissions, cache, matrix
+    ):
+        monkeypatch.setattr(user_service, "permission_decision_cache", cache)
+        service = RBACService(db_session, cache, matrix)
+        assert not await service.check_permission(test_user.id, Permission.USER_READ)
+
+        # Changing the role through UserService drops the user's cached decisions
+        await UserService(db_session).update_user(test_user.id, UserUpdate(role=UserRole.SUPER_ADMIN))
+
+        assert await service.check_permission(test_user.id, Permission.USER_READ)
+        assert await service.check_permission(test_user.id, Permission.PERMISSION_CREATE)
+
+    async def test_role_assignment_invalidates_user(self, db_session, test_user, role_permissions, cache, matrix):
+        service = RBACService(db_session, cache, matrix)
+        assert not await service.check_permission(test_user.id, Permission.USER_READ)
+
+        assert await service.assign_role_to_user(test_user.id, UserRole.ADMIN, assigned_by_id=test_user.id)
+        assert await service.check_permission(test_user.id, Permission.USER_READ)
+
+        assert await service.revoke_role_from_user(test_user.id, UserRole.ADMIN, revoked_by_id=test_user.id)
+        assert not await service.check_permission(test_user.id, Permission.USER_READ)
+
+    async def test_permission_override_invalidates_user(self, db_session, test_user, role_permissions, cache, matrix):
+        service = RBACService(db_session, cache, matrix)
+        assert await service.check_permission(test_user.id, Permission.PERMISSION_CREATE)
+
+        assert await service.grant_permission_override(
+            test_user.id, Permission.PERMISSION_CREATE, granted_by_id=test_user.id, is_granted=False
+        )
+
+        assert not await service.check_permission(test_user.id, Permission.PERMISSION_CREATE)
+
+
+@pytest.mark.unit
+class TestRolePermissionSnapshot:
+    """Compiled role permission matrix"""
+
+    @pytest.fixture
+    def snapshot(self):
+        return RolePermissionSnapshot((
+            (UserRole.VIEWER, Permission.CLIENT_READ, PermissionScope.SYSTEM, PermissionContext.ALL),
+            (UserRole.MANAGER, Permission.CLIENT_UPDATE, PermissionScope.CLIENT, PermissionContext.ASSIGNED_CLIENTS),
+            (UserRole.USER, Permission.USER_READ, PermissionScope.SYSTEM, PermissionContext.SAME_CLIENT),
+        ))
+
+    def test_inheritance_closure(self, snapshot):
+        assert snapshot.allows(UserRole.SUPER_ADMIN, Permission.CLIENT_READ, None)
+        assert snapshot.allows(UserRole.VIEWER, Permission.CLIENT_READ, None)
+        assert not snapshot.allows(UserRole.VIEWER, Permission.CLIENT_UPDATE, None)
+        assert not snapshot.rules(UserRole.ADMIN, Permission.CLIENT_READ, include_inherited=False)
+
+    def test_client_scope_requires_matching_assignment(self, snapshot):
+        assert snapshot.allows(UserRole.MANAGER, Permission.CLIENT_UPDATE, role_client_id=5, client_id=5)
+        assert not snapshot.allows(UserRole.MANAGER, Permission.CLIENT_UPDATE, role_client_id=5, client_id=6)
+        assert not snapshot.allows(
+            UserRole.MANAGER, Permission.CLIENT_UPDATE, role_client_id=5, client_id=5,
+            context=PermissionContext.OWN_DATA
+        )
+
+    def test_context_rules(self, snapshot):
+        assert snapshot.allows(UserRole.USER, Permission.USER_READ, None)
+        assert snapshot.allows(UserRole.USER, Permission.USER_READ, None, context=PermissionContext.SAME_CLIENT)
+        assert not snapshot.allows(UserRole.USER, Permission.USER_READ, None, context=PermissionContext.ALL)
+
+
+@pytest.mark.database
+class TestRolePermissionMatrix:
+    """RBACService backed by the compiled role matrix"""
+
+    async def test_role_checks_issue_no_role_permission_queries(
+        self, test_engine, db_session, test_user, role_permissions, matrix
+    ):
+        uncached = PermissionDecisionCache(max_entries=0)
+        service = RBACService(db_session, uncached, matrix)
+        assert await service.check_permission(test_user.id, Permission.PERMISSION_CREATE)
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(test_engine.sync_engine, "before_cursor_execute", record)
+        try:
+            for permission in Permission:
+                await service.check_permission(test_user.id, permission)
+        finally:
+            event.remove(test_engine.sync_engine, "before_cursor_execute", record)
+
+        assert statements
+        assert not [statement for statement in statements if "role_permissions" in statement]
+        assert matrix.loads == 1
+
+    async def test_set_role_permission_reloads_matrix(self, db_session, test_user, role_permissions, cache, matrix):
+        service = RBACService(db_session, cache, matrix)
+        assert not await service.check_permission(test_user.id, Permission.CLIENT_READ)
+
+        assert await service.set_role_permission(UserRole.VIEWER, Permission.CLIENT_READ)
+        assert await service.check_permission(test_user.id, Permission.CLIENT_READ)
+
+        assert await service.set_role_permission(UserRole.VIEWER, Permission.CLIENT_READ, is_active=False)
+        assert not await service.check_permission(test_user.id, Permission.CLIENT_READ)
+        assert matrix.loads == 3
+
+    async def test_role_change_from_another_worker_marks_matrix_stale(self, db_session, role_permissions, matrix):
+        cache = PermissionDecisionCache()
+        cache.add_role_change_listener(matrix.mark_stale)
+        await matrix.get(db_session)
+
+        cache.apply_invalidation(json.dumps({"all": True, "roles": True, "origin": "other-worker"}))
+
+        assert matrix.get_stats()["stale"]
+        await matrix.get(db_session)
+        assert matrix.loads == 2
+
+    async def test_matrix_reloads_after_max_age(self, db_session, role_permissions):
+        matrix = RolePermissionMatrix(max_age_seconds=0.05)
+        await matrix.get(db_session)
+        await matrix.get(db_session)
+        assert matrix.loads == 1
+
+        # No invalidation arrives (e.g. Redis disabled), but the snapshot ages out
+        await asyncio.sleep(0.06)
+        await matrix.get(db_session)
+        assert matrix.loads == 2
+
+    async def test_get_user_permissions_lists_role_permissions(self, db_session, test_user, role_permissions, cache, matrix):
+        permissions = await RBACService(db_session, cache, matrix).get_user_permissions(test_user.id)
+
+        assert [p["permission"] for p in permissions] == [Permission.PERMISSION_CREATE.value]
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestPermissionCacheBenchmark:
+    """check_permission throughput with and without the shared cache"""
+
+    async def test_cached_check_throughput(self, db_session, test_user, role_permissions, matrix):
+        iterations = 200
+
+        async def checks_per_second(cache):
+            started = time.perf_counter()
+            for _ in range(iterations):
+                # A new service per check, as in the request path
+                await RBACService(db_session, cache, matrix).check_permission(test_user.id, Permission.PERMISSION_CREATE)
+            return iterations / (time.perf_counter() - started)
+
+        uncached = await checks_per_second(PermissionDecisionCache(max_entries=0))
+        cached = await checks_per_second(PermissionDecisionCache(max_entries=1000, ttl_seconds=60))
+        print(f"\ncheck_permission: {uncached:,.0f}/s uncached, {cached:,.0f}/s cached")
+
+        assert cached > uncached * 10
+
+
+async def _legacy_role_check(db_session, role, permission):
+    """Per-role RolePermission queries as issued before the matrix was compiled"""
+    level = UserRole.get_hierarchy_level(role)
+    roles = [role] + [other for other in UserRole if UserRole.get_hierarchy_level(other) < level]
+    for candidate in roles:
+        result = await db_session.execute(
+            select(RolePermission).where(
+                and_(
+                    RolePermission.role == candidate,
+                    RolePermission.permission == permission,
+                    RolePermission.is_active == True
+                )
+            )
+        )
+        if result.scalars().all():
+            return True
+    return False
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestRolePermissionMatrixBenchmark:
+    """Role checks/sec per UserRole: compiled matrix vs per-role queries"""
+
+    async def test_matrix_vs_queries_per_role(self, db_session, matrix):
+        db_session.add_all([
+            RolePermission(role=role, permission=permission)
+            for index, role in enumerate(UserRole)
+            for permission in list(Permission)[::index + 2]
+        ])
+        await db_session.commit()
+        snapshot = await matrix.get(db_session)
+
+        # A permission nobody holds forces the full inheritance walk
+        permission = Permission.SYSTEM_BACKUP
+        query_iterations, matrix_iterations = 20, 20000
+
+        for role in UserRole:
+            started = time.perf_counter()
+            for _ in range(query_iterations):
+                legacy = await _legacy_role_check(db_session, role, permission)
+            queries_per_second = query_iterations / (time.perf_counter() - started)
+
+            started = time.perf_counter()
+            for _ in range(matrix_iterations):
+                compiled = snapshot.allows(role, permission, None)
+            matrix_per_second = matrix_iterations / (time.perf_counter() - started)
+
+            print(f"\n{role.value:>12}: {queries_per_second:,.0f} checks/s queried, {matrix_per_second:,.0f} checks/s compiled")
+            assert compiled == legacy
+            assert matrix_per_second > queries_per_second * 10
@@ -0,0 +1,276 @@
+"""
+Report service tests: streaming CSV / JSON Lines exports
+"""
+
+import csv
+import gzip
+import io
+import json
+import time
+import tracemalloc
+import zlib
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from src.api.routers import reports
+from src.core import auth_dependencies
+from src.core.database import Base
+from src.core.exceptions import AuthorizationError, ValidationError
+from src.models.db_models import (
+    AuditLog, Client, GA4Property, PermissionLevel, PermissionStatus, ReportDownloadLog,
+    ReportType, User, UserPermission, UserRole, UserStatus
+)
+from src.services.principal_cache import AuthenticatedPrincipal
+from src.services.report_service import ReportService
+
+
+@pytest.fixture
+async def report_engine():
+    """Separate engine: streamed exports read through their own sessions"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def report_sessions(report_engine):
+    return async_sessionmaker(report_engine, expire_on_commit=False)
+
+
+@pytest.fixture
+async def report_db(report_sessions):
+    async with report_sessions() as session:
+        yield session
+
+
+@pytest.fixture
+async def admin(report_db):
+    admin = User(
+        email="admin@example.com", name="Admin", company="Test", password_hash="x",
+        role=UserRole.ADMIN, status=UserStatus.ACTIVE
+    )
+    report_db.add(admin)
+    await report_db.commit()
+    return admin
+
+
+@pytest.fixture
+def service(report_db, report_sessions):
+    return ReportService(report_db, session_factory=report_sessions)
+
+
+async def _seed_audit_logs(db, count: int, actor_id=None, batch: int = 50_000) -> None:
+    created_at = datetime.utcnow() - timedelta(days=1)
+    for offset in range(0, count, batch):
+        await db.execute(insert(AuditLog.__table__), [
+            {
+                "actor_id": actor_id if index % 2 else None, "action": "seeded_action",
+                "resource_type": "test", "resource_id": str(index),
+                "details": f"Seeded row {index}, with a comma", "created_at": created_at
+            }
+            for index in range(offset, min(offset + batch, count))
+        ])
+    await db.commit()
+
+
+async def _read(stream) -> bytes:
+    return b"".join([chunk async for chunk in stream.body])
+
+
+@pytest.mark.database
+class TestStreamingExport:
+    """stream_report output and bookkeeping"""
+
+    async def test_audit_log_csv_matches_materialized_report(self, service, report_db, admin, monkeypatch):
+        monkeypatch.setattr("src.services.report_service.settings.REPORT_EXPORT_PAGE_SIZE", 7)
+        await _seed_audit_logs(report_db, 50, actor_id=admin.id)
+        start, end = datetime.utcnow() - timedelta(days=2), datetime.utcnow()
+        legacy = await service._format_audit_log_csv(await service._collect_audit_log_data(start, end))
+
+        # The export's own audit entry is left out by the action filter
+        export = await service.stream_report(
+            admin.id, ReportType.AUDIT_LOG, start_date=start, end_date=end, action_filter="seeded"
+        )
+        body = (await _read(export)).decode()
+
+        streamed_rows = list(csv.DictReader(io.StringIO(body)))
+        legacy_rows = list(csv.DictReader(io.StringIO(legacy)))
+        assert len(streamed_rows) == 50
+        assert sorted(streamed_rows, key=lambda row: int(row["id"])) == sorted(legacy_rows, key=lambda row: int(row["id"]))
+        # Newest first, without duplicates across pages
+        assert [int(row["id"]) for row in streamed_rows] == sorted((int(row["id"]) for row in streamed_rows), reverse=True)
+        assert export.media_type == "text/csv"
+        assert export.filename.endswith(".csv")
+
+    async def test_jsonl_and_gzip(self, service, report_db, admin):
+        await _seed_audit_logs(report_db, 20, actor_id=admin.id)
+
+        export = await service.stream_report(
+            admin.id, ReportType.AUDIT_LOG, file_format="jsonl", compress=True, action_filter="seeded"
+        )
+        body = gzip.decompress(await _read(export)).decode()
+
+        rows = [json.loads(line) for line in body.splitlines()]
+        assert len(rows) == 20
+        assert {row["actor_name"] for row in rows} == {"Admin", "System"}
+        assert export.media_type == "application/gzip"
+        assert export.filename.endswith(".jsonl.gz")
+
+    async def test_download_log_records_streamed_size(self, service, report_db, admin):
+        await _seed_audit_logs(report_db, 10)
+
+        export = await service.stream_report(admin.id, ReportType.AUDIT_LOG, compress=True)
+        size = len(await _read(export))
+
+        download_log = (await report_db.execute(
+            select(ReportDownloadLog).where(ReportDownloadLog.report_id == export.report_id)
+        )).scalar_one()
+        await report_db.refresh(download_log)
+        assert download_log.file_size_bytes == size
+        assert download_log.file_format == "csv.gz"
+
+    async def test_rows_come_from_the_read_sessions(self, report_db, report_sessions, admin):
+        # A second database stands in for a read replica holding the audit log
+        replica = create_async_engine(
+            "sqlite+aiosqlite:///:memory:", poolclass=StaticPool, connect_args={"check_same_thread": False}
+        )
+        async with replica.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        replica_sessions = async_sessionmaker(replica, expire_on_commit=False)
+        async with replica_sessions() as replica_db:
+            await _seed_audit_logs(replica_db, 15)
+
+        try:
+            service = ReportService(report_db, session_factory=report_sessions, read_session_factory=replica_sessions)
+            export = await service.stream_report(admin.id, ReportType.AUDIT_LOG, action_filter="seeded")
+            body = (await _read(export)).decode()
+        finally:
+            await replica.dispose()
+
+        assert len(list(csv.DictReader(io.StringIO(body)))) == 15
+        download_log = (await report_db.execute(
+            select(ReportDownloadLog).where(ReportDownloadLog.report_id == export.report_id)
+        )).scalar_one()
+        await report_db.refresh(download_log)
+        assert download_log.file_size_bytes == len(body.encode())
+
+    async def test_permission_summary_and_user_activity(self, service, report_db, admin):
+        client = Client(name="Report Client")
+        ga_property = GA4Property(
+            client=client, property_id="987654321", property_name="Report Property",
+            account_id="1", account_name="Account"
+        )
+        report_db.add_all([client, ga_property])
+        await report_db.flush()
+        now = datetime.utcnow()
+        report_db.add_all([
+            UserPermission(
+                user_id=admin.id, ga_property_id=ga_property.id, target_email=f"t{index}@example.com",
+                permission_level=PermissionLevel.VIEWER, status=PermissionStatus.APPROVED,
+                expires_at=now + timedelta(days=10 if index < 3 else -1),
+                original_expires_at=now + timedelta(days=10), extension_count=index
+            )
+            for index in range(5)
+        ])
+        await report_db.commit()
+
+        summary = await service.stream_report(admin.id, ReportType.PERMISSION_SUMMARY, file_format="jsonl")
+        summary_rows = [json.loads(line) for line in (await _read(summary)).decode().splitlines()]
+        activity = await service.stream_report(admin.id, ReportType.USER_ACTIVITY)
+        activity_rows = list(csv.DictReader(io.StringIO((await _read(activity)).decode())))
+
+        assert [row["target_email"] for row in summary_rows] == ["t0@example.com", "t1@example.com", "t2@example.com"]
+        assert summary_rows[0]["property_name"] == "Report Property"
+        assert all(row["is_active"] for row in summary_rows)
+        assert activity_rows[0]["permission_request_count"] == "5"
+        assert activity_rows[0]["permission_extension_count"] == "10"
+        assert activity_rows[0]["active_permissions"] == "3"
+
+    async def test_requires_admin_and_known_format(self, service, report_db, admin):
+        viewer = User(
+            email="viewer@example.com", name="Viewer", company="Test", password_hash="x",
+            role=UserRole.VIEWER, status=UserStatus.ACTIVE
+        )
+        report_db.add(viewer)
+        await report_db.commit()
+
+        with pytest.raises(AuthorizationError):
+            await service.stream_report(viewer.id, ReportType.AUDIT_LOG)
+        with pytest.raises(ValidationError):
+            await service.stream_report(admin.id, ReportType.AUDIT_LOG, file_format="xlsx")
+        with pytest.raises(ValidationError):
+            await service.stream_report(admin.id, ReportType.SYSTEM_METRICS)
+
+    async def test_export_endpoint_streams_attachment(self, service, report_db, admin):
+        await _seed_audit_logs(report_db, 5)
+        app = FastAPI()
+        app.include_router(reports.router, prefix="/api")
+        app.dependency_overrides[reports.get_report_service] = lambda: service
+        app.dependency_overrides[auth_dependencies.get_current_user] = lambda: AuthenticatedPrincipal(
+            admin.id, admin.email, UserRole.ADMIN, UserStatus.ACTIVE
+        )
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/api/reports/audit_log/export", params={"format": "jsonl", "action": "seeded"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert 'filename="audit_log_' in response.headers["content-disposition"]
+        assert len(response.text.splitlines()) == 5
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestStreamingExportBenchmark:
+    """Peak memory and time exporting a large audit log"""
+
+    async def test_export_1m_audit_rows(self, service, report_db, admin):
+        rows = 1_000_000
+        sample_rows = 50_000
+        start, end = datetime.utcnow() - timedelta(days=2), datetime.utcnow()
+        filters = dict(start_date=start, end_date=end, action_filter="seeded")
+
+        # Peak memory on the same 50k rows: materialized report vs stream
+        await _seed_audit_logs(report_db, sample_rows, actor_id=admin.id)
+        tracemalloc.start()
+        legacy = await service._format_audit_log_csv(await service._collect_audit_log_data(start, end, "seeded"))
+        legacy_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del legacy
+        report_db.expunge_all()
+
+        export = await service.stream_report(admin.id, ReportType.AUDIT_LOG, **filters)
+        tracemalloc.start()
+        async for _ in export.body:
+            pass
+        stream_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        # Throughput on 1M rows (untraced; tracemalloc slows allocation several times over)
+        await _seed_audit_logs(report_db, rows - sample_rows, actor_id=admin.id)
+        export = await service.stream_report(admin.id, ReportType.AUDIT_LOG, compress=True, **filters)
+        started = time.perf_counter()
+        decompressor = zlib.decompressobj(wbits=31)
+        size = lines = 0
+        async for chunk in export.body:
+            size += len(chunk)
+            lines += decompressor.decompress(chunk).count(b"\n")
+        elapsed = time.perf_counter() - started
+
+        print(
+            f"\nreport export peak memory for {sample_rows:,} rows: {legacy_peak / 2**20:.0f} MiB materialized, "
+            f"{stream_peak / 2**20:.1f} MiB streamed; {rows:,} rows streamed in {elapsed:.1f}s "
+            f"({rows / elapsed:,.0f} rows/s, {size / 2**20:.1f} MiB gzipped)"
+        )
+        assert lines == rows + 1  # header
+        assert stream_peak < legacy_peak / 5
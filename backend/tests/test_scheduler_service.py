@@ -0,0 +1,302 @@
+"""
+Scheduler service tests: set-based permission expiry sweep and expiry notification digests
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+from sqlalchemy.pool import StaticPool
+
+from src.core.database import Base
+from src.models.db_models import (
+    AuditLog, Client, GA4Property, NotificationChannel, NotificationLog, NotificationStatus,
+    PermissionGrant, PermissionLevel, PermissionStatus, ServiceAccount, User, UserPermission, UserRole, UserStatus
+)
+from src.services.audit_service import AuditService
+from src.services.audit_writer import AuditWriter
+from src.services.notification_service import NotificationService
+from src.services.scheduler_service import SchedulerService
+
+
+@pytest.fixture
+async def sweep_engine():
+    """Separate engine so sweeps commit for real and large fixtures are thrown away with it"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def sweep_db(sweep_engine):
+    async with async_sessionmaker(sweep_engine, expire_on_commit=False)() as session:
+        yield session
+
+
+@pytest.fixture
+def statements(sweep_engine):
+    """Record SQL statements issued while the test runs"""
+    recorded = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        recorded.append(statement)
+
+    event.listen(sweep_engine.sync_engine, "before_cursor_execute", record)
+    yield recorded
+    event.remove(sweep_engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+async def owners(sweep_db):
+    """User, client, service account and property referenced by seeded grants"""
+    user = User(
+        email="owner@example.com", name="Owner", company="Test", password_hash="x",
+        role=UserRole.REQUESTER, status=UserStatus.ACTIVE
+    )
+    client = Client(name="Sweep Client")
+    service_account = ServiceAccount(
+        client=client, email="sa@test.iam.gserviceaccount.com", display_name="SA", secret_name="sa-key"
+    )
+    ga_property = GA4Property(
+        client=client, property_id="123456789", property_name="Sweep Property",
+        account_id="1", account_name="Sweep Account"
+    )
+    sweep_db.add_all([user, client, service_account, ga_property])
+    await sweep_db.commit()
+    return user, client, service_account, ga_property
+
+
+async def _seed(
+    db, owners, grants: int, user_permissions: int = 0,
+    expires_in: timedelta = timedelta(hours=-1), recipients: int = 0
+) -> None:
+    """Insert grants and user permissions with Core executemany, optionally sharing recipients"""
+    user, client, service_account, ga_property = owners
+    expires_at = datetime.utcnow() + expires_in
+
+    if grants:
+        await db.execute(insert(PermissionGrant), [
+            {
+                "user_id": user.id, "client_id": client.id, "service_account_id": service_account.id,
+                "ga_property_id": ga_property.property_id, "target_email": f"grant{index % (recipients or grants)}@example.com",
+                "permission_level": PermissionLevel.VIEWER, "status": PermissionStatus.APPROVED,
+                "expires_at": expires_at
+            }
+            for index in range(grants)
+        ])
+    if user_permissions:
+        await db.execute(insert(UserPermission), [
+            {
+                "user_id": user.id, "ga_property_id": ga_property.id, "target_email": f"user{index % (recipients or user_permissions)}@example.com",
+                "permission_level": PermissionLevel.VIEWER, "status": PermissionStatus.APPROVED,
+                "expires_at": expires_at, "original_expires_at": expires_at
+            }
+            for index in range(user_permissions)
+        ])
+    await db.commit()
+
+
+async def _count(db, model, status) -> int:
+    return (await db.execute(select(func.count(model.id)).where(model.status == status))).scalar()
+
+
+@pytest.mark.database
+class TestExpirySweep:
+    """_check_expired_permissions with UPDATE ... RETURNING chunks"""
+
+    async def test_expires_and_audits_each_row(self, sweep_db, owners, monkeypatch):
+        monkeypatch.setattr("src.services.scheduler_service.settings.SCHEDULER_EXPIRY_CHUNK_SIZE", 7)
+        await _seed(sweep_db, owners, grants=20, user_permissions=5)
+        await _seed(sweep_db, owners, grants=3, user_permissions=2, expires_in=timedelta(days=30))
+
+        result = await SchedulerService()._check_expired_permissions(sweep_db)
+
+        assert result["expired_count"] == 25
+        assert result["permission_grants"] == 20
+        assert result["user_permissions"] == 5
+        assert await _count(sweep_db, PermissionGrant, PermissionStatus.EXPIRED) == 20
+        assert await _count(sweep_db, PermissionGrant, PermissionStatus.APPROVED) == 3
+        assert await _count(sweep_db, UserPermission, PermissionStatus.APPROVED) == 2
+
+        audits = (await sweep_db.execute(
+            select(AuditLog.resource_id, AuditLog.details)
+            .where(AuditLog.action == "expire_permission_grant")
+        )).all()
+        expired_ids = (await sweep_db.execute(
+            select(PermissionGrant.id).where(PermissionGrant.status == PermissionStatus.EXPIRED)
+        )).scalars().all()
+        assert sorted(int(audit.resource_id) for audit in audits) == sorted(expired_ids)
+        assert "Permission grant for grant0@example.com expired automatically" in {audit.details for audit in audits}
+        assert (await sweep_db.execute(
+            select(func.count(AuditLog.id)).where(AuditLog.action == "expire_user_permission")
+        )).scalar() == 5
+
+    async def test_second_sweep_finds_nothing(self, sweep_db, owners):
+        await _seed(sweep_db, owners, grants=5)
+        scheduler = SchedulerService()
+        await scheduler._check_expired_permissions(sweep_db)
+
+        result = await scheduler._check_expired_permissions(sweep_db)
+
+        assert result["expired_count"] == 0
+        assert (await sweep_db.execute(select(func.count(AuditLog.id)))).scalar() == 5
+
+    async def test_statements_scale_with_chunks(self, sweep_db, owners, statements, monkeypatch):
+        monkeypatch.setattr("src.services.scheduler_service.settings.SCHEDULER_EXPIRY_CHUNK_SIZE", 100)
+        await _seed(sweep_db, owners, grants=1000)
+        statements.clear()
+
+        await SchedulerService()._check_expired_permissions(sweep_db)
+
+        updates = [s for s in statements if s.startswith("UPDATE permission_grants")]
+        inserts = [s for s in statements if s.startswith("INSERT INTO audit_logs")]
+        # Ten full chunks and the empty one that ends the loop
+        assert len(updates) == 11
+        assert len(inserts) == 10
+        assert not [s for s in statements if s.startswith("SELECT users")]
+
+
+@pytest.fixture
+def outbox(monkeypatch):
+    """Capture sent emails and track how many are in flight at once"""
+    outbox = {"sent": [], "in_flight": 0, "max_in_flight": 0, "fail": set()}
+
+    async def send_email(self, recipient, subject, message_body):
+        outbox["in_flight"] += 1
+        outbox["max_in_flight"] = max(outbox["max_in_flight"], outbox["in_flight"])
+        try:
+            await asyncio.sleep(0.01)
+            if recipient in outbox["fail"]:
+                raise ConnectionError("SMTP unavailable")
+            outbox["sent"].append((recipient, subject))
+        finally:
+            outbox["in_flight"] -= 1
+
+    monkeypatch.setattr(NotificationService, "_send_email", send_email)
+    return outbox
+
+
+@pytest.mark.database
+class TestExpiryNotifications:
+    """Planned, deduplicated and batched expiry notifications"""
+
+    async def test_one_digest_per_recipient(self, sweep_db, owners, outbox):
+        await _seed(sweep_db, owners, grants=6, user_permissions=2, expires_in=timedelta(days=3), recipients=2)
+        await _seed(sweep_db, owners, grants=4, expires_in=timedelta(days=30))
+
+        result = await SchedulerService()._send_expiry_notifications(sweep_db)
+
+        assert result["notification_count"] == 4
+        assert result["permission_grants"] == 6
+        assert result["user_permissions"] == 2
+        subjects = dict(outbox["sent"])
+        assert set(subjects) == {"grant0@example.com", "grant1@example.com", "user0@example.com", "user1@example.com"}
+        assert subjects["grant0@example.com"].startswith("GA4 Permissions Expiring - 3 permissions")
+        assert subjects["user0@example.com"].startswith("GA4 Permission Expiring - Sweep Property")
+
+        statuses = (await sweep_db.execute(select(NotificationLog.status))).scalars().all()
+        assert statuses == [NotificationStatus.SENT] * 4
+
+    async def test_recently_notified_recipients_are_skipped(self, sweep_db, owners, outbox):
+        await _seed(sweep_db, owners, grants=3, expires_in=timedelta(days=3))
+        sweep_db.add(NotificationLog(
+            channel=NotificationChannel.EMAIL, recipient="grant1@example.com",
+            template_type="permission_expiry", status=NotificationStatus.SENT
+        ))
+        await sweep_db.commit()
+
+        digests = await SchedulerService()._plan_expiry_notifications(sweep_db)
+
+        assert set(digests) == {"grant0@example.com", "grant2@example.com"}
+        assert digests["grant0@example.com"][0]["property_name"] == "Sweep Client - 123456789"
+
+    async def test_planning_is_one_query(self, sweep_db, owners, outbox, statements):
+        await _seed(sweep_db, owners, grants=50, user_permissions=50, expires_in=timedelta(days=3))
+        statements.clear()
+
+        await SchedulerService()._send_expiry_notifications(sweep_db)
+
+        selects = [s for s in statements if s.lstrip().startswith("SELECT")]
+        assert len(selects) == 1
+        assert len(outbox["sent"]) == 100
+
+    async def test_sends_are_concurrent_and_bounded(self, sweep_db, owners, outbox, monkeypatch):
+        monkeypatch.setattr("src.services.notification_service.settings.NOTIFICATION_SEND_CONCURRENCY", 4)
+        await _seed(sweep_db, owners, grants=20, expires_in=timedelta(days=3))
+        outbox["fail"] = {"grant3@example.com"}
+
+        result = await SchedulerService()._send_expiry_notifications(sweep_db)
+
+        assert outbox["max_in_flight"] == 4
+        assert result["notification_count"] == 19
+        assert result["failed_count"] == 1
+        failed = (await sweep_db.execute(
+            select(NotificationLog).where(NotificationLog.recipient == "grant3@example.com")
+        )).scalar_one()
+        assert failed.status == NotificationStatus.RETRYING
+        assert failed.retry_count == 1
+
+
+async def _legacy_check_expired_permissions(db):
+    """Expiry as done before the set-based sweep: load every row, mutate and audit one by one"""
+    grants = (await db.execute(
+        select(PermissionGrant)
+        .options(selectinload(PermissionGrant.user), selectinload(PermissionGrant.client))
+        .where(
+            PermissionGrant.status == PermissionStatus.APPROVED,
+            PermissionGrant.expires_at.is_not(None),
+            PermissionGrant.expires_at <= datetime.utcnow()
+        )
+    )).scalars().all()
+
+    for grant in grants:
+        grant.status = PermissionStatus.EXPIRED
+        await AuditService(db, AuditWriter()).log_action(
+            actor_id=None,
+            action="expire_permission_grant",
+            resource_type="permission_grant",
+            resource_id=str(grant.id),
+            details=f"Permission grant for {grant.target_email} expired automatically"
+        )
+    await db.commit()
+    return len(grants)
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestExpirySweepBenchmark:
+    """Sweep time for 100k expired grants"""
+
+    async def test_sweep_100k_grants(self, sweep_db, owners, statements):
+        grants = 100_000
+        legacy_grants = 2_000
+        await _seed(sweep_db, owners, grants=legacy_grants)
+
+        started = time.perf_counter()
+        assert await _legacy_check_expired_permissions(sweep_db) == legacy_grants
+        legacy_rate = legacy_grants / (time.perf_counter() - started)
+
+        await _seed(sweep_db, owners, grants=grants)
+        statements.clear()
+        started = time.perf_counter()
+        result = await SchedulerService()._check_expired_permissions(sweep_db)
+        elapsed = time.perf_counter() - started
+        sweep_rate = grants / elapsed
+
+        print(
+            f"\nexpiry sweep: {legacy_rate:,.0f} grants/s row by row, "
+            f"{grants:,} grants in {elapsed:.2f}s ({sweep_rate:,.0f} grants/s) "
+            f"with {len(statements)} statements"
+        )
+        assert result["permission_grants"] == grants
+        assert await _count(sweep_db, PermissionGrant, PermissionStatus.APPROVED) == 0
+        assert len(statements) < 100
+        assert sweep_rate > legacy_rate * 5
@@ -0,0 +1,425 @@
+"""
+Security pipeline tests: route classification, incremental body scanning, shared token claims and overhead at 5k RPS
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+import httpx
+import jwt
+import pytest
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import JSONResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from redis.exceptions import ConnectionError as RedisConnectionError
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from src.core import auth_dependencies
+from src.core.config import settings
+from src.core.database import get_db
+from src.middleware.rate_limit import RedisRateLimiter
+from src.middleware.security import SECURITY_HEADERS, SecurityMiddleware, _read_headers, is_public_path
+from src.models.db_models import UserRole, UserStatus
+from src.services.principal_cache import AuthenticatedPrincipal
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def _token(**claims) -> str:
+    payload = {"sub": "user@example.com", "user_id": 7, "role": "Viewer", "exp": datetime.utcnow() + timedelta(hours=1)}
+    return jwt.encode({**payload, **claims}, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def _app(body_scan_max_bytes: int = settings.SECURITY_BODY_SCAN_MAX_BYTES) -> FastAPI:
+    app = FastAPI()
+    handled = app.state.handled = []
+
+    @app.get("/api/items")
+    async def items(request: Request):
+        state = request.scope.get("state", {})
+        return {"rbac": state.get("rbac_enabled", False), "sub": state.get("token_payload", {}).get("sub")}
+
+    @app.post("/api/items")
+    async def create_item(request: Request):
+        body = await request.body()
+        handled.append(len(body))
+        return {"size": len(body)}
+
+    @app.get("/health")
+    async def health(request: Request):
+        return {"rbac": request.scope.get("state", {}).get("rbac_enabled", False)}
+
+    app.add_middleware(
+        SecurityMiddleware,
+        rate_limiter=RedisRateLimiter(fakeredis.FakeAsyncRedis()),
+        body_scan_max_bytes=body_scan_max_bytes,
+        rate_limit_enabled=True,
+        pattern_blocking_enabled=True
+    )
+    return app
+
+
+def _client(app) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+@pytest.mark.unit
+class TestRouteClassification:
+    """Public routes skip RBAC context and token decoding"""
+
+    @pytest.mark.parametrize("path,public", [
+        ("/health", True),
+        ("/api/auth/login", True),
+        ("/api/docs/oauth2-redirect", True),
+        ("/static/app.css", True),
+        ("/api/auth/logout", False),
+        ("/healthcheck", False),
+        ("/api/users", False),
+    ])
+    def test_public_paths(self, path, public):
+        assert is_public_path(path) is public
+
+    async def test_protected_routes_get_rbac_context_and_claims(self):
+        async with _client(_app()) as client:
+            protected = await client.get("/api/items", headers={"Authorization": f"Bearer {_token()}"})
+            public = await client.get("/health", headers={"Authorization": f"Bearer {_token()}"})
+            invalid = await client.get("/api/items", headers={"Authorization": "Bearer not-a-token"})
+
+        assert protected.json() == {"rbac": True, "sub": "user@example.com"}
+        assert protected.headers["X-Frame-Options"] == "DENY"
+        assert public.json() == {"rbac": False}
+        assert invalid.json() == {"rbac": True, "sub": None}
+
+
+@pytest.mark.unit
+class TestRequestScanning:
+    """Attack patterns in URLs, user agents and streamed bodies"""
+
+    async def test_malicious_url_blocks_the_client(self):
+        async with _client(_app()) as client:
+            attack = await client.get("/api/items/<script>alert(1)</script>")
+            after = await client.get("/api/items")
+
+        assert attack.status_code == 400
+        assert attack.json()["error"] == "INVALID_REQUEST"
+        assert after.json()["error"] == "IP_BLOCKED"
+
+    async def test_scanner_user_agent_is_rejected(self):
+        async with _client(_app()) as client:
+            response = await client.get("/api/items", headers={"User-Agent": "sqlmap/1.7"})
+
+        assert response.status_code == 400
+
+    async def test_pattern_split_across_chunks_is_rejected(self):
+        app = _app()
+        async with _client(app) as client:
+            response = await client.post("/api/items", content=_chunks(b'{"name": "<scr', b'ipt>alert(1)"}'))
+
+        assert response.status_code == 400
+        assert response.json()["error"] == "INVALID_REQUEST"
+        assert app.state.handled == []
+
+    async def test_large_clean_body_streams_through(self):
+        app = _app()
+        body = b'{"notes": "' + b"x" * 200_000 + b'"}'
+        async with _client(app) as client:
+            response = await client.post("/api/items", content=_chunks(*(body[i:i + 8192] for i in range(0, len(body), 8192))))
+
+        assert response.json() == {"size": len(body)}
+        assert response.headers["X-Content-Type-Options"] == "nosniff"
+
+    @pytest.mark.parametrize("reads_body", [True, False])
+    async def test_match_after_the_handler_started_streaming_gets_a_whole_400(self, reads_body):
+        handled = []
+
+        async def stream_while_reading(scope, receive, send):
+            # Starts the response before reading the body, then echoes each chunk
+            await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+            more_body = reads_body
+            while more_body:
+                message = await receive()
+                if message["type"] != "http.request":
+                    break
+                handled.append(message.get("body", b""))
+                await send({"type": "http.response.body", "body": message.get("body", b""), "more_body": True})
+                more_body = message.get("more_body", False)
+            await send({"type": "http.response.body", "body": b"done", "more_body": False})
+
+        middleware = SecurityMiddleware(
+            stream_while_reading, rate_limiter=RedisRateLimiter(fakeredis.FakeAsyncRedis()),
+            pattern_blocking_enabled=True
+        )
+        async with _client(middleware) as client:
+            clean = await client.post("/api/items", content=_chunks(b"first,", b"second,"))
+            attack = await client.post("/api/items", content=_chunks(b"first,", b"<script>alert(1)"))
+
+        assert clean.status_code == 200
+        assert clean.text == ("first,second,done" if reads_body else "done")
+        assert attack.status_code == 400
+        assert attack.json() == {"error": "INVALID_REQUEST", "message": "Request blocked"}
+        # The blocked body never reaches the handler
+        assert b"".join(handled) == (b"first,second," if reads_body else b"")
+
+    async def test_bytes_past_the_scan_cap_are_not_scanned(self):
+        app = _app(body_scan_max_bytes=1024)
+        body = b"x" * 2048 + b"<script>"
+        async with _client(app) as client:
+            response = await client.post("/api/items", content=body)
+
+        assert response.json() == {"size": len(body)}
+
+
+@pytest.mark.unit
+class TestEnforcementSettings:
+    """Enforcing stages are opt-in; forwarding headers are believed only from trusted proxies"""
+
+    async def test_enforcement_is_off_by_default(self):
+        app = FastAPI()
+
+        @app.get("/api/items/{name}")
+        async def item(name: str):
+            return {"name": name}
+
+        @app.post("/api/items")
+        async def create_item(request: Request):
+            return {"size": len(await request.body())}
+
+        middleware = SecurityMiddleware(app, rate_limiter=RedisRateLimiter(fakeredis.FakeAsyncRedis()))
+        middleware.rate_limits["default"] = {"requests": 1, "window": 3600}
+        async with _client(middleware) as client:
+            responses = [await client.get("/api/items/burp", headers={"User-Agent": "nmap"}) for _ in range(3)]
+            posted = await client.post("/api/items", content=b"../../etc/passwd")
+
+        assert [response.status_code for response in responses] == [200] * 3
+        assert posted.json() == {"size": 16}
+        assert posted.headers["X-Frame-Options"] == "DENY"
+
+    @pytest.mark.parametrize("peer, headers, client_ip", [
+        # Untrusted peers cannot choose their address
+        ("203.0.113.9", {b"x-forwarded-for": b"1.2.3.4"}, "203.0.113.9"),
+        ("203.0.113.9", {b"x-real-ip": b"1.2.3.4"}, "203.0.113.9"),
+        # A trusted proxy's hops are walked back to the first untrusted one
+        ("10.0.0.2", {b"x-forwarded-for": b"1.2.3.4, 198.51.100.7, 10.0.0.1"}, "198.51.100.7"),
+        ("10.0.0.2", {b"x-forwarded-for": b"spoofed, 198.51.100.7"}, "198.51.100.7"),
+        ("10.0.0.2", {b"x-forwarded-for": b"10.0.0.5, 10.0.0.1"}, "10.0.0.5"),
+        ("10.0.0.2", {b"x-real-ip": b"198.51.100.7"}, "198.51.100.7"),
+        ("10.0.0.2", {}, "10.0.0.2"),
+    ])
+    def test_client_ip(self, peer, headers, client_ip):
+        middleware = SecurityMiddleware(
+            None, rate_limiter=RedisRateLimiter(fakeredis.FakeAsyncRedis()), trusted_proxies=["10.0.0.0/24"]
+        )
+
+        assert middleware._get_client_ip({"client": (peer, 50000)}, headers) == client_ip
+
+    def test_repeated_forwarded_for_headers_are_one_hop_list(self):
+        scope = {"headers": [(b"x-forwarded-for", b"1.2.3.4"), (b"x-forwarded-for", b"198.51.100.7")]}
+
+        assert _read_headers(scope)[b"x-forwarded-for"] == b"1.2.3.4, 198.51.100.7"
+
+
+@pytest.mark.unit
+class TestSharedTokenClaims:
+    """get_current_user reuses the claims the middleware decoded"""
+
+    async def test_token_is_decoded_once(self, monkeypatch):
+        resolved = []
+
+        class _Principals:
+            async def resolve(self, db, payload):
+                resolved.append(payload)
+                return AuthenticatedPrincipal(id=7, email=payload["sub"], role=UserRole.VIEWER, status=UserStatus.ACTIVE)
+
+        monkeypatch.setattr(auth_dependencies, "principal_cache", _Principals())
+        monkeypatch.setattr(auth_dependencies.activity_tracker, "record", lambda user_id: None)
+        decode, decoded = jwt.decode, []
+
+        def counting_decode(*args, **kwargs):
+            decoded.append(args[0])
+            return decode(*args, **kwargs)
+
+        monkeypatch.setattr(jwt, "decode", counting_decode)
+
+        app = _app()
+
+        @app.get("/api/me")
+        async def me(principal=Depends(auth_dependencies.get_current_user)):
+            return {"email": principal.email}
+
+        app.dependency_overrides[get_db] = lambda: None
+        async with _client(app) as client:
+            response = await client.get("/api/me", headers={"Authorization": f"Bearer {_token()}"})
+
+        assert response.json() == {"email": "user@example.com"}
+        assert len(decoded) == 1
+        assert resolved[0]["user_id"] == 7
+
+    def test_claims_of_another_token_are_ignored(self):
+        token = _token()
+        request = Request({"type": "http", "headers": [], "state": {"token": token, "token_payload": {"user_id": 7}}})
+
+        assert auth_dependencies._shared_token_payload(request, token) == {"user_id": 7}
+        assert auth_dependencies._shared_token_payload(request, _token(user_id=8)) is None
+        assert auth_dependencies._shared_token_payload(None, token) is None
+
+
+class _UnavailableRedis:
+    """Async Redis client whose server cannot be reached, so limits come from the in-process fallback"""
+
+    def register_script(self, script):
+        async def run(keys=None, args=None):
+            raise RedisConnectionError("Connection refused")
+        return run
+
+
+class _LegacySecurityMiddleware(BaseHTTPMiddleware):
+    """Previous SecurityMiddleware.dispatch: Request wrappers, per-pattern scans and a buffered body"""
+
+    def __init__(self, app, rate_limiter):
+        super().__init__(app)
+        self.rate_limiter = rate_limiter
+        self.suspicious_patterns = settings.SECURITY_SUSPICIOUS_PATTERNS
+
+    async def dispatch(self, request, call_next):
+        forwarded = request.headers.get('X-Forwarded-For')
+        client_ip = forwarded.split(',')[0].strip() if forwarded else request.client.host
+        decision = await self.rate_limiter.hit(client_ip, request.url.path, 10**9, 3600)
+        if not decision.allowed:
+            return JSONResponse({"error": "RATE_LIMIT_EXCEEDED"}, status_code=429)
+
+        path, query = str(request.url.path).lower(), str(request.url.query).lower()
+        user_agent = request.headers.get('User-Agent', '').lower()
+        suspicious = any(pattern in path or pattern in query for pattern in self.suspicious_patterns)
+        suspicious = suspicious or any(pattern in user_agent for pattern in ['sqlmap', 'nikto', 'nmap', 'burp'])
+        if request.method == "POST":
+            body = (await request.body()).decode('utf-8', errors='ignore').lower()
+            suspicious = suspicious or any(pattern in body for pattern in self.suspicious_patterns)
+        if suspicious:
+            return JSONResponse({"error": "INVALID_REQUEST"}, status_code=400)
+
+        response = await call_next(request)
+        response.headers.update({name.decode(): value.decode() for name, value in SECURITY_HEADERS})
+        return response
+
+
+class _LegacyRBACMiddleware:
+    """Previous core.rbac.RBACMiddleware: a Request per call and a linear public-path scan"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        request = Request(scope, receive)
+        public_paths = [
+            "/health", "/api/docs", "/api/redoc", "/api/openapi.json",
+            "/api/auth/login", "/api/auth/register", "/static"
+        ]
+        if not any(request.url.path.startswith(path) for path in public_paths):
+            request.state.rbac_enabled = True
+        await self.app(scope, receive, send)
+
+
+
+async def _endpoint(scope, receive, send):
+    """Bare ASGI handler that authenticates like get_current_user and reads the body"""
+    state = scope.get("state") or {}
+    if "token_payload" not in state:
+        token = dict(scope["headers"])[b"authorization"].decode()[7:]
+        jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    if scope["method"] == "POST":
+        more_body = True
+        while more_body:
+            message = await receive()
+            more_body = message.get("more_body", False)
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": b'{"ok":true}'})
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestSecurityPipelineBenchmark:
+    """Middleware CPU cost and latency per request at an offered load of 5k requests/s"""
+
+    RPS, REQUESTS = 5000, 5000
+
+    async def _drive(self, app) -> Dict[str, float]:
+        """Open-loop load: 4 authenticated GETs per POST of a 2 KB JSON body in two chunks"""
+        loop = asyncio.get_running_loop()
+        authorization = f"Bearer {_token()}".encode()
+        body = json.dumps({"name": "GA4 property", "notes": "n" * 2000}).encode()
+        latencies: List[float] = []
+        statuses: List[int] = []
+
+        async def request(index: int, due: float):
+            method = "POST" if index % 5 == 0 else "GET"
+            scope = {
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+                "scheme": "http", "path": "/api/items", "raw_path": b"/api/items", "root_path": "",
+                "query_string": b"page=2", "server": ("test", 80), "client": (f"10.0.{index % 200}.1", 50000),
+                "headers": [
+                    (b"host", b"test"), (b"user-agent", b"Mozilla/5.0"), (b"accept", b"application/json"),
+                    (b"authorization", authorization), (b"content-type", b"application/json")
+                ]
+            }
+            chunks: List[Dict[str, Any]] = [
+                {"type": "http.request", "body": body[:1024], "more_body": True},
+                {"type": "http.request", "body": body[1024:], "more_body": False}
+            ] if method == "POST" else [{"type": "http.request", "body": b"", "more_body": False}]
+
+            async def receive():
+                if chunks:
+                    return chunks.pop(0)
+                await asyncio.Event().wait()  # Nothing more until the client disconnects
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    statuses.append(message["status"])
+
+            await app(scope, receive, send)
+            latencies.append(loop.time() - due)
+
+        tasks = []
+        cpu_started = time.process_time()
+        started = loop.time()
+        for index in range(self.REQUESTS):
+            due = started + index / self.RPS
+            if due > loop.time():
+                await asyncio.sleep(due - loop.time())
+            tasks.append(asyncio.ensure_future(request(index, due)))
+        await asyncio.gather(*tasks)
+
+        assert statuses == [200] * self.REQUESTS
+        latencies.sort()
+        return {
+            "cpu": (time.process_time() - cpu_started) / self.REQUESTS,
+            "p50": latencies[len(latencies) // 2],
+            "p99": latencies[int(len(latencies) * 0.99)]
+        }
+
+    async def test_overhead_per_request(self):
+        def limiter():
+            return RedisRateLimiter(_UnavailableRedis(), retry_seconds=3600)
+
+        bare = await self._drive(_endpoint)
+        legacy = await self._drive(_LegacySecurityMiddleware(_LegacyRBACMiddleware(_endpoint), rate_limiter=limiter()))
+        pipeline = SecurityMiddleware(_endpoint, rate_limiter=limiter(), rate_limit_enabled=True, pattern_blocking_enabled=True)
+        pipeline.rate_limits["default"] = {"requests": 10**9, "window": 3600}
+        current = await self._drive(pipeline)
+
+        legacy_overhead, current_overhead = legacy["cpu"] - bare["cpu"], current["cpu"] - bare["cpu"]
+        print(f"\n{self.REQUESTS} requests offered at {self.RPS}/s (20% POST with 2 KB body):")
+        for name, result in (("bare handler", bare), ("legacy stack", legacy), ("ASGI pipeline", current)):
+            print(
+                f"  {name:<14} {result['cpu'] * 1e6:7.1f} us CPU/request, "
+                f"latency p50 {result['p50'] * 1000:7.2f} ms, p99 {result['p99'] * 1000:7.2f} ms"
+            )
+        print(f"  middleware overhead: legacy {legacy_overhead * 1e6:.1f} us, pipeline {current_overhead * 1e6:.1f} us")
+        assert current_overhead < legacy_overhead / 2
@@ -0,0 +1,167 @@
+"""
+Pooled SMTP transport tests against a local aiosmtpd server
+"""
+
+import asyncio
+import socket
+import time
+from email.mime.text import MIMEText
+
+import aiosmtplib
+import pytest
+
+from src.services import email_service as email_service_module
+from src.services import notification_service as notification_service_module
+from src.services.email_service import EmailService
+from src.services.notification_service import NotificationService
+from src.services.smtp_pool import SMTPPool
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+
+class _Inbox:
+    """aiosmtpd handler that keeps every delivered message"""
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((envelope.mail_from, envelope.rcpt_tos))
+        return "250 Message accepted for delivery"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    inbox = _Inbox()
+    controller = aiosmtpd_controller.Controller(inbox, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    yield inbox, controller.port
+    controller.stop()
+
+
+@pytest.fixture
+async def pool(smtp_server):
+    _, port = smtp_server
+    pool = SMTPPool(
+        hostname="127.0.0.1", port=port, username="", password="", use_tls=False, start_tls=False,
+        max_connections=3, retry_backoff=0.01
+    )
+    yield pool
+    await pool.close()
+
+
+def _message(index: int = 0) -> MIMEText:
+    message = MIMEText(f"Message {index}")
+    message["Subject"] = f"Test {index}"
+    message["From"] = "noreply@example.com"
+    message["To"] = f"user{index}@example.com"
+    return message
+
+
+@pytest.mark.unit
+class TestSMTPPool:
+    """Connection reuse, concurrency bounds and retries"""
+
+    async def test_connections_are_reused(self, pool, smtp_server):
+        inbox, _ = smtp_server
+        for index in range(10):
+            await pool.send(_message(index))
+
+        assert len(inbox.messages) == 10
+        assert pool.get_stats()["connections_opened"] == 1
+        assert inbox.sessions == 1
+
+    async def test_concurrency_is_bounded(self, pool, smtp_server):
+        inbox, _ = smtp_server
+        await asyncio.gather(*(pool.send(_message(index)) for index in range(30)))
+
+        assert len(inbox.messages) == 30
+        assert pool.get_stats()["connections_opened"] <= 3
+        assert pool.get_stats()["idle_connections"] <= 3
+
+    async def test_dropped_connection_is_replaced(self, pool, smtp_server):
+        inbox, _ = smtp_server
+        await pool.send(_message(0))
+        # The server went away between messages
+        pool._idle[0].client.close()
+
+        await pool.send(_message(1))
+
+        assert len(inbox.messages) == 2
+        assert pool.get_stats()["connections_opened"] == 2
+        assert pool.get_stats()["failures"] == 0
+
+    async def test_connections_are_recycled(self, smtp_server):
+        _, port = smtp_server
+        pool = SMTPPool(
+            hostname="127.0.0.1", port=port, username="", password="", use_tls=False, start_tls=False,
+            max_messages_per_connection=4
+        )
+        for index in range(10):
+            await pool.send(_message(index))
+        await pool.close()
+
+        assert pool.get_stats()["connections_opened"] == 3
+
+    async def test_unreachable_server_is_retried_with_backoff(self):
+        pool = SMTPPool(
+            hostname="127.0.0.1", port=_free_port(), username="", password="", use_tls=False, start_tls=False,
+            max_retries=2, retry_backoff=0.05, timeout=1
+        )
+        started = time.perf_counter()
+
+        with pytest.raises(aiosmtplib.SMTPConnectError):
+            await pool.send(_message())
+
+        assert time.perf_counter() - started >= 0.05 + 0.1
+        assert pool.get_stats()["retries"] == 2
+        assert pool.get_stats()["failures"] == 1
+
+    async def test_services_share_the_pool(self, pool, smtp_server, monkeypatch):
+        inbox, _ = smtp_server
+        monkeypatch.setattr(notification_service_module, "smtp_pool", pool)
+        monkeypatch.setattr(email_service_module, "smtp_pool", pool)
+
+        await NotificationService(db=None)._send_email("a@example.com", "Subject", "<p>Body</p>")
+        await EmailService()._send_email("b@example.com", "Subject", "<p>Body</p>")
+
+        assert [recipients for _, recipients in inbox.messages] == [["a@example.com"], ["b@example.com"]]
+        assert pool.get_stats()["connections_opened"] == 1
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestSMTPPoolBenchmark:
+    """Messages/sec: a connection per message vs the pool"""
+
+    async def test_messages_per_second(self, pool, smtp_server):
+        inbox, port = smtp_server
+        messages = 300
+
+        started = time.perf_counter()
+        for index in range(messages):
+            await aiosmtplib.send(_message(index), hostname="127.0.0.1", port=port, start_tls=False)
+        per_message_rate = messages / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(pool.send(_message(index)) for index in range(messages)))
+        pooled_rate = messages / (time.perf_counter() - started)
+
+        print(
+            f"\nSMTP: {per_message_rate:,.0f} msg/s connecting per message, "
+            f"{pooled_rate:,.0f} msg/s pooled over {pool.get_stats()['connections_opened']} connections"
+        )
+        assert len(inbox.messages) == messages * 2
+        assert pooled_rate > per_message_rate * 1.5